@@ -153,6 +153,16 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
     BoolOption("lonepycfiles", "Import pyc files with no matching py file",
                default=False),
 
+    BoolOption("lazy_code_loading",
+               "Unmarshal the functions of pyc files only when first used",
+               default=False),
+
+    StrOption("frozen_modules",
+              "Comma-separated list of app-level modules to import at "
+              "translation time and freeze into the executable",
+              cmdline="--frozen-modules",
+              default=""),
+
     StrOption("soabi",
               "Tag to differentiate extension modules built for different Python interpreters",
               cmdline="--soabi",
@@ -199,6 +209,19 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
                    "use specialised tuples",
                    default=False),
 
+        BoolOption("withbytesslice",
+                   "make large slices of strings without copying them",
+                   default=False),
+
+        BoolOption("withunicodeslice",
+                   "make large slices of unicode strings without copying them",
+                   default=False),
+
+        IntOption("bytesslicethreshold",
+                  "minimal length of the slices of strings and unicode "
+                  "strings that are not copied",
+                  default=4096, cmdline="--bytesslicethreshold"),
+
         BoolOption("withliststrategies",
                    "enable optimized ways to store lists of primitives ",
                    default=True),
@@ -393,6 +393,11 @@ class PyPyTarget(object):
         w_dict = app.getwdict(self.space)
         entry_point, _ = create_entry_point(self.space, w_dict)
 
+        if config.objspace.frozen_modules:
+            from pypy.module.imp.importing import freeze_modules
+            freeze_modules(self.space,
+                           config.objspace.frozen_modules.split(','))
+
         return entry_point, None, PyPyAnnotatorPolicy(self.space)
 
     def interface(self, ns):
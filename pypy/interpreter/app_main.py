@@ -35,6 +35,8 @@ PyPy options and arguments:
                      a warning if they are not closed explicitly
 -X faulthandler    : attempt to display tracebacks when PyPy crashes
 -X jit-off         : turn the JIT off, equivalent to --jit off
+-X pycache_prefix=PATH : write and look up the .pyc files in a tree under
+                     PATH instead of next to the source files
 """
 # Missing vs CPython: PYTHONHOME, PYTHONCASEOK
 USAGE2 = """
@@ -46,6 +48,8 @@ PYTHONIOENCODING: Encoding[:errors] used for stdin/stdout/stderr.
 PYPY_IRC_TOPIC: if set to a non-empty value, print a random #pypy IRC
                topic at startup of interactive mode.
 PYPYLOG: If set to a non-empty value, enable logging.
+PYTHONPYCACHEPREFIX: root directory of the .pyc files, as with
+               -X pycache_prefix=PATH.
 """
 
 try:
@@ -281,9 +285,12 @@ def set_runtime_options(options, Xparam, *args):
         run_faulthandler()
     elif Xparam == 'jit-off':
         set_jit_option(options, 'off')
+    elif Xparam.startswith('pycache_prefix='):
+        options["pycache_prefix"] = Xparam[len('pycache_prefix='):]
     else:
         print >> sys.stderr, 'usage: %s -X [options]' % (get_sys_executable(),)
-        print >> sys.stderr, '[options] can be: track-resources, faulthandler, jit-off'
+        print >> sys.stderr, ('[options] can be: track-resources, faulthandler, '
+                              'jit-off, pycache_prefix=PATH')
         raise SystemExit
 
 class CommandLineError(Exception):
@@ -411,7 +418,8 @@ default_options = dict.fromkeys(
     "run_module",
     "run_stdin",
     "warnoptions",
-    "unbuffered"), 0)
+    "unbuffered",
+    "pycache_prefix"), 0)
 
 def simple_option(options, name, iterargv):
     options[name] += 1
@@ -556,6 +564,8 @@ def parse_command_line(argv):
             options["unbuffered"] = 1
         parse_env('PYTHONVERBOSE', "verbose", options)
         parse_env('PYTHONOPTIMIZE', "optimize", options)
+        if not options["pycache_prefix"]:
+            options["pycache_prefix"] = getenv('PYTHONPYCACHEPREFIX')
     if (options["interactive"] or
         (not options["ignore_environment"] and getenv('PYTHONINSPECT'))):
         options["inspect"] = 1
@@ -571,6 +581,8 @@ def parse_command_line(argv):
         sys.flags = type(sys.flags)(flags)
         sys.py3kwarning = bool(sys.flags.py3k_warning)
         sys.dont_write_bytecode = bool(sys.flags.dont_write_bytecode)
+        if options["pycache_prefix"]:
+            sys.pycache_prefix = options["pycache_prefix"]
 
         if sys.flags.optimize >= 1:
             import __pypy__
@@ -400,6 +400,7 @@ class SymtableBuilder(ast.GenericASTVisitor):
             if self._visit_alias(alias):
                 if self.scope.note_import_star(imp):
                     msg = "import * only allowed at module level"
+                    self.compile_info.emitted_warnings = True
                     misc.syntax_warning(
                         self.space, msg, self.compile_info.filename,
                         imp.lineno, imp.col_offset)
@@ -439,6 +440,7 @@ class SymtableBuilder(ast.GenericASTVisitor):
                 else:
                     msg = "name '%s' is used prior to global declaration" % \
                         (name,)
+                self.compile_info.emitted_warnings = True
                 misc.syntax_warning(self.space, msg, self.compile_info.filename,
                                     glob.lineno, glob.col_offset)
             if old_role & SYM_PARAM:
@@ -972,7 +972,7 @@ class BuiltinCode4(BuiltinCode):
             w_result = space.w_None
         return w_result
 
-def interpindirect2app(unbound_meth, unwrap_spec=None):
+def interpindirect2app(unbound_meth, unwrap_spec=None, doc=None):
     base_cls = unbound_meth.im_class
     func = unbound_meth.im_func
     args = inspect.getargs(func.func_code)
@@ -987,7 +987,7 @@ def interpindirect2app(unbound_meth, unwrap_spec=None):
     exec func_code.compile() in d
     f = d['f']
     f.func_defaults = unbound_meth.func_defaults
-    f.func_doc = unbound_meth.func_doc
+    f.func_doc = doc if doc is not None else unbound_meth.func_doc
     f.__module__ = func.__module__
     # necessary for unique identifiers for pickling
     f.func_name = func.func_name
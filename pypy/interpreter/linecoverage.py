@@ -0,0 +1,171 @@
+"""
+Line coverage that does not need sys.settrace(), and so does not disable
+the JIT.  Used by the coverage_*() functions of the __pypy__ module.
+
+While it is enabled, the interpreter sets one bit per executed line start
+in a bitmap attached to the code object.  The bytecode offsets are only
+turned into line numbers when the data is asked for.
+
+A "line start" is an offset where co_lnotab starts a new entry or where
+control can arrive other than by falling through (a jump target or an
+exception handler).  Every line that runs runs from one of them, so only
+those bytecodes need to be marked; the others cost nothing in the JIT.
+"""
+
+from rpython.rlib import jit
+from rpython.rlib.listsort import make_timsort_class
+from pypy.tool import stdlib_opcode
+
+LineSort = make_timsort_class()
+
+HAVE_ARGUMENT = stdlib_opcode.HAVE_ARGUMENT
+EXTENDED_ARG = stdlib_opcode.opmap['EXTENDED_ARG']
+JUMP_RELATIVE = [False] * 256
+JUMP_ABSOLUTE = [False] * 256
+for _op in stdlib_opcode.hasjrel:
+    JUMP_RELATIVE[_op] = True
+for _op in stdlib_opcode.hasjabs:
+    JUMP_ABSOLUTE[_op] = True
+del _op
+
+
+def _setbit(bits, offset):
+    bits[offset >> 3] |= 1 << (offset & 7)
+
+def _getbit(bits, offset):
+    return (bits[offset >> 3] >> (offset & 7)) & 1
+
+def find_line_starts(code):
+    """Return the bitmap of the line starts of 'code'."""
+    co_code = code.co_code
+    size = len(co_code)
+    starts = [0] * ((size >> 3) + 1)
+    _setbit(starts, 0)
+    tab = code.co_lnotab
+    addr = 0
+    for i in range(0, len(tab) - 1, 2):
+        addr += ord(tab[i])
+        if addr < size:
+            _setbit(starts, addr)
+    offset = 0
+    extended = 0
+    while offset < size:
+        op = ord(co_code[offset])
+        offset += 1
+        if op < HAVE_ARGUMENT:
+            continue
+        if offset + 1 >= size:
+            break
+        oparg = (extended | ord(co_code[offset]) |
+                 (ord(co_code[offset + 1]) << 8))
+        offset += 2
+        if op == EXTENDED_ARG:
+            extended = oparg << 16
+            continue
+        extended = 0
+        if JUMP_RELATIVE[op]:
+            target = offset + oparg
+        elif JUMP_ABSOLUTE[op]:
+            target = oparg
+        else:
+            continue
+        if 0 <= target < size:
+            _setbit(starts, target)
+    return starts
+
+
+class LineCoverage(object):
+    _immutable_fields_ = ['epoch?']
+
+    def __init__(self, space):
+        self.space = space
+        self.epoch = 0          # 0 means that coverage is disabled
+        self.last_epoch = 0
+        self.codes = []         # the code objects that have a bitmap
+
+    def _cleanup_(self):
+        self.clear()
+        self.epoch = 0
+
+    def start(self):
+        self.clear()
+        self._new_epoch()
+
+    def stop(self):
+        self.epoch = 0
+
+    def is_running(self):
+        return self.epoch != 0
+
+    def _new_epoch(self):
+        # changing the quasi-immutable 'epoch' invalidates the machine
+        # code that was traced before, which then checks the new value
+        self.last_epoch += 1
+        self.epoch = self.last_epoch
+
+    def clear(self):
+        for code in self.codes:
+            code.coverage_bits = None
+        self.codes = []
+        if self.epoch != 0:
+            self._new_epoch()
+
+    def trace(self, code, offset):
+        """Called for every bytecode while coverage is enabled."""
+        # in a trace, 'code' and 'offset' are constants: the test is
+        # folded away for the bytecodes that are not line starts, and
+        # once the bit is set the residual call is replaced by a guard
+        if (self.is_line_start(code, offset) and
+                not self.is_marked(code, offset)):
+            self.mark(code, offset)
+
+    @jit.elidable
+    def is_line_start(self, code, offset):
+        starts = code.coverage_starts
+        if starts is None:
+            starts = find_line_starts(code)
+            code.coverage_starts = starts
+        return _getbit(starts, offset) != 0
+
+    def is_marked(self, code, offset):
+        bits = code.coverage_bits
+        return bits is not None and _getbit(bits, offset) != 0
+
+    # Not elidable: the point of the call is its side effect, which an
+    # elidable call is allowed to lose (it is constant-folded while
+    # tracing and can be removed or shared with an identical call).
+    # Left as a residual call, the machine code marks the bytecodes each
+    # time it runs them, and the JIT doesn't trace into the list handling.
+    @jit.dont_look_inside
+    def mark(self, code, offset):
+        bits = code.coverage_bits
+        if bits is None:
+            bits = [0] * ((len(code.co_code) >> 3) + 1)
+            code.coverage_bits = bits
+            self.codes.append(code)
+        _setbit(bits, offset)
+
+    def getlines(self, code):
+        """Return the sorted list of the lines of 'code' that were run."""
+        bits = code.coverage_bits
+        seen = {}
+        if bits is not None:
+            # walk co_lnotab together with the offsets, like
+            # offset2lineno() but only once for the whole code
+            tab = code.co_lnotab
+            line = code.co_firstlineno
+            addr = 0
+            i = 0
+            for offset in range(len(code.co_code)):
+                while i < len(tab) and addr + ord(tab[i]) <= offset:
+                    addr += ord(tab[i])
+                    line += ord(tab[i + 1])
+                    i += 2
+                if _getbit(bits, offset):
+                    seen[line] = None
+        lines = seen.keys()
+        LineSort(lines).sort()
+        return lines
+
+def getlinecoverage(space):
+    return space.fromcache(LineCoverage)
@@ -62,12 +62,17 @@ class PyCode(eval.Code):
                           "co_stacksize", "co_varnames[*]",
                           "_args_as_cellvars[*]",
                           "w_globals?",
+                          "lazy_loader?",
                           "cell_families[*]"]
 
+    coverage_bits = None    # see pypy.interpreter.linecoverage
+    coverage_starts = None
+
     def __init__(self, space,  argcount, nlocals, stacksize, flags,
                      code, consts, names, varnames, filename,
                      name, firstlineno, lnotab, freevars, cellvars,
-                     hidden_applevel=False, magic=default_magic):
+                     hidden_applevel=False, magic=default_magic,
+                     lazy_loader=None):
         """Initialize a new code object from parameters given by
         the pypy compiler"""
         self.space = space
@@ -93,6 +98,9 @@ class PyCode(eval.Code):
         self.w_globals = None
         self.hidden_applevel = hidden_applevel
         self.magic = magic
+        # if not None, then co_code, co_consts_w, co_names_w and co_lnotab
+        # are still in a .pyc buffer: see materialize()
+        self.lazy_loader = lazy_loader
         self._signature = make_signature(self)
         self._initialize()
         self._init_ready()
@@ -115,7 +123,6 @@ class PyCode(eval.Code):
                 e.write_unraisable(self.space, "new_code_hook()")
 
     def _initialize(self):
-        from pypy.objspace.std.mapdict import init_mapdict_cache
         from pypy.interpreter.nestedscope import CellFamily
         if self.co_cellvars:
             argcount = self.co_argcount
@@ -135,9 +142,43 @@ class PyCode(eval.Code):
 
         self._compute_flatcall()
 
+        if self.lazy_loader is None:
+            self._init_caches()
+
+    def _init_caches(self):
+        from pypy.objspace.std.mapdict import init_mapdict_cache
         init_mapdict_cache(self)
         self._globals_caches = [None] * len(self.co_names_w)
 
+    def materialize(self):
+        """Finish loading a code object that marshal only partially
+        unmarshalled from a .pyc file (see marshal_impl.LazyCodeLoader).
+        Must be called before co_code, co_consts_w, co_names_w or
+        co_lnotab are used."""
+        if self.lazy_loader is not None:
+            self._materialize()
+
+    @jit.dont_look_inside
+    def _materialize(self):
+        space = self.space
+        loader = self.lazy_loader
+        code, consts_w, names, lnotab = loader.load(space)
+        self.co_code = code
+        self.co_consts_w = consts_w
+        self.co_names_w = [space.new_interned_str(aname) for aname in names]
+        self.co_lnotab = lnotab
+        self.lazy_loader = None
+        self._init_caches()
+        if self.co_filename != loader.filename:
+            # update_code_filenames() was called on us while we were
+            # not loaded yet: the nested code objects are all lazy
+            for w_const in consts_w:
+                if (isinstance(w_const, PyCode) and
+                        w_const.co_filename == loader.filename):
+                    w_const.co_filename = self.co_filename
+        if loader.remove_docstrings:
+            self.remove_docstrings(space)
+
     def _init_ready(self):
         "This is a hook for the vmprof module, which overrides this method."
 
@@ -238,6 +279,7 @@ class PyCode(eval.Code):
         return self.co_varnames
 
     def getdocstring(self, space):
+        self.materialize()
         if self.co_consts_w:   # it is probably never empty
             w_first = self.co_consts_w[0]
             if space.isinstance_w(w_first, space.w_basestring):
@@ -245,6 +287,9 @@ class PyCode(eval.Code):
         return space.w_None
 
     def remove_docstrings(self, space):
+        if self.lazy_loader is not None:
+            self.lazy_loader.remove_docstrings = True
+            return
         if self.co_flags & CO_KILL_DOCSTRING:
             self.co_consts_w[0] = space.w_None
         for w_co in self.co_consts_w:
@@ -253,6 +298,7 @@ class PyCode(eval.Code):
 
     def _to_code(self):
         """For debugging only."""
+        self.materialize()
         consts = [None] * len(self.co_consts_w)
         num = 0
         for w in self.co_consts_w:
@@ -276,6 +322,24 @@ class PyCode(eval.Code):
                         tuple(self.co_freevars),
                         tuple(self.co_cellvars))
 
+    def copy(self):
+        """Return a new code object equal to this one.  Unlike this one, it
+        was never run, and the nested code objects are copied too."""
+        space = self.space
+        self.materialize()
+        consts_w = self.co_consts_w[:]
+        for i in range(len(consts_w)):
+            w_const = consts_w[i]
+            if isinstance(w_const, PyCode):
+                consts_w[i] = w_const.copy()
+        names = [space.text_w(w_name) for w_name in self.co_names_w]
+        return PyCode(space, self.co_argcount, self.co_nlocals,
+                      self.co_stacksize, self.co_flags, self.co_code,
+                      consts_w, names, self.co_varnames, self.co_filename,
+                      self.co_name, self.co_firstlineno, self.co_lnotab,
+                      self.co_freevars, self.co_cellvars,
+                      self.hidden_applevel, self.magic)
+
     def exec_host_bytecode(self, w_globals, w_locals):
         if sys.version_info < (2, 7):
             raise Exception("PyPy no longer supports Python 2.6 or lower")
@@ -288,12 +352,22 @@ class PyCode(eval.Code):
         co = self._to_code()
         dis.dis(co)
 
+    def fget_co_code(self, space):
+        self.materialize()
+        return space.newbytes(self.co_code)
+
     def fget_co_consts(self, space):
+        self.materialize()
         return space.newtuple(self.co_consts_w)
 
     def fget_co_names(self, space):
+        self.materialize()
         return space.newtuple(self.co_names_w)
 
+    def fget_co_lnotab(self, space):
+        self.materialize()
+        return space.newbytes(self.co_lnotab)
+
     def fget_co_varnames(self, space):
         return space.newtuple([space.newtext(name) for name in self.co_varnames])
 
@@ -307,6 +381,8 @@ class PyCode(eval.Code):
         space = self.space
         if not isinstance(w_other, PyCode):
             return space.w_NotImplemented
+        self.materialize()
+        w_other.materialize()
         areEqual = (self.co_name == w_other.co_name and
                     self.co_argcount == w_other.co_argcount and
                     self.co_nlocals == w_other.co_nlocals and
@@ -339,6 +415,7 @@ class PyCode(eval.Code):
 
     def descr_code__hash__(self):
         space = self.space
+        self.materialize()
         result =  compute_hash(self.co_name)
         result ^= self.co_argcount
         result ^= self.co_nlocals
@@ -399,6 +476,7 @@ class PyCode(eval.Code):
         w_mod    = space.getbuiltinmodule('_pickle_support')
         mod      = space.interp_w(MixedModule, w_mod)
         new_inst = mod.get('code_new')
+        self.materialize()
         tup      = [
             space.newint(self.co_argcount),
             space.newint(self.co_nlocals),
@@ -3,6 +3,9 @@ General classes for bytecode compilers.
 Compiler instances are stored into 'space.getexecutioncontext().compiler'.
 """
 
+from collections import OrderedDict
+
+from rpython.rlib.objectmodel import move_to_end
 from pypy.interpreter import pycode
 from pypy.interpreter.pyparser import future, pyparse, error as parseerror
 from pypy.interpreter.astcompiler import (astbuilder, codegen, consts, misc,
@@ -99,12 +102,42 @@ class PythonAstCompiler(PyCodeCompiler):
          of incomplete inputs (e.g. we shouldn't re-compile from scratch
          the whole source after having only added a new '\n')
     """
+    # compile() keeps the code objects of the last DEFAULT_CACHE_SIZE
+    # sources that it compiled, unless they are longer than
+    # CACHE_MAX_SOURCE_LENGTH
+    DEFAULT_CACHE_SIZE = 128
+    CACHE_MAX_SOURCE_LENGTH = 65536
+
     def __init__(self, space, override_version=None):
         PyCodeCompiler.__init__(self, space)
         self.future_flags = future.futureFlags_2_7
         self.parser = pyparse.PythonParser(space, self.future_flags)
         self.additional_rules = {}
         self.compiler_flags = self.future_flags.allowed_flags
+        self.cache_size = self.DEFAULT_CACHE_SIZE
+        self._reset_cache()
+
+    def _reset_cache(self):
+        self.cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _cleanup_(self):
+        # don't keep in the translated pypy the code compiled so far
+        self._reset_cache()
+
+    def set_cache_size(self, size):
+        """Change the number of code objects kept by compile(); 0 disables
+        the cache."""
+        assert size >= 0
+        self.cache_size = size
+        while len(self.cache) > size:
+            self._evict_oldest()
+
+    def _evict_oldest(self):
+        for key in self.cache:
+            del self.cache[key]
+            break
 
     def compile_ast(self, node, filename, mode, flags):
         if mode == 'eval':
@@ -150,7 +183,40 @@ class PythonAstCompiler(PyCodeCompiler):
         return mod
 
     def compile(self, source, filename, mode, flags, hidden_applevel=False):
+        if (self.cache_size == 0 or
+                len(source) > self.CACHE_MAX_SOURCE_LENGTH):
+            return self.compile_uncached(source, filename, mode, flags,
+                                         hidden_applevel)
+        key = (source, filename, mode, flags, hidden_applevel)
+        code = self.cache.get(key, None)
+        if code is not None:
+            self.cache_hits += 1
+            move_to_end(self.cache, key)
+            # the code object in the cache was returned by an earlier call
+            # and maybe run since then; copy() only reads the parts that
+            # don't change when a code object is run.  (The import system,
+            # which renames co_filename and removes docstrings, doesn't
+            # use the cache.)
+            return code.copy()
+        self.cache_misses += 1
         info = pyparse.CompileInfo(filename, mode, flags,
                                    hidden_applevel=hidden_applevel)
+        code = self._compile(source, info)
+        if not info.emitted_warnings:
+            # compiling again would emit the SyntaxWarnings again, so the
+            # sources that emit some are not cached
+            self.cache[key] = code
+            if len(self.cache) > self.cache_size:
+                self._evict_oldest()
+        return code
+
+    def compile_uncached(self, source, filename, mode, flags,
+                         hidden_applevel=False):
+        """Like compile(), without looking at or filling the cache."""
+        info = pyparse.CompileInfo(filename, mode, flags,
+                                   hidden_applevel=hidden_applevel)
+        return self._compile(source, info)
+
+    def _compile(self, source, info):
         mod = self._compile_to_ast(source, info)
         return self._compile_ast(mod, info, source)
@@ -16,6 +16,7 @@ from pypy.interpreter import (
 )
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.error import OperationError, oefmt
+from pypy.interpreter.linecoverage import getlinecoverage
 from pypy.interpreter.nestedscope import Cell
 from pypy.interpreter.pycode import PyCode, BytecodeCorruption
 from pypy.tool.stdlib_opcode import bytecode_spec
@@ -153,6 +154,9 @@ class __extend__(pyframe.PyFrame):
             else:
                 ec.bytecode_trace(self)
                 next_instr = r_uint(self.last_instr)
+            coverage = getlinecoverage(self.space)
+            if coverage.epoch != 0:
+                coverage.trace(self.getcode(), intmask(next_instr))
             opcode = ord(co_code[next_instr])
             next_instr += 1
 
@@ -66,6 +66,7 @@ class CompileInfo(object):
       import.
     * hidden_applevel: Will this code unit and sub units be hidden at the
       applevel?
+    * emitted_warnings: Set to True when compiling emits a SyntaxWarning.
     """
 
     def __init__(self, filename, mode="exec", flags=0, future_pos=(0, 0),
@@ -76,6 +77,7 @@ class CompileInfo(object):
         self.flags = flags
         self.last_future_import = future_pos
         self.hidden_applevel = hidden_applevel
+        self.emitted_warnings = False
 
 
 _targets = {
@@ -242,6 +242,20 @@ class TestParseCommandLine:
         self.check(['-X', 'jit-off'], {}, sys_argv=[''], run_stdin=True)
         assert options == ["off"]
 
+    def test_pycache_prefix(self):
+        self.check(['-X', 'pycache_prefix=/tmp/pyc', '-c', 'pass'], {},
+                   sys_argv=['-c'], run_command='pass',
+                   pycache_prefix='/tmp/pyc')
+        self.check(['-c', 'pass'], {'PYTHONPYCACHEPREFIX': '/tmp/env'},
+                   sys_argv=['-c'], run_command='pass',
+                   pycache_prefix='/tmp/env')
+        self.check(['-X', 'pycache_prefix=/tmp/pyc', '-c', 'pass'],
+                   {'PYTHONPYCACHEPREFIX': '/tmp/env'},
+                   sys_argv=['-c'], run_command='pass',
+                   pycache_prefix='/tmp/pyc')
+        self.check(['-E', '-c', 'pass'], {'PYTHONPYCACHEPREFIX': '/tmp/env'},
+                   sys_argv=['-c'], run_command='pass', ignore_environment=1)
+
 class TestInteraction:
     """
     These tests require pexpect (UNIX-only).
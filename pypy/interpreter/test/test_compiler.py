@@ -739,6 +739,74 @@ class TestECCompiler(BaseTestCompiler):
         self.compiler = self.space.getexecutioncontext().compiler
 
 
+class TestCompileCache:
+    def test_lru(self):
+        compiler = PythonAstCompiler(self.space)
+        compiler.set_cache_size(2)
+        compiler.compile('1', '?', 'eval', 0)
+        compiler.compile('2', '?', 'eval', 0)
+        compiler.compile('1', '?', 'eval', 0)    # '1' is now the most recent
+        compiler.compile('3', '?', 'eval', 0)    # evicts '2'
+        assert [key[0] for key in compiler.cache] == ['1', '3']
+        assert (compiler.cache_hits, compiler.cache_misses) == (1, 3)
+        code = compiler.compile('3', '?', 'eval', 0)
+        assert isinstance(code, PyCode)
+        assert code is not compiler.cache[('3', '?', 'eval', 0, False)]
+        compiler.set_cache_size(1)
+        assert [key[0] for key in compiler.cache] == ['3']
+
+    def test_miss_returns_the_cached_code(self):
+        compiler = PythonAstCompiler(self.space)
+        code = compiler.compile('x = 1', '?', 'exec', 0)
+        assert code is compiler.cache[('x = 1', '?', 'exec', 0, False)]
+        code2 = compiler.compile('x = 1', '?', 'exec', 0)
+        assert code2 is not code
+        assert self.space.eq_w(code2, code)
+
+    def test_uncached(self):
+        compiler = PythonAstCompiler(self.space)
+        code = compiler.compile_uncached('x = 1', '?', 'exec', 0)
+        assert isinstance(code, PyCode)
+        assert len(compiler.cache) == 0
+        assert (compiler.cache_hits, compiler.cache_misses) == (0, 0)
+
+    def test_warnings_not_cached(self):
+        space = self.space
+        compiler = PythonAstCompiler(space)
+        src = 'def f():\n    x = 1\n    global x\n'
+        w_warnings = space.appexec([], """():
+            import warnings
+            return warnings
+        """)
+        w_log = space.appexec([w_warnings], """(warnings):
+            log = []
+            def showwarning(message, *args):
+                log.append(str(message))
+            warnings.showwarning = showwarning
+            warnings.simplefilter('always')
+            return log
+        """)
+        try:
+            compiler.compile(src, '?', 'exec', 0)
+            compiler.compile(src, '?', 'exec', 0)
+        finally:
+            space.appexec([w_warnings], """(warnings):
+                del warnings.showwarning
+                warnings.resetwarnings()
+            """)
+        assert space.unwrap(w_log) == [
+            "name 'x' is assigned to before global declaration"] * 2
+        assert len(compiler.cache) == 0
+
+    def test_syntax_error_not_cached(self):
+        compiler = PythonAstCompiler(self.space)
+        for i in range(2):
+            with pytest.raises(OperationError):
+                compiler.compile('1 +', '?', 'eval', 0)
+        assert len(compiler.cache) == 0
+        assert compiler.cache_misses == 2
+
+
 class AppTestCompiler:
     def setup_class(cls):
         cls.w_host_is_pypy = cls.space.wrap(
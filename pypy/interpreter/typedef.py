@@ -641,7 +641,7 @@ PyCode.typedef = TypeDef('code',
     co_nlocals = interp_attrproperty('co_nlocals', cls=PyCode, wrapfn="newint"),
     co_stacksize = interp_attrproperty('co_stacksize', cls=PyCode, wrapfn="newint"),
     co_flags = interp_attrproperty('co_flags', cls=PyCode, wrapfn="newint"),
-    co_code = interp_attrproperty('co_code', cls=PyCode, wrapfn="newbytes"),
+    co_code = GetSetProperty(PyCode.fget_co_code),
     co_consts = GetSetProperty(PyCode.fget_co_consts),
     co_names = GetSetProperty(PyCode.fget_co_names),
     co_varnames = GetSetProperty(PyCode.fget_co_varnames),
@@ -650,7 +650,7 @@ PyCode.typedef = TypeDef('code',
     co_filename = interp_attrproperty('co_filename', cls=PyCode, wrapfn="newtext"),
     co_name = interp_attrproperty('co_name', cls=PyCode, wrapfn="newtext"),
     co_firstlineno = interp_attrproperty('co_firstlineno', cls=PyCode, wrapfn="newint"),
-    co_lnotab = interp_attrproperty('co_lnotab', cls=PyCode, wrapfn="newbytes"),
+    co_lnotab = GetSetProperty(PyCode.fget_co_lnotab),
     __weakref__ = make_weakref_descr(PyCode),
     )
 PyCode.typedef.acceptable_as_base_class = False
@@ -0,0 +1,36 @@
+from pypy.interpreter.gateway import unwrap_spec
+from pypy.interpreter.linecoverage import getlinecoverage, LineSort
+
+
+def coverage_start(space):
+    """Start recording which lines are run, forgetting the lines that were
+    recorded so far.  Unlike sys.settrace(), this does not stop the JIT."""
+    getlinecoverage(space).start()
+
+def coverage_stop(space):
+    """Stop recording which lines are run."""
+    getlinecoverage(space).stop()
+
+@unwrap_spec(clear=bool)
+def coverage_snapshot(space, clear=False):
+    """Return a dict {filename: sorted list of line numbers} of the lines
+    that were run since coverage_start().  If 'clear' is true, forget them
+    afterwards."""
+    coverage = getlinecoverage(space)
+    files = {}
+    for code in coverage.codes:
+        lines = files.get(code.co_filename, None)
+        if lines is None:
+            lines = {}
+            files[code.co_filename] = lines
+        for line in coverage.getlines(code):
+            lines[line] = None
+    w_result = space.newdict()
+    for filename, lines in files.items():
+        linenos = lines.keys()
+        LineSort(linenos).sort()
+        space.setitem(w_result, space.newtext(filename),
+                      space.newlist([space.newint(i) for i in linenos]))
+    if clear:
+        coverage.clear()
+    return w_result
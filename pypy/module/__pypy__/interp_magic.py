@@ -1,10 +1,12 @@
 from pypy.interpreter.error import oefmt, wrap_oserror
 from pypy.interpreter.gateway import unwrap_spec
 from pypy.interpreter.pycode import CodeHookCache
+from pypy.interpreter.pycompiler import PythonAstCompiler
 from pypy.interpreter.pyframe import PyFrame
 from pypy.interpreter.mixedmodule import MixedModule
 from rpython.rlib.objectmodel import we_are_translated
 from pypy.objspace.std.dictmultiobject import W_DictMultiObject
+from pypy.objspace.std.formatting import TemplateCache
 from pypy.objspace.std.listobject import W_ListObject
 from pypy.objspace.std.setobject import W_BaseSetObject
 from pypy.objspace.std.typeobject import MethodCache
@@ -42,6 +44,47 @@ def reset_method_cache_counter(space):
     cache.misses = {}
     cache.hits = {}
 
+def _get_compiler(space):
+    compiler = space.createcompiler()
+    assert isinstance(compiler, PythonAstCompiler)
+    return compiler
+
+def compile_cache_counter(space):
+    """Return a tuple (hits, misses) for the cache of code objects used
+    by compile(), exec and eval() with a source string."""
+    compiler = _get_compiler(space)
+    return space.newtuple([space.newint(compiler.cache_hits),
+                           space.newint(compiler.cache_misses)])
+
+def reset_compile_cache_counter(space):
+    """Reset to zero the counters returned by compile_cache_counter()."""
+    compiler = _get_compiler(space)
+    compiler.cache_hits = 0
+    compiler.cache_misses = 0
+
+@unwrap_spec(size=int)
+def set_compile_cache_size(space, size):
+    """Set how many code objects compile() keeps for the sources that it
+    compiled last.  0 disables this cache."""
+    if size < 0:
+        raise oefmt(space.w_ValueError, "size must be >= 0")
+    _get_compiler(space).set_cache_size(size)
+
+def format_template_cache_counter(space):
+    """Return a tuple (hits, misses) for the cache of parsed format
+    strings used by 'fmt % args' and fmt.format() when the format string
+    is not a constant in the JIT."""
+    cache = space.fromcache(TemplateCache)
+    return space.newtuple([space.newint(cache.hits),
+                           space.newint(cache.misses)])
+
+def reset_format_template_cache_counter(space):
+    """Reset to zero the counters returned by
+    format_template_cache_counter()."""
+    cache = space.fromcache(TemplateCache)
+    cache.hits = 0
+    cache.misses = 0
+
 @unwrap_spec(name='text')
 def mapdict_cache_counter(space, name):
     """Return a tuple (index_cache_hits, index_cache_misses) for lookups
@@ -121,6 +121,17 @@ class Module(MixedModule):
         'newmemoryview'             : 'interp_buffer.newmemoryview',
         'utf8content'               : 'interp_magic.utf8content',
         'list_get_physical_size'    : 'interp_magic.list_get_physical_size',
+        'compile_cache_counter'     : 'interp_magic.compile_cache_counter',
+        'reset_compile_cache_counter':
+                              'interp_magic.reset_compile_cache_counter',
+        'set_compile_cache_size'    : 'interp_magic.set_compile_cache_size',
+        'format_template_cache_counter':
+                              'interp_magic.format_template_cache_counter',
+        'reset_format_template_cache_counter':
+                        'interp_magic.reset_format_template_cache_counter',
+        'coverage_start'            : 'interp_coverage.coverage_start',
+        'coverage_stop'             : 'interp_coverage.coverage_stop',
+        'coverage_snapshot'         : 'interp_coverage.coverage_snapshot',
     }
     if sys.platform == 'win32':
         interpleveldefs['get_console_cp'] = 'interp_magic.get_console_cp'
@@ -0,0 +1,87 @@
+
+class AppTestCoverage:
+    spaceconfig = dict(usemodules=['__pypy__'])
+
+    def test_lines(self):
+        import __pypy__
+        def f(x):
+            if x:
+                y = 1
+            else:
+                y = 2
+            return y
+        first = f.__code__.co_firstlineno
+        filename = f.__code__.co_filename
+        f(0)
+        __pypy__.coverage_start()
+        try:
+            f(1)
+        finally:
+            __pypy__.coverage_stop()
+        f(0)
+        lines = __pypy__.coverage_snapshot()[filename]
+        assert lines == sorted(set(lines))
+        assert first + 1 in lines
+        assert first + 2 in lines
+        assert first + 4 not in lines
+        assert first + 5 in lines
+
+    def test_lines_far_apart(self):
+        import __pypy__
+        src = ("def f(x):\n    y = x\n" + "\n" * 300 +
+               "    if y:\n        y += 1\n    return y\n")
+        d = {}
+        exec compile(src, "<far_apart>", "exec") in d
+        __pypy__.coverage_start()
+        try:
+            d['f'](0)
+        finally:
+            __pypy__.coverage_stop()
+        lines = __pypy__.coverage_snapshot()["<far_apart>"]
+        assert lines == [2, 303, 305]
+
+    def test_loops_and_handlers(self):
+        # only the line starts are marked: check the lines that are
+        # entered by a jump or by an exception
+        import __pypy__
+        src = '''def f(n):
+    total = 0
+    for i in range(n):
+        if i & 1: continue
+        total += i
+    while n:
+        n -= 1
+    try:
+        1 / n
+    except ZeroDivisionError:
+        total = -total
+    x = 1 if total else 2
+    return total if x else 0
+'''
+        d = {}
+        exec compile(src, "<loops>", "exec") in d
+        __pypy__.coverage_start()
+        try:
+            assert d['f'](5) == -6
+        finally:
+            __pypy__.coverage_stop()
+        lines = __pypy__.coverage_snapshot()["<loops>"]
+        assert lines == range(2, 14)
+
+    def test_snapshot_clear(self):
+        import __pypy__
+        def f():
+            return 42
+        filename = f.__code__.co_filename
+        __pypy__.coverage_start()
+        try:
+            f()
+            d = __pypy__.coverage_snapshot(clear=True)
+            assert f.__code__.co_firstlineno + 1 in d[filename]
+            d = __pypy__.coverage_snapshot()
+            assert f.__code__.co_firstlineno + 1 not in d.get(filename, [])
+        finally:
+            __pypy__.coverage_stop()
+        f()
+        d = __pypy__.coverage_snapshot()
+        assert f.__code__.co_firstlineno + 1 not in d.get(filename, [])
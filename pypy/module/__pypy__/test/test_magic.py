@@ -84,3 +84,45 @@ def f():
         l = [1, 2]
         l.append(3)
         assert list_get_physical_size(l) >= 3 # should be 6, but untranslated 3
+
+    def test_compile_cache(self):
+        import __pypy__
+        __pypy__.reset_compile_cache_counter()
+        src = "def f(x):\n    return x + 1\n"
+        c1 = compile(src, "<cached>", "exec")
+        c2 = compile(src, "<cached>", "exec")
+        c3 = compile(src, "<other>", "exec")
+        assert __pypy__.compile_cache_counter() == (1, 2)
+        assert c1 == c2 and c1 is not c2
+        assert c1.co_consts[0] is not c2.co_consts[0]
+        assert c3.co_filename == "<other>"
+        d = {}
+        exec c2 in d
+        assert d['f'](41) == 42
+        #
+        # running the code above may compile app-level helpers lazily
+        __pypy__.set_compile_cache_size(0)
+        try:
+            __pypy__.reset_compile_cache_counter()
+            compile(src, "<cached>", "exec")
+            assert __pypy__.compile_cache_counter() == (0, 0)
+        finally:
+            __pypy__.set_compile_cache_size(128)
+        raises(ValueError, __pypy__.set_compile_cache_size, -1)
+        __pypy__.reset_compile_cache_counter()
+        compile(src, "<cached>", "exec")
+        assert __pypy__.compile_cache_counter() == (0, 1)
+
+    def test_format_template_cache(self):
+        import __pypy__
+        __pypy__.reset_format_template_cache_counter()
+        fmt = "%s-%5d-%-*s|"
+        assert fmt % ("a", 42, 3, "b") == "a-   42-b  |"
+        assert fmt % ("c", 7, -2, "d") == "c-    7-d |"
+        assert __pypy__.format_template_cache_counter() == (1, 1)
+        fmt = "{0}+{x!r:>4}"
+        assert fmt.format(1, x=2) == "1+   2"
+        assert fmt.format(3, x='y') == "3+ 'y'"
+        assert __pypy__.format_template_cache_counter() == (2, 2)
+        __pypy__.reset_format_template_cache_counter()
+        assert __pypy__.format_template_cache_counter() == (0, 0)
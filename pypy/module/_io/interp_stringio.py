@@ -195,6 +195,8 @@ class W_StringIO(W_TextIOBase):
                         "%T.__setstate__ argument should be a 4-tuple, got %T",
                         self, w_state)
         w_initval, w_readnl, w_pos, w_dict = space.unpackiterable(w_state, 4)
+        if space.isinstance_w(w_initval, space.w_unicode):
+            w_initval = space.convert_to_w_unicode(w_initval)
         self.w_value = space.interp_w(W_UnicodeObject, w_initval)
         self.buf = None
         self.builder = None
@@ -242,6 +244,9 @@ class W_StringIO(W_TextIOBase):
                 space.newtext("\n"),
                 space.newutf8(writenl, codepoints_in_utf8(writenl)),
             )
+        if space.isinstance_w(w_decoded, space.w_unicode):
+            # force a W_UnicodeSliceObject
+            w_decoded = space.convert_to_w_unicode(w_decoded)
         w_decoded = space.interp_w(W_UnicodeObject, w_decoded)
         return w_decoded
 
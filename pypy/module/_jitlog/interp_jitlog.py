@@ -1,8 +1,10 @@
-from pypy.interpreter.error import OperationError
+import time
+from pypy.interpreter.error import OperationError, oefmt
 from pypy.interpreter.gateway import unwrap_spec
 from pypy.interpreter.pyframe import PyFrame
 from pypy.interpreter.pycode import PyCode
 from pypy.interpreter.baseobjspace import W_Root
+from pypy.interpreter.executioncontext import PeriodicAsyncAction
 from rpython.rlib.rjitlog import rjitlog
 from rpython.rlib import jit
 
@@ -22,7 +24,55 @@ def enable(space, fileno):
     except rjitlog.JitlogError, e:
         raise JitlogError(space, e)
 
+@unwrap_spec(path='fsencode', interval=float)
+def enable_socket(space, path, interval=1.0):
+    """ Stream PyPy's jit log to the Unix-domain socket 'path'.  Every
+        'interval' seconds, the execution counters of the loops and
+        bridges and the guard failure counts are written too.  An
+        interval of 0 disables these periodic counter records.
+    """
+    if interval < 0.0:
+        raise oefmt(space.w_ValueError, "interval must be >= 0")
+    try:
+        rjitlog.enable_jitlog_socket(path)
+    except rjitlog.JitlogError, e:
+        raise JitlogError(space, e)
+    space.fromcache(FlushCountersAction).start(interval)
+
 @jit.dont_look_inside
 def disable(space):
     """ Disable PyPy's logging facility. """
+    space.fromcache(FlushCountersAction).stop()
     rjitlog.disable_jitlog()
+
+
+class FlushCountersAction(PeriodicAsyncAction):
+    """Periodically writes the jit counters to the streamed jit log.
+    Checked every sys.checkinterval bytecodes, the counters are only
+    written when 'interval' seconds have passed.
+    """
+    interval = 0.0
+    next_flush = 0.0
+
+    def start(self, interval):
+        self.interval = interval
+        self.next_flush = time.time() + interval
+
+    def stop(self):
+        self.interval = 0.0
+
+    def perform(self, executioncontext, frame):
+        if self.interval == 0.0:
+            return
+        now = time.time()
+        if now >= self.next_flush:
+            self.next_flush = now + self.interval
+            self._flush()
+
+    @jit.dont_look_inside
+    def _flush(self):
+        if not rjitlog.jitlog_enabled():
+            # the reader went away, see jitlog_write_marked()
+            self.stop()
+            return
+        rjitlog.flush_counters()
@@ -8,6 +8,15 @@ class Module(MixedModule):
 
     interpleveldefs = {
         'enable': 'interp_jitlog.enable',
+        'enable_socket': 'interp_jitlog.enable_socket',
         'disable': 'interp_jitlog.disable',
         'JitlogError': 'space.fromcache(interp_jitlog.Cache).w_JitlogError',
     }
+
+    def __init__(self, space, *args):
+        "NOT_RPYTHON"
+        from pypy.module._jitlog import interp_jitlog
+        MixedModule.__init__(self, space, *args)
+        space.actionflag.register_periodic_action(
+            space.fromcache(interp_jitlog.FlushCountersAction),
+            use_bytecode_counter=True)
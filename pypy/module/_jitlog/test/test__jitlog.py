@@ -9,7 +9,7 @@ win32_untranslated ="not config.option.runappdirect and sys.platform == 'win32'"
 win32_reason = "fileno may come from different runtimes depending on current compiler"
 
 class AppTestJitLog(object):
-    spaceconfig = {'usemodules': ['_jitlog', 'struct']}
+    spaceconfig = {'usemodules': ['_jitlog', 'struct', '_socket']}
 
     def setup_class(cls):
         cls.w_tmpfilename = cls.space.wrap(str(udir.join('test__jitlog.1')))
@@ -21,6 +21,7 @@ class AppTestJitLog(object):
         space = cls.space
         for key, value in opname.items():
             space.setitem(cls.w_resops, space.wrap(key), space.wrap(value))
+        cls.w_is_win32 = cls.space.wrap(sys.platform == 'win32')
 
     @pytest.mark.skipif(win32_untranslated, reason=win32_reason)
     def test_enable(self):
@@ -52,3 +53,57 @@ class AppTestJitLog(object):
                 assert opnum in self.resops
                 # the name must equal
                 assert self.resops[opnum] == opname
+
+    def test_enable_socket(self):
+        import _jitlog, _socket, os
+        if self.is_win32:
+            skip("no Unix-domain sockets")
+        path = self.tmpfilename + '.sock'
+        if os.path.exists(path):
+            os.unlink(path)
+        server = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+        server.bind(path)
+        server.listen(1)
+        _jitlog.enable_socket(path, 0.5)
+        conn, _ = server.accept()
+        _jitlog.disable()
+        data = conn.recv(4)
+        assert data == self.mark_header + self.version + data[3]
+        conn.close()
+        server.close()
+        os.unlink(path)
+
+    def test_enable_socket_errors(self):
+        import _jitlog
+        raises(ValueError, _jitlog.enable_socket, self.tmpfilename, -1.0)
+        raises(_jitlog.JitlogError, _jitlog.enable_socket,
+               self.tmpfilename + '.nosuchsocket')
+
+
+class TestFlushCountersAction(object):
+    spaceconfig = {'usemodules': ['_jitlog']}
+
+    def test_perform_flushes(self, monkeypatch):
+        from pypy.module._jitlog.interp_jitlog import FlushCountersAction
+        flushes = []
+        monkeypatch.setattr(jl, 'jitlog_enabled', lambda: True)
+        monkeypatch.setattr(jl, 'flush_counters', lambda: flushes.append(1))
+        space = self.space
+        action = space.fromcache(FlushCountersAction)
+        assert action in space.actionflag._periodic_actions
+        assert space.actionflag.has_bytecode_counter
+        action.perform(None, None)
+        assert flushes == []            # not started
+        action.start(1000.0)
+        action.perform(None, None)
+        assert flushes == []            # the interval has not passed
+        action.next_flush = 0.0
+        action.perform(None, None)
+        assert flushes == [1]
+        assert action.next_flush > 0.0
+        action.perform(None, None)
+        assert flushes == [1]
+        action.stop()
+        action.next_flush = 0.0
+        action.perform(None, None)
+        assert flushes == [1]
@@ -776,6 +776,7 @@ class MapBase(object):
     # tunable parameters
     MAX_FRINGE = 40
     USEFUL_THRESHOLD = 5
+    MAX_ADDED_TRANSITIONS = 8
 
     def __init__(self, space):
         self.space = space
@@ -787,6 +788,11 @@ class MapBase(object):
         # but then it also contains .nextmap_first
         self.nextmap_all = None # later dict {key: nextmap}
 
+        # the transitions taken by the dicts that get a key added after
+        # decoding, see JsonDictStrategy. They are never followed by the
+        # parser, and they don't change any of its statistics.
+        self.nextmap_added = None # later dict {key: nextmap}
+
         # keep some statistics about every map: how often it was instantiated
         # and how many non-blocked leaves the map transition tree has, starting
         # from self
@@ -890,6 +896,47 @@ class MapBase(object):
             check = check.prev
         return JSONMap(self.space, self, w_key, key_repr)
 
+    @jit.elidable
+    def get_next_added(self, w_key):
+        """ Returns the map of the dicts of self once w_key was added to
+        them, or None if the dicts should stop using maps. w_key must not
+        be one of the keys of self.
+
+        A transition that the parser already made is reused, so that
+        adding a key to a dict gives it the same map as decoding an object
+        with all the keys. Otherwise a new map is made, that the parser
+        never reaches. """
+        from pypy.objspace.std.dictmultiobject import unicode_hash, unicode_eq
+        from pypy.objspace.std.unicodeobject import W_UnicodeObject
+        assert isinstance(w_key, W_UnicodeObject)
+        nextmap_added = self.nextmap_added
+        if nextmap_added is None:
+            nextmap_added = self.nextmap_added = objectmodel.r_dict(
+                unicode_eq, unicode_hash,
+                force_non_null=True, simple_hash_eq=True)
+        else:
+            next = nextmap_added.get(w_key, None)
+            if next is not None:
+                return next
+            if len(nextmap_added) >= MapBase.MAX_ADDED_TRANSITIONS:
+                # probably a dict with arbitrary keys
+                return None
+        next = None
+        nextmap_first = self.nextmap_first
+        if nextmap_first is not None and nextmap_first.w_key.eq_w(w_key):
+            next = nextmap_first
+        elif self.nextmap_all is not None:
+            next = self.nextmap_all.get(w_key, None)
+        if next is None:
+            # the parser never compares the key_repr of this map
+            next = self._make_next_map(w_key, "")
+            if next is None:
+                return None
+        # store parser transitions too: they disappear from nextmap_all
+        # if the parser blocks them, and the result must stay the same
+        nextmap_added[w_key] = next
+        return next
+
     def fill_dict(self, dict_w, values_w):
         """ recursively fill the dictionary dict_w in the correct order,
         reading from values_w."""
@@ -1157,6 +1204,25 @@ class JSONMap(MapBase):
                 keys_in_order[index] = w_key
         return keys_in_order
 
+    @jit.elidable
+    def get_map_without(self, index):
+        """ Returns the map of the dicts of self once the key at index was
+        deleted from them, or None. Like in mapdict, the keys that come
+        after it are added again. The result is never the terminator. """
+        keys_in_order = self.get_keys_in_order()
+        length = len(keys_in_order)
+        assert 0 <= index < length and length > 1
+        jsonmap = self
+        for i in range(length - index):
+            assert isinstance(jsonmap, JSONMap)
+            jsonmap = jsonmap.prev
+        for i in range(index + 1, length):
+            jsonmap = jsonmap.get_next_added(keys_in_order[i])
+            if jsonmap is None:
+                return None
+        assert isinstance(jsonmap, JSONMap)
+        return jsonmap
+
     # _____________________________________________________
 
     def _get_dot_text(self):
@@ -272,6 +272,53 @@ class TestJson(object):
         assert m2.instantiation_count == 2
         dec.close()
 
+    def test_get_next_added(self):
+        w_a = self.space.newutf8("a", 1)
+        w_b = self.space.newutf8("b", 1)
+        w_c = self.space.newutf8("c", 1)
+        base = Terminator(self.space)
+        m1 = base.get_next(w_a, 'a"', 0, 2, base)
+        m2 = m1.get_next(w_b, 'b"', 0, 2, base)
+        # the transition of the parser is reused
+        assert m1.get_next_added(w_b) is m2
+        m3 = m2.get_next_added(w_c)
+        assert m3.get_keys_in_order() == [w_a, w_b, w_c]
+        assert m2.get_next_added(w_c) is m3
+        # ... but the parser doesn't see the new one
+        assert m2.nextmap_first is None
+        assert base.number_of_leaves == 1
+        # still the same result after the parser blocks m2
+        m1.mark_blocked(base)
+        assert m1.get_next_added(w_b) is m2
+        assert m3.get_next_added(w_a) is None
+
+    def test_get_next_added_limit(self):
+        base = Terminator(self.space)
+        w_a = self.space.newutf8("a", 1)
+        m1 = base.get_next(w_a, 'a"', 0, 2, base)
+        for i in range(MapBase.MAX_ADDED_TRANSITIONS):
+            w_key = self.space.newutf8(str(i), 1)
+            assert m1.get_next_added(w_key) is not None
+        w_x = self.space.newutf8("x", 1)
+        assert m1.get_next_added(w_x) is None
+        assert m1.get_next_added(self.space.newutf8("0", 1)) is not None
+
+    def test_get_map_without(self):
+        w_a = self.space.newutf8("a", 1)
+        w_b = self.space.newutf8("b", 1)
+        w_c = self.space.newutf8("c", 1)
+        base = Terminator(self.space)
+        m1 = base.get_next(w_a, 'a"', 0, 2, base)
+        m2 = m1.get_next(w_b, 'b"', 0, 2, base)
+        m3 = m2.get_next(w_c, 'c"', 0, 2, base)
+        assert m3.get_map_without(2) is m2
+        m4 = m3.get_map_without(0)
+        assert m4.get_keys_in_order() == [w_b, w_c]
+        assert m3.get_map_without(0) is m4
+        m5 = m3.get_map_without(1)
+        assert m5.get_keys_in_order() == [w_a, w_c]
+        assert m5.prev is m1
+
 
 class AppTest(object):
     spaceconfig = {"objspace.usemodules._pypyjson": True}
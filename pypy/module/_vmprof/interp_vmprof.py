@@ -51,17 +51,25 @@ def VMProfError(space, e):
     return OperationError(w_VMProfError, space.newtext(e.msg))
 
 
-@unwrap_spec(fileno=int, period=float, memory=int, lines=int, native=int, real_time=int)
-def enable(space, fileno, period, memory, lines, native, real_time):
+@unwrap_spec(fileno=int, period=float, memory=int, lines=int, native=int,
+             real_time=int, alloc_sample=int)
+def enable(space, fileno, period, memory, lines, native, real_time,
+           alloc_sample=0):
     """Enable vmprof.  Writes go to the given 'fileno', a file descriptor
     opened for writing.  *The file descriptor must remain open at least
     until disable() is called.*
 
     'interval' is a float representing the sampling interval, in seconds.
     Must be smaller than 1.0
+
+    If 'alloc_sample' is not zero, the stack is also written about every
+    'alloc_sample' bytes allocated by Python code, starting after the next
+    minor collection.  These samples use their own marker (9), with the
+    number of bytes in place of the count of the time samples.
     """
     try:
-        rvmprof.enable(fileno, period, memory, native, real_time)
+        rvmprof.enable(fileno, period, memory, native, real_time,
+                       alloc_sample)
     except rvmprof.VMProfError as e:
         raise VMProfError(space, e)
 
@@ -10,6 +10,19 @@ class AppTestVMProf(object):
         cls.w_tmpfilename2 = cls.space.wrap(str(udir.join('test__vmprof.2')))
         cls.w_plain = cls.space.wrap(not cls.runappdirect and
             '__pypy__' not in sys.builtin_module_names)
+        cls.w_runappdirect = cls.space.wrap(cls.runappdirect)
+        if not cls.runappdirect:
+            from pypy.interpreter.gateway import interp2app
+            from pypy.module.gc.hook import LowLevelGcHooks
+            gchooks = cls.space.fromcache(LowLevelGcHooks)
+            def get_alloc_sample_interval(space):
+                return space.newint(gchooks.get_alloc_sample_interval())
+            def fire_gc_alloc_sample(space):
+                gchooks.fire_gc_alloc_sample(4096)
+            cls.w_get_alloc_sample_interval = cls.space.wrap(
+                interp2app(get_alloc_sample_interval))
+            cls.w_fire_gc_alloc_sample = cls.space.wrap(
+                interp2app(fire_gc_alloc_sample))
 
     def test_import_vmprof(self):
         tmpfile = open(self.tmpfilename, 'wb')
@@ -98,6 +111,33 @@ class AppTestVMProf(object):
         NaN = (1e300*1e300) / (1e300*1e300)
         raises(_vmprof.VMProfError, _vmprof.enable, 2, NaN, 0, 0, 0, 0)
 
+    def test_alloc_sample(self):
+        if self.runappdirect:
+            skip("needs the interp-level GC hooks")
+        import _vmprof
+        tmpfile = open(self.tmpfilename, 'wb')
+        assert self.get_alloc_sample_interval() == 0
+        raises(_vmprof.VMProfError, _vmprof.enable, tmpfile.fileno(), 0.01,
+               0, 0, 0, 0, -1)
+        _vmprof.enable(tmpfile.fileno(), 0.01, 0, 0, 0, 0, 4096)
+        assert self.get_alloc_sample_interval() == 4096
+        self.fire_gc_alloc_sample()   # untranslated: no stack, no sample
+        _vmprof.disable()
+        assert self.get_alloc_sample_interval() == 0
+        self.fire_gc_alloc_sample()
+        # the profile has its own version, VERSION_ALLOC_SAMPLE
+        import struct
+        WORD = struct.calcsize('l')
+        s = open(self.tmpfilename, 'rb').read()
+        assert s[5 * WORD] == '\x05'       # MARKER_HEADER
+        assert s[5 * WORD + 2] == '\x07'
+        # and not the profiles without allocation samples
+        tmpfile = open(self.tmpfilename2, 'wb')
+        _vmprof.enable(tmpfile.fileno(), 0.01, 0, 0, 0, 0)
+        _vmprof.disable()
+        s = open(self.tmpfilename2, 'rb').read()
+        assert s[5 * WORD + 2] == '\x06'   # VERSION_TIMESTAMP
+
     def test_is_enabled(self):
         import _vmprof
         tmpfile = open(self.tmpfilename, 'wb')
@@ -2,6 +2,8 @@ from rpython.rlib import jit, rgc, rutf8
 from rpython.rlib.buffer import RawBuffer
 from rpython.rlib.objectmodel import keepalive_until_here
 from rpython.rlib.rarithmetic import ovfcheck, widen, r_uint
+from rpython.rlib.rrawarray import (
+    copy_list_to_raw_array, populate_list_from_raw_array)
 from rpython.rlib.unroll import unrolling_iterable
 from rpython.rtyper.annlowlevel import llstr
 from rpython.rtyper.lltypesystem import lltype, rffi
@@ -781,7 +783,7 @@ W_ArrayBase.typedef = TypeDef(
     pop = interpindirect2app(W_ArrayBase.descr_pop),
     insert = interpindirect2app(W_ArrayBase.descr_insert),
 
-    tolist = interp2app(W_ArrayBase.descr_tolist),
+    tolist = interpindirect2app(W_ArrayBase.descr_tolist),
     fromlist = interp2app(W_ArrayBase.descr_fromlist),
     tostring = interp2app(W_ArrayBase.descr_tostring),
     fromstring = interp2app(W_ArrayBase.descr_fromstring),
@@ -990,6 +992,13 @@ def make_array(mytype):
                 lst = None
             if lst is not None:
                 self.setlen(oldlen + len(lst))
+                if mytype.itemtype is lltype.Signed or (
+                        mytype.itemtype is lltype.Float):
+                    # the items can't overflow: copy them in bulk
+                    copy_list_to_raw_array(
+                        lst, rffi.ptradd(self.get_buffer(), oldlen))
+                    keepalive_until_here(self)
+                    return
                 try:
                     buf = self.get_buffer()
                     for num in lst:
@@ -1030,16 +1039,17 @@ def make_array(mytype):
                 oldlen = self.len
                 new = w_iterable.len
                 self.setlen(self.len + new)
-                i = 0
-                buf = self.get_buffer()
-                srcbuf = w_iterable.get_buffer()
-                while i < new:
-                    if oldlen + i >= self.len:
-                        self.setlen(oldlen + i + 1)
-                    buf[oldlen + i] = srcbuf[i]
-                    i += 1
+                if new:
+                    # 'w_iterable' may be 'self', but then the two parts
+                    # don't overlap
+                    rffi.c_memcpy(
+                        rffi.cast(rffi.VOIDP, rffi.ptradd(self._buffer,
+                                                     oldlen * self.itemsize)),
+                        rffi.cast(rffi.VOIDP, w_iterable._buffer),
+                        new * self.itemsize
+                    )
+                keepalive_until_here(self)
                 keepalive_until_here(w_iterable)
-                self.setlen(oldlen + i)
             elif (not accept_different_array
                   and isinstance(w_iterable, W_ArrayBase)):
                 raise oefmt(space.w_TypeError,
@@ -1047,6 +1057,44 @@ def make_array(mytype):
             else:
                 self.fromsequence(w_iterable)
 
+        if mytype.unwrap == 'int_w' or mytype.unwrap == 'float_w':
+            def getitems_unboxed(self):
+                # a new list of ints or floats, without boxing the items
+                length = self.len
+                buf = self.get_buffer()
+                if mytype.itemtype is lltype.Signed or (
+                        mytype.itemtype is lltype.Float):
+                    lst = []
+                    populate_list_from_raw_array(lst, buf, length)
+                elif mytype.unwrap == 'int_w':
+                    lst = [0] * length
+                    for i in range(length):
+                        lst[i] = rffi.cast(lltype.Signed, buf[i])
+                else:
+                    lst = [0.0] * length
+                    for i in range(length):
+                        lst[i] = float(buf[i])
+                keepalive_until_here(self)
+                return lst
+
+            def descr_tolist(self, space):
+                if mytype.unwrap == 'int_w':
+                    return space.newlist_int(self.getitems_unboxed())
+                else:
+                    return space.newlist_float(self.getitems_unboxed())
+
+            # used by list(array) and list.extend(array)
+            if mytype.unwrap == 'int_w':
+                def unpackiterable_int(self, space):
+                    if self.user_overridden_class:
+                        return None
+                    return self.getitems_unboxed()
+            else:
+                def unpackiterable_float(self, space):
+                    if self.user_overridden_class:
+                        return None
+                    return self.getitems_unboxed()
+
         def w_getitem(self, space, idx, integer_instead_of_char=False):
             item = self.get_buffer()[idx]
             keepalive_until_here(self)
@@ -1076,3 +1076,62 @@ class AppTestArray(object):
 
     def test_fresh_array_buffer_str(self):
         assert str(buffer(self.array('i'))) == ''
+
+    def test_list_conversion(self):
+        for tc in 'bBhHiIlLfd':
+            a = self.array(tc, [1, 2, 3, 120])
+            lst = a.tolist()
+            assert lst == [1, 2, 3, 120]
+            assert list(a) == lst
+            assert type(lst[0]) is type(a[0])
+            b = self.array(tc, lst)
+            assert b == a
+            b.fromlist(lst)
+            b.extend(a)
+            b.extend(b)
+            assert b.tolist() == lst * 6
+            l2 = [0, 0]
+            l2.extend(a)
+            assert l2 == [0, 0] + lst
+            l2 = [0.5]
+            l2.extend(a)
+            assert l2 == [0.5] + lst
+        a = self.array('l', [-self.maxint - 1, self.maxint])
+        assert a.tolist() == list(a) == [-self.maxint - 1, self.maxint]
+        a = self.array('d', [1e300, -0.0, float('inf')])
+        assert list(a) == a.tolist() == [1e300, -0.0, float('inf')]
+        assert str(a.tolist()[1]) == '-0.0'
+
+        class A(self.array):
+            def __iter__(self):
+                yield 42
+        a = A('l', [1, 2])
+        assert list(a) == [42]
+        assert a.tolist() == [1, 2]
+        l2 = [5]
+        l2.extend(a)
+        assert l2 == [5, 42]
+
+
+class AppTestArrayListStrategy(object):
+    spaceconfig = {'usemodules': ['array', '__pypy__']}
+
+    def test_unboxed_lists(self):
+        from array import array
+        from __pypy__ import strategy
+        for tc in 'bhil':
+            a = array(tc, range(-10, 10))
+            assert strategy(a.tolist()) == "IntegerListStrategy"
+            assert strategy(list(a)) == "IntegerListStrategy"
+            l = [5]
+            l.extend(a)
+            assert strategy(l) == "IntegerListStrategy"
+            assert l == [5] + range(-10, 10)
+        for tc in 'fd':
+            a = array(tc, [1.5, 2.5])
+            assert strategy(a.tolist()) == "FloatListStrategy"
+            assert strategy(list(a)) == "FloatListStrategy"
+            l = [0.5]
+            l.extend(a)
+            assert strategy(l) == "FloatListStrategy"
+            assert l == [0.5, 1.5, 2.5]
@@ -58,6 +58,7 @@ class GcStats(object):
                      'peak_memory', 'peak_allocated_memory', 'total_arena_memory',
                      'total_rawmalloced_memory', 'nursery_size',
                      'peak_arena_memory', 'peak_rawmalloced_memory',
+                     'released_memory', 'hugepage_memory',
                      ):
             setattr(self, item, self._format(getattr(self._s, item)))
         self.memory_used_sum = self._format(self._s.total_gc_memory + self._s.total_memory_pressure +
@@ -65,6 +66,10 @@ class GcStats(object):
         self.memory_allocated_sum = self._format(self._s.total_allocated_memory + self._s.total_memory_pressure +
                                             self._s.jit_backend_allocated)
         self.total_gc_time = self._s.total_gc_time
+        if self._s.rss >= 0:
+            self.rss = self._format(self._s.rss)
+        else:
+            self.rss = "unknown"
 
     def _format(self, v):
         if v < 1000000:
@@ -95,6 +100,10 @@ class GcStats(object):
     -----------------------------
     Total:                   %s
 
+    Released to the OS:      %s
+    On huge pages:           %s
+    Resident set size:       %s
+
     Total time spent in GC:  %s
     """ % (self.total_gc_memory, self.peak_memory,
               self.total_arena_memory,
@@ -111,6 +120,9 @@ class GcStats(object):
            self.jit_backend_allocated,
            extra,
            self.memory_allocated_sum,
+           self.released_memory,
+           self.hugepage_memory,
+           self.rss,
            self.total_gc_time / 1000.0)
 
 
@@ -1,6 +1,6 @@
 from rpython.memory.gc.hook import GcHooks
 from rpython.memory.gc import incminimark
-from rpython.rlib import rgc
+from rpython.rlib import rgc, rvmprof
 from rpython.rlib.nonconst import NonConstant
 from rpython.rlib.rarithmetic import r_uint, r_longlong, longlongmax
 from pypy.interpreter.gateway import interp2app, unwrap_spec, WrappedDefault
@@ -34,7 +34,14 @@ class LowLevelGcHooks(GcHooks):
     def is_gc_collect_enabled(self):
         return self.w_hooks.gc_collect_enabled
 
-    def on_gc_minor(self, duration, total_memory_used, pinned_objects):
+    def get_alloc_sample_interval(self):
+        # allocation sampling is done by _vmprof.enable(..., alloc_sample)
+        if self.space.config.objspace.usemodules._vmprof:
+            return rvmprof.get_alloc_sample_interval()
+        return 0
+
+    def on_gc_minor(self, duration, total_memory_used, pinned_objects,
+                    nursery_size, surviving_size):
         action = self.w_hooks.gc_minor
         action.count += 1
         action.duration += duration
@@ -42,6 +49,8 @@ class LowLevelGcHooks(GcHooks):
         action.duration_max = max(action.duration_max, duration)
         action.total_memory_used = total_memory_used
         action.pinned_objects = pinned_objects
+        action.nursery_size = nursery_size
+        action.surviving_size += surviving_size
         action.fire()
 
     def on_gc_collect_step(self, duration, oldstate, newstate):
@@ -68,6 +77,10 @@ class LowLevelGcHooks(GcHooks):
         action.rawmalloc_bytes_after = rawmalloc_bytes_after
         action.fire()
 
+    def on_gc_alloc_sample(self, size):
+        if self.space.config.objspace.usemodules._vmprof:
+            rvmprof.sample_allocation(size)
+
 
 class W_AppLevelHooks(W_Root):
 
@@ -133,6 +146,7 @@ class NoRecursiveAction(AsyncAction):
 class GcMinorHookAction(NoRecursiveAction):
     total_memory_used = 0
     pinned_objects = 0
+    nursery_size = 0
 
     def __init__(self, space):
         NoRecursiveAction.__init__(self, space)
@@ -144,6 +158,7 @@ class GcMinorHookAction(NoRecursiveAction):
         self.duration = 0.0
         self.duration_min = inf
         self.duration_max = 0.0
+        self.surviving_size = 0
 
     def fix_annotation(self):
         # the annotation of the class and its attributes must be completed
@@ -156,6 +171,8 @@ class GcMinorHookAction(NoRecursiveAction):
             self.duration_max = NonConstant(-53.2)
             self.total_memory_used = NonConstant(r_uint(42))
             self.pinned_objects = NonConstant(-42)
+            self.nursery_size = NonConstant(-42)
+            self.surviving_size = NonConstant(-42)
             self.fire()
 
     def _do_perform(self, ec, frame):
@@ -165,7 +182,9 @@ class GcMinorHookAction(NoRecursiveAction):
             self.duration_min,
             self.duration_max,
             self.total_memory_used,
-            self.pinned_objects)
+            self.pinned_objects,
+            self.nursery_size,
+            self.surviving_size)
         self.reset()
         self.space.call_function(self.w_callable, w_stats)
 
@@ -256,13 +275,16 @@ class GcCollectHookAction(NoRecursiveAction):
 class W_GcMinorStats(W_Root):
 
     def __init__(self, count, duration, duration_min, duration_max,
-                 total_memory_used, pinned_objects):
+                 total_memory_used, pinned_objects, nursery_size,
+                 surviving_size):
         self.count = count
         self.duration = duration
         self.duration_min = duration_min
         self.duration_max = duration_max
         self.total_memory_used = total_memory_used
         self.pinned_objects = pinned_objects
+        self.nursery_size = nursery_size
+        self.surviving_size = surviving_size
 
 
 class W_GcCollectStepStats(W_Root):
@@ -346,7 +368,9 @@ W_GcMinorStats.typedef = TypeDef(
         "duration_min",
         "duration_max",
         "total_memory_used",
-        "pinned_objects"))
+        "pinned_objects",
+        "nursery_size",
+        "surviving_size"))
     )
 
 W_GcCollectStepStats.typedef = TypeDef(
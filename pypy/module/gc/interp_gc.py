@@ -135,6 +135,15 @@ def collect_step(space):
     w_stats = sc.do()
     return w_stats
 
+def trim(space):
+    """
+    Give back to the OS the memory that the GC holds but does not currently
+    use: the free pages of the arenas, the nursery, and the free memory of
+    the malloc() heap.  Return the number of bytes of GC memory released.
+    Call gc.collect() first to release as much as possible.
+    """
+    return space.newint(rgc.trim_memory())
+
 # ____________________________________________________________
 
 @unwrap_spec(filename='fsencode')
@@ -23,6 +23,7 @@ class Module(MixedModule):
                 })
             self.interpleveldefs.update({
                 'collect_step': 'interp_gc.collect_step',
+                'trim': 'interp_gc.trim',
                 'get_rpy_roots': 'referents.get_rpy_roots',
                 'get_rpy_referents': 'referents.get_rpy_referents',
                 'get_rpy_memory_usage': 'referents.get_rpy_memory_usage',
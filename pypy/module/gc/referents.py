@@ -1,3 +1,4 @@
+import os
 from rpython.rlib import rgc, jit_hooks
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.typedef import TypeDef, interp_attrproperty
@@ -173,6 +174,35 @@ def get_typeids_list(space):
     list_w = [space.newint(l[i]) for i in range(len(l))]
     return space.newlist(list_w)
 
+def _parse_vmrss(status):
+    # 'status' is the content of /proc/self/status
+    for line in status.split('\n'):
+        if line.startswith('VmRSS:'):
+            words = line[len('VmRSS:'):].replace('\t', ' ').split(' ')
+            for word in words:
+                if word:
+                    try:
+                        return int(word) * 1024    # in kB
+                    except ValueError:
+                        return -1
+    return -1
+
+def get_rss():
+    """Return the resident set size of the process in bytes, or -1 if
+    it is not known (only implemented on Linux)."""
+    try:
+        fd = os.open('/proc/self/status', os.O_RDONLY, 0)
+    except OSError:
+        return -1
+    try:
+        try:
+            status = os.read(fd, 8192)
+        except OSError:
+            return -1
+    finally:
+        os.close(fd)
+    return _parse_vmrss(status)
+
 class W_GcStats(W_Root):
     def __init__(self, memory_pressure):
         if memory_pressure:
@@ -192,6 +222,9 @@ class W_GcStats(W_Root):
         self.peak_rawmalloced_memory = rgc.get_stats(rgc.PEAK_RAWMALLOCED_MEMORY)
         self.nursery_size = rgc.get_stats(rgc.NURSERY_SIZE)
         self.total_gc_time = rgc.get_stats(rgc.TOTAL_GC_TIME)
+        self.released_memory = rgc.get_stats(rgc.RELEASED_MEMORY)
+        self.hugepage_memory = rgc.get_stats(rgc.HUGEPAGE_MEMORY)
+        self.rss = get_rss()
 
 W_GcStats.typedef = TypeDef("GcStats",
     total_memory_pressure=interp_attrproperty("total_memory_pressure",
@@ -220,6 +253,12 @@ W_GcStats.typedef = TypeDef("GcStats",
         cls=W_GcStats, wrapfn="newint"),
     total_gc_time=interp_attrproperty("total_gc_time",
         cls=W_GcStats, wrapfn="newint"),
+    released_memory=interp_attrproperty("released_memory",
+        cls=W_GcStats, wrapfn="newint"),
+    hugepage_memory=interp_attrproperty("hugepage_memory",
+        cls=W_GcStats, wrapfn="newint"),
+    rss=interp_attrproperty("rss",
+        cls=W_GcStats, wrapfn="newint"),
 )
 
 @unwrap_spec(memory_pressure=bool)
@@ -12,9 +12,11 @@ class AppTestGcHooks(object):
         space = cls.space
         gchooks = space.fromcache(LowLevelGcHooks)
 
-        @unwrap_spec(ObjSpace, int, r_uint, int)
-        def fire_gc_minor(space, duration, total_memory_used, pinned_objects):
-            gchooks.fire_gc_minor(duration, total_memory_used, pinned_objects)
+        @unwrap_spec(ObjSpace, int, r_uint, int, int, int)
+        def fire_gc_minor(space, duration, total_memory_used, pinned_objects,
+                          nursery_size=0, surviving_size=0):
+            gchooks.fire_gc_minor(duration, total_memory_used, pinned_objects,
+                                  nursery_size, surviving_size)
 
         @unwrap_spec(ObjSpace, int, int, int)
         def fire_gc_collect_step(space, duration, oldstate, newstate):
@@ -26,8 +28,8 @@ class AppTestGcHooks(object):
 
         @unwrap_spec(ObjSpace)
         def fire_many(space):
-            gchooks.fire_gc_minor(5.0, 0, 0)
-            gchooks.fire_gc_minor(7.0, 0, 0)
+            gchooks.fire_gc_minor(5.0, 0, 0, 0, 0)
+            gchooks.fire_gc_minor(7.0, 0, 0, 0, 0)
             gchooks.fire_gc_collect_step(5.0, 0, 0)
             gchooks.fire_gc_collect_step(15.0, 0, 0)
             gchooks.fire_gc_collect_step(22.0, 0, 0)
@@ -67,6 +69,22 @@ class AppTestGcHooks(object):
             (1, 40, 50, 60),
             ]
 
+    def test_on_gc_minor_nursery(self):
+        import gc
+        lst = []
+        def on_gc_minor(stats):
+            lst.append((stats.count,
+                        stats.nursery_size,
+                        stats.surviving_size))
+        gc.hooks.on_gc_minor = on_gc_minor
+        self.fire_gc_minor(10, 20, 30, 4096, 100)
+        self.fire_gc_minor(40, 50, 60, 8192, 200)
+        assert lst == [
+            (1, 4096, 100),
+            (1, 8192, 200),
+            ]
+        gc.hooks.on_gc_minor = None
+
     def test_on_gc_collect_step(self):
         import gc
         SCANNING = 0
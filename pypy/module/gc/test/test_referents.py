@@ -150,3 +150,11 @@ class AppTestReferentsMore(object):
         assert a in lst
         lst = gc.get_referrers(A)
         assert a in lst
+
+
+def test_parse_vmrss():
+    from pypy.module.gc.referents import _parse_vmrss
+    status = ("Name:\tpypy\nVmPeak:\t  200000 kB\n"
+              "VmRSS:\t   12345 kB\nThreads:\t1\n")
+    assert _parse_vmrss(status) == 12345 * 1024
+    assert _parse_vmrss("Name:\tpypy\n") == -1
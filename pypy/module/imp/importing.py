@@ -2,7 +2,7 @@
 Implementation of the interpreter-level default import logic.
 """
 
-import sys, os, stat
+import sys, os, stat, time
 
 from pypy.interpreter.module import Module
 from pypy.interpreter.gateway import interp2app, unwrap_spec
@@ -12,10 +12,13 @@ from pypy.interpreter.baseobjspace import W_Root, CannotHaveLock
 from pypy.interpreter.eval import Code
 from pypy.interpreter.pycode import PyCode
 from pypy.interpreter.streamutil import wrap_streamerror
-from rpython.rlib import streamio, jit
+from rpython.rlib import streamio, jit, rpath
 from rpython.rlib.streamio import StreamErrors
 from rpython.rlib.objectmodel import we_are_translated, specialize
+from rpython.rlib.objectmodel import not_rpython
+from rpython.rlib.rstring import assert_str0
 from pypy.module.sys.version import PYPY_VERSION
+from pypy import pypydir
 
 _WIN32 = sys.platform == 'win32'
 
@@ -137,6 +140,156 @@ else:
         except OSError:
             return False
 
+# __________________________________________________________________
+#
+# Directory listing cache, similar to CPython 3's FileFinder.  For every
+# directory of sys.path we keep the names it contains, stripped of their
+# extension.  find_module() asks it first and skips the directories that
+# cannot contain the module, which saves the half-dozen stat() calls done
+# by find_modtype() for each of them.  A listing is valid as long as the
+# mtime of the directory does not change.  A file created in the same mtime
+# tick as the listing would not change it, so directories modified less than
+# MTIME_GRANULARITY seconds ago are not cached at all: code that writes a
+# module and imports it right away doesn't need imp.invalidate_caches().
+
+MTIME_GRANULARITY = 2.0     # seconds, the worst case is FAT
+
+class DirectoryListing(object):
+    def __init__(self, mtime, stems):
+        self.mtime = mtime
+        self.stems = stems
+
+class DirectoryListingCache(object):
+
+    def __init__(self, space):
+        self.listings = {}
+
+    def get_listing(self, path):
+        """Return the DirectoryListing of 'path', or None if 'path' is not
+        a readable directory.  Relative paths are not cached, because
+        they change meaning with os.chdir().
+        """
+        if not os.path.isabs(path):
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if not stat.S_ISDIR(st.st_mode):
+            return None
+        if time.time() - st.st_mtime < MTIME_GRANULARITY:
+            return None      # may still change in the same mtime tick
+        listing = self.listings.get(path, None)
+        if listing is not None and listing.mtime == st.st_mtime:
+            return listing
+        try:
+            names = os.listdir(path)
+        except OSError:
+            return None
+        stems = {}
+        for name in names:
+            dot = name.find('.')
+            if dot >= 0:
+                name = name[:dot]
+            stems[name] = None
+        listing = DirectoryListing(st.st_mtime, stems)
+        self.listings[path] = listing
+        return listing
+
+    def may_contain(self, path, partname):
+        """Return False if there is certainly no file or directory called
+        'partname' or 'partname.<ext>' in 'path'."""
+        listing = self.get_listing(path)
+        if listing is None:
+            return True      # can't tell, let the caller check
+        return partname in listing.stems
+
+    def invalidate(self):
+        self.listings.clear()
+
+def getlistingcache(space):
+    return space.fromcache(DirectoryListingCache)
+
+class FrozenModule(object):
+    def __init__(self, w_module, filename, pkgdir):
+        self.w_module = w_module
+        self.filename = filename    # relative to sys.prefix
+        self.pkgdir = pkgdir        # relative to sys.prefix, or None
+
+class FrozenModules(object):
+    """The app-level modules that were imported during translation, see
+    freeze_modules().  They are part of the prebuilt heap of the
+    executable."""
+    def __init__(self, space):
+        self.space = space
+        self.modules = {}   # {full module name: FrozenModule}
+
+    def get(self, modulename):
+        return self.modules.get(modulename, None)
+
+    @not_rpython
+    def freeze(self, modulenames):
+        space = self.space
+        srcdir = os.path.dirname(pypydir)
+        w_modules = space.sys.get('modules')
+        w_saved = space.call_method(w_modules, 'copy')
+        try:
+            for modulename in modulenames:
+                space.call_function(space.builtin.get('__import__'),
+                                    space.newtext(modulename))
+            for w_name in space.unpackiterable(w_modules):
+                name = space.text_w(w_name)
+                w_mod = space.getitem(w_modules, w_name)
+                if (space.finditem(w_saved, w_name) is not None or
+                        type(w_mod) is not Module):
+                    continue    # not new, a builtin module, or None
+                w_file = space.finditem_str(w_mod.w_dict, '__file__')
+                if w_file is None:
+                    continue
+                filename = os.path.relpath(space.text_w(w_file), srcdir)
+                if filename.startswith(os.pardir):
+                    continue    # not from lib-python or lib_pypy
+                if filename.endswith('.pyc'):
+                    filename = filename[:-1]
+                pkgdir = None
+                if space.finditem_str(w_mod.w_dict, '__path__') is not None:
+                    pkgdir = os.path.dirname(filename)
+                self.modules[name] = FrozenModule(w_mod, filename, pkgdir)
+        finally:
+            space.call_method(w_modules, 'clear')
+            space.call_method(w_modules, 'update', w_saved)
+
+def getfrozenmodules(space):
+    return space.fromcache(FrozenModules)
+
+@not_rpython
+def freeze_modules(space, modulenames):
+    """Import the given app-level modules at translation time.  They
+    are kept, with all the other app-level modules they import, in the
+    executable: importing them at runtime is then just a dict lookup
+    instead of finding, reading and executing their file.  Used for the
+    objspace.frozen_modules option."""
+    getfrozenmodules(space).freeze(modulenames)
+
+def load_frozen_module(space, w_modulename):
+    frozen = getfrozenmodules(space).get(space.text_w(w_modulename))
+    if frozen is None:
+        return None
+    log_pyverbose(space, 1, "import %s # frozen\n" %
+                  (space.text_w(w_modulename),))
+    w_mod = frozen.w_module
+    # Module._cleanup_() removed __file__ from the prebuilt module
+    prefix = space.fsencode_w(space.sys.get('prefix'))
+    space.setattr(w_mod, space.newtext('__file__'),
+                  space.newtext(os.path.join(prefix, frozen.filename)))
+    pkgdir = frozen.pkgdir
+    if pkgdir is not None:
+        pkgdir = os.path.join(prefix, pkgdir)
+        space.setattr(w_mod, space.newtext('__path__'),
+                      space.newlist([space.newtext(pkgdir)]))
+    space.setitem(space.sys.get('modules'), w_modulename, w_mod)
+    return w_mod
+
 def try_getattr(space, w_obj, w_name):
     try:
         return space.getattr(w_obj, w_name)
@@ -542,8 +695,8 @@ def find_module(space, modulename, w_modulename, partname, w_path,
         if w_loader:
             return FindInfo.fromLoader(w_loader)
 
-    # XXX Check for frozen modules?
-    #     when w_path is a string
+    if getfrozenmodules(space).get(modulename) is not None:
+        return FindInfo(PY_FROZEN, modulename, None)
 
     delayed_builtin = None
     w_lib_extensions = None
@@ -561,9 +714,6 @@ def find_module(space, modulename, w_modulename, partname, w_path,
             w_lib_extensions = space.sys.get_state(space).w_lib_extensions
         w_path = space.sys.get('path')
 
-    # XXX check frozen modules?
-    #     when w_path is null
-
     if w_path is not None:
         for w_pathitem in space.unpackiterable(w_path):
             # sys.path_hooks import hook
@@ -576,6 +726,8 @@ def find_module(space, modulename, w_modulename, partname, w_path,
                     return FindInfo.fromLoader(w_loader)
 
             path = space.fsencode_w(w_pathitem)
+            if not getlistingcache(space).may_contain(path, partname):
+                continue
             filepart = os.path.join(path, partname)
             log_pyverbose(space, 2, "# trying %s\n" % (filepart,))
             if os.path.isdir(filepart) and case_ok(filepart):
@@ -641,6 +793,9 @@ def load_module(space, w_modulename, find_info, reuse=False):
         return space.getbuiltinmodule(find_info.filename, force_init=True,
                                       reuse=reuse)
 
+    if find_info.modtype == PY_FROZEN:
+        return load_frozen_module(space, w_modulename)
+
     if find_info.modtype in (PY_SOURCE, PY_COMPILED, C_EXTENSION, PKG_DIRECTORY):
         w_mod = None
         if reuse:
@@ -890,7 +1045,9 @@ def get_pyc_magic(space):
 def parse_source_module(space, pathname, source):
     """ Parse a source file and return the corresponding code object """
     ec = space.getexecutioncontext()
-    pycode = ec.compiler.compile(source, pathname, 'exec', 0)
+    # a module is normally imported once, don't keep its source and code
+    # in the compile() cache
+    pycode = ec.compiler.compile_uncached(source, pathname, 'exec', 0)
     return pycode
 
 def exec_code_module(space, w_mod, code_w, w_modulename, check_afterwards=True):
@@ -928,7 +1085,11 @@ def load_source_module(space, w_modulename, w_mod, pathname, source, fd,
         src_stat = os.fstat(fd)
     except OSError as e:
         raise wrap_oserror(space, e, pathname)   # better report this error
-    cpathname = pathname + 'c'
+    prefix = get_pycache_prefix(space)
+    if prefix is None:
+        cpathname = pathname + 'c'
+    else:
+        cpathname = make_cache_pathname(prefix, pathname)
     mtime = int(src_stat[stat.ST_MTIME])
     mode = src_stat[stat.ST_MODE]
     stream = check_compiled_module(space, cpathname, mtime)
@@ -940,12 +1101,16 @@ def load_source_module(space, w_modulename, w_mod, pathname, source, fd,
                                           _wrap_readall(space, stream))
         finally:
             _close_ignore(stream)
-        space.setattr(w_mod, space.newtext('__file__'), space.newtext(cpathname))
+        if prefix is None:
+            space.setattr(w_mod, space.newtext('__file__'),
+                          space.newtext(cpathname))
     else:
         code_w = parse_source_module(space, pathname, source)
 
         if write_pyc:
             if not space.is_true(space.sys.get('dont_write_bytecode')):
+                if prefix is not None:
+                    _make_cache_dirs(cpathname)
                 write_compiled_module(space, code_w, cpathname, mode, mtime)
 
     try:
@@ -1034,6 +1199,45 @@ def _close_ignore(stream):
         pass
 
 
+def get_pycache_prefix(space):
+    """Return sys.pycache_prefix, or None if it is not set.  If set, it is
+    a directory under which the .pyc files are written and looked up, in
+    a tree that mirrors the absolute paths of the source files; this is
+    useful when the source tree is read-only.
+    """
+    w_prefix = space.sys.getdictvalue(space, 'pycache_prefix')
+    if w_prefix is None or space.is_none(w_prefix):
+        return None
+    prefix = space.fsencode_w(w_prefix)
+    if not prefix:
+        return None
+    return prefix
+
+def make_cache_pathname(prefix, pathname):
+    """Return the name of the .pyc file of the source file 'pathname'
+    in the tree under 'prefix'."""
+    assert_str0(pathname)
+    pathname = rpath.rabspath(pathname)
+    if os.name == 'nt':
+        pathname = rpath.rsplitdrive(pathname)[1]
+    pathname = pathname.lstrip(rpath.sep)
+    return rpath.rjoin(prefix, pathname) + 'c'
+
+def _make_cache_dirs(cpathname):
+    """Create the missing parent directories of 'cpathname'.  Errors
+    are ignored; they show up when trying to write the file."""
+    index = cpathname.rfind(rpath.sep)
+    if index <= 0:
+        return
+    dirname = cpathname[:index]
+    if rpath.risdir(dirname):
+        return
+    _make_cache_dirs(dirname)
+    try:
+        os.mkdir(dirname, 0777)
+    except OSError:
+        pass
+
 def check_compiled_module(space, pycfilename, expected_mtime):
     """
     Check if a pyc file's magic number and mtime match.
@@ -1059,8 +1263,12 @@ def check_compiled_module(space, pycfilename, expected_mtime):
 def read_compiled_module(space, cpathname, strbuf):
     """ Read a code object from a file and check it for validity """
 
-    w_marshal = space.getbuiltinmodule('marshal')
-    w_code = space.call_method(w_marshal, 'loads', space.newbytes(strbuf))
+    if space.config.objspace.lazy_code_loading:
+        from pypy.module.marshal.interp_marshal import loads_code_lazily
+        w_code = loads_code_lazily(space, strbuf)
+    else:
+        w_marshal = space.getbuiltinmodule('marshal')
+        w_code = space.call_method(w_marshal, 'loads', space.newbytes(strbuf))
     if not isinstance(w_code, Code):
         raise oefmt(space.w_ImportError, "Non-code object in %s", cpathname)
     return w_code
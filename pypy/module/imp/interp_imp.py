@@ -154,7 +154,7 @@ def init_builtin(space, w_name):
     return space.getbuiltinmodule(name)
 
 def init_frozen(space, w_name):
-    return None
+    return importing.load_frozen_module(space, w_name)
 
 def is_builtin(space, w_name):
     name = space.text0_w(w_name)
@@ -165,7 +165,15 @@ def is_builtin(space, w_name):
     return space.newint(1)
 
 def is_frozen(space, w_name):
-    return space.w_False
+    name = space.text0_w(w_name)
+    return space.newbool(importing.getfrozenmodules(space).get(name)
+                         is not None)
+
+def invalidate_caches(space):
+    """Forget the cached directory listings used to find modules on
+    sys.path.  Call it after creating a module file that must be
+    importable right away."""
+    importing.getlistingcache(space).invalidate()
 
 #__________________________________________________________________
 
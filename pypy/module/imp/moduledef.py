@@ -30,6 +30,7 @@ class Module(MixedModule):
         'init_frozen':     'interp_imp.init_frozen',
         'is_builtin':      'interp_imp.is_builtin',
         'is_frozen':       'interp_imp.is_frozen',
+        'invalidate_caches': 'interp_imp.invalidate_caches',           # pypy
         'reload':          'importing.reload',
         'NullImporter':    'importing.W_NullImporter',
 
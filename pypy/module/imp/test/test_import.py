@@ -188,6 +188,7 @@ class AppTestImport:
 
     def setup_class(cls):
         cls.w_runappdirect = cls.space.wrap(conftest.option.runappdirect)
+        cls.w_udir = cls.space.wrap(str(udir))
         cls.saved_modules = _setup(cls.space)
         #XXX Compile class
 
@@ -852,6 +853,45 @@ class AppTestImport:
     def test_dev_null_init_file(self):
         import devnullpkg
 
+    def test_invalidate_caches(self):
+        import imp, os, sys
+        dirname = os.path.join(self.udir, 'invalidatecaches')
+        os.mkdir(dirname)
+        # an old mtime, recently modified directories are not cached
+        mtime = 1000000000
+        os.utime(dirname, (mtime, mtime))
+        sys.path.insert(0, dirname)
+        try:
+            raises(ImportError, "import invalidatecachesmod")
+            with open(os.path.join(dirname, 'invalidatecachesmod.py'),
+                      'w') as f:
+                f.write('x = 42\n')
+            os.utime(dirname, (mtime, mtime))
+            imp.invalidate_caches()
+            import invalidatecachesmod
+            assert invalidatecachesmod.x == 42
+        finally:
+            sys.path.pop(0)
+            sys.modules.pop('invalidatecachesmod', None)
+
+    def test_import_module_written_after_lookup(self):
+        # the module is written in the same mtime tick as the failed
+        # lookup, without imp.invalidate_caches()
+        import os, sys
+        dirname = os.path.join(self.udir, 'writtenafterlookup')
+        os.mkdir(dirname)
+        sys.path.insert(0, dirname)
+        try:
+            raises(ImportError, "import writtenafterlookupmod")
+            with open(os.path.join(dirname, 'writtenafterlookupmod.py'),
+                      'w') as f:
+                f.write('x = 42\n')
+            import writtenafterlookupmod
+            assert writtenafterlookupmod.x == 42
+        finally:
+            sys.path.pop(0)
+            sys.modules.pop('writtenafterlookupmod', None)
+
 
 class TestAbi:
     def test_abi_tag(self):
@@ -971,6 +1011,20 @@ class TestPycStuff:
         ret = space.int_w(w_ret)
         assert ret == 42
 
+    def test_default_is_not_lazy(self):
+        space = self.space
+        assert not space.config.objspace.lazy_code_loading
+        co = compile('def f():\n    return 42\n', 'old.py', 'exec')
+        cpathname = _testfile(importing.get_pyc_magic(space), 12345, co)
+        stream = streamio.open_file_as_stream(cpathname, "rb")
+        try:
+            stream.seek(8, 0)
+            pycode = importing.read_compiled_module(
+                    space, cpathname, stream.readall())
+        finally:
+            stream.close()
+        assert pycode.co_consts_w[0].lazy_loader is None
+
     def test_parse_source_module(self):
         space = self.space
         pathname = _testfilesource()
@@ -1031,6 +1085,47 @@ class TestPycStuff:
         assert cpathname.check()
         cpathname.remove()
 
+    def test_load_source_module_pycache_prefix(self):
+        space = self.space
+        prefix = udir.join('pycacheprefix')
+        space.setattr(space.sys, space.wrap('pycache_prefix'),
+                      space.wrap(str(prefix)))
+        def load(pathname):
+            w_modulename = space.wrap('somemodule')
+            w_mod = space.wrap(Module(space, w_modulename))
+            stream = streamio.open_file_as_stream(pathname, "r")
+            try:
+                _load_source_module(space, w_modulename, w_mod,
+                                    pathname, stream.readall(),
+                                    stream.try_to_find_file_descriptor())
+            finally:
+                stream.close()
+            return w_mod
+        try:
+            pathname = _testfilesource()
+            cpathname = importing.make_cache_pathname(str(prefix), pathname)
+            assert cpathname == str(prefix) + os.path.abspath(pathname) + 'c'
+            #
+            # the .pyc file is written in the tree under the prefix
+            w_mod = load(pathname)
+            assert space.int_w(space.getattr(w_mod, space.wrap('x'))) == 42
+            assert os.path.exists(cpathname)
+            assert not os.path.exists(pathname + 'c')
+            mtime = int(os.stat(pathname).st_mtime)
+            assert importing.check_compiled_module(space, cpathname,
+                                                   mtime) is not None
+            #
+            # and it is used the next time
+            code_w = importing.parse_source_module(space, pathname, "x = 43")
+            importing.write_compiled_module(space, code_w, cpathname,
+                                            0666, mtime)
+            w_mod = load(pathname)
+            assert space.int_w(space.getattr(w_mod, space.wrap('x'))) == 43
+        finally:
+            space.setattr(space.sys, space.wrap('pycache_prefix'),
+                          space.w_None)
+            prefix.remove()
+
     def test_load_source_module_nowrite(self):
         space = self.space
         w_modulename = space.wrap('somemodule')
@@ -1196,6 +1291,131 @@ class TestPycStuff:
                     stream.close()
 
 
+class TestLazyCodeLoading:
+    spaceconfig = {"objspace.lazy_code_loading": True}
+
+    def test_read_compiled_module_lazy_code(self):
+        space = self.space
+        mtime = 12345
+        co = compile('def f():\n'
+                     '    "doc"\n'
+                     '    def g():\n'
+                     '        "doc of g"\n'
+                     '        return 42\n'
+                     '    return g\n', 'old.py', 'exec')
+        cpathname = _testfile(importing.get_pyc_magic(space), mtime, co)
+        stream = streamio.open_file_as_stream(cpathname, "rb")
+        try:
+            stream.seek(8, 0)
+            pycode = importing.read_compiled_module(
+                    space, cpathname, stream.readall())
+        finally:
+            stream.close()
+        w_f_code = pycode.co_consts_w[0]
+        assert w_f_code.lazy_loader is not None
+        # delayed until the nested code objects are loaded
+        importing.update_code_filenames(space, pycode, 'new.py')
+        w_dic = space.newdict()
+        pycode.exec_code(space, w_dic, w_dic)
+        w_res = space.appexec([w_dic], """(d):
+            f = d['f']
+            g = f()
+            return (g(), f.__doc__, g.__doc__,
+                    f.__code__.co_filename, g.__code__.co_filename)
+        """)
+        assert space.unwrap(w_res) == (42, 'doc', 'doc of g',
+                                       'new.py', 'new.py')
+        assert w_f_code.lazy_loader is None
+
+
+class TestDirectoryListingCache:
+
+    def test_may_contain(self):
+        cache = importing.DirectoryListingCache(self.space)
+        d = udir.ensure('listingcache', dir=1)
+        d.join('mod1.py').write('')
+        d.ensure('pkg1', dir=1)
+        d.join('ext1.pypy-73.so').write('')
+        path = str(d)
+        os.utime(path, (0, 0))
+        assert cache.may_contain(path, 'mod1')
+        assert cache.may_contain(path, 'pkg1')
+        assert cache.may_contain(path, 'ext1')
+        assert not cache.may_contain(path, 'mod2')
+        assert not cache.may_contain(path, 'Mod1')
+        # relative paths and missing directories are not cached
+        assert cache.may_contain('somewhere', 'mod2')
+        assert cache.may_contain(str(d.join('missing')), 'mod2')
+        assert cache.listings.keys() == [path]
+
+    def test_mtime_change(self):
+        cache = importing.DirectoryListingCache(self.space)
+        d = udir.ensure('listingcache2', dir=1)
+        path = str(d)
+        os.utime(path, (0, 0))
+        assert not cache.may_contain(path, 'mod1')
+        d.join('mod1.py').write('')
+        os.utime(path, (1, 1))
+        assert cache.may_contain(path, 'mod1')
+        #
+        # same mtime: the listing is stale until invalidate()
+        d.join('mod2.py').write('')
+        os.utime(path, (1, 1))
+        assert not cache.may_contain(path, 'mod2')
+        cache.invalidate()
+        assert cache.may_contain(path, 'mod2')
+
+    def test_recently_modified_directory(self):
+        cache = importing.DirectoryListingCache(self.space)
+        d = udir.ensure('listingcache3', dir=1)
+        path = str(d)
+        # modified less than MTIME_GRANULARITY ago: not cached, a module
+        # created in the same mtime tick is found
+        assert cache.may_contain(path, 'mod1')
+        assert cache.listings == {}
+        d.join('mod1.py').write('')
+        assert cache.may_contain(path, 'mod1')
+        assert cache.listings == {}
+
+
+class TestFrozenModules:
+    spaceconfig = {"usemodules": ["struct"],
+                   "objspace.frozen_modules": "json"}
+
+    def test_freeze_modules(self):
+        space = self.space
+        importing.freeze_modules(
+            space, space.config.objspace.frozen_modules.split(','))
+        frozen = importing.getfrozenmodules(space)
+        libdir = os.path.join('lib-python', '2.7')
+        assert frozen.get('json').pkgdir == os.path.join(libdir, 'json')
+        assert frozen.get('json.decoder').filename == os.path.join(
+            libdir, 'json', 'decoder.py')
+        assert frozen.get('json.decoder').pkgdir is None
+        assert frozen.get('re') is not None      # imported by json
+        assert frozen.get('sys') is None
+        w_res = space.appexec([], """():
+            import sys, imp
+            assert 'json' not in sys.modules
+            assert imp.is_frozen('json')
+            assert not imp.is_frozen('sys')
+            saved = sys.path[:]
+            sys.path[:] = []
+            try:
+                import json.decoder
+            finally:
+                sys.path[:] = saved
+            assert sys.modules['json'] is json
+            return json.__path__, json.decoder.__file__, json.dumps([1])
+        """)
+        prefix = os.path.dirname(pypy.__file__)
+        prefix = os.path.dirname(os.path.abspath(prefix))
+        assert space.unwrap(w_res) == (
+            [os.path.join(prefix, libdir, 'json')],
+            os.path.join(prefix, libdir, 'json', 'decoder.py'),
+            '[1]')
+
+
 def test_PYTHONPATH_takes_precedence(space):
     if sys.platform == "win32":
         py.test.skip("unresolved issues with win32 shell quoting rules")
@@ -53,6 +53,12 @@ ignored."""
     obj = u.load_w_obj()
     return obj
 
+def loads_code_lazily(space, bufstr):
+    """Like loads(), for the content of .pyc files: the code objects nested
+    in the loaded one are only fully unmarshalled when they are first used."""
+    u = CodeUnmarshaller(space, bufstr)
+    return u.load_w_obj()
+
 
 class AbstractReaderWriter(object):
     def __init__(self, space):
@@ -334,6 +340,11 @@ class Unmarshaller(_Base):
     for tc, func in get_unmarshallers():
         _dispatch[ord(tc)] = func
 
+    # see CodeUnmarshaller
+    lazy_code = False
+    replaying = False
+    code_depth = 0
+
     def __init__(self, space, reader):
         self.space = space
         self.reader = reader
@@ -498,3 +509,31 @@ class StringUnmarshaller(Unmarshaller):
             return x
         else:
             self.raise_exc('bad marshal data')
+
+
+class CodeUnmarshaller(StringUnmarshaller):
+    """StringUnmarshaller that only records where the nested code objects
+    are in the buffer, instead of unmarshalling them completely (see
+    marshal_impl.LazyCodeLoader).  With a 'stringtable_w', it is used to
+    load again a part of the buffer when such a code object is needed:
+    the interned strings of that part are then already in the table.
+    """
+    lazy_code = True
+
+    def __init__(self, space, bufstr, pos=0, stringtable_w=None):
+        Unmarshaller.__init__(self, space, None)
+        self.bufstr = bufstr
+        self.bufpos = pos
+        self.limit = len(bufstr)
+        if stringtable_w is not None:
+            self.stringtable_w = stringtable_w
+            self.replaying = True
+            self.code_depth = 1
+
+    def skip(self, n):
+        if n < 0:
+            self.raise_exc('bad marshal data')
+        newpos = self.bufpos + n
+        if newpos > self.limit:
+            self.raise_eof()
+        self.bufpos = newpos
@@ -91,3 +91,52 @@ def test_long_more(space):
         for i in range(100):
             _marshal_check(sign * ((1L << i) - 1L))
             _marshal_check(sign * (1L << i))
+
+
+def test_loads_code_lazily(space):
+    from pypy.interpreter.pycode import PyCode
+    w_data = space.appexec([], """():
+        import marshal
+        src = '''
+def f(x):
+    "docstring"
+    def g(y):
+        return x + y + 0.5
+    return g(x * 2), 'f', {'a': 10000000000000000000L, 'b': (1j, None)}
+class C:
+    def f(self):
+        return 'f', u'g'
+'''
+        return marshal.dumps(compile(src, 'mod.py', 'exec'))
+    """)
+    data = space.bytes_w(w_data)
+    w_code = interp_marshal.loads_code_lazily(space, data)
+    assert isinstance(w_code, PyCode)
+    assert w_code.lazy_loader is None
+    nested = [w_c for w_c in w_code.co_consts_w if isinstance(w_c, PyCode)]
+    assert len(nested) == 2
+    for w_c in nested:
+        assert w_c.lazy_loader is not None
+        assert w_c.co_code == ''
+    # marshalling it again loads everything
+    assert space.bytes_w(interp_marshal.dumps(space, w_code,
+                                              space.newint(2))) == data
+    assert space.eq_w(w_code, interp_marshal.loads(space, w_data))
+    #
+    # running the code loads the nested codes that it runs
+    w_code = interp_marshal.loads_code_lazily(space, data)
+    nested = [w_c for w_c in w_code.co_consts_w if isinstance(w_c, PyCode)]
+    for w_c in nested:
+        assert w_c.lazy_loader is not None
+    w_res = space.appexec([w_code], """(code):
+        d = {}
+        exec code in d
+        f = d['f']
+        assert f.__doc__ == "docstring"
+        assert d['C']().f() == ('f', u'g')
+        return f(3), f.__code__.co_names
+    """)
+    assert space.unwrap(w_res) == (
+        (9.5, 'f', {'a': 10000000000000000000L, 'b': (1j, None)}), ())
+    for w_c in nested:
+        assert w_c.lazy_loader is None
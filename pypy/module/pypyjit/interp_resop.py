@@ -1,3 +1,4 @@
+from collections import OrderedDict
 
 from pypy.interpreter.typedef import (TypeDef, GetSetProperty,
      interp_attrproperty, interp_attrproperty_w)
@@ -14,8 +15,15 @@ from rpython.rlib.rarithmetic import r_uint
 from rpython.rlib import jit_hooks
 from rpython.rlib.jit import Counters
 from rpython.rlib.objectmodel import compute_unique_id
+from rpython.tool.error import offset2lineno
 from pypy.module.pypyjit.interp_jit import pypyjitdriver
 
+# how many of the most recently compiled bridges get_recent_bridges() returns
+RECENT_BRIDGES = 100
+# how many guards, the most recently compiled ones, get_guard_stats() and
+# get_recent_bridges() know the source location of
+GUARD_LOCATIONS = 10000
+
 class Cache(object):
     in_recursion = False
     no = 0
@@ -25,6 +33,10 @@ class Cache(object):
         self.w_abort_hook = None
         self.w_trace_too_long_hook = None
         self.compile_hook_with_ops = False
+        self.guard_stats = False
+        # guard number -> GuardLocation, the oldest first
+        self.guard_locations = OrderedDict()
+        self.recent_bridges = []    # list of (guard number, GuardLocation)
 
     def getno(self):
         self.no += 1
@@ -397,6 +409,119 @@ def get_stats_asmmemmgr(space):
     m2 = jit_hooks.stats_asmmemmgr_used(None)
     return space.newtuple([space.newint(m1), space.newint(m2)])
 
+class GuardLocation(object):
+    """ The Python code and bytecode of the last debug_merge_point
+    before a guard.
+    """
+    def __init__(self, pycode, next_instr):
+        self.pycode = pycode
+        self.next_instr = next_instr
+
+    def getlineno(self):
+        return offset2lineno(self.pycode, self.next_instr)
+
+def record_guard_locations(space, debug_info):
+    # this function is called from the JIT
+    from rpython.jit.metainterp.resoperation import rop
+
+    cache = space.fromcache(Cache)
+    jitdrivers_sd = debug_info.logger.metainterp_sd.jitdrivers_sd
+    location = None
+    for op in debug_info.operations:
+        if op.getopnum() == rop.DEBUG_MERGE_POINT:
+            jd_sd = jitdrivers_sd[op.getarg(0).getint()]
+            if jd_sd.jitdriver.name == pypyjitdriver.name:
+                greenkey = op.getarglist()[3:]
+                ll_code = lltype.cast_opaque_ptr(lltype.Ptr(OBJECT),
+                                                 greenkey[2].getref_base())
+                pycode = cast_base_ptr_to_instance(PyCode, ll_code)
+                location = GuardLocation(pycode, greenkey[0].getint())
+        elif op.is_guard():
+            descr = op.getdescr()
+            if descr is not None:
+                _set_guard_location(cache, compute_unique_id(descr), location)
+    if debug_info.fail_descr is not None:
+        number = compute_unique_id(debug_info.fail_descr)
+        if len(cache.recent_bridges) >= RECENT_BRIDGES:
+            del cache.recent_bridges[0]
+        cache.recent_bridges.append(
+            (number, cache.guard_locations.get(number, None)))
+
+def _set_guard_location(cache, number, location):
+    # the number is the unique id of the descr, which can be reused once
+    # the loop of the guard is freed: forget what we knew about the old
+    # guard with the same number
+    locations = cache.guard_locations
+    if number in locations:
+        del locations[number]
+    if location is None:
+        return
+    locations[number] = location
+    if len(locations) > GUARD_LOCATIONS:
+        for key in locations:
+            del locations[key]
+            break
+
+def wrap_guard_location(space, location):
+    if location is None:
+        return space.w_None, space.w_None
+    return location.pycode, space.newint(location.getlineno())
+
+def enable_guard_stats(space):
+    """ Start counting how often each guard fails, and remember the
+    source location of the guards compiled from now on, see
+    get_guard_stats() and get_recent_bridges().
+    """
+    cache = space.fromcache(Cache)
+    cache.guard_stats = True
+    jit_hooks.stats_set_guard_failures(None, True)
+
+def disable_guard_stats(space):
+    """ Stop counting guard failures and forget everything collected
+    so far.
+    """
+    cache = space.fromcache(Cache)
+    cache.guard_stats = False
+    cache.guard_locations.clear()
+    del cache.recent_bridges[:]
+    jit_hooks.stats_set_guard_failures(None, False)
+
+@unwrap_spec(reset=bool)
+def get_guard_stats(space, reset=False):
+    """ get_guard_stats(reset=False)
+
+    Return a list of (guard number, failures, code, line) tuples for the
+    guards that failed since enable_guard_stats() was called, or since
+    the last call with reset=True.  The guard number is the same as the
+    bridge_no of the bridge attached to the guard.  'code' and 'line'
+    are the Python code object and line of the guard, or None if the
+    guard was compiled before enable_guard_stats().
+    """
+    cache = space.fromcache(Cache)
+    ll_failures = jit_hooks.stats_get_guard_failures(None, reset)
+    result_w = []
+    if ll_failures:
+        for i in range(len(ll_failures)):
+            number = ll_failures[i].number
+            location = cache.guard_locations.get(number, None)
+            w_code, w_line = wrap_guard_location(space, location)
+            result_w.append(space.newtuple([space.newint(number),
+                                            space.newint(ll_failures[i].counter),
+                                            w_code, w_line]))
+    return space.newlist(result_w)
+
+def get_recent_bridges(space):
+    """ Return a list of (guard number, code, line) tuples for the
+    bridges compiled most recently while the guard stats are enabled,
+    oldest first.
+    """
+    cache = space.fromcache(Cache)
+    result_w = []
+    for number, location in cache.recent_bridges:
+        w_code, w_line = wrap_guard_location(space, location)
+        result_w.append(space.newtuple([space.newint(number), w_code, w_line]))
+    return space.newlist(result_w)
+
 def enable_debug(space):
     """ Set the jit debugging - completely necessary for some stats to work,
     most notably assembler counters.
@@ -14,6 +14,7 @@ from pypy.module.pypyjit.interp_jit import pypyjitdriver
 from pypy.module.pypyjit.hooks import pypy_hooks
 from rpython.jit.tool.oparser import parse
 from rpython.rlib.jit import JitDebugInfo, AsmInfo, Counters
+from rpython.rlib.objectmodel import compute_unique_id
 
 
 class MockJitDriverSD(object):
@@ -93,6 +94,10 @@ class AppTestJitHook(object):
         di_bridge = JitDebugInfo(MockJitDriverSD, logger, JitCellToken(),
                                  oplist, 'bridge', fail_descr=FailDescr())
         di_bridge.asminfo = AsmInfo(offset, 0, 0)
+        guard_descr = oplist[-1].getdescr()
+        di_guard_bridge = JitDebugInfo(MockJitDriverSD, logger, JitCellToken(),
+                                       oplist, 'bridge', fail_descr=guard_descr)
+        di_guard_bridge.asminfo = AsmInfo(offset, 0, 0)
 
         def interp_on_compile():
             di_loop.oplist = cls.oplist
@@ -103,6 +108,10 @@ class AppTestJitHook(object):
             if pypy_hooks.are_hooks_enabled():
                 pypy_hooks.after_compile_bridge(di_bridge)
 
+        def interp_on_compile_guard_bridge():
+            if pypy_hooks.are_hooks_enabled():
+                pypy_hooks.after_compile_bridge(di_guard_bridge)
+
         def interp_on_optimize():
             if pypy_hooks.are_hooks_enabled():
                 di_loop_optimize.oplist = cls.oplist
@@ -118,6 +127,9 @@ class AppTestJitHook(object):
         cls.w_on_compile = space.wrap(interp2app(interp_on_compile))
         cls.w_on_compile_bridge = space.wrap(interp2app(interp_on_compile_bridge))
         cls.w_on_abort = space.wrap(interp2app(interp_on_abort))
+        cls.w_on_compile_guard_bridge = space.wrap(
+            interp2app(interp_on_compile_guard_bridge))
+        cls.w_guard_number = space.wrap(compute_unique_id(guard_descr))
         cls.w_int_add_num = space.wrap(rop.INT_ADD)
         cls.w_dmp_num = space.wrap(rop.DEBUG_MERGE_POINT)
         cls.w_on_optimize = space.wrap(interp2app(interp_on_optimize))
@@ -269,6 +281,28 @@ class AppTestJitHook(object):
         raises(AttributeError, 'op.pycode')
         assert op.call_depth == 5
 
+    def test_guard_stats(self):
+        import pypyjit
+
+        pypyjit.enable_guard_stats()
+        try:
+            self.on_compile()
+            self.on_compile_guard_bridge()
+            self.on_compile_bridge()
+            bridges = pypyjit.get_recent_bridges()
+            assert len(bridges) == 2
+            # bytecode 0 is the 'pass' on the line after the 'def'
+            assert bridges[0] == (self.guard_number, self.f.__code__,
+                                  self.f.__code__.co_firstlineno + 1)
+            assert bridges[1][1:] == (None, None)
+            # guard failures are only counted when translated
+            assert pypyjit.get_guard_stats() == []
+        finally:
+            pypyjit.disable_guard_stats()
+        assert pypyjit.get_recent_bridges() == []
+        self.on_compile_guard_bridge()
+        assert pypyjit.get_recent_bridges() == []
+
     def test_get_stats_snapshot(self):
         skip("a bit no idea how to test it")
         from pypyjit import get_stats_snapshot
@@ -278,3 +312,44 @@ class AppTestJitHook(object):
         assert isinstance(stats.w_counters, dict)
         assert sorted(stats.w_counters.keys()) == self.sorted_keys
 
+
+
+class TestGuardLocations(object):
+    spaceconfig = dict(usemodules=('pypyjit',))
+
+    def test_bounded(self, monkeypatch):
+        from pypy.module.pypyjit import interp_resop
+        space = self.space
+        w_f = space.appexec([], """():
+            def f():
+                pass
+            return f
+        """)
+        ll_code = cast_instance_to_base_ptr(w_f.code)
+        code_gcref = lltype.cast_opaque_ptr(llmemory.GCREF, ll_code)
+        logger = Logger(MockSD())
+        oplist = parse("""
+        [i1]
+        debug_merge_point(0, 0, 0, 0, 0, ConstPtr(ptr0))
+        guard_true(i1) []
+        guard_true(i1) []
+        guard_true(i1) []
+        """, namespace={'ptr0': code_gcref}).operations
+        numbers = []
+        for op in oplist[1:]:
+            op.setdescr(BasicFailDescr())
+            numbers.append(compute_unique_id(op.getdescr()))
+        greenkey = [ConstInt(0), ConstInt(0), ConstPtr(code_gcref)]
+        di_loop = JitDebugInfo(MockJitDriverSD, logger, JitCellToken(),
+                               oplist, 'loop', greenkey)
+        monkeypatch.setattr(interp_resop, 'GUARD_LOCATIONS', 2)
+        cache = space.fromcache(interp_resop.Cache)
+        interp_resop.record_guard_locations(space, di_loop)
+        assert cache.guard_locations.keys() == numbers[1:]
+        # a guard without a location that gets the number of an old guard
+        # (its loop was freed) forgets the location of the old guard
+        di_other = JitDebugInfo(MockJitDriverSD, logger, JitCellToken(),
+                                oplist[2:3], 'loop', greenkey)
+        interp_resop.record_guard_locations(space, di_other)
+        assert cache.guard_locations.keys() == numbers[2:]
+        cache.guard_locations.clear()
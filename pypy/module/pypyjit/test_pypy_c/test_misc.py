@@ -436,3 +436,31 @@ class TestMisc(BaseTestPyPyC):
         assert opnames.count('new_with_vtable') == 1
         assert opnames.count('new') == 0
         assert opnames.count('new_array_clear') == 0
+
+    def test_coverage_keeps_loops_fast(self):
+        def main(n):
+            import time, __pypy__
+            def f(n):
+                i = total = 0
+                while i < n:
+                    total += i & 3    # ID: add
+                    i += 1
+                return total
+            t0 = time.time()
+            f(n)
+            t1 = time.time()
+            __pypy__.coverage_start()
+            try:
+                f(n)
+                t2 = time.time()
+            finally:
+                __pypy__.coverage_stop()
+            assert __pypy__.coverage_snapshot()[__file__]
+            return (t2 - t1) / (t1 - t0)
+        log = self.run(main, [10000000])
+        # the loops with coverage on don't call mark() on every bytecode,
+        # only guard that the bits of the line starts are set
+        for loop in log.loops_by_id("add"):
+            opnames = log.opnames(loop.allops())
+            assert not [name for name in opnames if name.startswith('call')]
+        assert log.result < 1.5
@@ -2,7 +2,7 @@ from rpython.rlib import jit
 from rpython.rlib.buffer import SubBuffer
 from rpython.rlib.mutbuffer import MutableStringBuffer
 from rpython.rlib.rstruct.error import StructError, StructOverflowError
-from rpython.rlib.rstruct.formatiterator import CalcSizeFormatIterator
+from rpython.rlib.rstruct.formatiterator import compile_format
 
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.gateway import interp2app, unwrap_spec
@@ -14,39 +14,55 @@ from pypy.module.struct.formatiterator import (
 )
 
 
+MAXCACHE = 100
+
+
 class Cache:
     def __init__(self, space):
         self.error = space.new_exception_class("struct.error", space.w_Exception)
+        self.formats = {}    # format string -> CompiledFormat
 
 
 def get_error(space):
     return space.fromcache(Cache).error
 
 
-def _calcsize(space, format):
-    fmtiter = CalcSizeFormatIterator()
+@jit.elidable
+def _compile_format(cache, format):
+    try:
+        return cache.formats[format]
+    except KeyError:
+        pass
+    compiled = compile_format(format)
+    if len(cache.formats) >= MAXCACHE:
+        cache.formats.clear()
+    cache.formats[format] = compiled
+    return compiled
+
+
+def get_compiled_format(space, format):
+    """Return the CompiledFormat for 'format', parsing the format string
+only the first time it is seen."""
     try:
-        fmtiter.interpret(format)
+        return _compile_format(space.fromcache(Cache), format)
     except StructOverflowError as e:
         raise OperationError(space.w_OverflowError, space.newtext(e.msg))
     except StructError as e:
         raise OperationError(get_error(space), space.newtext(e.msg))
-    return fmtiter.totalsize
 
 
 @unwrap_spec(format='text')
 def calcsize(space, format):
     """Return size of C struct described by format string fmt."""
-    return space.newint(_calcsize(space, format))
+    return space.newint(get_compiled_format(space, format).size)
 
 
-def _pack(space, format, args_w):
+def _pack(space, compiled, args_w):
     """Return string containing values v1, v2, ... packed according to fmt."""
-    size = _calcsize(space, format)
-    wbuf = MutableStringBuffer(size)
+    wbuf = MutableStringBuffer(compiled.size)
     fmtiter = PackFormatIterator(space, wbuf, args_w)
     try:
-        fmtiter.interpret(format)
+        fmtiter.interpret_compiled(compiled)
     except StructOverflowError as e:
         raise OperationError(space.w_OverflowError, space.newtext(e.msg))
     except StructError as e:
@@ -57,15 +73,12 @@ def _pack(space, format, args_w):
 
 @unwrap_spec(format='text')
 def pack(space, format, args_w):
-    return space.newbytes(_pack(space, format, args_w))
+    compiled = get_compiled_format(space, format)
+    return space.newbytes(_pack(space, compiled, args_w))
 
 
-@unwrap_spec(format='text', offset=int)
-def pack_into(space, format, w_buffer, offset, args_w):
-    """ Pack the values v1, v2, ... according to fmt.
-Write the packed bytes into the writable buffer buf starting at offset
-    """
-    size = _calcsize(space, format)
+def _pack_into(space, compiled, w_buffer, offset, args_w):
+    size = compiled.size
     buf = space.getarg_w('w*', w_buffer)
     if offset < 0:
         offset += buf.getlength()
@@ -77,17 +90,26 @@ Write the packed bytes into the writable buffer buf starting at offset
     wbuf = SubBuffer(buf, offset, size)
     fmtiter = PackFormatIterator(space, wbuf, args_w)
     try:
-        fmtiter.interpret(format)
+        fmtiter.interpret_compiled(compiled)
     except StructOverflowError as e:
         raise OperationError(space.w_OverflowError, space.newtext(e.msg))
     except StructError as e:
         raise OperationError(get_error(space), space.newtext(e.msg))
 
 
-def _unpack(space, format, buf):
+@unwrap_spec(format='text', offset=int)
+def pack_into(space, format, w_buffer, offset, args_w):
+    """ Pack the values v1, v2, ... according to fmt.
+Write the packed bytes into the writable buffer buf starting at offset
+    """
+    compiled = get_compiled_format(space, format)
+    _pack_into(space, compiled, w_buffer, offset, args_w)
+
+
+def _unpack(space, compiled, buf):
     fmtiter = UnpackFormatIterator(space, buf)
     try:
-        fmtiter.interpret(format)
+        fmtiter.interpret_compiled(compiled)
     except StructOverflowError as e:
         raise OperationError(space.w_OverflowError, space.newtext(e.msg))
     except StructError as e:
@@ -97,15 +119,13 @@ def _unpack(space, format, buf):
 
 @unwrap_spec(format='text')
 def unpack(space, format, w_str):
+    compiled = get_compiled_format(space, format)
     buf = space.getarg_w('s*', w_str)
-    return _unpack(space, format, buf)
+    return _unpack(space, compiled, buf)
 
 
-@unwrap_spec(format='text', offset=int)
-def unpack_from(space, format, w_buffer, offset=0):
-    """Unpack the buffer, containing packed C structure data, according to
-fmt, starting at offset. Requires len(buffer[offset:]) >= calcsize(fmt)."""
-    size = _calcsize(space, format)
+def _unpack_from(space, compiled, w_buffer, offset):
+    size = compiled.size
     buf = space.getarg_w('z*', w_buffer)
     if buf is None:
         raise oefmt(get_error(space), "unpack_from requires a buffer argument")
@@ -116,36 +136,64 @@ fmt, starting at offset. Requires len(buffer[offset:]) >= calcsize(fmt)."""
                     "unpack_from requires a buffer of at least %d bytes",
                     size)
     buf = SubBuffer(buf, offset, size)
-    return _unpack(space, format, buf)
+    return _unpack(space, compiled, buf)
+
+
+@unwrap_spec(format='text', offset=int)
+def unpack_from(space, format, w_buffer, offset=0):
+    """Unpack the buffer, containing packed C structure data, according to
+fmt, starting at offset. Requires len(buffer[offset:]) >= calcsize(fmt)."""
+    compiled = get_compiled_format(space, format)
+    return _unpack_from(space, compiled, w_buffer, offset)
+
+
+@unwrap_spec(format='text')
+def iter_unpack(space, format, w_buffer):
+    """Return an iterator yielding tuples unpacked from the given bytes
+source according to the format string, like a repeated invocation of
+unpack_from(). Requires that the bytes length be a multiple of the
+format struct size."""
+    compiled = get_compiled_format(space, format)
+    return W_UnpackIter(space, compiled, w_buffer)
 
 
 class W_Struct(W_Root):
-    _immutable_fields_ = ["format", "size"]
+    _immutable_fields_ = ["format", "size", "compiled"]
 
     format = ""
     size = -1
+    compiled = compile_format("")
 
     def descr__new__(space, w_subtype, __args__):
         return space.allocate_instance(W_Struct, w_subtype)
 
     @unwrap_spec(format='text')
     def descr__init__(self, space, format):
+        self.compiled = get_compiled_format(space, format)
         self.format = format
-        self.size = _calcsize(space, format)
+        self.size = self.compiled.size
 
     def descr_pack(self, space, args_w):
-        return pack(space, jit.promote_string(self.format), args_w)
+        compiled = jit.promote(self.compiled)
+        return space.newbytes(_pack(space, compiled, args_w))
 
     @unwrap_spec(offset=int)
     def descr_pack_into(self, space, w_buffer, offset, args_w):
-        return pack_into(space, jit.promote_string(self.format), w_buffer, offset, args_w)
+        compiled = jit.promote(self.compiled)
+        _pack_into(space, compiled, w_buffer, offset, args_w)
 
     def descr_unpack(self, space, w_str):
-        return unpack(space, jit.promote_string(self.format), w_str)
+        compiled = jit.promote(self.compiled)
+        buf = space.getarg_w('s*', w_str)
+        return _unpack(space, compiled, buf)
 
     @unwrap_spec(offset=int)
     def descr_unpack_from(self, space, w_buffer, offset=0):
-        return unpack_from(space, jit.promote_string(self.format), w_buffer, offset)
+        compiled = jit.promote(self.compiled)
+        return _unpack_from(space, compiled, w_buffer, offset)
+
+    def descr_iter_unpack(self, space, w_buffer):
+        return W_UnpackIter(space, self.compiled, w_buffer)
 
 W_Struct.typedef = TypeDef("Struct",
     __new__=interp2app(W_Struct.descr__new__.im_func),
@@ -157,8 +205,52 @@ W_Struct.typedef = TypeDef("Struct",
     unpack=interp2app(W_Struct.descr_unpack),
     pack_into=interp2app(W_Struct.descr_pack_into),
     unpack_from=interp2app(W_Struct.descr_unpack_from),
+    iter_unpack=interp2app(W_Struct.descr_iter_unpack),
     __weakref__=make_weakref_descr(W_Struct),
 )
 
+
+class W_UnpackIter(W_Root):
+    def __init__(self, space, compiled, w_buffer):
+        size = compiled.size
+        if size <= 0:
+            raise oefmt(get_error(space),
+                "cannot iteratively unpack with a struct of length %d", size)
+        buf = space.getarg_w('s*', w_buffer)
+        if buf.getlength() % size != 0:
+            raise oefmt(get_error(space),
+                "iterative unpacking requires a buffer of a multiple of %d "
+                "bytes", size)
+        self.compiled = compiled
+        self.buf = buf
+        self.index = 0
+
+    def descr_iter(self, space):
+        return self
+
+    def descr_next(self, space):
+        compiled = jit.promote(self.compiled)
+        size = compiled.size
+        # the buffer may have shrunk in the meantime
+        if self.index + size > self.buf.getlength():
+            raise OperationError(space.w_StopIteration, space.w_None)
+        buf = SubBuffer(self.buf, self.index, size)
+        w_res = _unpack(space, compiled, buf)
+        self.index += size
+        return w_res
+
+    def descr_length_hint(self, space):
+        length = (self.buf.getlength() - self.index) // self.compiled.size
+        return space.newint(max(length, 0))
+
+W_UnpackIter.typedef = TypeDef("unpack_iterator",
+    __iter__=interp2app(W_UnpackIter.descr_iter),
+    next=interp2app(W_UnpackIter.descr_next),
+    __length_hint__=interp2app(W_UnpackIter.descr_length_hint),
+)
+W_UnpackIter.typedef.acceptable_as_base_class = False
+
+
 def clearcache(space):
-    """No-op on PyPy"""
+    """Clear the internal cache."""
+    space.fromcache(Cache).formats.clear()
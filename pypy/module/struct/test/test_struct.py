@@ -462,6 +462,41 @@ class AppTestStruct(object):
         assert val == sys.maxint+1
         assert type(val) is long
 
+    def test_iter_unpack(self):
+        s = self.struct.Struct('<hxi')
+        data = ''.join([s.pack(i, -i * 1000) for i in range(10)])
+        it = s.iter_unpack(data)
+        assert iter(it) is it
+        assert it.__length_hint__() == 10
+        assert next(it) == (0, 0)
+        assert it.__length_hint__() == 9
+        assert list(it) == [(i, -i * 1000) for i in range(1, 10)]
+        assert it.__length_hint__() == 0
+        raises(StopIteration, next, it)
+        #
+        it = self.struct.iter_unpack('<hxi', bytearray(data))
+        assert list(it) == [(i, -i * 1000) for i in range(10)]
+        assert list(self.struct.iter_unpack('<i', '')) == []
+        raises(self.struct.error, self.struct.iter_unpack, '<i', 'abcde')
+        raises(self.struct.error, self.struct.iter_unpack, '', 'abcde')
+        raises(self.struct.error, s.iter_unpack, 'abc')
+
+    def test_compiled_format_cache(self):
+        struct = self.struct
+        struct._clearcache()
+        for i in range(300):
+            fmt = '<%dsi' % i
+            assert struct.calcsize(fmt) == i + 4
+            assert struct.unpack(fmt, struct.pack(fmt, 'x' * i, i)) == (
+                'x' * i, i)
+        struct._clearcache()
+        assert struct.pack('iii2i', 1, 2, 3, 4, 5) == struct.pack(
+            '5i', 1, 2, 3, 4, 5)
+        assert struct.unpack('bb i', struct.pack('bb i', 1, 2, 3)) == (1, 2, 3)
+        raises(struct.error, struct.pack, 'ii', 1)
+        raises(struct.error, struct.pack, 'ii', 1, 2, 3)
+        raises(struct.error, struct.calcsize, 'iz')
+
     def test_bpo35714(self):
         # why not "bad char in struct format"??
         for s in '\0', '2\0i', b'\0':
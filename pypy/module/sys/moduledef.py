@@ -83,6 +83,7 @@ class Module(MixedModule):
         'path_hooks'            : 'space.newlist([])',
         'path_importer_cache'   : 'space.newdict()',
         'dont_write_bytecode'   : 'space.newbool(space.config.translation.sandbox)',
+        'pycache_prefix'        : 'space.w_None',
 
         'getdefaultencoding'    : 'interp_encoding.getdefaultencoding',
         'setdefaultencoding'    : 'interp_encoding.setdefaultencoding',
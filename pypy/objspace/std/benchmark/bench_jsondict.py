@@ -0,0 +1,79 @@
+
+""" decode a list of JSON records, add a field to every record, encode it
+again.  Run with a translated pypy:
+
+    pypy bench_jsondict.py [number_of_records [rounds [unicode]]]
+
+On PyPy, the decoded records use JsonDictStrategy, also after the new
+field is added; the memory is measured with gc.get_stats().  With
+'unicode', the records are copied to normal dicts first, which is what
+happens when they switch to UnicodeDictStrategy.
+"""
+
+import sys, time, json
+
+try:
+    import gc
+except ImportError:
+    gc = None
+
+try:
+    from __pypy__ import strategy
+except ImportError:
+    strategy = None
+
+RECORD = ('{"id": %d, "name": "user%d", "email": "user%d@example.com", '
+          '"active": true, "score": %d.5, "tags": ["a", "b"], '
+          '"created": "2024-05-17T12:34:56", "group": %d}')
+
+def make_input(n):
+    return '[' + ', '.join([RECORD % (i, i, i, i % 100, i % 7)
+                            for i in xrange(n)]) + ']'
+
+def memory_used():
+    if gc is None or not hasattr(gc, 'get_stats'):
+        return 0
+    gc.collect()
+    return gc.get_stats()._s.total_gc_memory
+
+def count_operation(name, function, *args):
+    t0 = time.time()
+    retval = function(*args)
+    tk = time.time()
+    print "%-10s takes: %f" % (name, tk - t0)
+    return retval
+
+def enrich(records, use_copies):
+    if use_copies:
+        records[:] = [record.copy() for record in records]
+    for record in records:
+        record[u"score_class"] = int(record[u"score"]) // 10
+        del record[u"tags"]
+
+def bench(n, rounds, use_copies):
+    data = make_input(n)
+    for i in range(rounds):
+        mem0 = memory_used()
+        records = count_operation("decode", json.loads, data)
+        mem1 = memory_used()
+        count_operation("mutate", enrich, records, use_copies)
+        mem2 = memory_used()
+        count_operation("encode", json.dumps, records)
+        if strategy is not None:
+            print "strategy:", strategy(records[-1])
+        if mem0:
+            print "memory per record after decode: %d bytes" % (
+                (mem1 - mem0) // n)
+            print "memory per record after mutate: %d bytes" % (
+                (mem2 - mem0) // n)
+        records = None
+
+if __name__ == '__main__':
+    n = 100000
+    rounds = 3
+    if len(sys.argv) > 1:
+        n = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        rounds = int(sys.argv[2])
+    use_copies = len(sys.argv) > 3 and sys.argv[3] == 'unicode'
+    bench(n, rounds, use_copies)
@@ -76,6 +76,9 @@ class W_BytearrayObject(W_Root):
     def _new_from_list(self, value):
         return W_BytearrayObject(value)
 
+    def _new_from_str(self, value):
+        return W_BytearrayObject([c for c in value])
+
     def _empty(self):
         return W_BytearrayObject([])
 
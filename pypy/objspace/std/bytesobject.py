@@ -59,6 +59,21 @@ class W_AbstractBytesObject(W_Root):
     def convert_to_w_unicode(self, space):
         return unicode_from_string(space, self)
 
+    def descr_getbuffer(self, space, w_flags):
+        #from pypy.objspace.std.bufferobject import W_Buffer
+        #return W_Buffer(StringBuffer(self._value))
+        return self
+
+    def descr_formatter_parser(self, space):
+        from pypy.objspace.std.newformat import str_template_formatter
+        tformat = str_template_formatter(space, space.bytes_w(self))
+        return tformat.formatter_parser()
+
+    def descr_formatter_field_name_split(self, space):
+        from pypy.objspace.std.newformat import str_template_formatter
+        tformat = str_template_formatter(space, space.bytes_w(self))
+        return tformat.formatter_field_name_split()
+
     def descr_add(self, space, w_other):
         """x.__add__(y) <==> x+y"""
 
@@ -468,11 +483,6 @@ class W_BytesObject(W_AbstractBytesObject):
         raise oefmt(space.w_TypeError,
                     "Cannot use string as modifiable buffer")
 
-    def descr_getbuffer(self, space, w_flags):
-        #from pypy.objspace.std.bufferobject import W_Buffer
-        #return W_Buffer(StringBuffer(self._value))
-        return self
-
     charbuf_w = str_w
 
     def listview_bytes(self):
@@ -491,6 +501,8 @@ class W_BytesObject(W_AbstractBytesObject):
     def _new_from_list(self, value):
         return W_BytesObject(''.join(value))
 
+    _new_from_str = _new
+
     def _empty(self):
         return W_BytesObject.EMPTY
 
@@ -499,11 +511,19 @@ class W_BytesObject(W_AbstractBytesObject):
 
     _val = str_w
 
+    def _sliced(self, space, s, start, stop, orig_obj):
+        if space.config.objspace.std.withbytesslice:
+            from pypy.objspace.std.bytessliceobject import bytes_slice
+            return bytes_slice(space, s, start, stop)
+        assert start >= 0
+        assert stop >= 0
+        return W_BytesObject(s[start:stop])
+
     @staticmethod
     def _use_rstr_ops(space, w_other):
-        from pypy.objspace.std.unicodeobject import W_UnicodeObject
-        return (isinstance(w_other, W_BytesObject) or
-                isinstance(w_other, W_UnicodeObject))
+        from pypy.objspace.std.unicodeobject import W_AbstractUnicodeObject
+        return (isinstance(w_other, W_AbstractBytesObject) or
+                isinstance(w_other, W_AbstractUnicodeObject))
 
     @staticmethod
     def _op_val(space, w_other, strict=None):
@@ -616,31 +636,49 @@ class W_BytesObject(W_AbstractBytesObject):
 
     def descr_eq(self, space, w_other):
         if not isinstance(w_other, W_BytesObject):
+            if isinstance(w_other, W_AbstractBytesObject):
+                # a W_BytesSliceObject, which compares without forcing
+                return w_other.descr_eq(space, self)
             return space.w_NotImplemented
         return space.newbool(self._value == w_other._value)
 
     def descr_ne(self, space, w_other):
         if not isinstance(w_other, W_BytesObject):
+            if isinstance(w_other, W_AbstractBytesObject):
+                # a W_BytesSliceObject, which compares without forcing
+                return w_other.descr_ne(space, self)
             return space.w_NotImplemented
         return space.newbool(self._value != w_other._value)
 
     def descr_lt(self, space, w_other):
         if not isinstance(w_other, W_BytesObject):
+            if isinstance(w_other, W_AbstractBytesObject):
+                # a W_BytesSliceObject, which compares without forcing
+                return w_other.descr_gt(space, self)
             return space.w_NotImplemented
         return space.newbool(self._value < w_other._value)
 
     def descr_le(self, space, w_other):
         if not isinstance(w_other, W_BytesObject):
+            if isinstance(w_other, W_AbstractBytesObject):
+                # a W_BytesSliceObject, which compares without forcing
+                return w_other.descr_ge(space, self)
             return space.w_NotImplemented
         return space.newbool(self._value <= w_other._value)
 
     def descr_gt(self, space, w_other):
         if not isinstance(w_other, W_BytesObject):
+            if isinstance(w_other, W_AbstractBytesObject):
+                # a W_BytesSliceObject, which compares without forcing
+                return w_other.descr_lt(space, self)
             return space.w_NotImplemented
         return space.newbool(self._value > w_other._value)
 
     def descr_ge(self, space, w_other):
         if not isinstance(w_other, W_BytesObject):
+            if isinstance(w_other, W_AbstractBytesObject):
+                # a W_BytesSliceObject, which compares without forcing
+                return w_other.descr_le(space, self)
             return space.w_NotImplemented
         return space.newbool(self._value >= w_other._value)
 
@@ -657,6 +695,10 @@ class W_BytesObject(W_AbstractBytesObject):
             from .bytearrayobject import W_BytearrayObject, _make_data
             self_as_bytearray = W_BytearrayObject(_make_data(self._value))
             return space.add(self_as_bytearray, w_other)
+        elif (isinstance(w_other, W_AbstractBytesObject) and
+                not isinstance(w_other, W_BytesObject)):
+            from pypy.objspace.std.bytessliceobject import concat
+            return concat(self, w_other)
         return self._StringMethods_descr_add(space, w_other)
 
     _StringMethods__startswith = _startswith
@@ -683,6 +725,7 @@ class W_BytesObject(W_AbstractBytesObject):
     def descr_contains(self, space, w_sub):
         if space.isinstance_w(w_sub, space.w_unicode):
             from pypy.objspace.std.unicodeobject import W_UnicodeObject
+            w_sub = space.convert_to_w_unicode(w_sub)
             assert isinstance(w_sub, W_UnicodeObject)
             self_as_unicode = unicode_from_encoded_object(space, self, None,
                                                           None)
@@ -837,16 +880,6 @@ class W_BytesObject(W_AbstractBytesObject):
     def descr_upper(self, space):
         return W_BytesObject(self._value.upper())
 
-    def descr_formatter_parser(self, space):
-        from pypy.objspace.std.newformat import str_template_formatter
-        tformat = str_template_formatter(space, space.bytes_w(self))
-        return tformat.formatter_parser()
-
-    def descr_formatter_field_name_split(self, space):
-        from pypy.objspace.std.newformat import str_template_formatter
-        tformat = str_template_formatter(space, space.bytes_w(self))
-        return tformat.formatter_field_name_split()
-
 
 def _create_list_from_bytes(value):
     # need this helper function to allow the jit to look inside and inline
@@ -923,17 +956,18 @@ W_BytesObject.typedef = TypeDef(
     translate = interpindirect2app(W_AbstractBytesObject.descr_translate),
     upper = interpindirect2app(W_AbstractBytesObject.descr_upper),
     zfill = interpindirect2app(W_AbstractBytesObject.descr_zfill),
-    __buffer__ = interp2app(W_BytesObject.descr_getbuffer),
+    __buffer__ = interp2app(W_AbstractBytesObject.descr_getbuffer),
 
-    format = interpindirect2app(W_BytesObject.descr_format),
-    __format__ = interpindirect2app(W_BytesObject.descr__format__),
-    __mod__ = interpindirect2app(W_BytesObject.descr_mod),
-    __rmod__ = interpindirect2app(W_BytesObject.descr_rmod),
+    format = interpindirect2app(W_AbstractBytesObject.descr_format),
+    __format__ = interpindirect2app(W_AbstractBytesObject.descr__format__),
+    __mod__ = interpindirect2app(W_AbstractBytesObject.descr_mod),
+    __rmod__ = interpindirect2app(W_AbstractBytesObject.descr_rmod),
     __getnewargs__ = interpindirect2app(
         W_AbstractBytesObject.descr_getnewargs),
-    _formatter_parser = interp2app(W_BytesObject.descr_formatter_parser),
+    _formatter_parser = interp2app(
+        W_AbstractBytesObject.descr_formatter_parser),
     _formatter_field_name_split =
-        interp2app(W_BytesObject.descr_formatter_field_name_split),
+        interp2app(W_AbstractBytesObject.descr_formatter_field_name_split),
 )
 W_BytesObject.typedef.flag_sequence_bug_compat = True
 
@@ -0,0 +1,351 @@
+"""
+Slices of large strings that don't copy the characters.  Enabled with
+the option 'objspace.std.withbytesslice'.
+
+A W_BytesSliceObject references the string that it is a slice of, with
+the start and stop of the slice in it.  The usual 'buf = buf[n:]' of
+parsers then runs in constant time instead of copying the rest of 'buf'
+every time.  Comparisons, '+', indexing, slicing and the searches work
+on the original string.  The slice is turned into a real string (see
+force()) as soon as something else needs one, e.g. most string methods,
+hash(), or passing the object to C code.  After this, the characters outside the
+slice are no longer referenced.
+
+To avoid keeping alive a huge string for the sake of a small part of it,
+a slice is only made if it is at least 1/SLICE_MAX_RATIO of the string;
+smaller slices are copied.
+"""
+
+import py
+
+from rpython.rlib.buffer import StringBuffer, SubBuffer
+from rpython.rlib.rstring import StringBuilder, endswith, startswith
+
+from pypy.interpreter.buffer import SimpleView
+from pypy.interpreter.error import oefmt
+from pypy.objspace.std.bytesobject import (
+    W_AbstractBytesObject, W_BytesObject)
+from pypy.objspace.std.sliceobject import (
+    W_SliceObject, normalize_simple_slice, unwrap_start_stop)
+
+SLICE_MAX_RATIO = 4
+
+
+def bytes_slice(space, s, start, stop):
+    """Return s[start:stop] as a str object, which is a W_BytesSliceObject
+    if the slice is large enough."""
+    assert start >= 0
+    assert stop >= 0
+    length = stop - start
+    if (length >= space.config.objspace.std.bytesslicethreshold and
+            length * SLICE_MAX_RATIO >= len(s)):
+        return W_BytesSliceObject(s, start, stop)
+    return W_BytesObject(s[start:stop])
+
+def _needle(w_sub):
+    s = w_sub._value
+    assert s is not None
+    return s
+
+def _unslice(w_obj):
+    if isinstance(w_obj, W_BytesSliceObject):
+        return w_obj._force_w()
+    return w_obj
+
+def _is_str(w_obj):
+    return (isinstance(w_obj, W_BytesObject) or
+            isinstance(w_obj, W_BytesSliceObject))
+
+def _parts(w_obj):
+    # (string, start, stop) of a W_BytesObject or W_BytesSliceObject
+    if isinstance(w_obj, W_BytesSliceObject):
+        return w_obj._str, w_obj._start, w_obj._stop
+    assert isinstance(w_obj, W_BytesObject)
+    s = w_obj._value
+    return s, 0, len(s)
+
+def compare(w_str1, w_str2):
+    """Like cmp() on the two str objects, without forcing the slices."""
+    s1, start1, stop1 = _parts(w_str1)
+    s2, start2, stop2 = _parts(w_str2)
+    return compare_ranges(s1, start1, stop1, s2, start2, stop2)
+
+def compare_ranges(s1, start1, stop1, s2, start2, stop2):
+    """Like cmp(s1[start1:stop1], s2[start2:stop2]), without copying."""
+    length1 = stop1 - start1
+    length2 = stop2 - start2
+    if s1 is s2 and start1 == start2:
+        i = min(length1, length2)
+    else:
+        i = 0
+    while i < length1 and i < length2:
+        c1 = s1[start1 + i]
+        c2 = s2[start2 + i]
+        if c1 != c2:
+            if c1 < c2:
+                return -1
+            return 1
+        i += 1
+    if length1 < length2:
+        return -1
+    return int(length1 > length2)
+
+def equal(w_str1, w_str2):
+    s1, start1, stop1 = _parts(w_str1)
+    s2, start2, stop2 = _parts(w_str2)
+    if stop1 - start1 != stop2 - start2:
+        return False
+    return compare(w_str1, w_str2) == 0
+
+def concat(w_str1, w_str2):
+    """w_str1 + w_str2, copying the characters of the slices only once."""
+    s1, start1, stop1 = _parts(w_str1)
+    s2, start2, stop2 = _parts(w_str2)
+    builder = StringBuilder((stop1 - start1) + (stop2 - start2))
+    builder.append_slice(s1, start1, stop1)
+    builder.append_slice(s2, start2, stop2)
+    return W_BytesObject(builder.build())
+
+
+class W_BytesSliceObject(W_AbstractBytesObject):
+    _attrs_ = ['_str', '_start', '_stop']
+
+    def __init__(self, s, start, stop):
+        assert 0 <= start <= stop <= len(s)
+        self._str = s
+        self._start = start
+        self._stop = stop
+
+    def __repr__(self):
+        """representation for debugging purposes"""
+        return "%s(%r, %d, %d)" % (self.__class__.__name__, self._str,
+                                   self._start, self._stop)
+
+    def force(self):
+        """Return the slice as a string, and stop referencing the rest
+        of the original string."""
+        start = self._start
+        stop = self._stop
+        if start != 0 or stop != len(self._str):
+            assert start >= 0
+            assert stop >= 0
+            self._str = self._str[start:stop]
+            self._start = 0
+            self._stop = stop - start
+        return self._str
+
+    def _force_w(self):
+        return W_BytesObject(self.force())
+
+    def _len(self):
+        return self._stop - self._start
+
+    def unwrap(self, space):
+        return self.force()
+
+    def str_w(self, space):
+        return self.force()
+
+    def utf8_w(self, space):
+        return self.force()
+
+    charbuf_w = str_w
+
+    def _subbuffer(self):
+        return SubBuffer(StringBuffer(self._str), self._start, self._len())
+
+    def buffer_w(self, space, flags):
+        space.check_buf_flags(flags, True)
+        return SimpleView(self._subbuffer())
+
+    def readbuf_w(self, space):
+        return self._subbuffer()
+
+    def writebuf_w(self, space):
+        raise oefmt(space.w_TypeError,
+                    "Cannot use string as modifiable buffer")
+
+    def ord(self, space):
+        return self._force_w().ord(space)
+
+    def descr_str(self, space):
+        return self
+
+    def descr_len(self, space):
+        return space.newint(self._len())
+
+    def descr_getitem(self, space, w_index):
+        length = self._len()
+        if isinstance(w_index, W_SliceObject):
+            start, stop, step, sl = w_index.indices4(space, length)
+            if sl == 0:
+                return W_BytesObject.EMPTY
+            elif step == 1:
+                return bytes_slice(space, self._str, self._start + start,
+                                   self._start + stop)
+            return self._force_w().descr_getitem(space, w_index)
+        index = space.getindex_w(w_index, space.w_IndexError, "string index")
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise oefmt(space.w_IndexError, "string index out of range")
+        return W_BytesObject(self._str[self._start + index])
+
+    def descr_getslice(self, space, w_start, w_stop):
+        start, stop = normalize_simple_slice(space, self._len(), w_start,
+                                             w_stop)
+        if start == stop:
+            return W_BytesObject.EMPTY
+        return bytes_slice(space, self._str, self._start + start,
+                           self._start + stop)
+
+    # comparisons, '+' and the searches are done in the original string,
+    # without forcing the slice
+
+    def descr_eq(self, space, w_other):
+        if not _is_str(w_other):
+            return space.w_NotImplemented
+        return space.newbool(equal(self, w_other))
+
+    def descr_ne(self, space, w_other):
+        if not _is_str(w_other):
+            return space.w_NotImplemented
+        return space.newbool(not equal(self, w_other))
+
+    def descr_lt(self, space, w_other):
+        if not _is_str(w_other):
+            return space.w_NotImplemented
+        return space.newbool(compare(self, w_other) < 0)
+
+    def descr_le(self, space, w_other):
+        if not _is_str(w_other):
+            return space.w_NotImplemented
+        return space.newbool(compare(self, w_other) <= 0)
+
+    def descr_gt(self, space, w_other):
+        if not _is_str(w_other):
+            return space.w_NotImplemented
+        return space.newbool(compare(self, w_other) > 0)
+
+    def descr_ge(self, space, w_other):
+        if not _is_str(w_other):
+            return space.w_NotImplemented
+        return space.newbool(compare(self, w_other) >= 0)
+
+    def descr_add(self, space, w_other):
+        if not _is_str(w_other):
+            # unicode, bytearray, or an error
+            return self._force_w().descr_add(space, w_other)
+        return concat(self, w_other)
+
+    def _convert_idx_params(self, space, w_start, w_end):
+        length = self._len()
+        start, end = unwrap_start_stop(space, length, w_start, w_end)
+        if end > length:
+            end = length
+        start += self._start
+        end += self._start
+        assert start >= 0
+        assert end >= 0
+        return start, end
+
+    def descr_find(self, space, w_sub, w_start=None, w_end=None):
+        if not isinstance(w_sub, W_BytesObject):
+            return self._force_w().descr_find(space, _unslice(w_sub),
+                                              w_start, w_end)
+        start, end = self._convert_idx_params(space, w_start, w_end)
+        res = self._str.find(_needle(w_sub), start, end)
+        if res >= 0:
+            res -= self._start
+        return space.newint(res)
+
+    def descr_rfind(self, space, w_sub, w_start=None, w_end=None):
+        if not isinstance(w_sub, W_BytesObject):
+            return self._force_w().descr_rfind(space, _unslice(w_sub),
+                                               w_start, w_end)
+        start, end = self._convert_idx_params(space, w_start, w_end)
+        res = self._str.rfind(_needle(w_sub), start, end)
+        if res >= 0:
+            res -= self._start
+        return space.newint(res)
+
+    def descr_index(self, space, w_sub, w_start=None, w_end=None):
+        if not isinstance(w_sub, W_BytesObject):
+            return self._force_w().descr_index(space, _unslice(w_sub),
+                                               w_start, w_end)
+        start, end = self._convert_idx_params(space, w_start, w_end)
+        res = self._str.find(_needle(w_sub), start, end)
+        if res < 0:
+            raise oefmt(space.w_ValueError,
+                        "substring not found in string.index")
+        return space.newint(res - self._start)
+
+    def descr_rindex(self, space, w_sub, w_start=None, w_end=None):
+        if not isinstance(w_sub, W_BytesObject):
+            return self._force_w().descr_rindex(space, _unslice(w_sub),
+                                                w_start, w_end)
+        start, end = self._convert_idx_params(space, w_start, w_end)
+        res = self._str.rfind(_needle(w_sub), start, end)
+        if res < 0:
+            raise oefmt(space.w_ValueError,
+                        "substring not found in string.rindex")
+        return space.newint(res - self._start)
+
+    def descr_count(self, space, w_sub, w_start=None, w_end=None):
+        if not isinstance(w_sub, W_BytesObject):
+            return self._force_w().descr_count(space, _unslice(w_sub),
+                                               w_start, w_end)
+        start, end = self._convert_idx_params(space, w_start, w_end)
+        return space.newint(self._str.count(_needle(w_sub), start, end))
+
+    def descr_startswith(self, space, w_prefix, w_start=None, w_end=None):
+        if not isinstance(w_prefix, W_BytesObject):
+            return self._force_w().descr_startswith(space, _unslice(w_prefix),
+                                                    w_start, w_end)
+        start, end = self._convert_idx_params(space, w_start, w_end)
+        if start > self._stop:
+            return space.w_False
+        return space.newbool(startswith(self._str, _needle(w_prefix),
+                                        start, end))
+
+    def descr_endswith(self, space, w_suffix, w_start=None, w_end=None):
+        if not isinstance(w_suffix, W_BytesObject):
+            return self._force_w().descr_endswith(space, _unslice(w_suffix),
+                                                  w_start, w_end)
+        start, end = self._convert_idx_params(space, w_start, w_end)
+        if start > self._stop:
+            return space.w_False
+        return space.newbool(endswith(self._str, _needle(w_suffix),
+                                      start, end))
+
+
+def _make_forcing_method(name, argnames):
+    # the other methods force the slice and call the W_BytesObject method
+    args = ', '.join(['space'] + argnames)
+    callargs = ', '.join(['space'] + [
+        '_unslice(%s)' % (arg,) if arg.startswith('w_') else arg
+        for arg in argnames])
+    source = py.code.Source("""
+    def %(name)s(self, %(args)s):
+        return self._force_w().%(name)s(%(callargs)s)
+    """ % {'name': name, 'args': args, 'callargs': callargs})
+    d = {'_unslice': _unslice}
+    exec source.compile() in d
+    return d[name]
+
+def _install_forcing_methods():
+    import inspect
+    for name, func in W_AbstractBytesObject.__dict__.items():
+        if (not name.startswith('descr_') or
+                name in W_BytesSliceObject.__dict__ or
+                name not in W_BytesObject.__dict__):
+            continue
+        argnames = inspect.getargs(func.func_code).args
+        assert argnames[:2] == ['self', 'space']
+        meth = _make_forcing_method(name, argnames[2:])
+        meth.func_defaults = W_BytesObject.__dict__[name].func_defaults
+        setattr(W_BytesSliceObject, name, meth)
+
+_install_forcing_methods()
+
+W_BytesSliceObject.typedef = W_BytesObject.typedef
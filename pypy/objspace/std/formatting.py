@@ -265,13 +265,7 @@ def make_formatter_subclass(do_unicode):
             c = self.peekchr()
             if c == '*':
                 self.forward()
-                w_value = self.nextinputvalue()
-                if name == 'width':
-                    return space.int_w(w_value)
-                elif name == 'prec':
-                    return space.c_int_w(w_value)
-                else:
-                    assert False
+                return self.star_num(name)
             result = 0
             while True:
                 digit = ord(c) - ord('0')
@@ -284,8 +278,25 @@ def make_formatter_subclass(do_unicode):
                 c = self.peekchr()
             return result
 
+        def star_num(self, name):
+            # the width or precision given as '*'
+            space = self.space
+            w_value = self.nextinputvalue()
+            if name == 'width':
+                return space.int_w(w_value)
+            elif name == 'prec':
+                return space.c_int_w(w_value)
+            else:
+                assert False
+
         @jit.look_inside_iff(lambda self: jit.isconstant(self.fmt))
         def format(self):
+            if not jit.isconstant(self.fmt):
+                # not in the JIT, or 'fmt' is not a constant: use the
+                # cached pre-parsed version of 'fmt'
+                template = get_mod_template(self.space, self.fmt)
+                if template is not None:
+                    return self.format_template(template)
             lgt = len(self.fmt) + 4 * len(self.values_w) + 10
             result = StringBuilder(lgt)
             self.result = result
@@ -321,20 +332,64 @@ def make_formatter_subclass(do_unicode):
                     self.unknown_fmtchar()
                 if w_value is None:
                     w_value = self.nextinputvalue()
+                self.format_value(c, w_value)
 
-                # dispatch on the formatter
-                # (this turns into a switch after translation)
-                for c1 in FORMATTER_CHARS:
-                    if c == c1:
-                        # 'c1' is an annotation constant here,
-                        # so this getattr() is ok
-                        do_fmt = getattr(self, 'fmt_' + c1)
-                        do_fmt(w_value)
-                        break
+            self.checkconsumed()
+            return result.build()
 
+        def format_template(self, template):
+            # same as format(), but with a format string that was already
+            # parsed by parse_mod_template()
+            space = self.space
+            fmt = self.fmt
+            result = StringBuilder(len(fmt) + 4 * len(self.values_w) + 10)
+            self.result = result
+            for spec in template.specs:
+                result.append_slice(fmt, spec.literal_start, spec.literal_end)
+                if spec.key is not None:
+                    w_value = self.getmappingvalue(spec.key)
+                else:
+                    w_value = None
+                self.f_ljust = spec.f_ljust
+                self.f_sign = spec.f_sign
+                self.f_blank = spec.f_blank
+                self.f_alt = spec.f_alt
+                self.f_zero = spec.f_zero
+                width = spec.width
+                if width == STAR:
+                    width = self.star_num('width')
+                    if width < 0:
+                        self.f_ljust = True
+                        width = -width
+                self.width = width
+                prec = spec.prec
+                if prec == STAR:
+                    prec = self.star_num('prec')
+                    if prec < 0:
+                        prec = 0
+                self.prec = prec
+                c = spec.char
+                if c == '%':
+                    result.append('%')
+                    continue
+                if w_value is None:
+                    w_value = self.nextinputvalue()
+                self.format_value(c, w_value)
+            result.append_slice(fmt, template.tail_start, len(fmt))
             self.checkconsumed()
             return result.build()
 
+        def format_value(self, c, w_value):
+            # dispatch on the formatter
+            # (this turns into a switch after translation)
+            for c1 in FORMATTER_CHARS:
+                if c == c1:
+                    # 'c1' is an annotation constant here,
+                    # so this getattr() is ok
+                    do_fmt = getattr(self, 'fmt_' + c1)
+                    do_fmt(w_value)
+                    break
+
         def unknown_fmtchar(self):
             space = self.space
             if do_unicode:
@@ -513,6 +568,169 @@ FORMATTER_CHARS = unrolling_iterable(
     [_name[-1] for _name in dir(StringFormatter)
                if len(_name) == 5 and _name.startswith('fmt_')])
 
+# ____________________________________________________________
+# Cache of pre-parsed format strings, used when the format string is not
+# a constant for the JIT
+
+MAX_CACHED_TEMPLATES = 1000
+MAX_TEMPLATE_LENGTH = 65536
+
+class TemplateCache(object):
+    """The parsed versions of the format strings seen by 'fmt % args'
+    (ModTemplate) and by fmt.format() (newformat.FormatTemplate)."""
+
+    def __init__(self, space):
+        self._reset()
+
+    def _reset(self):
+        self.mod_templates = {}
+        self.format_templates = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _cleanup_(self):
+        self._reset()
+
+
+STAR = -2    # for a width or precision given as '*'
+
+class ModSpec(object):
+    """One '%' specifier, and the literal text before it."""
+    _immutable_ = True
+
+    def __init__(self, literal_start, literal_end, key, f_ljust, f_sign,
+                 f_blank, f_alt, f_zero, width, prec, char):
+        self.literal_start = literal_start
+        self.literal_end = literal_end
+        self.key = key          # '%(key)s', or None
+        self.f_ljust = f_ljust
+        self.f_sign = f_sign
+        self.f_blank = f_blank
+        self.f_alt = f_alt
+        self.f_zero = f_zero
+        self.width = width      # or STAR
+        self.prec = prec        # -1 if not given, or STAR
+        self.char = char
+
+
+class ModTemplate(object):
+    _immutable_ = True
+    _immutable_fields_ = ['specs[*]']
+
+    def __init__(self, specs, tail_start):
+        self.specs = specs
+        self.tail_start = tail_start
+
+
+def _is_formatter_char(c):
+    for c1 in FORMATTER_CHARS:
+        if c == c1:
+            return True
+    return False
+
+def _parse_mod_num(fmt, i, maxval):
+    # returns (number, new position), or (-1, i) if the number is too big
+    if i < len(fmt) and fmt[i] == '*':
+        return STAR, i + 1
+    result = 0
+    while i < len(fmt):
+        digit = ord(fmt[i]) - ord('0')
+        if not (0 <= digit <= 9):
+            break
+        if result > (maxval - digit) / 10:
+            return -1, i
+        result = result * 10 + digit
+        i += 1
+    return result, i
+
+def parse_mod_template(fmt):
+    """Parse the format string of 'fmt % args'.  Returns None if 'fmt' is
+    invalid: it is then left to StringFormatter.format() to raise the
+    error at the right point."""
+    specs = []
+    n = len(fmt)
+    i = 0
+    while True:
+        start = i
+        while i < n and fmt[i] != '%':
+            i += 1
+        if i == n:
+            return ModTemplate(specs[:], start)
+        literal_end = i
+        i += 1
+        if i == n:
+            return None
+        key = None
+        if fmt[i] == '(':
+            i += 1
+            i0 = i
+            pcount = 1
+            while True:
+                if i == n:
+                    return None
+                c = fmt[i]
+                if c == ')':
+                    pcount -= 1
+                    if pcount == 0:
+                        break
+                elif c == '(':
+                    pcount += 1
+                i += 1
+            key = fmt[i0:i]
+            i += 1
+        f_ljust = f_sign = f_blank = f_alt = f_zero = False
+        while i < n:
+            c = fmt[i]
+            if c == '-':
+                f_ljust = True
+            elif c == '+':
+                f_sign = True
+            elif c == ' ':
+                f_blank = True
+            elif c == '#':
+                f_alt = True
+            elif c == '0':
+                f_zero = True
+            else:
+                break
+            i += 1
+        width, i = _parse_mod_num(fmt, i, sys.maxint)
+        if width == -1:
+            return None
+        prec = -1
+        if i < n and fmt[i] == '.':
+            prec, i = _parse_mod_num(fmt, i + 1, INT_MAX)
+            if prec == -1:
+                return None
+        if i < n and (fmt[i] == 'h' or fmt[i] == 'l' or fmt[i] == 'L'):
+            i += 1
+        if i == n:
+            return None
+        c = fmt[i]
+        i += 1
+        if c != '%' and not _is_formatter_char(c):
+            return None
+        specs.append(ModSpec(start, literal_end, key, f_ljust, f_sign,
+                             f_blank, f_alt, f_zero, width, prec, c))
+
+def get_mod_template(space, fmt):
+    """Return the ModTemplate for 'fmt' from the cache, or None."""
+    if len(fmt) > MAX_TEMPLATE_LENGTH:
+        return None
+    cache = space.fromcache(TemplateCache)
+    template = cache.mod_templates.get(fmt, None)
+    if template is not None:
+        cache.hits += 1
+        return template
+    cache.misses += 1
+    template = parse_mod_template(fmt)
+    if template is not None:
+        if len(cache.mod_templates) >= MAX_CACHED_TEMPLATES:
+            cache.mod_templates.clear()
+        cache.mod_templates[fmt] = template
+    return template
+
+
 def format(space, w_fmt, values_w, w_valuedict, do_unicode):
     "Entry point"
     if not do_unicode:
@@ -1,6 +1,7 @@
 """dict implementation specialized for object loaded by the _pypyjson module.
 
-Somewhat similar to MapDictStrategy, also uses a map.
+Somewhat similar to MapDictStrategy, also uses a map.  Like in mapdict,
+adding or deleting a key moves the dict to another map of the same tree.
 """
 
 from rpython.rlib import jit, rerased, objectmodel, debug
@@ -15,11 +16,15 @@ def from_values_and_jsonmap(space, values_w, jsonmap):
         assert len(values_w) == len(jsonmap.get_keys_in_order())
         assert len(values_w) != 0
     debug.make_sure_not_resized(values_w)
+    strategy = get_strategy(space, jsonmap)
+    storage = strategy.erase(values_w)
+    return W_DictObject(space, strategy, storage)
+
+def get_strategy(space, jsonmap):
     strategy = jsonmap.strategy_instance
     if strategy is None:
         jsonmap.strategy_instance = strategy = JsonDictStrategy(space, jsonmap)
-    storage = strategy.erase(values_w)
-    return W_DictObject(space, strategy, storage)
+    return strategy
 
 def devolve_jsonmap_dict(w_dict):
     assert isinstance(w_dict, W_DictObject)
@@ -33,6 +38,9 @@ def get_jsonmap_from_dict(w_dict):
     assert isinstance(strategy, JsonDictStrategy)
     return strategy.jsonmap
 
+# like JSONDecoder.MAX_MAP_SIZE: bigger dicts switch to UnicodeDictStrategy
+MAX_JSONDICT_SIZE = 100
+
 class JsonDictStrategy(DictStrategy):
     erase, unerase = rerased.new_erasing_pair("jsondict")
     erase = staticmethod(erase)
@@ -86,6 +94,8 @@ class JsonDictStrategy(DictStrategy):
             if index != -1:
                 storage_w[index] = w_value
                 return
+            if self._add_key(w_dict, w_key, w_value):
+                return
         self.switch_to_unicode_strategy(w_dict)
         w_dict.setitem(w_key, w_value)
 
@@ -98,16 +108,73 @@ class JsonDictStrategy(DictStrategy):
             w_result = self.getitem_unicode(w_dict, w_key)
             if w_result is not None:
                 return w_result
+            if self._add_key(w_dict, w_key, w_default):
+                return w_default
         self.switch_to_unicode_strategy(w_dict)
         return w_dict.setdefault(w_key, w_default)
 
+    def _add_key(self, w_dict, w_key, w_value):
+        # move to the map with one more key, so that the dicts that all
+        # get the same keys added after decoding still share their maps
+        storage_w = self.unerase(w_dict.dstorage)
+        length = len(storage_w)
+        if length >= MAX_JSONDICT_SIZE:
+            return False
+        if jit.isconstant(w_key):
+            jit.promote(self)
+        jsonmap = self.jsonmap.get_next_added(w_key)
+        if jsonmap is None:
+            return False
+        new_storage_w = [None] * (length + 1)
+        for index in range(length):
+            new_storage_w[index] = storage_w[index]
+        new_storage_w[length] = w_value
+        self._switch_to_jsonmap(w_dict, jsonmap, new_storage_w)
+        return True
+
+    def _remove_index(self, w_dict, index):
+        # move to the map without the key at index
+        storage_w = self.unerase(w_dict.dstorage)
+        length = len(storage_w)
+        if length == 1:
+            self.clear(w_dict)
+            return True
+        jsonmap = self.jsonmap.get_map_without(index)
+        if jsonmap is None:
+            return False
+        new_storage_w = [None] * (length - 1)
+        for i in range(index):
+            new_storage_w[i] = storage_w[i]
+        for i in range(index + 1, length):
+            new_storage_w[i - 1] = storage_w[i]
+        self._switch_to_jsonmap(w_dict, jsonmap, new_storage_w)
+        return True
+
+    def _switch_to_jsonmap(self, w_dict, jsonmap, values_w):
+        debug.make_sure_not_resized(values_w)
+        w_dict.set_strategy(get_strategy(self.space, jsonmap))
+        w_dict.dstorage = self.erase(values_w)
+
     def delitem(self, w_dict, w_key):
+        if self.is_correct_type(w_key):
+            index = self.jsonmap.get_index(w_key)
+            if index == -1:
+                raise KeyError
+            if self._remove_index(w_dict, index):
+                return
         self.switch_to_unicode_strategy(w_dict)
         return w_dict.delitem(w_key)
 
     def popitem(self, w_dict):
-        self.switch_to_unicode_strategy(w_dict)
-        return w_dict.popitem()
+        # the last item, like in the other strategies
+        storage_w = self.unerase(w_dict.dstorage)
+        index = len(storage_w) - 1
+        w_key = self.jsonmap.get_keys_in_order()[index]
+        w_value = storage_w[index]
+        if not self._remove_index(w_dict, index):
+            self.switch_to_unicode_strategy(w_dict)
+            w_dict.delitem(w_key)
+        return (w_key, w_value)
 
     def switch_to_unicode_strategy(self, w_dict):
         storage = self._make_unicode_dict(w_dict)
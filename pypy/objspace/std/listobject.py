@@ -29,6 +29,7 @@ from pypy.interpreter.miscutils import StringSort
 from pypy.objspace.std.bytesobject import W_BytesObject
 from pypy.objspace.std.floatobject import W_FloatObject
 from pypy.objspace.std.intobject import W_IntObject
+from pypy.objspace.std.longobject import W_LongObject
 from pypy.objspace.std.iterobject import (
     W_FastListIterObject, W_ReverseSeqIterObject)
 from pypy.objspace.std.sliceobject import (
@@ -731,25 +732,39 @@ class W_ListObject(W_Root):
             # core-dump factory, since the storage may change).
             self.__init__(space, [])
 
-            # wrap each item in a KeyContainer if needed
-            if has_key:
-                # XXX inefficient for unwrapped strategies:
-                # we wrap the elements twice, once for the key, and once to get
-                # KeyContainers. Then unwrap carefully in the __init__ call below.
-                # Could type-specialize this.
-                _compute_keys_for_sorting(strategy, sorter.list, w_key)
-
-            # Reverse sort stability achieved by initially reversing the list,
-            # applying a stable forward sort, then reversing the final result.
-            if reverse:
-                sorter.list.reverse()
-
-            # perform the sort
-            sorter.sort()
-
-            # reverse again
-            if reverse:
-                sorter.list.reverse()
+            done = False
+            if sorterclass is SimpleSort:
+                # the items are their own keys
+                done = _sort_with_unboxed_keys(space, sorter.list,
+                                               sorter.list, reverse)
+            elif has_key:
+                # XXX inefficient for unwrapped strategies: we wrap the
+                # elements once for the key, and unwrap carefully in the
+                # __init__ call below
+                keys_w = _compute_keys_for_sorting(strategy, sorter.list,
+                                                   w_key)
+                if not has_cmp:
+                    done = _sort_with_unboxed_keys(space, sorter.list,
+                                                   keys_w, reverse)
+                if not done:
+                    # wrap each item in a KeyContainer
+                    for i in range(sorter.listlength):
+                        sorter.list[i] = KeyContainer(keys_w[i],
+                                                      sorter.list[i])
+
+            if not done:
+                # Reverse sort stability achieved by initially reversing
+                # the list, applying a stable forward sort, then reversing
+                # the final result.
+                if reverse:
+                    sorter.list.reverse()
+
+                # perform the sort
+                sorter.sort()
+
+                # reverse again
+                if reverse:
+                    sorter.list.reverse()
 
         finally:
             # unwrap each item if needed
@@ -779,6 +794,7 @@ sortkey_jmp = jit.JitDriver(
 
 def _compute_keys_for_sorting(strategy, list_w, w_callable):
     space = strategy.space
+    keys_w = [None] * len(list_w)
     i = 0
     # XXX would like a new API space.greenkey_for_callable here
     # (also in min/max and map/filter)
@@ -788,9 +804,96 @@ def _compute_keys_for_sorting(strategy, list_w, w_callable):
         # the strategy to distinguish the cases better
         sortkey_jmp.jit_merge_point(tp=tp, strategy_type=type(strategy))
         w_item = list_w[i]
-        w_keyitem = space.call_function(w_callable, w_item)
-        list_w[i] = KeyContainer(w_keyitem, w_item)
+        keys_w[i] = space.call_function(w_callable, w_item)
         i += 1
+    return keys_w
+
+def _sort_with_unboxed_keys(space, list_w, keys_w, reverse):
+    """Sort list_w in place according to keys_w, if the keys are all
+    ints, all longs, all floats, all str or all unicode, or tuples whose
+    first items are.  The keys are then unboxed into a list, and we sort a list
+    of indices into it.  Returns False, without doing anything, for other
+    kinds of keys."""
+    length = len(keys_w)
+    if length < 2:
+        return False
+    tuple_keys_w = None
+    w_key = keys_w[0]
+    if isinstance(w_key, W_AbstractTupleObject):
+        tuple_keys_w = keys_w
+        keys_w = [None] * length
+        for i in range(length):
+            w_tuple = tuple_keys_w[i]
+            if (not isinstance(w_tuple, W_AbstractTupleObject) or
+                    w_tuple.user_overridden_class or w_tuple.length() == 0):
+                return False
+            keys_w[i] = w_tuple.getitem(space, 0)
+        w_key = keys_w[0]
+    #
+    if type(w_key) is W_IntObject:
+        int_keys = [0] * length
+        for i in range(length):
+            w_key = keys_w[i]
+            if type(w_key) is not W_IntObject:
+                return False
+            int_keys[i] = w_key.intval
+        _sort_indices(IntKeySort, int_keys, tuple_keys_w, space, list_w,
+                      reverse)
+    elif type(w_key) is W_LongObject:
+        long_keys = [None] * length
+        for i in range(length):
+            w_key = keys_w[i]
+            if type(w_key) is not W_LongObject:
+                return False
+            long_keys[i] = w_key.num
+        _sort_indices(LongKeySort, long_keys, tuple_keys_w, space, list_w,
+                      reverse)
+    elif type(w_key) is W_FloatObject:
+        float_keys = [0.0] * length
+        for i in range(length):
+            w_key = keys_w[i]
+            if type(w_key) is not W_FloatObject:
+                return False
+            float_keys[i] = w_key.floatval
+        _sort_indices(FloatKeySort, float_keys, tuple_keys_w, space, list_w,
+                      reverse)
+    elif type(w_key) is W_BytesObject:
+        str_keys = [''] * length
+        for i in range(length):
+            w_key = keys_w[i]
+            if type(w_key) is not W_BytesObject:
+                return False
+            str_keys[i] = w_key._value
+        _sort_indices(StrKeySort, str_keys, tuple_keys_w, space, list_w,
+                      reverse)
+    elif type(w_key) is W_UnicodeObject:
+        # the utf-8 encodings sort in the same order as the code points
+        str_keys = [''] * length
+        for i in range(length):
+            w_key = keys_w[i]
+            if type(w_key) is not W_UnicodeObject:
+                return False
+            str_keys[i] = w_key._utf8
+        _sort_indices(StrKeySort, str_keys, tuple_keys_w, space, list_w,
+                      reverse)
+    else:
+        return False
+    return True
+
+@specialize.arg(0)
+def _sort_indices(sorterclass, keys, tuple_keys_w, space, list_w, reverse):
+    sorter = sorterclass(range(len(keys)), len(keys))
+    sorter.keys = keys
+    sorter.tuple_keys_w = tuple_keys_w
+    sorter.space = space
+    if reverse:
+        sorter.list.reverse()
+    sorter.sort()
+    if reverse:
+        sorter.list.reverse()
+    sorted_w = [list_w[index] for index in sorter.list]
+    for i in range(len(sorted_w)):
+        list_w[i] = sorted_w[i]
 
 def get_printable_location_find(count, strategy_type, tp):
     if count:
@@ -1843,6 +1946,14 @@ class IntegerListStrategy(ListStrategy):
                 return
         return self._base_extend_from_list(w_list, w_other)
 
+    def _extend_from_iterable(self, w_list, w_iterable):
+        intlist = self.space.unpackiterable_int(w_iterable)
+        if intlist is not None:
+            l = self.unerase(w_list.lstorage)
+            l += intlist
+            return
+        ListStrategy._extend_from_iterable(self, w_list, w_iterable)
+
 
     _base_setslice = setslice
 
@@ -1939,6 +2050,14 @@ class FloatListStrategy(ListStrategy):
                 return
         return self._base_extend_from_list(w_list, w_other)
 
+    def _extend_from_iterable(self, w_list, w_iterable):
+        floatlist = self.space.unpackiterable_float(w_iterable)
+        if floatlist is not None:
+            l = self.unerase(w_list.lstorage)
+            l += floatlist
+            return
+        ListStrategy._extend_from_iterable(self, w_list, w_iterable)
+
 
     _base_setslice = setslice
 
@@ -2235,6 +2354,10 @@ TimSort = make_timsort_class()
 IntBaseTimSort = make_timsort_class()
 FloatBaseTimSort = make_timsort_class()
 IntOrFloatBaseTimSort = make_timsort_class()
+IntKeyBaseTimSort = make_timsort_class()
+LongKeyBaseTimSort = make_timsort_class()
+FloatKeyBaseTimSort = make_timsort_class()
+StrKeyBaseTimSort = make_timsort_class()
 
 
 class KeyContainer(W_Root):
@@ -2270,6 +2393,54 @@ class IntOrFloatSort(IntOrFloatBaseTimSort):
         return fa < fb
 
 
+@specialize.argtype(0)
+def _unboxed_key_lt(sorter, a, b):
+    # 'a' and 'b' are indices into 'sorter.keys'.  For tuple keys, this
+    # compares the first items of the tuples, and only falls back to
+    # comparing the whole tuples if these are equal (or are NaNs)
+    key_a = sorter.keys[a]
+    key_b = sorter.keys[b]
+    if sorter.key_lt(key_a, key_b):
+        return True
+    if sorter.tuple_keys_w is None or sorter.key_lt(key_b, key_a):
+        return False
+    space = sorter.space
+    return space.is_true(space.lt(sorter.tuple_keys_w[a],
+                                  sorter.tuple_keys_w[b]))
+
+
+class IntKeySort(IntKeyBaseTimSort):
+    def lt(self, a, b):
+        return _unboxed_key_lt(self, a, b)
+
+    def key_lt(self, key_a, key_b):
+        return key_a < key_b
+
+
+class LongKeySort(LongKeyBaseTimSort):
+    def lt(self, a, b):
+        return _unboxed_key_lt(self, a, b)
+
+    def key_lt(self, key_a, key_b):
+        return key_a.lt(key_b)
+
+
+class FloatKeySort(FloatKeyBaseTimSort):
+    def lt(self, a, b):
+        return _unboxed_key_lt(self, a, b)
+
+    def key_lt(self, key_a, key_b):
+        return key_a < key_b
+
+
+class StrKeySort(StrKeyBaseTimSort):
+    def lt(self, a, b):
+        return _unboxed_key_lt(self, a, b)
+
+    def key_lt(self, key_a, key_b):
+        return key_a < key_b
+
+
 class CustomCompareSort(SimpleSort):
     def lt(self, a, b):
         space = self.space
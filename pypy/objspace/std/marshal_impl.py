@@ -9,7 +9,7 @@ from pypy.interpreter.pycode import PyCode
 from pypy.interpreter import unicodehelper
 from pypy.interpreter.buffer import BufferInterfaceNotFound
 from pypy.objspace.std.boolobject import W_BoolObject
-from pypy.objspace.std.bytesobject import W_BytesObject
+from pypy.objspace.std.bytesobject import W_AbstractBytesObject
 from pypy.objspace.std.complexobject import W_ComplexObject
 from pypy.objspace.std.dictmultiobject import W_DictMultiObject
 from pypy.objspace.std.intobject import W_IntObject
@@ -20,7 +20,7 @@ from pypy.objspace.std.noneobject import W_NoneObject
 from pypy.objspace.std.setobject import W_FrozensetObject, W_SetObject
 from pypy.objspace.std.tupleobject import W_AbstractTupleObject
 from pypy.objspace.std.typeobject import W_TypeObject
-from pypy.objspace.std.unicodeobject import W_UnicodeObject
+from pypy.objspace.std.unicodeobject import W_AbstractUnicodeObject
 
 
 TYPE_NULL      = '0'
@@ -245,7 +245,7 @@ def unmarshal_complex_bin(space, u, tc):
     return space.newcomplex(real, imag)
 
 
-@marshaller(W_BytesObject)
+@marshaller(W_AbstractBytesObject)
 def marshal_bytes(space, w_str, m):
     s = space.bytes_w(w_str)
     if m.version >= 1 and space.is_interned_str(s):
@@ -268,7 +268,8 @@ def unmarshal_bytes(space, u, tc):
 @unmarshaller(TYPE_INTERNED)
 def unmarshal_interned(space, u, tc):
     w_ret = space.new_interned_str(u.get_str())
-    u.stringtable_w.append(w_ret)
+    if not u.replaying:
+        u.stringtable_w.append(w_ret)
     return w_ret
 
 @unmarshaller(TYPE_STRINGREF)
@@ -341,6 +342,7 @@ def marshal_pycode(space, w_pycode, m):
     m.start(TYPE_CODE)
     # see pypy.interpreter.pycode for the layout
     x = space.interp_w(PyCode, w_pycode)
+    x.materialize()
     m.put_int(x.co_argcount)
     m.put_int(x.co_nlocals)
     m.put_int(x.co_stacksize)
@@ -378,9 +380,14 @@ def unmarshal_pycode(space, u, tc):
     nlocals     = u.get_int()
     stacksize   = u.get_int()
     flags       = u.get_int()
+    if u.lazy_code and u.code_depth > 0:
+        return _unmarshal_lazy_pycode(space, u, argcount, nlocals,
+                                      stacksize, flags)
     code        = unmarshal_str(u)
     u.start(TYPE_TUPLE)
+    u.code_depth += 1
     consts_w    = u.get_tuple_w()
+    u.code_depth -= 1
     # copy in order not to merge it with anything else
     names       = unmarshal_strlist(u, TYPE_TUPLE)
     varnames    = unmarshal_strlist(u, TYPE_TUPLE)
@@ -394,8 +401,112 @@ def unmarshal_pycode(space, u, tc):
                   code, consts_w[:], names, varnames, filename,
                   name, firstlineno, lnotab, freevars, cellvars)
 
+# Lazy loading of the code objects nested in the content of a .pyc file
+# (see interp_marshal.CodeUnmarshaller).  Only the parts of such a code
+# object that are needed to build a function out of it are unmarshalled;
+# for the bytecode, the constants, the names and the lnotab, we only
+# remember where they are in the buffer.  They are loaded by
+# PyCode.materialize(), typically when the first frame is created.
+
+class LazyCodeLoader(object):
+    remove_docstrings = False
+
+    def __init__(self, bufstr, stringtable_w, code_pos, lnotab_pos,
+                 filename):
+        self.bufstr = bufstr
+        self.stringtable_w = stringtable_w
+        self.code_pos = code_pos
+        self.lnotab_pos = lnotab_pos
+        self.filename = filename
+
+    def load(self, space):
+        """Return (code, consts_w, names, lnotab)."""
+        from pypy.module.marshal.interp_marshal import CodeUnmarshaller
+        u = CodeUnmarshaller(space, self.bufstr, self.code_pos,
+                             self.stringtable_w)
+        code = unmarshal_str(u)
+        u.start(TYPE_TUPLE)
+        consts_w = u.get_tuple_w()
+        names = unmarshal_strlist(u, TYPE_TUPLE)
+        u.bufpos = self.lnotab_pos
+        lnotab = unmarshal_str(u)
+        return code, consts_w[:], names, lnotab
+
+def _unmarshal_lazy_pycode(space, u, argcount, nlocals, stacksize, flags):
+    from pypy.module.marshal.interp_marshal import CodeUnmarshaller
+    assert isinstance(u, CodeUnmarshaller)
+    code_pos    = u.bufpos
+    _skip_w_obj(space, u)     # code
+    _skip_w_obj(space, u)     # consts
+    _skip_w_obj(space, u)     # names
+    varnames    = unmarshal_strlist(u, TYPE_TUPLE)
+    freevars    = unmarshal_strlist(u, TYPE_TUPLE)
+    cellvars    = unmarshal_strlist(u, TYPE_TUPLE)
+    filename    = unmarshal_str(u)
+    name        = unmarshal_str(u)
+    firstlineno = u.get_int()
+    lnotab_pos  = u.bufpos
+    _skip_w_obj(space, u)     # lnotab
+    loader = LazyCodeLoader(u.bufstr, u.stringtable_w, code_pos, lnotab_pos,
+                            filename)
+    return PyCode(space, argcount, nlocals, stacksize, flags,
+                  '', [], [], varnames, filename,
+                  name, firstlineno, '', freevars, cellvars,
+                  lazy_loader=loader)
+
+def _skip_w_obj(space, u):
+    # Move past one marshalled object without building it.  The interned
+    # strings are still put in the string table, so that the TYPE_STRINGREF
+    # that follow refer to the correct entries.
+    tc = u.get1()
+    if (tc == TYPE_NULL or tc == TYPE_NONE or tc == TYPE_FALSE or
+            tc == TYPE_TRUE or tc == TYPE_STOPITER or tc == TYPE_ELLIPSIS):
+        pass
+    elif tc == TYPE_INT or tc == TYPE_STRINGREF:
+        u.skip(4)
+    elif tc == TYPE_INT64 or tc == TYPE_BINARY_FLOAT:
+        u.skip(8)
+    elif tc == TYPE_BINARY_COMPLEX:
+        u.skip(16)
+    elif tc == TYPE_FLOAT:
+        u.skip(ord(u.get1()))
+    elif tc == TYPE_COMPLEX:
+        u.skip(ord(u.get1()))
+        u.skip(ord(u.get1()))
+    elif tc == TYPE_LONG:
+        lng = u.get_int()
+        if lng < 0:
+            lng = -lng
+        u.skip(2 * lng)
+    elif tc == TYPE_STRING or tc == TYPE_UNICODE:
+        u.skip(u.get_lng())
+    elif tc == TYPE_INTERNED:
+        unmarshal_interned(space, u, tc)
+    elif (tc == TYPE_TUPLE or tc == TYPE_LIST or tc == TYPE_SET or
+              tc == TYPE_FROZENSET):
+        lng = u.get_lng()
+        for i in range(lng):
+            _skip_w_obj(space, u)
+    elif tc == TYPE_DICT:
+        while True:
+            if u.bufpos >= u.limit:
+                u.raise_eof()
+            if u.bufstr[u.bufpos] == TYPE_NULL:
+                u.bufpos += 1
+                break
+            _skip_w_obj(space, u)
+            _skip_w_obj(space, u)
+    elif tc == TYPE_CODE:
+        u.skip(16)
+        for i in range(8):
+            _skip_w_obj(space, u)
+        u.skip(4)
+        _skip_w_obj(space, u)
+    else:
+        u.raise_exc('bad marshal data (unknown type code)')
+
 
-@marshaller(W_UnicodeObject)
+@marshaller(W_AbstractUnicodeObject)
 def marshal_unicode(space, w_unicode, m):
     s = space.utf8_w(w_unicode)
     m.atom_str(TYPE_UNICODE, s)
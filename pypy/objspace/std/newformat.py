@@ -10,6 +10,8 @@ from rpython.rlib.objectmodel import specialize
 from rpython.rlib.rfloat import formatd
 from rpython.rlib.rarithmetic import r_uint, intmask
 from pypy.interpreter.signature import Signature
+from pypy.objspace.std.formatting import (
+    TemplateCache, MAX_CACHED_TEMPLATES, MAX_TEMPLATE_LENGTH)
 
 @specialize.argtype(1)
 @jit.look_inside_iff(lambda space, s, start, end:
@@ -76,8 +78,30 @@ def make_template_formatting_class(for_unicode):
                 self.args, self.kwargs = args.unpack()
             self.auto_numbering = 0
             self.auto_numbering_state = ANS_INIT
+            if not jit.isconstant(self.template):
+                # not in the JIT, or the template is not a constant: use
+                # the cached pre-parsed version of the template
+                parsed = get_format_template(self.space, self.template)
+                if parsed is not None:
+                    return self._build_from_parsed(parsed)
             return self._build_string(0, len(self.template), 2)
 
+        def _build_from_parsed(self, parsed):
+            # same as _build_string(0, len(self.template), 2), with the
+            # result of parse_format_template()
+            s = self.template
+            out = rstring.StringBuilder()
+            for piece in parsed.pieces:
+                out.append_slice(s, piece.literal_start, piece.literal_end)
+                field_start = piece.field_start
+                if field_start >= 0:
+                    field_end = piece.field_end
+                    assert field_end >= 0
+                    out.append(self._render_field(field_start, field_end,
+                                                  piece.recursive, 1))
+            out.append_slice(s, parsed.tail_start, len(s))
+            return out.build()
+
         def _build_string(self, start, end, level):
             space = self.space
             out = rstring.StringBuilder()
@@ -375,6 +399,97 @@ str_template_formatter = make_template_formatting_class(for_unicode=False)
 unicode_template_formatter = make_template_formatting_class(for_unicode=True)
 
 
+class FormatPiece(object):
+    """Some literal text of a format() template, and the replacement
+    field after it, if field_start >= 0."""
+    _immutable_ = True
+
+    def __init__(self, literal_start, literal_end, field_start, field_end,
+                 recursive):
+        self.literal_start = literal_start
+        self.literal_end = literal_end
+        self.field_start = field_start
+        self.field_end = field_end
+        self.recursive = recursive
+
+
+class FormatTemplate(object):
+    _immutable_ = True
+    _immutable_fields_ = ['pieces[*]']
+
+    def __init__(self, pieces, tail_start):
+        self.pieces = pieces
+        self.tail_start = tail_start
+
+
+def parse_format_template(s):
+    """Split the template of format() into its literal parts and its
+    replacement fields, like TemplateFormatter._do_build_string() does.
+    Returns None if the braces are not balanced: the error is then raised
+    by _do_build_string()."""
+    pieces = []
+    end = len(s)
+    last_literal = i = 0
+    while i < end:
+        c = s[i]
+        i += 1
+        if c == "{" or c == "}":
+            at_end = i == end
+            markup_follows = True
+            if c == "}":
+                if at_end or s[i] != "}":
+                    return None
+                i += 1
+                markup_follows = False
+            if c == "{":
+                if at_end:
+                    return None
+                if s[i] == "{":
+                    i += 1
+                    markup_follows = False
+            if not markup_follows:
+                pieces.append(FormatPiece(last_literal, i - 1, -1, -1, False))
+                last_literal = i
+                continue
+            nested = 1
+            field_start = i
+            recursive = False
+            while i < end:
+                c = s[i]
+                if c == "{":
+                    recursive = True
+                    nested += 1
+                elif c == "}":
+                    nested -= 1
+                    if not nested:
+                        break
+                i += 1
+            if nested:
+                return None
+            pieces.append(FormatPiece(last_literal, field_start - 1,
+                                      field_start, i, recursive))
+            i += 1
+            last_literal = i
+    return FormatTemplate(pieces[:], last_literal)
+
+def get_format_template(space, s):
+    """Return the FormatTemplate for 's' from the cache, or None."""
+    if len(s) > MAX_TEMPLATE_LENGTH:
+        return None
+    cache = space.fromcache(TemplateCache)
+    parsed = cache.format_templates.get(s, None)
+    if parsed is not None:
+        cache.hits += 1
+        return parsed
+    cache.misses += 1
+    parsed = parse_format_template(s)
+    if parsed is not None:
+        if len(cache.format_templates) >= MAX_CACHED_TEMPLATES:
+            cache.format_templates.clear()
+        cache.format_templates[s] = parsed
+    return parsed
+
+
 def format_method(space, w_string, args, is_unicode):
     if is_unicode:
         template = unicode_template_formatter(space,
@@ -1,6 +1,6 @@
 """Functionality shared between bytes/bytearray/unicode"""
 
-from rpython.rlib import jit
+from rpython.rlib import jit, rbytes
 from rpython.rlib.objectmodel import specialize, newlist_hint
 from rpython.rlib.rarithmetic import ovfcheck
 from rpython.rlib.rstring import (
@@ -150,15 +150,24 @@ class StringMethods(object):
         value, start, end, _ = self._convert_idx_params(space, w_start, w_end)
 
         if self._use_rstr_ops(space, w_sub):
-            return space.newint(value.count(self._op_val(space, w_sub), start,
-                                            end))
+            sub = self._op_val(space, w_sub)
+            assert sub is not None
+            if len(sub) == 1:
+                res = rbytes.count_char(value, sub[0], start, end)
+            else:
+                res = value.count(sub, start, end)
+            return space.newint(res)
 
         from pypy.objspace.std.bytearrayobject import W_BytearrayObject
         from pypy.objspace.std.bytesobject import W_BytesObject
         if isinstance(w_sub, W_BytearrayObject):
             res = count(value, w_sub.getdata(), start, end)
         elif isinstance(w_sub, W_BytesObject):
-            res = count(value, w_sub._value, start, end)
+            sub = w_sub._value
+            if len(sub) == 1:
+                res = rbytes.count_char(value, sub[0], start, end)
+            else:
+                res = count(value, sub, start, end)
         else:
             buffer = _get_buffer(space, w_sub)
             res = count(value, buffer, start, end)
@@ -331,8 +340,18 @@ class StringMethods(object):
         else:
             return self._is_generic_loop(space, v, func_name)
 
+    # this is only for bytes and bytearray: unicodeobject overrides it.
+    # The loop is done by rbytes.isdigit() & co.
     @specialize.arg(3)
     def _is_generic_loop(self, space, v, func_name):
+        if func_name == '_isdigit':
+            return space.newbool(rbytes.isdigit(v))
+        if func_name == '_isalpha':
+            return space.newbool(rbytes.isalpha(v))
+        if func_name == '_isalnum':
+            return space.newbool(rbytes.isalnum(v))
+        if func_name == '_isspace':
+            return space.newbool(rbytes.isspace(v))
         func = getattr(self, func_name)
         for idx in range(len(v)):
             if not func(v[idx]):
@@ -482,12 +501,9 @@ class StringMethods(object):
 
         return self._new(value)
 
+    # for bytes and bytearray, overridden by unicode
     def descr_lower(self, space):
-        value = self._val(space)
-        builder = self._builder(len(value))
-        for i in range(len(value)):
-            builder.append(self._lower(value[i]))
-        return self._new(builder.build())
+        return self._new_from_str(rbytes.lower(self._val(space)))
 
     # This is not used for W_UnicodeObject.
     def descr_partition(self, space, w_sub):
@@ -580,6 +596,7 @@ class StringMethods(object):
 
         return self._newlist_unwrapped(space, res)
 
+    # for bytes and bytearray, overridden by unicode
     @unwrap_spec(keepends=bool)
     def descr_splitlines(self, space, keepends=False):
         value = self._val(space)
@@ -588,8 +605,9 @@ class StringMethods(object):
         pos = 0
         while pos < length:
             sol = pos
-            while pos < length and not self._islinebreak(value[pos]):
-                pos += 1
+            pos = rbytes.find_linebreak(value, pos, length)
+            if pos < 0:
+                pos = length
             eol = pos
             pos += 1
             # read CRLF as one line break
@@ -708,18 +726,9 @@ class StringMethods(object):
             return self._strip_none(space, left=0, right=1)
         return self._strip(space, w_chars, left=0, right=1, name='rstrip')
 
+    # for bytes and bytearray, overridden by unicode
     def descr_swapcase(self, space):
-        selfvalue = self._val(space)
-        builder = self._builder(len(selfvalue))
-        for i in range(len(selfvalue)):
-            ch = selfvalue[i]
-            if self._isupper(ch):
-                builder.append(self._lower(ch))
-            elif self._islower(ch):
-                builder.append(self._upper(ch))
-            else:
-                builder.append(ch)
-        return self._new(builder.build())
+        return self._new_from_str(rbytes.swapcase(self._val(space)))
 
     def descr_title(self, space):
         selfval = self._val(space)
@@ -755,26 +764,20 @@ class StringMethods(object):
         string = self._val(space)
         deletechars = self._op_val(space, w_deletechars)
         if len(deletechars) == 0:
-            buf = self._builder(len(string))
-            for char in string:
+            return self._new_from_str(rbytes.translate(string, table))
+        # XXX Why not preallocate here too?
+        buf = self._builder()
+        deletion_table = [False] * 256
+        for i in range(len(deletechars)):
+            deletion_table[ord(deletechars[i])] = True
+        for char in string:
+            if not deletion_table[ord(char)]:
                 buf.append(table[ord(char)])
-        else:
-            # XXX Why not preallocate here too?
-            buf = self._builder()
-            deletion_table = [False] * 256
-            for i in range(len(deletechars)):
-                deletion_table[ord(deletechars[i])] = True
-            for char in string:
-                if not deletion_table[ord(char)]:
-                    buf.append(table[ord(char)])
         return self._new(buf.build())
 
+    # for bytes and bytearray, overridden by unicode
     def descr_upper(self, space):
-        value = self._val(space)
-        builder = self._builder(len(value))
-        for i in range(len(value)):
-            builder.append(self._upper(value[i]))
-        return self._new(builder.build())
+        return self._new_from_str(rbytes.upper(self._val(space)))
 
     @unwrap_spec(width=int)
     def descr_zfill(self, space, width):
@@ -413,3 +413,30 @@ def test_unicode_error_position():
 
 def test_g_strip_trailing_zero_bug():
     assert "%.3g" % 1505.0 == "1.5e+03"
+
+def test_repeated_format_string():
+    # the parsed format string is cached: check that nothing leaks
+    # from one use to the next
+    for fmt in ["%s %r %%", "%(a)s%(b)5.2f", "%*.*f|%-*d", "%(k)%%(k)s"]:
+        for i in range(3):
+            if fmt.startswith("%(k)"):
+                assert fmt % {'k': i} == "%" + str(i)
+            elif fmt.startswith("%("):
+                assert fmt % {'a': i, 'b': i} == "%d %d.00" % (i, i)
+            elif fmt.startswith("%*"):
+                assert fmt % (6, i, 1.5, -3, i) == "%6.*f|%-3d" % (i, 1.5, i)
+            else:
+                assert fmt % (i, i) == "%d %d %%" % (i, i)
+    fmt = u"%s-%s"
+    assert fmt % (1, u'\xe9') == u"1-\xe9"
+    assert fmt % (u'\xe9', 2) == u"\xe9-2"
+
+def test_repeated_format_string_errors():
+    for i in range(2):
+        raises(TypeError, "'%s %s' % (1,)")
+        raises(TypeError, "'%s' % (1, 2)")
+        raises(ValueError, "'%(a' % {'a': 1}")
+        raises(ValueError, "'%y' % (1,)")
+        raises(ValueError, "'abc%' % ()")
+    assert "%*d" % (-4, 1) == "1   "
+    assert "%.*f" % (-3, 1.25) == "1"
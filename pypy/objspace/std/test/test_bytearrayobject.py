@@ -138,6 +138,28 @@ class AppTestBytesArray:
             assert c == bytearray('hee')
             assert isinstance(c, bytearray)
 
+    def test_bulk_operations(self):
+        s = 'Hello, World 42!\r\n\t' * 10
+        b = bytearray('xxx' + s)
+        del b[:3]    # the data of 'b' now starts at an offset
+        for result, expected in [(b.lower(), s.lower()),
+                                 (b.upper(), s.upper()),
+                                 (b.swapcase(), s.swapcase()),
+                                 (b.translate(None), s),
+                                 (b.splitlines(), s.splitlines()),
+                                 (b.splitlines(True), s.splitlines(True))]:
+            assert result == expected
+        assert b == bytearray(s)
+        assert b.count('l') == s.count('l') == 30
+        assert b.count('l', 5, -5) == s.count('l', 5, -5)
+        assert b.count(bytearray('o')) == 20
+        assert bytearray('12345' * 10).isdigit()
+        assert not bytearray('12345' * 10 + 'x').isdigit()
+        assert bytearray('abC' * 10).isalpha()
+        assert bytearray('ab1' * 10).isalnum()
+        assert bytearray(' \t\n' * 10).isspace()
+        assert not bytearray(' \t\n\x1c' * 10).isspace()
+
     def test_strip(self):
         b = bytearray('mississippi ')
 
@@ -0,0 +1,130 @@
+from pypy.objspace.std.bytesobject import W_BytesObject
+from pypy.objspace.std.bytessliceobject import W_BytesSliceObject
+from pypy.objspace.std.test import test_bytesobject
+
+
+class TestW_BytesSliceObject:
+    spaceconfig = {"objspace.std.withbytesslice": True,
+                   "objspace.std.bytesslicethreshold": 10}
+
+    def slice(self, w_str, start, stop):
+        space = self.space
+        return space.getitem(w_str, space.newslice(space.newint(start),
+                                                   space.newint(stop),
+                                                   space.w_None))
+
+    def test_slice_is_not_copied(self):
+        s = "abcdefghij" * 4
+        w_str = self.space.newbytes(s)
+        w_slice = self.slice(w_str, 5, 35)
+        assert isinstance(w_slice, W_BytesSliceObject)
+        assert w_slice._str is s
+        w_slice2 = self.slice(w_slice, 1, -1)
+        assert isinstance(w_slice2, W_BytesSliceObject)
+        assert w_slice2._str is s
+        assert (w_slice2._start, w_slice2._stop) == (6, 34)
+        assert self.space.bytes_w(w_slice2) == s[6:34]
+        # forcing doesn't reference the whole string any more
+        assert w_slice2._str == s[6:34]
+        assert w_slice._str is s
+
+    def test_small_slices_are_copied(self):
+        s = "abcdefghij" * 4
+        w_str = self.space.newbytes(s)
+        # below the threshold
+        assert type(self.slice(w_str, 5, 14)) is W_BytesObject
+        # too small compared to the string that would be kept alive
+        w_str = self.space.newbytes(s * 10)
+        w_slice = self.slice(w_str, 0, 50)
+        assert type(w_slice) is W_BytesObject
+        assert self.space.bytes_w(w_slice) == s + s[:10]
+
+    def test_search_without_forcing(self):
+        space = self.space
+        s = "abc\ndefghij\n" * 4
+        w_str = space.newbytes(s)
+        w_slice = self.slice(w_str, 4, len(s))
+        w_nl = space.newbytes("\n")
+        assert space.int_w(space.call_method(w_slice, "find", w_nl)) == 7
+        assert space.int_w(space.call_method(w_slice, "rfind", w_nl)) == 43
+        assert space.int_w(space.call_method(w_slice, "count", w_nl)) == 7
+        assert space.is_true(space.call_method(w_slice, "startswith",
+                                               space.newbytes("def")))
+        assert w_slice._str is s
+
+    def test_compare_and_add_without_forcing(self):
+        space = self.space
+        s = "abcdefghij" * 4
+        w_str = space.newbytes(s)
+        w_slice = self.slice(w_str, 5, 35)
+        w_slice2 = self.slice(w_str, 6, 36)
+        w_copy = space.newbytes(s[5:35])
+        assert space.is_true(space.eq(w_slice, w_copy))
+        assert space.is_true(space.eq(w_copy, w_slice))
+        assert not space.is_true(space.ne(w_copy, w_slice))
+        assert space.is_true(space.ne(w_slice, w_slice2))
+        assert space.is_true(space.lt(w_slice, w_slice2))
+        assert space.is_true(space.le(w_copy, w_slice2))
+        assert space.is_true(space.gt(w_slice2, w_copy))
+        assert space.is_true(space.ge(w_slice, w_copy))
+        assert not space.is_true(space.lt(w_slice2, w_slice))
+        assert not space.is_true(space.eq(w_slice, space.newbytes("abc")))
+        w_sum = space.add(w_slice, w_copy)
+        assert space.bytes_w(w_sum) == s[5:35] * 2
+        w_sum = space.add(w_copy, w_slice2)
+        assert space.bytes_w(w_sum) == s[5:35] + s[6:36]
+        assert w_slice._str is s
+        assert w_slice2._str is s
+
+
+class AppTestBytesSliceObject(test_bytesobject.AppTestBytesObject):
+    spaceconfig = {"objspace.std.withbytesslice": True,
+                   "objspace.std.bytesslicethreshold": 2}
+
+    def test_slice_operations(self):
+        s = "0123456789abcdef" * 4
+        t = s[3:-3]
+        assert type(t) is str
+        assert t == s[3:-3] and len(t) == 58
+        assert t[0] == "3" and t[-1] == "c" and t[5:9] == "89ab"
+        assert t[::2] == s[3:-3:2]
+        assert t[1:3] + "x" == "45x"
+        assert hash(t) == hash(s[3:-3][:])
+        assert t == "3456789abcdef" + s[16:48] + "0123456789abc"
+        assert t < s[4:] and s[4:] > t and t != s[4:]
+        assert {t: 1}[t[:]] == 1
+        assert t.upper() == s.upper()[3:-3]
+        assert str(t) is t
+
+    def test_slice_search(self):
+        s = "..abc..abc..abc.."
+        t = s[1:-1]
+        assert t.find("abc") == 1
+        assert t.find("abc", 2) == 6
+        assert t.find("abc", 2, 8) == -1
+        assert t.find("", 20) == -1
+        assert t.rfind("abc") == 11
+        assert t.rfind("abc", 0, 13) == 6
+        assert t.index(".") == 0
+        assert t.rindex(".") == 14
+        raises(ValueError, t.index, "x")
+        assert t.count(".") == 6
+        assert t.count("", 15) == 1
+        assert t.startswith(".abc") and not t.startswith("..")
+        assert t.startswith("abc", 1) and not t.startswith("abc", 1, 3)
+        assert not t.startswith("", 20)
+        assert t.endswith("c.") and not t.endswith("..")
+        assert t.endswith("abc", 0, -1)
+        assert t.startswith(("x", ".a"))
+        assert t.find(u"abc") == 1
+        assert t.find(bytearray("abc")) == 1
+
+    def test_parse_loop(self):
+        lines = ["line %d" % i for i in range(10)]
+        buf = "\n".join(lines) + "\n"
+        result = []
+        while buf:
+            i = buf.index("\n")
+            result.append(buf[:i])
+            buf = buf[i + 1:]
+        assert result == lines
@@ -39,8 +39,8 @@ class AppTest(object):
 
         d = _pypyjson.loads('{"a": 1, "b": "x"}')
         assert d.setdefault(u"a", "blub") == 1
-        d.setdefault(u"x", 23)
-        assert __pypy__.strategy(d) == "UnicodeDictStrategy"
+        assert d.setdefault(u"x", 23) == 23
+        assert __pypy__.strategy(d) == "JsonDictStrategy"
         assert len(d) == 3
         assert d == {u"a": 1, u"b": "x", u"x": 23}
 
@@ -48,11 +48,19 @@ class AppTest(object):
         import __pypy__
         import _pypyjson
 
-        d = _pypyjson.loads('{"a": 1, "b": "x"}')
+        d = _pypyjson.loads('{"a": 1, "b": "x", "c": 2}')
         del d[u"a"]
-        assert __pypy__.strategy(d) == "UnicodeDictStrategy"
-        assert len(d) == 1
+        assert __pypy__.strategy(d) == "JsonDictStrategy"
+        assert len(d) == 2
+        assert d == {u"b": "x", u"c": 2}
+        assert list(d) == [u"b", u"c"]
+        raises(KeyError, "del d[u'a']")
+        assert d.pop(u"c") == 2
+        assert d.pop(u"c", 5) == 5
         assert d == {u"b": "x"}
+        del d[u"b"]
+        assert __pypy__.strategy(d) == "EmptyDictStrategy"
+        assert d == {}
 
     def test_popitem(self):
         import __pypy__
@@ -60,15 +68,66 @@ class AppTest(object):
 
         d = _pypyjson.loads('{"a": 1, "b": "x"}')
         k, v = d.popitem()
+        assert __pypy__.strategy(d) == "JsonDictStrategy"
+        assert (k, v) == (u"b", u"x")
+        assert d == {u"a": 1}
+        assert d.popitem() == (u"a", 1)
+        assert d == {}
+        raises(KeyError, d.popitem)
+
+    def test_add_key(self):
+        import __pypy__
+        import _pypyjson
+
+        l = _pypyjson.loads('[{"a": 1, "b": "x"}, {"a": 2, "b": "y"}]')
+        for i, d in enumerate(l):
+            d[u"c"] = i
+            assert __pypy__.strategy(d) == "JsonDictStrategy"
+        assert l == [{u"a": 1, u"b": u"x", u"c": 0},
+                     {u"a": 2, u"b": u"y", u"c": 1}]
+        assert l[0].keys() == [u"a", u"b", u"c"]
+        assert l[1].items() == [(u"a", 2), (u"b", u"y"), (u"c", 1)]
+        l[0][u"c"] = 5
+        assert l[0][u"c"] == 5
+        assert l[1][u"c"] == 1
+        # deleting a key in the middle keeps the order
+        del l[0][u"a"]
+        assert __pypy__.strategy(l[0]) == "JsonDictStrategy"
+        assert l[0].items() == [(u"b", u"x"), (u"c", 5)]
+        l[0][u"a"] = 7
+        assert l[0].items() == [(u"b", u"x"), (u"c", 5), (u"a", 7)]
+        assert l[1].keys() == [u"a", u"b", u"c"]
+
+    def test_add_key_as_decoded(self):
+        import __pypy__
+        import _pypyjson
+
+        # adding a key gives the same dict as decoding it
+        l = _pypyjson.loads('[{"a": 1, "b": 2}, {"a": 1}]')
+        l[1][u"b"] = 2
+        assert l[0] == l[1]
+        assert l[1].keys() == [u"a", u"b"]
+        assert __pypy__.strategy(l[1]) == "JsonDictStrategy"
+
+    def test_add_many_keys(self):
+        import __pypy__
+        import _pypyjson
+
+        # used with arbitrary keys: switches to a normal dict at some point
+        l = _pypyjson.loads('[' + ', '.join(['{"a": 1}'] * 20) + ']')
+        for i, d in enumerate(l):
+            d[unicode(i)] = i
+        assert __pypy__.strategy(l[0]) == "JsonDictStrategy"
+        assert __pypy__.strategy(l[-1]) == "UnicodeDictStrategy"
+        for i, d in enumerate(l):
+            assert d == {u"a": 1, unicode(i): i}
+            assert d.keys() == [u"a", unicode(i)]
+        d = l[0]
+        for i in range(200):
+            d[u"x%d" % i] = i
         assert __pypy__.strategy(d) == "UnicodeDictStrategy"
-        if k == u"a":
-            assert v == 1
-            assert len(d) == 1
-            assert d == {u"b": "x"}
-        else:
-            assert v == u"x"
-            assert len(d) == 1
-            assert d == {u"a": 1}
+        assert len(d) == 202
+        assert d[u"x199"] == 199
 
     def test_keys_value_items(self):
         import _pypyjson
@@ -516,6 +516,16 @@ class AppTestListObject(object):
         cls.w_on_cpython = cls.space.wrap(on_cpython)
         cls.w_on_arm = cls.space.wrap(platform.machine().startswith('arm'))
         cls.w_runappdirect = cls.space.wrap(cls.runappdirect)
+        cls.w_make_randrange = cls.space.appexec([], """():
+            def make_randrange(seed):
+                # a small LCG: the same seed always gives the same numbers
+                state = [seed]
+                def randrange(n):
+                    state[0] = (state[0] * 1103515245 + 12345) & 0x7fffffff
+                    return (state[0] >> 8) % n
+                return randrange
+            return make_randrange
+        """)
 
     def test_doc(self):
         assert list.__doc__ == "list() -> new empty list\nlist(iterable) -> new list initialized from iterable's items"
@@ -755,6 +765,85 @@ class AppTestListObject(object):
         r.sort(key=lambda x: -x)
         assert r == range(9, -1, -1)
 
+    def test_sort_key_unboxed(self):
+        randrange = self.make_randrange(42)
+        keyfuncs = [
+            lambda x: x[0],                         # int
+            lambda x: x[0] * 0.5,                   # float
+            lambda x: str(x[0]),                    # str
+            lambda x: unicode(x[0]) + u'\xe9\u1234', # unicode
+            lambda x: (x[0], x[1]),                 # tuple of ints
+            lambda x: (str(x[0]), -x[1]),           # tuple of str
+            lambda x: (x[0] * 0.5, [x[1]]),         # tuple of float, list
+            lambda x: x[0] if x[1] else str(x[0]),  # mixed, not unboxed
+        ]
+        for n in [2, 5, 40]:
+            items = [(randrange(n // 2 + 1), randrange(3), i)
+                     for i in range(n)]
+            for key in keyfuncs:
+                for reverse in [False, True]:
+                    expected = sorted(items, reverse=reverse,
+                                      cmp=lambda a, b: cmp(key(a), key(b)))
+                    assert sorted(items, key=key, reverse=reverse) == expected
+
+        # the whole tuples are compared if the first items are equal
+        nan = float('nan')
+        l = [(nan, 2), (nan, 1)]
+        l.sort(key=lambda x: x)
+        assert l == [(nan, 1), (nan, 2)]
+        l = [(5, 'b'), (5, 'a'), (4, 'c')]
+        l.sort(key=lambda x: x)
+        assert l == [(4, 'c'), (5, 'a'), (5, 'b')]
+        l = [(u'b',), (u'a', 1), (u'a',)]
+        l.sort(key=lambda x: x, reverse=True)
+        assert l == [(u'b',), (u'a', 1), (u'a',)]
+
+        class MyInt(int):
+            def __lt__(self, other):
+                return int(self) > int(other)
+        l = [3, 1, 2]
+        l.sort(key=MyInt)
+        assert l == [3, 2, 1]
+        class MyTuple(tuple):
+            def __lt__(self, other):
+                return self[0] > other[0]
+        l = [3, 1, 2]
+        l.sort(key=lambda x: MyTuple((x,)))
+        assert l == [3, 2, 1]
+
+        l = [3, 1, 2]
+        def key(x):
+            l.append(x)
+            return x
+        raises(ValueError, l.sort, key=key)
+        l = [(1, 3j), (1, 2j)]
+        raises(TypeError, l.sort, key=lambda x: x)
+        assert l == [(1, 3j), (1, 2j)]
+
+    def test_sort_same_type(self):
+        # lists with the object strategy whose items all have one type
+        randrange = self.make_randrange(42)
+        makers = [
+            lambda i, j: (i, j),
+            lambda i, j: (str(i), j, None),
+            lambda i, j: (u'\u1234' * i, [j]),
+            lambda i, j: 2 ** (60 + i) * (j - 1),
+            lambda i, j: -i * 1000000000000000000000 + j,
+            lambda i, j: i if j else 2 ** 70,
+        ]
+        for make in makers:
+            for reverse in [False, True]:
+                l = [make(randrange(10), randrange(3)) for n in range(40)]
+                l.append(None)
+                l.pop()
+                expected = sorted(l, reverse=reverse, cmp=cmp)
+                l.sort(reverse=reverse)
+                assert l == expected
+        l = [(1, 3j), (1, 2j), object]
+        l.pop()
+        raises(TypeError, l.sort)
+        assert l == [(1, 3j), (1, 2j)]
+
     def test_sort_reversed(self):
         l = range(10)
         l.sort(reverse=True)
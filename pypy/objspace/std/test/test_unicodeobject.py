@@ -993,6 +993,20 @@ class AppTestUnicodeString:
         assert u'\xe4\xc4\xdf'.swapcase() == u'\xc4\xe4\xdf'
         assert u'\ud800'.swapcase() == u'\ud800'
 
+    def test_ascii_bulk_operations(self):
+        s = u'Hello, World 42!\r\n' * 10
+        assert s.swapcase() == u'hELLO, wORLD 42!\r\n' * 10
+        assert s.lower() == u'hello, world 42!\r\n' * 10
+        assert s.upper() == u'HELLO, WORLD 42!\r\n' * 10
+        for name in ['isdigit', 'isdecimal', 'isnumeric']:
+            assert getattr(u'0123456789' * 5, name)()
+            assert not getattr(u'0123456789' * 5 + u'a', name)()
+        assert (u'abcXYZ' * 5).isalpha()
+        assert (u'abc123' * 5).isalnum()
+        assert not (u'abc123' * 5 + u'!').isalnum()
+        # unlike in 'str', '\x1c' to '\x1f' are whitespace
+        assert (u' \t\x1c\x1d\x1e\x1f' * 5).isspace()
+
     def test_buffer(self):
         buf = buffer(u'XY')
         assert str(buf) in ['X\x00Y\x00',
@@ -0,0 +1,186 @@
+# -*- encoding: utf-8 -*-
+from pypy.objspace.std.unicodeobject import W_UnicodeObject
+from pypy.objspace.std.unicodesliceobject import W_UnicodeSliceObject
+from pypy.objspace.std.test import test_unicodeobject
+
+
+class TestW_UnicodeSliceObject:
+    spaceconfig = {"objspace.std.withunicodeslice": True,
+                   "objspace.std.bytesslicethreshold": 10}
+
+    def slice(self, w_uni, start, stop):
+        space = self.space
+        return space.getitem(w_uni, space.newslice(space.newint(start),
+                                                   space.newint(stop),
+                                                   space.w_None))
+
+    def unicode_w(self, w_uni):
+        return self.space.utf8_w(w_uni).decode('utf-8')
+
+    def test_slice_is_not_copied(self):
+        space = self.space
+        u = u"abcdefghij" * 4
+        w_uni = space.newutf8(u.encode('utf-8'), len(u))
+        w_slice = self.slice(w_uni, 5, 35)
+        assert isinstance(w_slice, W_UnicodeSliceObject)
+        assert w_slice._w_str is w_uni
+        w_slice2 = self.slice(w_slice, 1, -1)
+        assert isinstance(w_slice2, W_UnicodeSliceObject)
+        assert w_slice2._w_str is w_uni
+        assert (w_slice2._start, w_slice2._stop) == (6, 34)
+        assert self.unicode_w(w_slice2) == u[6:34]
+        # forcing doesn't reference the whole string any more
+        assert w_slice2._w_str is not w_uni
+        assert w_slice2._w_str._utf8 == u[6:34].encode('utf-8')
+        assert w_slice._w_str is w_uni
+
+    def test_small_slices_are_copied(self):
+        space = self.space
+        u = u"abcdefghij" * 4
+        w_uni = space.newutf8(u.encode('utf-8'), len(u))
+        # below the threshold
+        assert type(self.slice(w_uni, 5, 14)) is W_UnicodeObject
+        # too small compared to the string that would be kept alive
+        w_uni = space.newutf8((u * 10).encode('utf-8'), len(u) * 10)
+        w_slice = self.slice(w_uni, 0, 50)
+        assert type(w_slice) is W_UnicodeObject
+        assert self.unicode_w(w_slice) == u + u[:10]
+
+    def test_non_ascii(self):
+        space = self.space
+        u = u"a€b\xe9c\U0001f600d" * 5
+        w_uni = space.newutf8(u.encode('utf-8'), len(u))
+        w_slice = self.slice(w_uni, 3, 33)
+        assert isinstance(w_slice, W_UnicodeSliceObject)
+        assert space.len_w(w_slice) == 30
+        assert self.unicode_w(space.getitem(w_slice, space.newint(2))) == (
+            u[5])
+        w_slice2 = self.slice(w_slice, 2, 29)
+        assert isinstance(w_slice2, W_UnicodeSliceObject)
+        assert w_slice2._w_str is w_uni
+        w_sub = space.newutf8(u"\U0001f600d".encode('utf-8'), 2)
+        assert space.int_w(space.call_method(w_slice2, "find", w_sub)) == (
+            u[5:32].find(u"\U0001f600d"))
+        assert space.int_w(space.call_method(w_slice2, "rfind", w_sub)) == (
+            u[5:32].rfind(u"\U0001f600d"))
+        assert self.unicode_w(w_slice2) == u[5:32]
+
+    def test_search_without_forcing(self):
+        space = self.space
+        u = u"abc\ndefghij\n" * 4
+        w_uni = space.newutf8(u.encode('utf-8'), len(u))
+        w_slice = self.slice(w_uni, 4, len(u))
+        w_nl = space.newutf8("\n", 1)
+        assert space.int_w(space.call_method(w_slice, "find", w_nl)) == 7
+        assert space.int_w(space.call_method(w_slice, "rfind", w_nl)) == 43
+        assert space.int_w(space.call_method(w_slice, "count", w_nl)) == 7
+        assert space.is_true(space.call_method(w_slice, "startswith",
+                                               space.newutf8("def", 3)))
+        assert space.is_true(space.contains(w_slice, w_nl))
+        assert w_slice._w_str is w_uni
+
+    def test_compare_and_add_without_forcing(self):
+        space = self.space
+        u = u"abcdefghij" * 4
+        w_uni = space.newutf8(u.encode('utf-8'), len(u))
+        w_slice = self.slice(w_uni, 5, 35)
+        w_slice2 = self.slice(w_uni, 6, 36)
+        w_copy = space.newutf8(u[5:35].encode('utf-8'), 30)
+        assert space.is_true(space.eq(w_slice, w_copy))
+        assert space.is_true(space.eq(w_copy, w_slice))
+        assert not space.is_true(space.ne(w_copy, w_slice))
+        assert space.is_true(space.ne(w_slice, w_slice2))
+        assert space.is_true(space.lt(w_slice, w_slice2))
+        assert space.is_true(space.le(w_copy, w_slice2))
+        assert space.is_true(space.gt(w_slice2, w_copy))
+        assert space.is_true(space.ge(w_slice, w_copy))
+        assert not space.is_true(space.lt(w_slice2, w_slice))
+        w_sum = space.add(w_slice, w_copy)
+        assert self.unicode_w(w_sum) == u[5:35] * 2
+        w_sum = space.add(w_copy, w_slice2)
+        assert self.unicode_w(w_sum) == u[5:35] + u[6:36]
+        assert space.len_w(w_sum) == 60
+        assert w_slice._w_str is w_uni
+        assert w_slice2._w_str is w_uni
+
+
+class AppTestUnicodeSliceObject(test_unicodeobject.AppTestUnicodeString):
+    spaceconfig = {"usemodules": ('unicodedata',),
+                   "objspace.std.withunicodeslice": True,
+                   "objspace.std.bytesslicethreshold": 2}
+
+    def test_slice_operations(self):
+        s = u"0123456789abcdef" * 4
+        t = s[3:-3]
+        assert type(t) is unicode
+        assert t == s[3:-3] and len(t) == 58
+        assert t[0] == u"3" and t[-1] == u"c" and t[5:9] == u"89ab"
+        assert t[::2] == s[3:-3:2]
+        assert t[1:3] + u"x" == u"45x"
+        assert t[1:3] + "x" == u"45x"
+        assert hash(t) == hash(s[3:-3][:])
+        assert t == u"3456789abcdef" + s[16:48] + u"0123456789abc"
+        assert t < s[4:] and s[4:] > t and t != s[4:]
+        assert t == str(t) and str(t) == t
+        assert {t: 1}[t[:]] == 1
+        assert t.upper() == s.upper()[3:-3]
+        assert unicode(t) is t
+        assert u"%s" % (t,) == t
+        assert int(s[2:5]) == 234
+
+    def test_slice_non_ascii(self):
+        s = u"\xe9t\xe9 \u20ac \U0001f600 " * 3
+        t = s[2:-2]
+        assert len(t) == len(s) - 4
+        assert t == s[2:-2]
+        assert t[0] == s[2] and t[-1] == s[-3]
+        assert t[4:7] == s[6:9]
+        assert t.find(u"\u20ac") == 2
+        assert t.rfind(u"\U0001f600") == 12
+        assert t.count(u"\xe9") == 5
+        assert t.endswith(u"\xe9 \u20ac ")
+        assert t.startswith(u"\U0001f600", 4)
+        assert t.encode("utf-8") == s[2:-2].encode("utf-8")
+        assert t + s == s[2:-2] + s
+
+    def test_slice_search(self):
+        s = u"..abc..abc..abc.."
+        t = s[1:-1]
+        assert t.find(u"abc") == 1
+        assert t.find(u"abc", 2) == 6
+        assert t.find(u"abc", 2, 8) == -1
+        assert t.find(u"", 20) == -1
+        assert t.rfind(u"abc") == 11
+        assert t.rfind(u"abc", 0, 13) == 6
+        assert t.index(u".") == 0
+        assert t.rindex(u".") == 14
+        raises(ValueError, t.index, u"x")
+        assert t.count(u".") == 6
+        assert t.count(u"", 15) == 1
+        assert t.startswith(u".abc") and not t.startswith(u"..")
+        assert t.startswith(u"abc", 1) and not t.startswith(u"abc", 1, 3)
+        assert t.endswith(u"c.") and not t.endswith(u"..")
+        assert t.endswith(u"abc", 0, -1)
+        assert t.startswith((u"x", u".a"))
+        assert t.find("abc") == 1
+        assert u"abc" in t and u"x" not in t
+        assert u"abc" in "." + t
+
+    def test_stringio_and_marshal(self):
+        import _io, marshal
+        s = u"line 1\nline 2\n" * 3
+        f = _io.StringIO(s[7:])
+        assert f.read() == s[7:]
+        f.write(s[7:21])
+        assert f.getvalue() == s[7:] + s[7:21]
+        assert marshal.loads(marshal.dumps(s[7:])) == s[7:]
+
+    def test_parse_loop(self):
+        lines = [u"line %d \u20ac" % i for i in range(10)]
+        buf = u"\n".join(lines) + u"\n"
+        result = []
+        while buf:
+            i = buf.index(u"\n")
+            result.append(buf[:i])
+            buf = buf[i + 1:]
+        assert result == lines
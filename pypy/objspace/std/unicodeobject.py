@@ -1,6 +1,9 @@
 """The builtin unicode implementation"""
 
 import sys
+import types
+
+import py
 
 from rpython.rlib.objectmodel import (
     compute_hash, compute_unique_id, import_from_mixin, always_inline,
@@ -11,12 +14,13 @@ from rpython.rlib.rarithmetic import ovfcheck
 from rpython.rlib.rstring import (
     StringBuilder, split, rsplit, UnicodeBuilder, replace_count, startswith,
     endswith)
-from rpython.rlib import rutf8, jit
+from rpython.rlib import rbytes, rutf8, jit
 
 from pypy.interpreter import unicodehelper
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.error import OperationError, oefmt
-from pypy.interpreter.gateway import WrappedDefault, interp2app, unwrap_spec
+from pypy.interpreter.gateway import (
+    WrappedDefault, interp2app, interpindirect2app, unwrap_spec)
 from pypy.interpreter.typedef import TypeDef
 from pypy.module.unicodedata.interp_ucd import unicodedb
 from pypy.objspace.std import newformat
@@ -46,34 +50,12 @@ def codepoint_at_pos_dont_look_inside(utf8, p):
     return rutf8.codepoint_at_pos(utf8, p)
 
 
-class W_UnicodeObject(W_Root):
-    import_from_mixin(StringMethods)
-    _immutable_fields_ = ['_utf8']
-
-    @enforceargs(utf8str=str)
-    def __init__(self, utf8str, length):
-        assert isinstance(utf8str, str)
-        assert length >= 0
-        self._utf8 = utf8str
-        self._length = length
-        self._index_storage = rutf8.null_storage()
-        if not we_are_translated() and not sys.platform == 'win32':
-            # utf8str must always be a valid utf8 string, except maybe with
-            # explicit surrogate characters---which .decode('utf-8') doesn't
-            # special-case in Python 2, which is exactly what we want here
-            assert length == len(utf8str.decode('utf-8'))
-
-    @staticmethod
-    def from_utf8builder(builder):
-        return W_UnicodeObject(
-            builder.build(), builder.getlength())
-
-    def __repr__(self):
-        """representation for debugging purposes"""
-        return "%s(%r)" % (self.__class__.__name__, self._utf8)
+class W_AbstractUnicodeObject(W_Root):
+    __slots__ = ()
+    exact_class_applevel_name = 'unicode'
 
     def is_w(self, space, w_other):
-        if not isinstance(w_other, W_UnicodeObject):
+        if not isinstance(w_other, W_AbstractUnicodeObject):
             return False
         if self is w_other:
             return True
@@ -102,6 +84,47 @@ class W_UnicodeObject(W_Root):
             uid = (base << IDTAG_SHIFT) | IDTAG_SPECIAL
         return space.newint(uid)
 
+    def _force_w(self):
+        """Return the object as a W_UnicodeObject."""
+        raise NotImplementedError
+
+
+def _as_slice(space, w_obj):
+    # w_obj if it is a W_UnicodeSliceObject (see unicodesliceobject.py),
+    # or None
+    if (space.config.objspace.std.withunicodeslice and
+            isinstance(w_obj, W_AbstractUnicodeObject) and
+            not isinstance(w_obj, W_UnicodeObject)):
+        return w_obj
+    return None
+
+
+class W_UnicodeObject(W_AbstractUnicodeObject):
+    import_from_mixin(StringMethods)
+    _immutable_fields_ = ['_utf8']
+
+    @enforceargs(utf8str=str)
+    def __init__(self, utf8str, length):
+        assert isinstance(utf8str, str)
+        assert length >= 0
+        self._utf8 = utf8str
+        self._length = length
+        self._index_storage = rutf8.null_storage()
+        if not we_are_translated() and not sys.platform == 'win32':
+            # utf8str must always be a valid utf8 string, except maybe with
+            # explicit surrogate characters---which .decode('utf-8') doesn't
+            # special-case in Python 2, which is exactly what we want here
+            assert length == len(utf8str.decode('utf-8'))
+
+    @staticmethod
+    def from_utf8builder(builder):
+        return W_UnicodeObject(
+            builder.build(), builder.getlength())
+
+    def __repr__(self):
+        """representation for debugging purposes"""
+        return "%s(%r)" % (self.__class__.__name__, self._utf8)
+
     def str_w(self, space):
         return space.text_w(encode_object(space, self, 'ascii', 'strict'))
 
@@ -158,8 +181,8 @@ class W_UnicodeObject(W_Root):
     def convert_arg_to_w_unicode(space, w_other, strict=None):
         if space.is_w(space.type(w_other), space.w_unicode):
             # XXX why do we need this for translation???
-            assert isinstance(w_other, W_UnicodeObject)
-            return w_other
+            assert isinstance(w_other, W_AbstractUnicodeObject)
+            return w_other._force_w()
         if space.isinstance_w(w_other, space.w_bytes):
             return unicode_from_string(space, w_other)
         if strict:
@@ -170,6 +193,9 @@ class W_UnicodeObject(W_Root):
     def convert_to_w_unicode(self, space):
         return self
 
+    def _force_w(self):
+        return self
+
     @specialize.argtype(1)
     def _chr(self, char):
         assert len(char) == 1
@@ -233,7 +259,8 @@ class W_UnicodeObject(W_Root):
         if space.is_w(w_unicodetype, space.w_unicode):
             return w_value
 
-        assert isinstance(w_value, W_UnicodeObject)
+        assert isinstance(w_value, W_AbstractUnicodeObject)
+        w_value = w_value._force_w()
         w_newobj = space.allocate_instance(W_UnicodeObject, w_unicodetype)
         W_UnicodeObject.__init__(w_newobj, w_value._utf8, w_value._length)
         if w_value._index_storage:
@@ -262,6 +289,9 @@ class W_UnicodeObject(W_Root):
         return self._utf8 == w_other._utf8
 
     def descr_eq(self, space, w_other):
+        w_slice = _as_slice(space, w_other)
+        if w_slice is not None:
+            return w_slice.descr_eq(space, self)
         try:
             res = self._utf8 == self.convert_arg_to_w_unicode(space, w_other)._utf8
         except OperationError as e:
@@ -278,6 +308,9 @@ class W_UnicodeObject(W_Root):
         return space.newbool(res)
 
     def descr_ne(self, space, w_other):
+        w_slice = _as_slice(space, w_other)
+        if w_slice is not None:
+            return w_slice.descr_ne(space, self)
         try:
             res = self._utf8 != self.convert_arg_to_w_unicode(space, w_other)._utf8
         except OperationError as e:
@@ -294,6 +327,9 @@ class W_UnicodeObject(W_Root):
         return space.newbool(res)
 
     def descr_lt(self, space, w_other):
+        w_slice = _as_slice(space, w_other)
+        if w_slice is not None:
+            return w_slice.descr_gt(space, self)
         try:
             res = self._utf8 < self.convert_arg_to_w_unicode(space, w_other)._utf8
         except OperationError as e:
@@ -303,6 +339,9 @@ class W_UnicodeObject(W_Root):
         return space.newbool(res)
 
     def descr_le(self, space, w_other):
+        w_slice = _as_slice(space, w_other)
+        if w_slice is not None:
+            return w_slice.descr_ge(space, self)
         try:
             res = self._utf8 <= self.convert_arg_to_w_unicode(space, w_other)._utf8
         except OperationError as e:
@@ -312,6 +351,9 @@ class W_UnicodeObject(W_Root):
         return space.newbool(res)
 
     def descr_gt(self, space, w_other):
+        w_slice = _as_slice(space, w_other)
+        if w_slice is not None:
+            return w_slice.descr_lt(space, self)
         try:
             res = self._utf8 > self.convert_arg_to_w_unicode(space, w_other)._utf8
         except OperationError as e:
@@ -321,6 +363,9 @@ class W_UnicodeObject(W_Root):
         return space.newbool(res)
 
     def descr_ge(self, space, w_other):
+        w_slice = _as_slice(space, w_other)
+        if w_slice is not None:
+            return w_slice.descr_le(space, self)
         try:
             res = self._utf8 >= self.convert_arg_to_w_unicode(space, w_other)._utf8
         except OperationError as e:
@@ -349,6 +394,8 @@ class W_UnicodeObject(W_Root):
 
     def descr_swapcase(self, space):
         input = self._utf8
+        if self.is_ascii():
+            return W_UnicodeObject(rbytes.swapcase(input), self._length)
         builder = rutf8.Utf8StringBuilder(len(input))
         for ch in rutf8.Utf8StringIterator(input):
             if unicodedb.isupper(ch):
@@ -390,7 +437,8 @@ class W_UnicodeObject(W_Root):
                     continue
                 elif space.isinstance_w(w_newval, space.w_int):
                     codepoint = space.int_w(w_newval)
-                elif isinstance(w_newval, W_UnicodeObject):
+                elif isinstance(w_newval, W_AbstractUnicodeObject):
+                    w_newval = w_newval._force_w()
                     builder.append_utf8(w_newval._utf8, w_newval._length)
                     continue
                 else:
@@ -444,6 +492,16 @@ class W_UnicodeObject(W_Root):
 
     @specialize.arg(3)
     def _is_generic_loop(self, space, v, func_name):
+        if self.is_ascii():
+            # for ascii characters, these are the same as in 'str'.
+            # Not isspace(), which is also true for '\x1c'-'\x1f'
+            if (func_name == '_isdigit' or func_name == '_isdecimal' or
+                    func_name == '_isnumeric'):
+                return space.newbool(rbytes.isdigit(self._utf8))
+            if func_name == '_isalpha':
+                return space.newbool(rbytes.isalpha(self._utf8))
+            if func_name == '_isalnum':
+                return space.newbool(rbytes.isalnum(self._utf8))
         func = getattr(self, func_name)
         val = self._utf8
         for uchar in rutf8.Utf8StringIterator(val):
@@ -589,6 +647,10 @@ class W_UnicodeObject(W_Root):
         return endswith(value, prefix, start, end)
 
     def descr_add(self, space, w_other):
+        w_slice = _as_slice(space, w_other)
+        if w_slice is not None:
+            from pypy.objspace.std.unicodesliceobject import concat
+            return concat(self, w_slice)
         try:
             w_other = self.convert_arg_to_w_unicode(space, w_other)
         except OperationError as e:
@@ -771,7 +833,7 @@ class W_UnicodeObject(W_Root):
         assert stop >= 0
         byte_start = self._index_to_byte(start)
         byte_stop = self._index_to_byte(stop)
-        return W_UnicodeObject(self._utf8[byte_start:byte_stop], stop - start)
+        return self._sliced_utf8(space, start, stop, byte_start, byte_stop)
 
     @jit.unroll_safe
     def _unicode_sliced_constant_index_jit(self, space, start, stop):
@@ -783,6 +845,15 @@ class W_UnicodeObject(W_Root):
         byte_stop = len(self._utf8)
         for i in range(self._len() - stop):
             byte_stop = prev_codepoint_pos_dont_look_inside(self._utf8, byte_stop)
+        return self._sliced_utf8(space, start, stop, byte_start, byte_stop)
+
+    def _sliced_utf8(self, space, start, stop, byte_start, byte_stop):
+        if space.config.objspace.std.withunicodeslice:
+            from pypy.objspace.std.unicodesliceobject import unicode_slice
+            return unicode_slice(space, self, start, stop, byte_start,
+                                 byte_stop)
+        assert byte_start >= 0
+        assert byte_stop >= 0
         return W_UnicodeObject(self._utf8[byte_start:byte_stop], stop - start)
 
     def _unroll_slice_heuristic(self, start, stop, w_stop):
@@ -1259,8 +1330,8 @@ def unicode_from_encoded_object(space, w_obj, encoding, errors):
         raise oefmt(space.w_TypeError,
                     "decoder did not return an unicode object (type '%T')",
                     w_retval)
-    assert isinstance(w_retval, W_UnicodeObject)
-    return w_retval
+    assert isinstance(w_retval, W_AbstractUnicodeObject)
+    return w_retval._force_w()
 
 
 def unicode_from_object(space, w_obj):
@@ -1695,140 +1766,171 @@ class UnicodeDocstrings:
         """
 
 
+def _make_abstract_method(name, func):
+    # the typedef calls the methods of W_AbstractUnicodeObject, which are
+    # implemented by W_UnicodeObject and W_UnicodeSliceObject
+    import inspect
+    args = ', '.join(inspect.getargs(func.func_code).args)
+    source = py.code.Source("""
+    def %(name)s(%(args)s):
+        raise NotImplementedError
+    """ % {'name': name, 'args': args})
+    d = {}
+    exec source.compile() in d
+    meth = d[name]
+    meth.func_defaults = func.func_defaults
+    if hasattr(func, 'unwrap_spec'):
+        meth.unwrap_spec = func.unwrap_spec
+    return meth
+
+def _install_abstract_methods():
+    for name, func in W_UnicodeObject.__dict__.items():
+        if name.startswith('descr_') and isinstance(func, types.FunctionType):
+            setattr(W_AbstractUnicodeObject, name,
+                    _make_abstract_method(name, func))
+
+_install_abstract_methods()
+
+
 W_UnicodeObject.typedef = TypeDef(
     "unicode", basestring_typedef,
     __new__ = interp2app(W_UnicodeObject.descr_new),
     __doc__ = UnicodeDocstrings.__doc__,
 
-    __repr__ = interp2app(W_UnicodeObject.descr_repr,
-                          doc=UnicodeDocstrings.__repr__.__doc__),
-    __str__ = interp2app(W_UnicodeObject.descr_str,
-                         doc=UnicodeDocstrings.__str__.__doc__),
-    __hash__ = interp2app(W_UnicodeObject.descr_hash,
-                          doc=UnicodeDocstrings.__hash__.__doc__),
-
-    __eq__ = interp2app(W_UnicodeObject.descr_eq,
-                        doc=UnicodeDocstrings.__eq__.__doc__),
-    __ne__ = interp2app(W_UnicodeObject.descr_ne,
-                        doc=UnicodeDocstrings.__ne__.__doc__),
-    __lt__ = interp2app(W_UnicodeObject.descr_lt,
-                        doc=UnicodeDocstrings.__lt__.__doc__),
-    __le__ = interp2app(W_UnicodeObject.descr_le,
-                        doc=UnicodeDocstrings.__le__.__doc__),
-    __gt__ = interp2app(W_UnicodeObject.descr_gt,
-                        doc=UnicodeDocstrings.__gt__.__doc__),
-    __ge__ = interp2app(W_UnicodeObject.descr_ge,
-                        doc=UnicodeDocstrings.__ge__.__doc__),
-
-    __len__ = interp2app(W_UnicodeObject.descr_len,
-                         doc=UnicodeDocstrings.__len__.__doc__),
-    __contains__ = interp2app(W_UnicodeObject.descr_contains,
-                              doc=UnicodeDocstrings.__contains__.__doc__),
-
-    __add__ = interp2app(W_UnicodeObject.descr_add,
-                         doc=UnicodeDocstrings.__add__.__doc__),
-    __mul__ = interp2app(W_UnicodeObject.descr_mul,
-                         doc=UnicodeDocstrings.__mul__.__doc__),
-    __rmul__ = interp2app(W_UnicodeObject.descr_mul,
-                          doc=UnicodeDocstrings.__rmul__.__doc__),
-
-    __getitem__ = interp2app(W_UnicodeObject.descr_getitem,
-                             doc=UnicodeDocstrings.__getitem__.__doc__),
-    __getslice__ = interp2app(W_UnicodeObject.descr_getslice,
-                              doc=UnicodeDocstrings.__getslice__.__doc__),
-
-    capitalize = interp2app(W_UnicodeObject.descr_capitalize,
-                            doc=UnicodeDocstrings.capitalize.__doc__),
-    center = interp2app(W_UnicodeObject.descr_center,
-                        doc=UnicodeDocstrings.center.__doc__),
-    count = interp2app(W_UnicodeObject.descr_count,
-                       doc=UnicodeDocstrings.count.__doc__),
-    decode = interp2app(W_UnicodeObject.descr_decode,
-                        doc=UnicodeDocstrings.decode.__doc__),
-    encode = interp2app(W_UnicodeObject.descr_encode,
-                        doc=UnicodeDocstrings.encode.__doc__),
-    expandtabs = interp2app(W_UnicodeObject.descr_expandtabs,
-                            doc=UnicodeDocstrings.expandtabs.__doc__),
-    find = interp2app(W_UnicodeObject.descr_find,
-                      doc=UnicodeDocstrings.find.__doc__),
-    rfind = interp2app(W_UnicodeObject.descr_rfind,
-                       doc=UnicodeDocstrings.rfind.__doc__),
-    index = interp2app(W_UnicodeObject.descr_index,
-                       doc=UnicodeDocstrings.index.__doc__),
-    rindex = interp2app(W_UnicodeObject.descr_rindex,
-                        doc=UnicodeDocstrings.rindex.__doc__),
-    isalnum = interp2app(W_UnicodeObject.descr_isalnum,
-                         doc=UnicodeDocstrings.isalnum.__doc__),
-    isalpha = interp2app(W_UnicodeObject.descr_isalpha,
-                         doc=UnicodeDocstrings.isalpha.__doc__),
-    isdecimal = interp2app(W_UnicodeObject.descr_isdecimal,
-                           doc=UnicodeDocstrings.isdecimal.__doc__),
-    isdigit = interp2app(W_UnicodeObject.descr_isdigit,
-                         doc=UnicodeDocstrings.isdigit.__doc__),
-    islower = interp2app(W_UnicodeObject.descr_islower,
-                         doc=UnicodeDocstrings.islower.__doc__),
-    isnumeric = interp2app(W_UnicodeObject.descr_isnumeric,
-                           doc=UnicodeDocstrings.isnumeric.__doc__),
-    isspace = interp2app(W_UnicodeObject.descr_isspace,
-                         doc=UnicodeDocstrings.isspace.__doc__),
-    istitle = interp2app(W_UnicodeObject.descr_istitle,
-                         doc=UnicodeDocstrings.istitle.__doc__),
-    isupper = interp2app(W_UnicodeObject.descr_isupper,
-                         doc=UnicodeDocstrings.isupper.__doc__),
-    join = interp2app(W_UnicodeObject.descr_join,
-                      doc=UnicodeDocstrings.join.__doc__),
-    ljust = interp2app(W_UnicodeObject.descr_ljust,
-                       doc=UnicodeDocstrings.ljust.__doc__),
-    rjust = interp2app(W_UnicodeObject.descr_rjust,
-                       doc=UnicodeDocstrings.rjust.__doc__),
-    lower = interp2app(W_UnicodeObject.descr_lower,
-                       doc=UnicodeDocstrings.lower.__doc__),
-    partition = interp2app(W_UnicodeObject.descr_partition,
-                           doc=UnicodeDocstrings.partition.__doc__),
-    rpartition = interp2app(W_UnicodeObject.descr_rpartition,
-                            doc=UnicodeDocstrings.rpartition.__doc__),
-    replace = interp2app(W_UnicodeObject.descr_replace,
-                         doc=UnicodeDocstrings.replace.__doc__),
-    split = interp2app(W_UnicodeObject.descr_split,
-                       doc=UnicodeDocstrings.split.__doc__),
-    rsplit = interp2app(W_UnicodeObject.descr_rsplit,
-                        doc=UnicodeDocstrings.rsplit.__doc__),
-    splitlines = interp2app(W_UnicodeObject.descr_splitlines,
-                            doc=UnicodeDocstrings.splitlines.__doc__),
-    startswith = interp2app(W_UnicodeObject.descr_startswith,
-                            doc=UnicodeDocstrings.startswith.__doc__),
-    endswith = interp2app(W_UnicodeObject.descr_endswith,
-                          doc=UnicodeDocstrings.endswith.__doc__),
-    strip = interp2app(W_UnicodeObject.descr_strip,
-                       doc=UnicodeDocstrings.strip.__doc__),
-    lstrip = interp2app(W_UnicodeObject.descr_lstrip,
-                        doc=UnicodeDocstrings.lstrip.__doc__),
-    rstrip = interp2app(W_UnicodeObject.descr_rstrip,
-                        doc=UnicodeDocstrings.rstrip.__doc__),
-    swapcase = interp2app(W_UnicodeObject.descr_swapcase,
-                          doc=UnicodeDocstrings.swapcase.__doc__),
-    title = interp2app(W_UnicodeObject.descr_title,
-                       doc=UnicodeDocstrings.title.__doc__),
-    translate = interp2app(W_UnicodeObject.descr_translate,
-                           doc=UnicodeDocstrings.translate.__doc__),
-    upper = interp2app(W_UnicodeObject.descr_upper,
-                       doc=UnicodeDocstrings.upper.__doc__),
-    zfill = interp2app(W_UnicodeObject.descr_zfill,
-                       doc=UnicodeDocstrings.zfill.__doc__),
-
-    format = interp2app(W_UnicodeObject.descr_format,
-                        doc=UnicodeDocstrings.format.__doc__),
-    __format__ = interp2app(W_UnicodeObject.descr__format__,
-                            doc=UnicodeDocstrings.__format__.__doc__),
-    __mod__ = interp2app(W_UnicodeObject.descr_mod,
-                         doc=UnicodeDocstrings.__mod__.__doc__),
-    __rmod__ = interp2app(W_UnicodeObject.descr_rmod,
-                         doc=UnicodeDocstrings.__rmod__.__doc__),
-    __getnewargs__ = interp2app(W_UnicodeObject.descr_getnewargs,
-                                doc=UnicodeDocstrings.__getnewargs__.__doc__),
-    _formatter_parser = interp2app(W_UnicodeObject.descr_formatter_parser),
-    _formatter_field_name_split =
-        interp2app(W_UnicodeObject.descr_formatter_field_name_split),
+    __repr__ = interpindirect2app(W_AbstractUnicodeObject.descr_repr,
+                                  doc=UnicodeDocstrings.__repr__.__doc__),
+    __str__ = interpindirect2app(W_AbstractUnicodeObject.descr_str,
+                                 doc=UnicodeDocstrings.__str__.__doc__),
+    __hash__ = interpindirect2app(W_AbstractUnicodeObject.descr_hash,
+                                  doc=UnicodeDocstrings.__hash__.__doc__),
+
+    __eq__ = interpindirect2app(W_AbstractUnicodeObject.descr_eq,
+                                doc=UnicodeDocstrings.__eq__.__doc__),
+    __ne__ = interpindirect2app(W_AbstractUnicodeObject.descr_ne,
+                                doc=UnicodeDocstrings.__ne__.__doc__),
+    __lt__ = interpindirect2app(W_AbstractUnicodeObject.descr_lt,
+                                doc=UnicodeDocstrings.__lt__.__doc__),
+    __le__ = interpindirect2app(W_AbstractUnicodeObject.descr_le,
+                                doc=UnicodeDocstrings.__le__.__doc__),
+    __gt__ = interpindirect2app(W_AbstractUnicodeObject.descr_gt,
+                                doc=UnicodeDocstrings.__gt__.__doc__),
+    __ge__ = interpindirect2app(W_AbstractUnicodeObject.descr_ge,
+                                doc=UnicodeDocstrings.__ge__.__doc__),
+
+    __len__ = interpindirect2app(W_AbstractUnicodeObject.descr_len,
+                                 doc=UnicodeDocstrings.__len__.__doc__),
+    __contains__ = interpindirect2app(
+        W_AbstractUnicodeObject.descr_contains,
+        doc=UnicodeDocstrings.__contains__.__doc__),
+
+    __add__ = interpindirect2app(W_AbstractUnicodeObject.descr_add,
+                                 doc=UnicodeDocstrings.__add__.__doc__),
+    __mul__ = interpindirect2app(W_AbstractUnicodeObject.descr_mul,
+                                 doc=UnicodeDocstrings.__mul__.__doc__),
+    __rmul__ = interpindirect2app(W_AbstractUnicodeObject.descr_rmul,
+                                  doc=UnicodeDocstrings.__rmul__.__doc__),
+
+    __getitem__ = interpindirect2app(
+        W_AbstractUnicodeObject.descr_getitem,
+        doc=UnicodeDocstrings.__getitem__.__doc__),
+    __getslice__ = interpindirect2app(
+        W_AbstractUnicodeObject.descr_getslice,
+        doc=UnicodeDocstrings.__getslice__.__doc__),
+
+    capitalize = interpindirect2app(W_AbstractUnicodeObject.descr_capitalize,
+                                    doc=UnicodeDocstrings.capitalize.__doc__),
+    center = interpindirect2app(W_AbstractUnicodeObject.descr_center,
+                                doc=UnicodeDocstrings.center.__doc__),
+    count = interpindirect2app(W_AbstractUnicodeObject.descr_count,
+                               doc=UnicodeDocstrings.count.__doc__),
+    decode = interpindirect2app(W_AbstractUnicodeObject.descr_decode,
+                                doc=UnicodeDocstrings.decode.__doc__),
+    encode = interpindirect2app(W_AbstractUnicodeObject.descr_encode,
+                                doc=UnicodeDocstrings.encode.__doc__),
+    expandtabs = interpindirect2app(W_AbstractUnicodeObject.descr_expandtabs,
+                                    doc=UnicodeDocstrings.expandtabs.__doc__),
+    find = interpindirect2app(W_AbstractUnicodeObject.descr_find,
+                              doc=UnicodeDocstrings.find.__doc__),
+    rfind = interpindirect2app(W_AbstractUnicodeObject.descr_rfind,
+                               doc=UnicodeDocstrings.rfind.__doc__),
+    index = interpindirect2app(W_AbstractUnicodeObject.descr_index,
+                               doc=UnicodeDocstrings.index.__doc__),
+    rindex = interpindirect2app(W_AbstractUnicodeObject.descr_rindex,
+                                doc=UnicodeDocstrings.rindex.__doc__),
+    isalnum = interpindirect2app(W_AbstractUnicodeObject.descr_isalnum,
+                                 doc=UnicodeDocstrings.isalnum.__doc__),
+    isalpha = interpindirect2app(W_AbstractUnicodeObject.descr_isalpha,
+                                 doc=UnicodeDocstrings.isalpha.__doc__),
+    isdecimal = interpindirect2app(W_AbstractUnicodeObject.descr_isdecimal,
+                                   doc=UnicodeDocstrings.isdecimal.__doc__),
+    isdigit = interpindirect2app(W_AbstractUnicodeObject.descr_isdigit,
+                                 doc=UnicodeDocstrings.isdigit.__doc__),
+    islower = interpindirect2app(W_AbstractUnicodeObject.descr_islower,
+                                 doc=UnicodeDocstrings.islower.__doc__),
+    isnumeric = interpindirect2app(W_AbstractUnicodeObject.descr_isnumeric,
+                                   doc=UnicodeDocstrings.isnumeric.__doc__),
+    isspace = interpindirect2app(W_AbstractUnicodeObject.descr_isspace,
+                                 doc=UnicodeDocstrings.isspace.__doc__),
+    istitle = interpindirect2app(W_AbstractUnicodeObject.descr_istitle,
+                                 doc=UnicodeDocstrings.istitle.__doc__),
+    isupper = interpindirect2app(W_AbstractUnicodeObject.descr_isupper,
+                                 doc=UnicodeDocstrings.isupper.__doc__),
+    join = interpindirect2app(W_AbstractUnicodeObject.descr_join,
+                              doc=UnicodeDocstrings.join.__doc__),
+    ljust = interpindirect2app(W_AbstractUnicodeObject.descr_ljust,
+                               doc=UnicodeDocstrings.ljust.__doc__),
+    rjust = interpindirect2app(W_AbstractUnicodeObject.descr_rjust,
+                               doc=UnicodeDocstrings.rjust.__doc__),
+    lower = interpindirect2app(W_AbstractUnicodeObject.descr_lower,
+                               doc=UnicodeDocstrings.lower.__doc__),
+    partition = interpindirect2app(W_AbstractUnicodeObject.descr_partition,
+                                   doc=UnicodeDocstrings.partition.__doc__),
+    rpartition = interpindirect2app(W_AbstractUnicodeObject.descr_rpartition,
+                                    doc=UnicodeDocstrings.rpartition.__doc__),
+    replace = interpindirect2app(W_AbstractUnicodeObject.descr_replace,
+                                 doc=UnicodeDocstrings.replace.__doc__),
+    split = interpindirect2app(W_AbstractUnicodeObject.descr_split,
+                               doc=UnicodeDocstrings.split.__doc__),
+    rsplit = interpindirect2app(W_AbstractUnicodeObject.descr_rsplit,
+                                doc=UnicodeDocstrings.rsplit.__doc__),
+    splitlines = interpindirect2app(W_AbstractUnicodeObject.descr_splitlines,
+                                    doc=UnicodeDocstrings.splitlines.__doc__),
+    startswith = interpindirect2app(W_AbstractUnicodeObject.descr_startswith,
+                                    doc=UnicodeDocstrings.startswith.__doc__),
+    endswith = interpindirect2app(W_AbstractUnicodeObject.descr_endswith,
+                                  doc=UnicodeDocstrings.endswith.__doc__),
+    strip = interpindirect2app(W_AbstractUnicodeObject.descr_strip,
+                               doc=UnicodeDocstrings.strip.__doc__),
+    lstrip = interpindirect2app(W_AbstractUnicodeObject.descr_lstrip,
+                                doc=UnicodeDocstrings.lstrip.__doc__),
+    rstrip = interpindirect2app(W_AbstractUnicodeObject.descr_rstrip,
+                                doc=UnicodeDocstrings.rstrip.__doc__),
+    swapcase = interpindirect2app(W_AbstractUnicodeObject.descr_swapcase,
+                                  doc=UnicodeDocstrings.swapcase.__doc__),
+    title = interpindirect2app(W_AbstractUnicodeObject.descr_title,
+                               doc=UnicodeDocstrings.title.__doc__),
+    translate = interpindirect2app(W_AbstractUnicodeObject.descr_translate,
+                                   doc=UnicodeDocstrings.translate.__doc__),
+    upper = interpindirect2app(W_AbstractUnicodeObject.descr_upper,
+                               doc=UnicodeDocstrings.upper.__doc__),
+    zfill = interpindirect2app(W_AbstractUnicodeObject.descr_zfill,
+                               doc=UnicodeDocstrings.zfill.__doc__),
+
+    format = interpindirect2app(W_AbstractUnicodeObject.descr_format,
+                                doc=UnicodeDocstrings.format.__doc__),
+    __format__ = interpindirect2app(W_AbstractUnicodeObject.descr__format__,
+                                    doc=UnicodeDocstrings.__format__.__doc__),
+    __mod__ = interpindirect2app(W_AbstractUnicodeObject.descr_mod,
+                                 doc=UnicodeDocstrings.__mod__.__doc__),
+    __rmod__ = interpindirect2app(W_AbstractUnicodeObject.descr_rmod,
+                                  doc=UnicodeDocstrings.__rmod__.__doc__),
+    __getnewargs__ = interpindirect2app(
+        W_AbstractUnicodeObject.descr_getnewargs,
+        doc=UnicodeDocstrings.__getnewargs__.__doc__),
+    _formatter_parser = interpindirect2app(
+        W_AbstractUnicodeObject.descr_formatter_parser),
+    _formatter_field_name_split = interpindirect2app(
+        W_AbstractUnicodeObject.descr_formatter_field_name_split),
 )
 W_UnicodeObject.typedef.flag_sequence_bug_compat = True
 
@@ -1842,8 +1944,9 @@ W_UnicodeObject.EMPTY = W_UnicodeObject('', 0)
 
 # Helper for converting int/long
 def unicode_to_decimal_w(space, w_unistr):
-    if not isinstance(w_unistr, W_UnicodeObject):
+    if not isinstance(w_unistr, W_AbstractUnicodeObject):
         raise oefmt(space.w_TypeError, "expected unicode, got '%T'", w_unistr)
+    w_unistr = w_unistr._force_w()
     utf8 = w_unistr._utf8
     result = StringBuilder(w_unistr._len())
     it = rutf8.Utf8StringIterator(utf8)
@@ -0,0 +1,343 @@
+"""
+Slices of large unicode strings that don't copy the characters.  Enabled
+with the option 'objspace.std.withunicodeslice'.
+
+This is the unicode version of bytessliceobject.py.  A
+W_UnicodeSliceObject references the W_UnicodeObject that it is a slice
+of, with the start and stop of the slice both in codepoints and in bytes
+of the utf-8 string.  Comparisons, '+', indexing, slicing and the
+searches work on the original string, whose index storage converts
+between codepoints and bytes.  The slice is turned into a real unicode
+object (see _force_w()) as soon as something else needs one.
+
+Like for str, a slice is only made if it is at least
+'bytesslicethreshold' bytes of utf-8 and at least 1/SLICE_MAX_RATIO of
+the original string; smaller slices are copied.
+"""
+
+import py
+
+from rpython.rlib.rstring import StringBuilder, endswith, startswith
+
+from pypy.interpreter.error import oefmt
+from pypy.objspace.std.bytessliceobject import SLICE_MAX_RATIO, compare_ranges
+from pypy.objspace.std.sliceobject import (
+    W_SliceObject, normalize_simple_slice, unwrap_start_stop)
+from pypy.objspace.std.unicodeobject import (
+    W_AbstractUnicodeObject, W_UnicodeObject)
+
+
+def unicode_slice(space, w_str, start, stop, byte_start, byte_stop):
+    """Return the characters start:stop of the W_UnicodeObject w_str,
+    which are the bytes byte_start:byte_stop of its utf-8 string, as a
+    W_UnicodeSliceObject if the slice is large enough."""
+    assert byte_start >= 0
+    assert byte_stop >= 0
+    size = byte_stop - byte_start
+    if (size >= space.config.objspace.std.bytesslicethreshold and
+            size * SLICE_MAX_RATIO >= len(w_str._utf8)):
+        return W_UnicodeSliceObject(w_str, start, stop, byte_start, byte_stop)
+    return W_UnicodeObject(w_str._utf8[byte_start:byte_stop], stop - start)
+
+def _as_unicode(space, w_obj):
+    return W_UnicodeObject.convert_arg_to_w_unicode(space, w_obj)
+
+def _parts(w_obj):
+    # (utf-8 string, byte start, byte stop) of a W_UnicodeObject or
+    # W_UnicodeSliceObject
+    if isinstance(w_obj, W_UnicodeSliceObject):
+        return w_obj._w_str._utf8, w_obj._bytestart, w_obj._bytestop
+    assert isinstance(w_obj, W_UnicodeObject)
+    s = w_obj._utf8
+    return s, 0, len(s)
+
+def compare(w_uni1, w_uni2):
+    """Like cmp() on the two unicode objects, without forcing the slices.
+    The order of utf-8 strings is the order of their codepoints."""
+    s1, start1, stop1 = _parts(w_uni1)
+    s2, start2, stop2 = _parts(w_uni2)
+    return compare_ranges(s1, start1, stop1, s2, start2, stop2)
+
+def equal(w_uni1, w_uni2):
+    s1, start1, stop1 = _parts(w_uni1)
+    s2, start2, stop2 = _parts(w_uni2)
+    if stop1 - start1 != stop2 - start2:
+        return False
+    return compare(w_uni1, w_uni2) == 0
+
+def concat(w_uni1, w_uni2):
+    """w_uni1 + w_uni2, copying the characters of the slices only once."""
+    s1, start1, stop1 = _parts(w_uni1)
+    s2, start2, stop2 = _parts(w_uni2)
+    builder = StringBuilder((stop1 - start1) + (stop2 - start2))
+    builder.append_slice(s1, start1, stop1)
+    builder.append_slice(s2, start2, stop2)
+    return W_UnicodeObject(builder.build(), w_uni1._len() + w_uni2._len())
+
+
+class W_UnicodeSliceObject(W_AbstractUnicodeObject):
+    _attrs_ = ['_w_str', '_start', '_stop', '_bytestart', '_bytestop']
+
+    def __init__(self, w_str, start, stop, byte_start, byte_stop):
+        assert isinstance(w_str, W_UnicodeObject)
+        assert 0 <= start <= stop <= w_str._len()
+        assert 0 <= byte_start <= byte_stop <= len(w_str._utf8)
+        self._w_str = w_str
+        self._start = start
+        self._stop = stop
+        self._bytestart = byte_start
+        self._bytestop = byte_stop
+
+    def __repr__(self):
+        """representation for debugging purposes"""
+        return "%s(%r, %d, %d)" % (self.__class__.__name__,
+                                   self._w_str._utf8, self._start, self._stop)
+
+    def _force_w(self):
+        """Return the slice as a W_UnicodeObject, and stop referencing
+        the rest of the original string."""
+        w_str = self._w_str
+        if (self._bytestart != 0 or self._bytestop != len(w_str._utf8) or
+                w_str.user_overridden_class):
+            byte_start = self._bytestart
+            byte_stop = self._bytestop
+            assert byte_start >= 0
+            assert byte_stop >= 0
+            w_str = W_UnicodeObject(w_str._utf8[byte_start:byte_stop],
+                                    self._len())
+            self._w_str = w_str
+            self._start = 0
+            self._stop = w_str._len()
+            self._bytestart = 0
+            self._bytestop = len(w_str._utf8)
+        return w_str
+
+    def _len(self):
+        return self._stop - self._start
+
+    def _byte_pos(self, index):
+        # the position in the utf-8 string of the original object of the
+        # character 'index' of the slice, with 0 <= index <= len(self)
+        if index == 0:
+            return self._bytestart
+        if index == self._len():
+            return self._bytestop
+        return self._w_str._index_to_byte(self._start + index)
+
+    def str_w(self, space):
+        return self._force_w().str_w(space)
+
+    def utf8_w(self, space):
+        return self._force_w().utf8_w(space)
+
+    def readbuf_w(self, space):
+        return self._force_w().readbuf_w(space)
+
+    def writebuf_w(self, space):
+        return self._force_w().writebuf_w(space)
+
+    def charbuf_w(self, space):
+        return self._force_w().charbuf_w(space)
+
+    def ord(self, space):
+        return self._force_w().ord(space)
+
+    def convert_to_w_unicode(self, space):
+        return self._force_w()
+
+    def descr_len(self, space):
+        return space.newint(self._len())
+
+    def _sliced(self, space, start, stop):
+        assert 0 <= start < stop
+        return unicode_slice(space, self._w_str, self._start + start,
+                             self._start + stop, self._byte_pos(start),
+                             self._byte_pos(stop))
+
+    def descr_getitem(self, space, w_index):
+        length = self._len()
+        if isinstance(w_index, W_SliceObject):
+            start, stop, step, sl = w_index.indices4(space, length)
+            if sl == 0:
+                return W_UnicodeObject.EMPTY
+            elif step == 1:
+                return self._sliced(space, start, stop)
+            return self._force_w().descr_getitem(space, w_index)
+        index = space.getindex_w(w_index, space.w_IndexError, "string index")
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise oefmt(space.w_IndexError, "string index out of range")
+        return self._w_str._getitem_result(space, self._start + index)
+
+    def descr_getslice(self, space, w_start, w_stop):
+        start, stop = normalize_simple_slice(space, self._len(), w_start,
+                                             w_stop)
+        if start == stop:
+            return W_UnicodeObject.EMPTY
+        return self._sliced(space, start, stop)
+
+    # comparisons, '+' and the searches are done in the original string,
+    # without forcing the slice
+
+    def descr_eq(self, space, w_other):
+        if not isinstance(w_other, W_AbstractUnicodeObject):
+            # str, which is decoded, or NotImplemented
+            return self._force_w().descr_eq(space, w_other)
+        return space.newbool(equal(self, w_other))
+
+    def descr_ne(self, space, w_other):
+        if not isinstance(w_other, W_AbstractUnicodeObject):
+            return self._force_w().descr_ne(space, w_other)
+        return space.newbool(not equal(self, w_other))
+
+    def descr_lt(self, space, w_other):
+        if not isinstance(w_other, W_AbstractUnicodeObject):
+            return self._force_w().descr_lt(space, w_other)
+        return space.newbool(compare(self, w_other) < 0)
+
+    def descr_le(self, space, w_other):
+        if not isinstance(w_other, W_AbstractUnicodeObject):
+            return self._force_w().descr_le(space, w_other)
+        return space.newbool(compare(self, w_other) <= 0)
+
+    def descr_gt(self, space, w_other):
+        if not isinstance(w_other, W_AbstractUnicodeObject):
+            return self._force_w().descr_gt(space, w_other)
+        return space.newbool(compare(self, w_other) > 0)
+
+    def descr_ge(self, space, w_other):
+        if not isinstance(w_other, W_AbstractUnicodeObject):
+            return self._force_w().descr_ge(space, w_other)
+        return space.newbool(compare(self, w_other) >= 0)
+
+    def descr_add(self, space, w_other):
+        if not isinstance(w_other, W_AbstractUnicodeObject):
+            return self._force_w().descr_add(space, w_other)
+        return concat(self, w_other)
+
+    def _search(self, space, w_sub, w_start, w_end, forward):
+        # like W_UnicodeObject._unwrap_and_search()
+        sub = _as_unicode(space, w_sub)._utf8
+        length = self._len()
+        start, end = unwrap_start_stop(space, length, w_start, w_end)
+        if end > length:
+            end = length
+        if start > end:
+            return None
+        utf8 = self._w_str._utf8
+        if forward:
+            res = utf8.find(sub, self._byte_pos(start), self._byte_pos(end))
+        else:
+            res = utf8.rfind(sub, self._byte_pos(start), self._byte_pos(end))
+        if res < 0:
+            return None
+        return space.newint(self._w_str._byte_to_index(res) - self._start)
+
+    def descr_find(self, space, w_sub, w_start=None, w_end=None):
+        w_result = self._search(space, w_sub, w_start, w_end, True)
+        if w_result is None:
+            w_result = space.newint(-1)
+        return w_result
+
+    def descr_rfind(self, space, w_sub, w_start=None, w_end=None):
+        w_result = self._search(space, w_sub, w_start, w_end, False)
+        if w_result is None:
+            w_result = space.newint(-1)
+        return w_result
+
+    def descr_index(self, space, w_sub, w_start=None, w_end=None):
+        w_result = self._search(space, w_sub, w_start, w_end, True)
+        if w_result is None:
+            raise oefmt(space.w_ValueError,
+                        "substring not found in string.index")
+        return w_result
+
+    def descr_rindex(self, space, w_sub, w_start=None, w_end=None):
+        w_result = self._search(space, w_sub, w_start, w_end, False)
+        if w_result is None:
+            raise oefmt(space.w_ValueError,
+                        "substring not found in string.rindex")
+        return w_result
+
+    def descr_count(self, space, w_sub, w_start=None, w_end=None):
+        w_sub = _as_unicode(space, w_sub)
+        if w_sub._len() == 0:
+            return self._force_w().descr_count(space, w_sub, w_start, w_end)
+        length = self._len()
+        start, end = unwrap_start_stop(space, length, w_start, w_end)
+        if end > length:
+            end = length
+        if start > end:
+            return space.newint(0)
+        return space.newint(self._w_str._utf8.count(
+            w_sub._utf8, self._byte_pos(start), self._byte_pos(end)))
+
+    def descr_contains(self, space, w_sub):
+        return space.newbool(self._search(space, w_sub, None, None, True)
+                             is not None)
+
+    def _startswith_endswith(self, space, w_fix, w_start, w_end, prefix):
+        # like W_UnicodeObject.descr_startswith() and descr_endswith()
+        if space.isinstance_w(w_fix, space.w_tuple):
+            fixes_w = space.fixedview(w_fix)
+        else:
+            fixes_w = [w_fix]
+        length = self._len()
+        start, end = unwrap_start_stop(space, length, w_start, w_end)
+        if end > length:
+            end = length
+        utf8 = self._w_str._utf8
+        for w_fix in fixes_w:
+            fix = _as_unicode(space, w_fix)._utf8
+            if len(fix) == 0:
+                return space.w_True
+            if start > end:
+                continue
+            byte_start = self._byte_pos(start)
+            byte_end = self._byte_pos(end)
+            if prefix:
+                found = startswith(utf8, fix, byte_start, byte_end)
+            else:
+                found = endswith(utf8, fix, byte_start, byte_end)
+            if found:
+                return space.w_True
+        return space.w_False
+
+    def descr_startswith(self, space, w_prefix, w_start=None, w_end=None):
+        return self._startswith_endswith(space, w_prefix, w_start, w_end,
+                                         True)
+
+    def descr_endswith(self, space, w_suffix, w_start=None, w_end=None):
+        return self._startswith_endswith(space, w_suffix, w_start, w_end,
+                                         False)
+
+
+def _make_forcing_method(name, argnames):
+    # the other methods force the slice and call the W_UnicodeObject method
+    args = ', '.join(['space'] + argnames)
+    source = py.code.Source("""
+    def %(name)s(self, %(args)s):
+        return self._force_w().%(name)s(%(args)s)
+    """ % {'name': name, 'args': args})
+    d = {}
+    exec source.compile() in d
+    return d[name]
+
+def _install_forcing_methods():
+    import inspect
+    for name, func in W_AbstractUnicodeObject.__dict__.items():
+        if (not name.startswith('descr_') or
+                name in W_UnicodeSliceObject.__dict__):
+            continue
+        argnames = inspect.getargs(func.func_code).args
+        assert argnames[:2] == ['self', 'space']
+        meth = _make_forcing_method(name, argnames[2:])
+        meth.func_defaults = func.func_defaults
+        if hasattr(func, 'unwrap_spec'):
+            meth.unwrap_spec = func.unwrap_spec
+        setattr(W_UnicodeSliceObject, name, meth)
+
+_install_forcing_methods()
+
+W_UnicodeSliceObject.typedef = W_UnicodeObject.typedef
@@ -18,7 +18,8 @@ DEBUG_COUNTER = lltype.Struct('DEBUG_COUNTER',
     # 'b'ridge, 'l'abel or # 'e'ntry point
     ('i', lltype.Signed),      # first field, at offset 0
     ('type', lltype.Char),
-    ('number', lltype.Signed)
+    ('number', lltype.Signed),
+    ('flushed', lltype.Signed) # value of 'i' at the last jitlog flush
 )
 
 class GuardToken(object):
@@ -76,6 +77,8 @@ class BaseAssembler(object):
         # do not rely on this attribute if you test for jitlog
         self._debug = False
         self.loop_run_counters = []
+        # plan the spilling with a linear scan, see LifetimeManager.linear_scan
+        self.linear_scan_regalloc = False
 
         # XXX register allocation statistics to be removed later
         self.num_moves_calls = 0
@@ -387,6 +390,7 @@ class BaseAssembler(object):
         struct = lltype.malloc(DEBUG_COUNTER, flavor='raw',
                                track_allocation=False)
         struct.i = 0
+        struct.flushed = 0
         struct.type = tp
         if tp == 'b' or tp == 'e':
             struct.number = number
@@ -428,12 +432,14 @@ class BaseAssembler(object):
         length = len(self.loop_run_counters)
         for i in range(length):
             struct = self.loop_run_counters[i]
-            # only log if it has been executed
-            if struct.i > 0:
-                jl._log_jit_counter(struct)
-            # reset the counter, flush in a later point in time will
-            # add up the counters!
-            struct.i = 0
+            # only log if it has been executed since the last flush.
+            # The jitlog gets the increments, which the reader adds up;
+            # 'i' itself keeps counting, for finish_once() and
+            # get_all_loop_runs()
+            count = struct.i - struct.flushed
+            if count > 0:
+                jl._log_counter(struct.number, struct.type, count)
+            struct.flushed = struct.i
         # here would be the point to free some counters
         # see YYY comment above! but first we should run this every once in a while
         # not just when jitlog_disable is called
@@ -1,6 +1,7 @@
 import sys
 from rpython.jit.metainterp.history import Const, REF, JitCellToken
 from rpython.rlib.objectmodel import we_are_translated, specialize
+from rpython.rlib.listsort import make_timsort_class
 from rpython.jit.metainterp.resoperation import rop, AbstractValue
 from rpython.rtyper.lltypesystem import lltype
 from rpython.rtyper.lltypesystem.lloperation import llop
@@ -426,8 +427,10 @@ class RegisterManager(object):
 
         # try to spill a variable that has no further real usages, ie that only
         # appears in failargs or in a jump
-        # if that doesn't exist, spill the variable that has a real_usage that
-        # is the furthest away from the current position
+        # if that doesn't exist, spill a variable that the linear scan (if it
+        # ran) planned to keep in the frame at the current position
+        # otherwise, spill the variable that has a real_usage that is the
+        # furthest away from the current position
 
         # YYY check for fixed variable usages
         if regs is None:
@@ -438,6 +441,8 @@ class RegisterManager(object):
         candidate = None
         cur_max_age_failargs = -1
         candidate_from_failargs = None
+        cur_max_planned_use_distance = -1
+        candidate_planned = None
         for next in regs:
             reg = self.reg_bindings[next]
             if next in forbidden_vars:
@@ -462,11 +467,17 @@ class RegisterManager(object):
                     candidate_from_failargs = next
             else:
                 use_distance = lifetime.next_real_usage(position) - position
+                if lifetime.is_planned_spill(position):
+                    if cur_max_planned_use_distance < use_distance:
+                        cur_max_planned_use_distance = use_distance
+                        candidate_planned = next
                 if cur_max_use_distance < use_distance:
                     cur_max_use_distance = use_distance
                     candidate = next
         if candidate_from_failargs is not None:
             return candidate_from_failargs
+        if candidate_planned is not None:
+            return candidate_planned
         if candidate is not None:
             return candidate
         raise NoVariableToSpill
@@ -834,6 +845,11 @@ class Lifetime(object):
         # the other lifetime will have this variable set to self.definition_pos
         self._definition_pos_shared = UNDEF_POS
 
+        # ranges (start, end) between two real usages during which the linear
+        # scan decided that the variable should rather live in the frame.
+        # None if linear scan did not run or kept the variable in a register
+        self.spill_ranges = None
+
     def last_usage_including_sharing(self):
         while self.share_with is not None:
             self = self.share_with
@@ -860,6 +876,23 @@ class Lifetime(object):
                 low = mid + 1
         return l[low]
 
+    def is_planned_spill(self, position):
+        """ returns True if the linear scan decided that at position the
+        variable is better kept in the frame than in a register. """
+        if self.spill_ranges is None:
+            return False
+        for (start, end) in self.spill_ranges:
+            if start <= position < end:
+                return True
+        return False
+
+    def is_fixed_at(self, position, reg):
+        if self.fixed_positions is not None:
+            for (index, fixed_reg) in self.fixed_positions:
+                if index == position and fixed_reg is reg:
+                    return True
+        return False
+
     def definition_pos_shared(self):
         if self._definition_pos_shared != UNDEF_POS:
             return self._definition_pos_shared
@@ -933,6 +966,43 @@ class FixedRegisterPositions(object):
         return "%s: fixed at %s" % (self.register, self.index_lifetimes)
 
 
+class LiveSegment(object):
+    """ A part of a lifetime between its definition or a real usage and the
+    next real usage, used by the linear scan. """
+    def __init__(self, start, end, lifetime, is_gcref=False):
+        self.start = start
+        self.end = end
+        self.lifetime = lifetime
+        self.is_gcref = is_gcref
+        # the register that the linear scan gave to the segment, if any
+        self.reg = None
+
+    def first_crossed_position(self):
+        """ The value must survive the operations from this position up to
+        (excluding) self.end in a register.  The operation at self.start
+        only counts if it uses the value rather than defining it.  (The
+        inputargs start at a negative position.) """
+        if self.start == self.lifetime.definition_pos:
+            return max(self.start + 1, 0)
+        return self.start
+
+    def spill(self):
+        lifetime = self.lifetime
+        if lifetime.spill_ranges is None:
+            lifetime.spill_ranges = []
+        lifetime.spill_ranges.append((self.start, self.end))
+
+    def __repr__(self):
+        return "<LiveSegment %s-%s>" % (self.start, self.end)
+
+def _segment_lt(a, b):
+    if a.start != b.start:
+        return a.start < b.start
+    return a.end < b.end
+
+LiveSegmentSort = make_timsort_class(lt=_segment_lt)
+
+
 class LifetimeManager(object):
     def __init__(self, longevity):
         self.longevity = longevity
@@ -1036,6 +1106,138 @@ class LifetimeManager(object):
         # to do in the current system
         return None
 
+    def linear_scan(self, vars, regs, save_around_call_regs=None, calls=None):
+        """ Plan the spilling of the variables in 'vars', which all compete
+        for the registers in 'regs', with a linear scan.
+
+        The lifetimes are split at their real usages into segments. Every
+        segment ends in a real usage, so spilling a segment means that the
+        variable stays in the frame and is reloaded at the end of the segment.
+        The segments are scanned in order of their start and get a register
+        that is free for their whole length.  A register is not free for a
+        segment if the segment crosses a position where the register is fixed
+        (see fixed_register), or if it crosses a call in 'calls' (a list of
+        (position, save_all_regs) in increasing order) and the register is in
+        'save_around_call_regs'; crossing a call with SAVE_ALL_REGS, or a call
+        with SAVE_GCREF_REGS for a gc pointer, leaves no register at all.
+        If there is no register, the segment that ends the furthest away
+        among itself and the ones holding a register it could use is
+        spilled, preferring variables that were already spilled before (the
+        frame location stays valid, so spilling them again is free).
+        The result is stored in Lifetime.spill_ranges and consulted by
+        RegisterManager._pick_variable_to_spill. """
+        if save_around_call_regs is None:
+            save_around_call_regs = []
+        if calls is None:
+            calls = []
+        segments = []
+        end_pos = 0
+        for v in vars:
+            lifetime = self.longevity[v]
+            lifetime.spill_ranges = None
+            if lifetime.real_usages is None:
+                continue
+            start = lifetime.definition_pos
+            for use in lifetime.real_usages:
+                if use > start:
+                    segments.append(LiveSegment(start, use, lifetime,
+                                                v.type == REF))
+                start = use
+            end_pos = max(end_pos, start + 1)
+        LiveSegmentSort(segments).sort()
+        for (position, save_all_regs) in calls:
+            end_pos = max(end_pos, position + 1)
+        # number of calls (of any kind, with SAVE_ALL_REGS, with
+        # SAVE_GCREF_REGS) before every position
+        calls_before = [0] * (end_pos + 1)
+        all_calls_before = [0] * (end_pos + 1)
+        gcref_calls_before = [0] * (end_pos + 1)
+        for (position, save_all_regs) in calls:
+            calls_before[position + 1] += 1
+            if save_all_regs == SAVE_ALL_REGS:
+                all_calls_before[position + 1] += 1
+            elif save_all_regs == SAVE_GCREF_REGS:
+                gcref_calls_before[position + 1] += 1
+        for i in range(1, end_pos + 1):
+            calls_before[i] += calls_before[i - 1]
+            all_calls_before[i] += all_calls_before[i - 1]
+            gcref_calls_before[i] += gcref_calls_before[i - 1]
+        # the segments come in order of their start, so the fixed positions
+        # before the current start can be skipped for good
+        fixed_cursors = [0] * len(regs)
+        active = []
+        for segment in segments:
+            # expire the segments that end before this one starts
+            i = 0
+            while i < len(active):
+                if active[i].end <= segment.start:
+                    del active[i]
+                else:
+                    i += 1
+            lo = segment.first_crossed_position()
+            hi = segment.end
+            usable = []
+            if (all_calls_before[hi] == all_calls_before[lo] and
+                    (not segment.is_gcref or
+                     gcref_calls_before[hi] == gcref_calls_before[lo])):
+                crosses_call = calls_before[hi] != calls_before[lo]
+                for i in range(len(regs)):
+                    reg = regs[i]
+                    if crosses_call and reg in save_around_call_regs:
+                        continue
+                    if self._fixed_register_crossed(reg, segment,
+                                                    fixed_cursors, i):
+                        continue
+                    usable.append(reg)
+            for reg in usable:
+                for other in active:
+                    if other.reg is reg:
+                        break
+                else:
+                    segment.reg = reg
+                    active.append(segment)
+                    break
+            if segment.reg is not None:
+                continue
+            victim = segment
+            for other in active:
+                if other.end < segment.end or other.reg not in usable:
+                    continue
+                if victim.lifetime.spill_ranges is None:
+                    if (other.lifetime.spill_ranges is not None or
+                            other.end > victim.end):
+                        victim = other
+                elif (other.lifetime.spill_ranges is not None and
+                        other.end > victim.end):
+                    victim = other
+            if victim is not segment:
+                segment.reg = victim.reg
+                active.remove(victim)
+                active.append(segment)
+            victim.spill()
+
+    def _fixed_register_crossed(self, reg, segment, fixed_cursors, i):
+        """ Is 'reg' fixed (for another variable, or for none at all) at a
+        position that 'segment' crosses? """
+        fixed_reg_pos = self.fixed_register_use.get(reg, None)
+        if fixed_reg_pos is None:
+            return False
+        index_lifetimes = fixed_reg_pos.index_lifetimes
+        k = fixed_cursors[i]
+        while k < len(index_lifetimes) and (
+                index_lifetimes[k][0] < segment.start):
+            k += 1
+        fixed_cursors[i] = k
+        lo = segment.first_crossed_position()
+        while k < len(index_lifetimes):
+            index = index_lifetimes[k][0]
+            if index >= segment.end:
+                break
+            if index >= lo and not segment.lifetime.is_fixed_at(index, reg):
+                return True
+            k += 1
+        return False
+
     def __contains__(self, var):
         return var in self.longevity
 
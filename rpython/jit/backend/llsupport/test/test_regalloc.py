@@ -9,7 +9,7 @@ from rpython.jit.backend.detect_cpu import getcpuclass
 from rpython.jit.backend.llsupport.regalloc import FrameManager, LinkedList
 from rpython.jit.backend.llsupport.regalloc import RegisterManager as BaseRegMan,\
      Lifetime as RealLifetime, UNDEF_POS, BaseRegalloc, compute_vars_longevity,\
-     LifetimeManager
+     LifetimeManager, SAVE_DEFAULT_REGS, SAVE_GCREF_REGS, SAVE_ALL_REGS
 from rpython.jit.tool.oparser import parse
 from rpython.jit.codewriter.effectinfo import EffectInfo
 from rpython.rtyper.lltypesystem import lltype
@@ -404,6 +404,83 @@ def test_chained_coalescing():
     loc = longevity.try_pick_free_reg(5, b4, [r0, r1])
     assert loc is r0
 
+def test_linear_scan_splits_lifetime():
+    b0, b1, b2 = newboxes(0, 0, 0)
+    l0 = Lifetime(0, 10, [1, 10])
+    l1 = Lifetime(0, 3, [2, 3])
+    l2 = Lifetime(1, 3, [2, 3])
+    longevity = LifetimeManager({b0: l0, b1: l1, b2: l2})
+    longevity.linear_scan([b0, b1, b2], [r0, r1])
+    # b0 is needed in a register at 1 and at 10, but is kept in the frame in
+    # between, where b1 and b2 need the registers
+    assert l0.spill_ranges == [(1, 10)]
+    assert l1.spill_ranges is None
+    assert l2.spill_ranges is None
+    assert not l0.is_planned_spill(0)
+    assert l0.is_planned_spill(1)
+    assert l0.is_planned_spill(5)
+    assert not l0.is_planned_spill(10)
+
+def test_linear_scan_prefers_spilled_vars():
+    b0, b1, b3, b4, b5 = newboxes(0, 0, 0, 0, 0)
+    l0 = Lifetime(0, 8, [5, 8])
+    l1 = Lifetime(1, 2)
+    l3 = Lifetime(4, 9)
+    l4 = Lifetime(1, 3)
+    l5 = Lifetime(6, 7)
+    longevity = LifetimeManager({b0: l0, b1: l1, b3: l3, b4: l4, b5: l5})
+    longevity.linear_scan([b0, b1, b3, b4, b5], [r0, r1])
+    # at 6, b3 is used later than b0, but b0 is already in the frame, so
+    # spilling it again costs nothing
+    assert l0.spill_ranges == [(0, 5), (5, 8)]
+    assert l3.spill_ranges is None
+    assert l5.spill_ranges is None
+
+def test_linear_scan_call_clobbers():
+    b0, b1, b2 = newboxes(0, 0, 0)
+    l0 = Lifetime(0, 10, [1, 10])
+    l1 = Lifetime(0, 8, [1, 8])
+    l2 = Lifetime(4, 6, [5, 6])
+    longevity = LifetimeManager({b0: l0, b1: l1, b2: l2})
+    # r0 is caller-save, so only r1 survives the call at 3.  b0 and b1 both
+    # cross it, the one used later is left in the frame.  b2 is defined
+    # after the call and gets r0
+    longevity.linear_scan([b0, b1, b2], [r0, r1], [r0], [(3, SAVE_DEFAULT_REGS)])
+    assert l0.spill_ranges == [(1, 10)]
+    assert l1.spill_ranges is None
+    assert l2.spill_ranges is None
+
+def test_linear_scan_call_saves_all_regs():
+    b0, b1 = newboxes(0, 0)
+    b2 = InputArgRef()
+    l0 = Lifetime(0, 10, [1, 10])
+    l1 = Lifetime(0, 2, [1, 2])
+    l2 = Lifetime(0, 10, [1, 10])
+    longevity = LifetimeManager({b0: l0, b1: l1, b2: l2})
+    # the value used as an argument of the call at 2 does not survive it
+    longevity.linear_scan([b0, b1], [r0, r1], [r0], [(2, SAVE_ALL_REGS)])
+    assert l0.spill_ranges == [(1, 10)]
+    assert l1.spill_ranges is None
+    # only the gc pointers have to survive a SAVE_GCREF_REGS call in the frame
+    longevity.linear_scan([b0, b2], [r0, r1], [r0], [(2, SAVE_GCREF_REGS)])
+    assert l0.spill_ranges is None
+    assert l2.spill_ranges == [(1, 10)]
+
+def test_linear_scan_fixed_register():
+    b0, b1, b2 = newboxes(0, 0, 0)
+    l0 = Lifetime(0, 10, [1, 10])
+    l1 = Lifetime(0, 4, [1, 4])
+    l2 = Lifetime(0, 6, [1, 6])
+    longevity = LifetimeManager({b0: l0, b1: l1, b2: l2})
+    # r0 is blocked at 3 and r1 is needed for b1 at 4: b0 and b2 cross both
+    # positions, so only one of them fits into r2
+    longevity.fixed_register(3, r0)
+    longevity.fixed_register(4, r1, b1)
+    longevity.linear_scan([b0, b1, b2], [r0, r1, r2])
+    assert l0.spill_ranges == [(1, 10)]
+    assert l1.spill_ranges is None
+    assert l2.spill_ranges is None
+
 
 class TestRegalloc(object):
     def test_freeing_vars(self):
@@ -681,6 +758,25 @@ class TestRegalloc(object):
         assert spilled2 is loc
         rm._check_invariants()
 
+    def test_spill_planned_by_linear_scan(self):
+        b0, b1, b2, b3, b4 = newboxes(0, 1, 2, 3, 4)
+        longevity = {b0: Lifetime(0, 5, [1, 5]), b1: Lifetime(0, 3, [1, 3]),
+                     b2: Lifetime(0, 10, [1, 10]), b3: Lifetime(0, 4, [1, 4]),
+                     b4: Lifetime(2, 3)}
+        longevity[b0].spill_ranges = [(1, 5)]
+        fm = TFrameManager()
+        asm = MockAsm()
+        rm = RegisterManager(longevity, frame_manager=fm, assembler=asm)
+        rm.next_instruction()
+        for b in b0, b1, b2, b3:
+            rm.force_allocate_reg(b)
+        rm.position = 2
+        loc = rm.loc(b0)
+        # without the plan, b2 would be spilled: its next use is furthest
+        spilled = rm.force_allocate_reg(b4)
+        assert spilled is loc
+        rm._check_invariants()
+
     def test_hint_frame_locations_1(self):
         for hint_value in range(11):
             b0, = newboxes(0)
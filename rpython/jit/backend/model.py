@@ -54,6 +54,12 @@ class AbstractCPU(object):
         """
         return False
 
+    def set_linear_scan_regalloc(self, value):
+        """ Select whether the register allocator plans its spilling with a
+        linear scan over the whole trace. Does nothing by default.
+        """
+        pass
+
     def compile_loop(self, inputargs, operations, looptoken, jd_id=0,
                      unique_id=0, log=True, name='', logger=None):
         """Assemble the given loop.
@@ -42,6 +42,15 @@ def compute_gc_level(calldescr, guard_not_forced=False):
         return SAVE_DEFAULT_REGS
 
 
+# the long long operations that _consider_real_call() does without a call
+_INLINE_LLONG_OOPSPECS = (EffectInfo.OS_LLONG_ADD, EffectInfo.OS_LLONG_SUB,
+                          EffectInfo.OS_LLONG_AND, EffectInfo.OS_LLONG_OR,
+                          EffectInfo.OS_LLONG_XOR, EffectInfo.OS_LLONG_TO_INT,
+                          EffectInfo.OS_LLONG_FROM_INT,
+                          EffectInfo.OS_LLONG_FROM_UINT,
+                          EffectInfo.OS_LLONG_EQ, EffectInfo.OS_LLONG_NE)
+
+
 class X86RegisterManager(RegisterManager):
     box_types = [INT, REF]
     all_regs = [ecx, eax, edx, ebx, esi, edi]
@@ -196,8 +205,70 @@ class RegAlloc(BaseRegalloc, VectorRegallocMixin):
                                   assembler = self.assembler)
         self.xrm = xmm_reg_mgr_cls(self.longevity, frame_manager = self.fm,
                                    assembler = self.assembler)
+        if self.assembler.linear_scan_regalloc:
+            self._plan_linear_scan(inputargs, operations)
         return operations
 
+    def _plan_linear_scan(self, inputargs, operations):
+        gpr_vars = []
+        xmm_vars = []
+        gpr_calls = []
+        xmm_calls = []
+        for var in inputargs:
+            if var.type == FLOAT or var.is_vector():
+                xmm_vars.append(var)
+            else:
+                gpr_vars.append(var)
+        for i in range(len(operations)):
+            op = operations[i]
+            gc_level = self._linear_scan_call_level(op)
+            if gc_level >= 0:
+                # like _call(): the xmm registers only see SAVE_ALL_REGS,
+                # the gc pointers are only saved with a shadowstack
+                if gc_level == SAVE_ALL_REGS:
+                    xmm_calls.append((i, SAVE_ALL_REGS))
+                else:
+                    xmm_calls.append((i, SAVE_DEFAULT_REGS))
+                if (gc_level == SAVE_GCREF_REGS and
+                        not self.assembler.cpu.gc_ll_descr.gcrootmap):
+                    gc_level = SAVE_DEFAULT_REGS
+                gpr_calls.append((i, gc_level))
+            if op.type == 'v' or op not in self.longevity:
+                continue
+            if op.type == FLOAT or op.is_vector():
+                xmm_vars.append(op)
+            else:
+                gpr_vars.append(op)
+        self.longevity.linear_scan(gpr_vars, self.rm.all_regs,
+                                   self.rm.save_around_call_regs, gpr_calls)
+        self.longevity.linear_scan(xmm_vars, self.xrm.all_regs,
+                                   self.xrm.save_around_call_regs, xmm_calls)
+
+    def _linear_scan_call_level(self, op):
+        """ If 'op' is turned into a call that clobbers the registers (see
+        _call() and consider_guard_not_forced_2()), return its gc_level.
+        Otherwise return -1. """
+        opnum = op.getopnum()
+        if rop.is_call_assembler(opnum):
+            return SAVE_ALL_REGS
+        if opnum == rop.GUARD_NOT_FORCED_2:
+            return SAVE_ALL_REGS
+        if rop.is_call_may_force(opnum) or rop.is_call_release_gil(opnum):
+            return compute_gc_level(op.getdescr(), guard_not_forced=True)
+        if rop.is_plain_call(opnum):
+            calldescr = op.getdescr()
+            effectinfo = calldescr.get_extra_info()
+            if effectinfo is not None:
+                oopspecindex = effectinfo.oopspecindex
+                if (oopspecindex == EffectInfo.OS_MATH_SQRT or
+                    oopspecindex == EffectInfo.OS_THREADLOCALREF_GET or
+                    oopspecindex == EffectInfo.OS_MATH_READ_TIMESTAMP):
+                    return -1        # done inline
+                if IS_X86_32 and oopspecindex in _INLINE_LLONG_OOPSPECS:
+                    return -1        # see _consider_real_call()
+            return compute_gc_level(calldescr)
+        return -1
+
     def prepare_loop(self, inputargs, operations, looptoken, allgcrefs):
         operations = self._prepare(inputargs, operations, allgcrefs)
         self._set_initial_bindings(inputargs, looptoken)
@@ -55,6 +55,9 @@ class AbstractX86CPU(AbstractLLCPU):
     def set_debug(self, flag):
         return self.assembler.set_debug(flag)
 
+    def set_linear_scan_regalloc(self, flag):
+        self.assembler.linear_scan_regalloc = flag
+
     def setup(self):
         self.assembler = Assembler386(self, self.translate_support_code)
 
@@ -431,3 +431,48 @@ class TestCheckRegistersExplicitly64(BaseTestCheckRegistersExplicitly):
             # 2 ptrs to save before call (p249, p244)
             # 1 for argument shuffling (ecx => edx)
             assert len(self.filter_log_moves()) == 10
+
+
+class TestLinearScan(BaseTestCheckRegistersExplicitly):
+    def setup_method(self, meth):
+        BaseTestCheckRegistersExplicitly.setup_method(self, meth)
+        self.cpu.set_linear_scan_regalloc(True)
+
+    def teardown_method(self, meth):
+        self.cpu.set_linear_scan_regalloc(False)
+        BaseTestCheckRegistersExplicitly.teardown_method(self, meth)
+
+    def test_many_live_values(self):
+        # more values are live at once than there are general purpose
+        # registers, so the linear scan has to plan some spilling
+        n = 20
+        lines = ["[%s]" % ", ".join(["i%d" % i for i in range(n)])]
+        for i in range(n):
+            lines.append("i%d = int_add(i%d, i%d)" % (100 + i, i, (i + 1) % n))
+        for i in range(n):
+            lines.append("i%d = int_mul(i%d, i%d)" % (200 + i, 100 + i, i))
+        lines.append("guard_true(i0) [%s]" % ", ".join(
+            ["i%d" % (200 + i) for i in range(n)]))
+        lines.append("finish()")
+        args = [0] + range(2, n + 1)
+        self.interpret("\n".join(lines), args)
+        expected = [(args[i] + args[(i + 1) % n]) * args[i] for i in range(n)]
+        assert self.getints(n) == expected
+
+    def test_many_live_values_around_call(self):
+        # the values that survive the call only fit partly into the
+        # callee-saved registers, the plan must leave the others in the frame
+        n = 12
+        lines = ["[%s]" % ", ".join(["i%d" % i for i in range(n)])]
+        for i in range(n):
+            lines.append("i%d = int_add(i%d, 1)" % (100 + i, i))
+        lines.append("i99 = call_i(ConstClass(f1ptr), i0, descr=f1_calldescr)")
+        for i in range(n):
+            lines.append("i%d = int_add(i%d, i99)" % (200 + i, 100 + i))
+        lines.append("guard_true(i0) [%s]" % ", ".join(
+            ["i%d" % (200 + i) for i in range(n)]))
+        lines.append("finish()")
+        args = [0] + range(2, n + 1)     # the guard fails
+        self.interpret("\n".join(lines), args)
+        expected = [args[i] + 1 + (args[0] + 1) for i in range(n)]
+        assert self.getints(n) == expected
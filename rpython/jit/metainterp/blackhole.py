@@ -17,6 +17,7 @@ from rpython.rtyper.lltypesystem import lltype, llmemory, rffi
 from rpython.rtyper import rclass
 from rpython.rtyper.lltypesystem.lloperation import llop
 from rpython.rlib.jit_libffi import CIF_DESCRIPTION_P
+from rpython.rlib.jit import Counters
 
 SIZE_LIVE_OP = OFFSET_SIZE + 1
 
@@ -1769,6 +1770,7 @@ def resume_in_blackhole(metainterp_sd, jitdriver_sd, resumedescr, deadframe,
                         all_virtuals=None):
     from rpython.jit.metainterp.resume import blackhole_from_resumedata
     #debug_start('jit-blackhole')
+    metainterp_sd.profiler.count(Counters.BLACKHOLE)
     blackholeinterp = blackhole_from_resumedata(
         metainterp_sd.blackholeinterpbuilder,
         metainterp_sd.jitcodes,
@@ -1787,6 +1789,7 @@ def convert_and_run_from_pyjitpl(metainterp, raising_exception=False):
     # 'metainterp.framestack'.
     #debug_start('jit-blackhole')
     metainterp_sd = metainterp.staticdata
+    metainterp_sd.profiler.count(Counters.BLACKHOLE)
     nextbh = None
     for frame in metainterp.framestack:
         curbh = metainterp_sd.blackholeinterpbuilder.acquire_interp()
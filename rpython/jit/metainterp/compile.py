@@ -690,6 +690,9 @@ class AbstractResumeGuardDescr(ResumeDescr):
         raise NotImplementedError("abstract base class")
 
     def handle_fail(self, deadframe, metainterp_sd, jitdriver_sd):
+        metainterp_sd.profiler.count(Counters.GUARD_FAILURES)
+        metainterp_sd.guard_failures.guard_failed(self)
+        metainterp_sd.jitlog.guard_failed(self)
         if (self.must_compile(deadframe, metainterp_sd, jitdriver_sd)
                 and not rstack.stack_almost_full()):
             self.start_compiling()
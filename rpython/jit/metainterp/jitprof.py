@@ -7,6 +7,7 @@ from rpython.rlib.debug import debug_print, debug_start, debug_stop
 from rpython.rlib.debug import have_debug_prints
 from rpython.jit.metainterp.jitexc import JitException
 from rpython.rlib.jit import Counters
+from rpython.rlib.objectmodel import compute_unique_id
 
 
 JITPROF_LINES = Counters.ncounters + 1 + 1
@@ -158,6 +159,9 @@ class Profiler(BaseProfiler):
         self._print_intline("nvirtuals", cnt[Counters.NVIRTUALS])
         self._print_intline("nvholes", cnt[Counters.NVHOLES])
         self._print_intline("nvreused", cnt[Counters.NVREUSED])
+        self._print_intline("guard failures", cnt[Counters.GUARD_FAILURES])
+        self._print_intline("blackhole", cnt[Counters.BLACKHOLE])
+        self._print_intline("resumed frames", cnt[Counters.RESUMED_FRAMES])
         self._print_intline("vecopt tried", cnt[Counters.OPT_VECTORIZE_TRY])
         self._print_intline("vecopt success", cnt[Counters.OPT_VECTORIZED])
         cpu = self.cpu
@@ -183,3 +187,24 @@ class Profiler(BaseProfiler):
 
 class BrokenProfilerData(JitException):
     pass
+
+
+class GuardFailures(object):
+    """ Counts how often each guard failed.  Disabled by default, see
+    jit_hooks.stats_set_guard_failures().  A guard is identified by the
+    compute_unique_id() of its fail descr, which is also the number of
+    the bridge attached to it.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.counts = {}
+
+    def set_enabled(self, flag):
+        self.enabled = flag
+        if not flag:
+            self.counts.clear()
+
+    def guard_failed(self, descr):
+        if self.enabled:
+            number = compute_unique_id(descr)
+            self.counts[number] = self.counts.get(number, 0) + 1
@@ -10,7 +10,7 @@ from rpython.jit.metainterp import history, compile, resume, executor, jitexc
 from rpython.jit.metainterp.heapcache import HeapCache
 from rpython.jit.metainterp.history import (Const, ConstInt, ConstPtr,
     ConstFloat, CONST_NULL, TargetToken, MissingValue, SwitchToBlackhole)
-from rpython.jit.metainterp.jitprof import EmptyProfiler
+from rpython.jit.metainterp.jitprof import EmptyProfiler, GuardFailures
 from rpython.jit.metainterp.logger import Logger
 from rpython.jit.metainterp.optimizeopt.util import args_dict
 from rpython.jit.metainterp.resoperation import rop, OpHelpers, GuardResOp
@@ -2052,6 +2052,7 @@ class MetaInterpStaticData(object):
         self.jitlog.logger_ops = self.logger_ops
 
         self.profiler = ProfilerClass()
+        self.guard_failures = GuardFailures()
         self.profiler.cpu = cpu
         self.warmrunnerdesc = warmrunnerdesc
         if warmrunnerdesc:
@@ -1077,6 +1077,7 @@ def rebuild_from_resumedata(metainterp, storage, deadframe,
         resumereader.consume_boxes(f.get_current_position_info(),
                                    f.registers_i, f.registers_r, f.registers_f)
         f.handle_rvmprof_enter_on_resume()
+        metainterp.staticdata.profiler.count(jitprof.Counters.RESUMED_FRAMES)
     return resumereader.liveboxes, virtualizable_boxes, virtualref_boxes
 
 
@@ -1356,6 +1357,7 @@ def blackhole_from_resumedata(blackholeinterpbuilder, jitcodes,
         curbh.setposition(jitcode, pc)
         resumereader.consume_one_section(curbh)
         curbh.handle_rvmprof_enter()
+        metainterp_sd.profiler.count(jitprof.Counters.RESUMED_FRAMES)
     return curbh
 
 def force_from_resumedata(metainterp_sd, storage, deadframe, vinfo, ginfo):
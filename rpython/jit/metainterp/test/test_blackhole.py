@@ -130,6 +130,8 @@ def test_convert_and_run_from_pyjitpl():
                 def start_blackhole(): pass
                 @staticmethod
                 def end_blackhole(): pass
+                @staticmethod
+                def count(kind, inc=1): pass
         last_exc_value = None
         framestack = [MyMIFrame()]
     MyMetaInterp.staticdata.blackholeinterpbuilder = getblackholeinterp(
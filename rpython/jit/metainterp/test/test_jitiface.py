@@ -157,6 +157,41 @@ class JitHookInterfaceTests(object):
             assert jit_hooks.stats_get_times_value(None, Counters.TRACING) == 0
         self.meta_interp(main, [], ProfilerClass=EmptyProfiler)
 
+    def test_guard_failures(self):
+        driver = JitDriver(greens = [], reds = ['i', 's'])
+
+        def loop(i):
+            s = 0
+            while i > 0:
+                driver.jit_merge_point(i=i, s=s)
+                if i % 2:
+                    s += 1
+                i -= 1
+                s+= 2
+            return s
+
+        def main():
+            jit_hooks.stats_set_guard_failures(None, True)
+            loop(30)
+            l = jit_hooks.stats_get_guard_failures(None, True)
+            total = 0
+            for i in range(len(l)):
+                total += l[i].counter
+            assert total >= 1
+            assert total == jit_hooks.stats_get_counter_value(None,
+                                                   Counters.GUARD_FAILURES)
+            assert jit_hooks.stats_get_counter_value(None,
+                                                   Counters.BLACKHOLE) >= 1
+            assert jit_hooks.stats_get_counter_value(None,
+                                                   Counters.RESUMED_FRAMES) >= 1
+            # reset=True cleared the counts
+            assert len(jit_hooks.stats_get_guard_failures(None, False)) == 0
+            jit_hooks.stats_set_guard_failures(None, False)
+            loop(30)
+            assert len(jit_hooks.stats_get_guard_failures(None, False)) == 0
+
+        self.meta_interp(main, [], ProfilerClass=Profiler)
+
     def test_get_jitcell_at_key(self):
         driver = JitDriver(greens = ['s'], reds = ['i'], name='jit')
 
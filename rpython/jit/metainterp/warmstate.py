@@ -326,6 +326,11 @@ class WarmEnterState(object):
     def set_param_vec_cost(self, ivalue):
         self.vec_cost = ivalue
 
+    def set_param_regalloc_linear_scan(self, value):
+        # note: it's a global parameter, not a per-jitdriver one
+        if self.cpu is not None:    # for tests
+            self.cpu.set_linear_scan_regalloc(bool(value))
+
     def disable_noninlinable_function(self, greenkey):
         cell = self.JitCell.ensure_jit_cell_at_key(greenkey)
         cell.flags |= JC_DONT_TRACE_HERE
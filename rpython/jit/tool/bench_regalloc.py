@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+"""
+Compare the default register allocator with the linear scan one (jit
+parameter regalloc_linear_scan) on the workloads of
+pypy/module/pypyjit/test_pypy_c, i.e. on the 'main' functions that the tests
+there pass to self.run() together with literal arguments.
+
+Every workload is run by the given pypy-c with and without the linear scan.
+The numbers of spills and reloads are taken from the jit-regalloc-stats log
+sections (see regallocstats.py), the time is the best of several runs of the
+loop that calls main() 'iterations' times after it was warmed up.  The
+result is printed as CSV:
+
+    bench_regalloc.py [-k substring] [--repeat=N] [--iterations=N] pypy-c
+"""
+
+import sys
+import os
+import ast
+import glob
+import optparse
+import subprocess
+import tempfile
+import textwrap
+
+from rpython.jit.tool.regallocstats import parse_regalloc_stats
+
+TEST_PYPY_C = os.path.join(os.path.dirname(__file__), '..', '..', '..',
+                           'pypy', 'module', 'pypyjit', 'test_pypy_c')
+
+SPILL_KEYS = ['num moves spills', 'num moves spills to existing',
+              'num moves register reloads']
+
+RUNNER = """
+import sys, time
+sys.setcheckinterval(10000000)
+%(source)s
+args = %(args)r
+for i in xrange(%(iterations)d):     # warm up, compile the loops
+    main(*args)
+t0 = time.time()
+for i in xrange(%(iterations)d):
+    main(*args)
+print time.time() - t0
+"""
+
+def _function_source(lines, funcdef):
+    """ Cut the source of the (nested) function 'funcdef' out of 'lines'. """
+    first = funcdef.lineno - 1
+    indent = funcdef.col_offset
+    result = [lines[first]]
+    for line in lines[first + 1:]:
+        stripped = line.strip()
+        if stripped and len(line) - len(line.lstrip()) <= indent:
+            break
+        result.append(line)
+    while result and not result[-1].strip():
+        result.pop()
+    return textwrap.dedent(''.join(result))
+
+def extract_workloads(source, filename='?'):
+    """ Return a list of (name, source of main, args) for the test methods
+    in 'source' that define a function main() and call self.run(main, args)
+    with literal args. """
+    lines = source.splitlines(True)
+    tree = ast.parse(source, filename)
+    workloads = []
+    for cls in tree.body:
+        if not isinstance(cls, ast.ClassDef):
+            continue
+        for meth in cls.body:
+            if (not isinstance(meth, ast.FunctionDef) or
+                    not meth.name.startswith('test_')):
+                continue
+            main = None
+            for stmt in meth.body:
+                if isinstance(stmt, ast.FunctionDef) and stmt.name == 'main':
+                    main = stmt
+            if main is None:
+                continue
+            for node in ast.walk(meth):
+                if not (isinstance(node, ast.Call) and
+                        isinstance(node.func, ast.Attribute) and
+                        node.func.attr == 'run' and len(node.args) >= 2 and
+                        isinstance(node.args[0], ast.Name) and
+                        node.args[0].id == 'main'):
+                    continue
+                try:
+                    args = ast.literal_eval(node.args[1])
+                except ValueError:
+                    continue
+                if not isinstance(args, list):
+                    continue
+                name = '%s.%s' % (os.path.basename(filename), meth.name)
+                workloads.append((name, _function_source(lines, main), args))
+                break
+    return workloads
+
+def find_workloads(directory=TEST_PYPY_C, keyword=''):
+    workloads = []
+    for filename in sorted(glob.glob(os.path.join(directory, 'test_*.py'))):
+        f = open(filename)
+        try:
+            source = f.read()
+        finally:
+            f.close()
+        for workload in extract_workloads(source, filename):
+            if keyword in workload[0]:
+                workloads.append(workload)
+    return workloads
+
+def run_workload(pypy, source, args, linear_scan, iterations, tmpdir):
+    """ Run the workload once, return (time, regalloc stats) or None if it
+    failed. """
+    script = os.path.join(tmpdir, 'workload.py')
+    logfile = os.path.join(tmpdir, 'workload.log')
+    f = open(script, 'w')
+    try:
+        f.write(RUNNER % {'source': source, 'args': args,
+                          'iterations': iterations})
+    finally:
+        f.close()
+    env = os.environ.copy()
+    env['PYPYLOG'] = 'jit-regalloc-stats:' + logfile
+    cmdline = [pypy, '-S', '--jit', 'regalloc_linear_scan=%d' % linear_scan,
+               script]
+    pipe = subprocess.Popen(cmdline, env=env, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE)
+    stdout, stderr = pipe.communicate()
+    if pipe.returncode != 0:
+        return None
+    f = open(logfile)
+    try:
+        stats = parse_regalloc_stats(f)
+    finally:
+        f.close()
+    return float(stdout.splitlines()[-1]), stats
+
+def main(pypy, options):
+    tmpdir = tempfile.mkdtemp(prefix='bench_regalloc-')
+    columns = ['time', 'loops'] + SPILL_KEYS
+    print ','.join(['workload'] +
+                   ['%s %s' % (mode, key) for mode in ('greedy', 'linear')
+                                          for key in columns])
+    for name, source, args in find_workloads(keyword=options.keyword):
+        row = [name]
+        for linear_scan in (0, 1):
+            best = None
+            for i in range(options.repeat):
+                result = run_workload(pypy, source, args, linear_scan,
+                                      options.iterations, tmpdir)
+                if result is None:
+                    break
+                if best is None or result[0] < best[0]:
+                    best = result
+            if best is None:
+                row = None
+                break
+            row.append('%.4f' % best[0])
+            row += [str(best[1][key]) for key in ['loops'] + SPILL_KEYS]
+        if row is None:
+            print >> sys.stderr, '%s: failed, skipped' % (name,)
+            continue
+        print ','.join(row)
+        sys.stdout.flush()
+
+if __name__ == '__main__':
+    parser = optparse.OptionParser(usage="%prog [options] pypy-c")
+    parser.add_option('-k', dest='keyword', default='',
+                      help='only run the workloads whose name contains this')
+    parser.add_option('--repeat', type=int, default=3,
+                      help='take the best time of this many runs')
+    parser.add_option('--iterations', type=int, default=100,
+                      help='number of calls to main() per run')
+    options, args = parser.parse_args()
+    if len(args) != 1:
+        parser.print_help()
+        sys.exit(2)
+    main(args[0], options)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""
+Sum up the register allocation statistics (the jit-regalloc-stats sections)
+of one or several logs produced by pypy-c-jit when PYPYLOG is set.
+
+Used to compare the default register allocator with the linear scan one, e.g.
+by running the same workload with and without --jit regalloc_linear_scan=1:
+
+    PYPYLOG=jit-regalloc-stats:greedy.log pypy-c bench.py
+    PYPYLOG=jit-regalloc-stats:linear.log pypy-c --jit regalloc_linear_scan=1 bench.py
+    regallocstats.py greedy.log linear.log
+
+bench_regalloc.py does that, and measures the time, for the workloads of
+pypy/module/pypyjit/test_pypy_c.
+"""
+
+import sys
+import optparse
+import re
+
+KEYS = ['assembler size', 'number ops',
+        'num moves calls', 'num moves jump', 'num moves spills',
+        'num moves spills to existing', 'num moves register reloads']
+
+def parse_regalloc_stats(log):
+    """ Return a dict mapping the keys in KEYS to their sum over all the
+    loops and bridges in the log.  The preamble and loop body counters are
+    added together. """
+    result = dict.fromkeys(KEYS, 0)
+    result['loops'] = 0
+    in_section = False
+    for line in log:
+        if '{jit-regalloc-stats' in line:
+            in_section = True
+            result['loops'] += 1
+            continue
+        if 'jit-regalloc-stats}' in line:
+            in_section = False
+            continue
+        if not in_section:
+            continue
+        match = re.match(r'(preamble )?([a-z ]+):\s*(\d+)\s*$', line)
+        if match is None:
+            continue
+        key = match.group(2).strip()
+        if key == 'num register reloads':    # preamble spelling
+            key = 'num moves register reloads'
+        if key in result:
+            result[key] += int(match.group(3))
+    return result
+
+def main(logfiles, options):
+    stats = []
+    for logfile in logfiles:
+        f = open(logfile)
+        try:
+            stats.append(parse_regalloc_stats(f))
+        finally:
+            f.close()
+    print ','.join(['key'] + logfiles)
+    for key in ['loops'] + KEYS:
+        print ','.join([key] + [str(s[key]) for s in stats])
+
+if __name__ == '__main__':
+    parser = optparse.OptionParser(usage="%prog logfile [logfile...]")
+    options, args = parser.parse_args()
+    if len(args) < 1:
+        parser.print_help()
+        sys.exit(2)
+    main(args, options)
@@ -0,0 +1,71 @@
+from cStringIO import StringIO
+from rpython.jit.tool.regallocstats import parse_regalloc_stats
+
+def test_regallocstats():
+    log = StringIO("""
+[1200] {jit-backend-addr
+Loop 0 (<code object f>) has address 0x1000 to 0x1100 (bootstrap 0x1000)
+[1201] jit-backend-addr}
+[1202] {jit-regalloc-stats
+Loop 0 (<code object f>) has address 0x1000 to 0x1100 (bootstrap 0x1000)
+assembler size:  256
+number ops:  40
+preamble num moves calls:  3
+preamble num moves jump: 1
+preamble num moves spills: 4
+preamble num moves spills to existing: 1
+preamble num register reloads: 2
+num moves calls:  5
+num moves jump: 2
+num moves spills: 6
+num moves spills to existing: 3
+num moves register reloads: 7
+[1203] jit-regalloc-stats}
+[1300] {jit-regalloc-stats
+bridge out of Guard 0x1050 has address 0x2000 to 0x2040
+assembler size:  64
+number ops:  10
+num moves spills: 1
+[1301] jit-regalloc-stats}
+""")
+    stats = parse_regalloc_stats(log)
+    assert stats['loops'] == 2
+    assert stats['assembler size'] == 320
+    assert stats['number ops'] == 50
+    assert stats['num moves calls'] == 8
+    assert stats['num moves jump'] == 3
+    assert stats['num moves spills'] == 11
+    assert stats['num moves spills to existing'] == 4
+    assert stats['num moves register reloads'] == 9
+
+def test_extract_workloads():
+    from rpython.jit.tool.bench_regalloc import extract_workloads
+    source = '''
+class TestFoo(BaseTestPyPyC):
+    def test_loop(self):
+        def main(n):
+            i = 0
+            while i < n:
+
+                i += 1
+            return i
+        #
+        log = self.run(main, [1000])
+        assert log.result == 1000
+
+    def test_no_literal_args(self):
+        def main(n):
+            return n
+        log = self.run(main, [self.N])
+
+    def test_no_main(self):
+        log = self.run(src, [1])
+'''
+    workloads = extract_workloads(source, 'test_foo.py')
+    assert len(workloads) == 1
+    name, src, args = workloads[0]
+    assert name == 'test_foo.py.test_loop'
+    assert args == [1000]
+    d = {}
+    exec src in d
+    assert d['main'](*args) == 1000
@@ -164,6 +164,9 @@ class GCBase(object):
         self.collect()
         return True
 
+    def trim_memory(self):
+        return 0
+
     def malloc(self, typeid, length=0, zero=False):
         """NOT_RPYTHON
         For testing.  The interface used by the gctransformer is
@@ -21,9 +21,22 @@ class GcHooks(object):
     def is_gc_collect_enabled(self):
         return False
 
-    def on_gc_minor(self, duration, total_memory_used, pinned_objects):
+    def get_alloc_sample_interval(self):
         """
-        Called after a minor collection
+        Return N > 0 to have on_gc_alloc_sample() called about every N
+        bytes allocated in the nursery, or 0 to disable it.  A new value
+        is taken into account at the next minor collection, or the next
+        time the GC is asked for more nursery space.
+        """
+        return 0
+
+    def on_gc_minor(self, duration, total_memory_used, pinned_objects,
+                    nursery_size, surviving_size):
+        """
+        Called after a minor collection.  ``surviving_size`` is the number
+        of bytes moved out of the nursery, and ``nursery_size`` the size of
+        the nursery used from now on (it changes only with adaptive nursery
+        sizing, see incminimark.adapt_nursery_size()).
         """
 
     def on_gc_collect_step(self, duration, oldstate, newstate):
@@ -45,13 +58,23 @@ class GcHooks(object):
         Called after a major collection is fully done
         """
 
+    def on_gc_alloc_sample(self, size):
+        """
+        Called before the allocation which crosses the next multiple of
+        get_alloc_sample_interval() bytes allocated in the nursery.
+        ``size`` is that interval, i.e. the number of bytes this sample
+        stands for.
+        """
+
     # the fire_* methods are meant to be called from the GC are should NOT be
     # overridden
 
     @rgc.no_collect
-    def fire_gc_minor(self, duration, total_memory_used, pinned_objects):
+    def fire_gc_minor(self, duration, total_memory_used, pinned_objects,
+                      nursery_size, surviving_size):
         if self.is_gc_minor_enabled():
-            self.on_gc_minor(duration, total_memory_used, pinned_objects)
+            self.on_gc_minor(duration, total_memory_used, pinned_objects,
+                             nursery_size, surviving_size)
 
     @rgc.no_collect
     def fire_gc_collect_step(self, duration, oldstate, newstate):
@@ -68,3 +91,7 @@ class GcHooks(object):
                                arenas_count_before, arenas_count_after,
                                arenas_bytes, rawmalloc_bytes_before,
                                rawmalloc_bytes_after)
+
+    @rgc.no_collect
+    def fire_gc_alloc_sample(self, size):
+        self.on_gc_alloc_sample(size)
@@ -9,6 +9,13 @@ Environment variables can be used to fine-tune the following parameters:
  PYPY_GC_NURSERY_DEBUG   If set to non-zero, will fill nursery with garbage,
                          to help debugging.
 
+ PYPY_GC_NURSERY_MIN     If either of these two is set, the nursery size
+ PYPY_GC_NURSERY_MAX     adapts between minor collections, within these
+                         bounds, depending on the fraction of the nursery
+                         that survives and on the duration of the minor
+                         collections.  PYPY_GC_NURSERY is then the initial
+                         size, and the default for the missing bound.
+
  PYPY_GC_INCREMENT_STEP  The size of memory marked during the marking step.
                          Default is size of nursery * 2. If you mark it too high
                          your GC is not incremental at all. The minimum is set
@@ -52,6 +59,28 @@ Environment variables can be used to fine-tune the following parameters:
                          in time.  Defaults to a conservative value depending
                          on nursery size and maximum object size inside the
                          nursery.  Useful for debugging by setting it to 0.
+
+ PYPY_GC_MARK_PREFETCH   The number of objects whose header is prefetched
+                         into the cache before they are marked during the
+                         marking steps of major collections.  Marking a
+                         heap much larger than the cache is dominated by
+                         cache misses, which this hides; it doesn't help
+                         on heaps below a few hundred MB.  Defaults to 0
+                         (off); try values like 16.
+
+ PYPY_GC_TRIM            If the arenas hold more than this amount of memory
+                         that is not used by objects at the end of a major
+                         collection, give the free pages back to the OS
+                         (with madvise()) and trim the malloc() heap.
+                         Defaults to 0 (off); try values like '64MB'.  See
+                         also gc.trim().
+
+ PYPY_GC_HUGEPAGES       If set to non-zero, try to back the nursery and
+                         the arenas with (transparent) huge pages, which
+                         reduces TLB misses on large heaps.  The arena size
+                         is then rounded up to 2MB.  If the OS refuses, the
+                         GC silently uses normal pages.  See the
+                         'hugepage_memory' entry of gc.get_stats().
 """
 # XXX Should find a way to bound the major collection threshold by the
 # XXX total addressable size.  Maybe by keeping some minimarkpage arenas
@@ -64,6 +93,7 @@ import sys
 import os
 import time
 from rpython.rtyper.lltypesystem import lltype, llmemory, llarena, llgroup
+from rpython.rtyper.lltypesystem import rffi
 from rpython.rtyper.lltypesystem.lloperation import llop
 from rpython.rtyper.lltypesystem.llmemory import raw_malloc_usage
 from rpython.memory.gc.base import GCBase, MovingGCBase
@@ -75,6 +105,7 @@ from rpython.rlib.debug import ll_assert, debug_print, debug_start, debug_stop
 from rpython.rlib.objectmodel import specialize
 from rpython.rlib import rgc
 from rpython.memory.gc.minimarkpage import out_of_memory
+from rpython.translator.tool.cbuild import ExternalCompilationInfo
 
 #
 # Handles the objects in 2 generations:
@@ -94,6 +125,43 @@ from rpython.memory.gc.minimarkpage import out_of_memory
 
 WORD = LONG_BIT // 8
 
+# Hint the CPU that we are about to read and write the memory at 'addr'.
+_prefetch_eci = ExternalCompilationInfo(post_include_bits=["""
+static void pypy__gc_prefetch(void *addr) {
+#ifdef __GNUC__
+    __builtin_prefetch(addr, 1, 3);
+#endif
+}
+"""])
+
+def _prefetch_emulator(addr):
+    pass
+
+gc_prefetch = rffi.llexternal(
+    "pypy__gc_prefetch", [llmemory.Address], lltype.Void,
+    _callable=_prefetch_emulator, compilation_info=_prefetch_eci,
+    _nowrapper=True, sandboxsafe=True)
+
+# Give the free memory at the top of the malloc() heap back to the OS.
+_malloc_trim_eci = ExternalCompilationInfo(post_include_bits=["""
+#ifdef __GLIBC__
+#include <malloc.h>
+#endif
+static void pypy__gc_malloc_trim(void) {
+#ifdef __GLIBC__
+    malloc_trim(0);
+#endif
+}
+"""])
+
+def _malloc_trim_emulator():
+    pass
+
+gc_malloc_trim = rffi.llexternal(
+    "pypy__gc_malloc_trim", [], lltype.Void,
+    _callable=_malloc_trim_emulator, compilation_info=_malloc_trim_eci,
+    _nowrapper=True, sandboxsafe=True)
+
 first_gcflag = 1 << (LONG_BIT//2)
 
 # The following flag is set on objects if we need to do something to
@@ -289,6 +357,11 @@ class IncrementalMiniMarkGC(MovingGCBase):
                  growth_rate_max=2.5,   # for tests
                  card_page_indices=0,
                  large_object=8*WORD,
+                 mark_prefetch_distance=0,
+                 trim_threshold=0,
+                 hugepages=False,
+                 nursery_min_size=0,
+                 nursery_max_size=0,
                  ArenaCollectionClass=None,
                  **kwds):
         "NOT_RPYTHON"
@@ -296,6 +369,17 @@ class IncrementalMiniMarkGC(MovingGCBase):
         assert small_request_threshold % WORD == 0
         self.read_from_env = read_from_env
         self.nursery_size = nursery_size
+        self.nursery_min_size = nursery_min_size
+        self.nursery_max_size = nursery_max_size
+        self.adaptive_nursery = False
+        self.nursery_adapt_count = 0
+        self.nursery_adapt_used = 0
+        self.nursery_adapt_surviving = 0
+        self.nursery_adapt_max_duration = 0.0
+        self.mark_prefetch_distance = mark_prefetch_distance
+        self.trim_threshold = trim_threshold
+        self.hugepages = hugepages
+        self.nursery_hugepages = False
 
         self.small_request_threshold = small_request_threshold
         self.major_collection_threshold = major_collection_threshold
@@ -321,6 +405,16 @@ class IncrementalMiniMarkGC(MovingGCBase):
         self.nursery_free = llmemory.NULL
         self.nursery_top  = llmemory.NULL
         self.debug_tiny_nursery = -1
+        #
+        # Allocation sampling (see GcHooks.get_alloc_sample_interval()):
+        # 'alloc_sample_countdown' is the number of bytes left to allocate
+        # from 'alloc_sample_start' before the next sample is taken.  If
+        # that point is before the end of the current part of the nursery,
+        # 'nursery_top' is lowered to it and the real top is saved in
+        # 'alloc_sample_top'.
+        self.alloc_sample_start = llmemory.NULL
+        self.alloc_sample_top = llmemory.NULL
+        self.alloc_sample_countdown = -1
         self.debug_rotating_nurseries = lltype.nullptr(NURSARRAY)
         self.extra_threshold = 0
         #
@@ -330,6 +424,8 @@ class IncrementalMiniMarkGC(MovingGCBase):
             ArenaCollectionClass = minimarkpage.ArenaCollection
         self.ac = ArenaCollectionClass(arena_size, page_size,
                                        small_request_threshold)
+        if hugepages:
+            self.ac.use_hugepages()
         #
         # Used by minor collection: a list of (mostly non-young) objects that
         # (may) contain a pointer to a young object.  Populated by
@@ -436,11 +532,16 @@ class IncrementalMiniMarkGC(MovingGCBase):
         self.old_objects_pointing_to_pinned = self.AddressStack()
         self.updated_old_objects_pointing_to_pinned = False
         #
+        # The FIFO of visit_all_objects_step_prefetch().  Kept here instead
+        # of being allocated at every marking step; empty between steps.
+        self.mark_prefetch_fifo = self.AddressDeque()
+        #
         # Allocate a nursery.  In case of auto_nursery_size, start by
         # allocating a very small nursery, enough to do things like look
         # up the env var, which requires the GC; and then really
         # allocate the nursery of the final size.
         if not self.read_from_env:
+            self._init_nursery_bounds()
             self.allocate_nursery()
             self.gc_increment_step = self.nursery_size * 4
             self.gc_nursery_debug = False
@@ -452,7 +553,12 @@ class IncrementalMiniMarkGC(MovingGCBase):
             self.allocate_nursery()
             #
             # From there on, the GC is fully initialized and the code
-            # below can use it
+            # below can use it.  Check this one first, before anything
+            # is allocated in the arenas.
+            if env.read_uint_from_env('PYPY_GC_HUGEPAGES') > 0:
+                self.hugepages = True
+                self.ac.use_hugepages()
+            #
             newsize = env.read_from_env('PYPY_GC_NURSERY')
             # PYPY_GC_NURSERY=smallvalue means that minor collects occur
             # very frequently; the extreme case is PYPY_GC_NURSERY=1, which
@@ -505,9 +611,25 @@ class IncrementalMiniMarkGC(MovingGCBase):
                 self.gc_nursery_debug = True
             else:
                 self.gc_nursery_debug = False
+            #
+            mark_prefetch = env.read_uint_from_env('PYPY_GC_MARK_PREFETCH')
+            if mark_prefetch > 0:
+                self.mark_prefetch_distance = intmask(mark_prefetch)
+            #
+            trim_threshold = env.read_uint_from_env('PYPY_GC_TRIM')
+            if trim_threshold > 0:
+                self.trim_threshold = intmask(trim_threshold)
+            #
+            nursery_min_size = env.read_uint_from_env('PYPY_GC_NURSERY_MIN')
+            if nursery_min_size > 0:
+                self.nursery_min_size = intmask(nursery_min_size)
+            nursery_max_size = env.read_uint_from_env('PYPY_GC_NURSERY_MAX')
+            if nursery_max_size > 0:
+                self.nursery_max_size = intmask(nursery_max_size)
             self._minor_collection()    # to empty the nursery
             llarena.arena_free(self.nursery)
             self.nursery_size = newsize
+            self._init_nursery_bounds()
             self.allocate_nursery()
         #
         env_max_number_of_pinned_objects = os.environ.get('PYPY_GC_MAX_PINNED')
@@ -522,7 +644,10 @@ class IncrementalMiniMarkGC(MovingGCBase):
         else:
             # Estimate this number conservatively
             bigobj = self.nonlarge_max + 1
-            self.max_number_of_pinned_objects = self.nursery_size / (bigobj * 2)
+            nursery_size = self.nursery_size
+            if self.adaptive_nursery:
+                nursery_size = self.nursery_min_size
+            self.max_number_of_pinned_objects = nursery_size / (bigobj * 2)
 
     def enable(self):
         self.enabled = True
@@ -533,8 +658,36 @@ class IncrementalMiniMarkGC(MovingGCBase):
     def isenabled(self):
         return self.enabled
 
+    def _init_nursery_bounds(self):
+        # Adaptive nursery sizing is enabled if at least one of
+        # 'nursery_min_size' and 'nursery_max_size' is given; the other one
+        # defaults to 'nursery_size'.  The nursery is allocated with the
+        # maximum size, but only its first 'nursery_size' bytes are used.
+        if self.nursery_min_size <= 0 and self.nursery_max_size <= 0:
+            return
+        if self.debug_tiny_nursery >= 0:
+            return
+        minsize = 2 * (self.nonlarge_max + 1)
+        if self.nursery_min_size <= 0:
+            self.nursery_min_size = self.nursery_size
+        if self.nursery_max_size <= 0:
+            self.nursery_max_size = self.nursery_size
+        self.nursery_min_size = max(self.nursery_min_size, minsize)
+        self.nursery_min_size &= ~(WORD-1)
+        self.nursery_max_size = max(self.nursery_max_size,
+                                    self.nursery_min_size)
+        self.nursery_max_size &= ~(WORD-1)
+        nursery_size = min(max(self.nursery_size, self.nursery_min_size),
+                           self.nursery_max_size)
+        assert nursery_size > 0
+        self.nursery_size = nursery_size
+        self.adaptive_nursery = (self.nursery_min_size <
+                                 self.nursery_max_size)
+
     def _nursery_memory_size(self):
         extra = self.nonlarge_max + 1
+        if self.adaptive_nursery:
+            return self.nursery_max_size + extra
         return self.nursery_size + extra
 
     def _alloc_nursery(self):
@@ -542,6 +695,12 @@ class IncrementalMiniMarkGC(MovingGCBase):
         # the nursery than really needed, to simplify pointer arithmetic
         # in malloc_fixedsize().  The few extra pages are never used
         # anyway so it doesn't even count.
+        if self.hugepages:
+            nursery = llarena.arena_malloc_hugepage(
+                self._nursery_memory_size())
+            self.nursery_hugepages = bool(nursery)
+            if nursery:
+                return nursery
         nursery = llarena.arena_malloc(self._nursery_memory_size(), 0)
         if not nursery:
             out_of_memory("cannot allocate nursery")
@@ -806,6 +965,43 @@ class IncrementalMiniMarkGC(MovingGCBase):
         self.rrc_invoke_callback()
         return rgc._encode_states(old_state, self.gc_state)
 
+    def trim_memory(self):
+        """Give back to the OS the memory that we hold but don't use right
+        now: the free pages in the arenas, the nursery (emptied by a minor
+        collection first) and the free memory of the malloc() heap.  Return
+        the number of bytes released.
+        """
+        self._minor_collection()
+        debug_start("gc-trim")
+        released = 0
+        if self.pinned_objects_in_nursery == 0 and not self.gc_nursery_debug:
+            # the nursery is empty now; we don't need its content, and the
+            # memory is given back to us by the OS on the next write
+            llarena.arena_reset(self.nursery, self.nursery_size, 4)
+            released += self.nursery_size
+        released += self._release_free_memory()
+        debug_print("released", released, "bytes")
+        debug_stop("gc-trim")
+        self.rrc_invoke_callback()
+        return released
+
+    def trim_if_above_threshold(self):
+        # Called at the end of a major collection.  The arenas' memory that
+        # is neither used by objects nor already released is an upper bound
+        # on what release_free_pages() can give back.
+        unused = (self.ac.total_memory_alloced - self.ac.total_memory_used -
+                  r_uint(self.ac.released_memory))
+        if unused > r_uint(self.trim_threshold):
+            debug_start("gc-trim")
+            released = self._release_free_memory()
+            debug_print("released", released, "bytes")
+            debug_stop("gc-trim")
+
+    def _release_free_memory(self):
+        released = self.ac.release_free_pages()
+        gc_malloc_trim()
+        return released
+
     def minor_collection_with_major_progress(self, extrasize=0,
                                              force_enabled=False):
         """Do a minor collection.  Then, if the GC is enabled and there
@@ -855,6 +1051,27 @@ class IncrementalMiniMarkGC(MovingGCBase):
         major collection, and finally reserve totalsize bytes.
         """
 
+        if self.alloc_sample_start:
+            # undo the caller's 'nursery_free += totalsize' to count
+            # only the bytes really allocated so far
+            self.nursery_free -= totalsize
+            self.disarm_alloc_sampling()
+            interval = self.hooks.get_alloc_sample_interval()
+            size = llmemory.raw_malloc_usage(totalsize)
+            if self.alloc_sample_countdown < size and interval > 0:
+                # this allocation crosses the point where the next
+                # sample is taken
+                self.hooks.fire_gc_alloc_sample(interval)
+                self.alloc_sample_countdown += interval
+            self.alloc_sample_countdown -= size
+            #
+            # we may have been stopped only by the lowered 'nursery_top'
+            result = self.nursery_free
+            if result + totalsize <= self.nursery_top:
+                self.nursery_free = result + totalsize
+                self.arm_alloc_sampling()
+                return result
+        #
         minor_collection_count = 0
         while True:
             self.nursery_free = llmemory.NULL      # debug: don't use me
@@ -920,6 +1137,7 @@ class IncrementalMiniMarkGC(MovingGCBase):
             # Tried to do something about nursery_free overflowing
             # nursery_top before this point. Try to reserve totalsize now.
             # If this succeeds break out of loop.
+            self.disarm_alloc_sampling()
             result = self.nursery_free
             if self.nursery_free + totalsize <= self.nursery_top:
                 self.nursery_free = result + totalsize
@@ -931,9 +1149,38 @@ class IncrementalMiniMarkGC(MovingGCBase):
             if self.nursery_top - self.nursery_free > self.debug_tiny_nursery:
                 self.nursery_free = self.nursery_top - self.debug_tiny_nursery
         #
+        self.arm_alloc_sampling()
         return result
     collect_and_reserve._dont_inline_ = True
 
+    def arm_alloc_sampling(self):
+        """Lower 'nursery_top' so that the malloc fast paths, including
+        the JIT's, fall back to collect_and_reserve() at the point where
+        the next allocation sample is taken.  Called after 'nursery_free'
+        and 'nursery_top' got new values.
+        """
+        interval = self.hooks.get_alloc_sample_interval()
+        if interval <= 0 or self.alloc_sample_start:
+            return
+        if not (0 <= self.alloc_sample_countdown <= interval):
+            self.alloc_sample_countdown = interval
+        self.alloc_sample_start = self.nursery_free
+        if self.alloc_sample_countdown < self.nursery_top - self.nursery_free:
+            self.alloc_sample_top = self.nursery_top
+            self.nursery_top = self.nursery_free + self.alloc_sample_countdown
+
+    def disarm_alloc_sampling(self):
+        """Undo arm_alloc_sampling(), counting the bytes allocated since.
+        Called before 'nursery_free' or 'nursery_top' get new values.
+        """
+        if self.alloc_sample_start:
+            self.alloc_sample_countdown -= (self.nursery_free -
+                                            self.alloc_sample_start)
+            self.alloc_sample_start = llmemory.NULL
+            if self.alloc_sample_top:
+                self.nursery_top = self.alloc_sample_top
+                self.alloc_sample_top = llmemory.NULL
+
 
     # XXX kill alloc_young and make it always True
     def external_malloc(self, typeid, length, alloc_young):
@@ -1091,6 +1338,7 @@ class IncrementalMiniMarkGC(MovingGCBase):
         if self.next_major_collection_threshold < 0:
             # cannot trigger a full collection now, but we can ensure
             # that one will occur very soon
+            self.disarm_alloc_sampling()
             self.nursery_free = self.nursery_top
 
     def can_optimize_clean_setarrayitems(self):
@@ -1711,6 +1959,12 @@ class IncrementalMiniMarkGC(MovingGCBase):
         #
         start = time.time()
         debug_start("gc-minor")
+        self.disarm_alloc_sampling()
+        if self.nursery_free:
+            nursery_used = (llarena.getfakearenaaddress(self.nursery_free) -
+                            self.nursery)
+        else:
+            nursery_used = self.nursery_size   # from collect_and_reserve()
         #
         # All nursery barriers are invalid from this point on.  They
         # are evaluated anew as part of the minor collection.
@@ -1910,10 +2164,71 @@ class IncrementalMiniMarkGC(MovingGCBase):
         debug_stop("gc-minor")
         duration = time.time() - start
         self.total_gc_time += duration
+        if self.adaptive_nursery:
+            self.adapt_nursery_size(nursery_used, duration)
+        self.arm_alloc_sampling()
         self.hooks.fire_gc_minor(
             duration=duration,
             total_memory_used=total_memory_used,
-            pinned_objects=self.pinned_objects_in_nursery)
+            pinned_objects=self.pinned_objects_in_nursery,
+            nursery_size=self.nursery_size,
+            surviving_size=self.nursery_surviving_size)
+
+    # Adaptive nursery sizing: every NURSERY_ADAPT_PERIOD minor collections,
+    # halve the nursery if one of them took longer than NURSERY_MAX_PAUSE
+    # seconds; otherwise, double it if the fraction of the nursery that
+    # survived is high (the young objects need more time to die) or very
+    # low (the minor collections are then mostly fixed costs).
+    NURSERY_ADAPT_PERIOD = 8
+    NURSERY_MAX_PAUSE = 0.005
+    NURSERY_SURVIVAL_HIGH = 0.10
+    NURSERY_SURVIVAL_LOW = 0.01
+
+    def adapt_nursery_size(self, nursery_used, duration):
+        # Called at the end of a minor collection, with the number of
+        # bytes that were allocated in the nursery.  Minor collections
+        # done on a mostly empty nursery (e.g. explicit gc.collect()) are
+        # not representative and are ignored.
+        if nursery_used < self.nursery_size // 2:
+            return
+        self.nursery_adapt_count += 1
+        self.nursery_adapt_used += nursery_used
+        self.nursery_adapt_surviving += self.nursery_surviving_size
+        if duration > self.nursery_adapt_max_duration:
+            self.nursery_adapt_max_duration = duration
+        if self.nursery_adapt_count < self.NURSERY_ADAPT_PERIOD:
+            return
+        #
+        survival = (float(self.nursery_adapt_surviving) /
+                    float(self.nursery_adapt_used))
+        newsize = self.nursery_size
+        if self.nursery_adapt_max_duration > self.NURSERY_MAX_PAUSE:
+            newsize = self.nursery_size // 2
+        elif (survival >= self.NURSERY_SURVIVAL_HIGH or
+              survival <= self.NURSERY_SURVIVAL_LOW):
+            newsize = self.nursery_size * 2
+        newsize = min(max(newsize, self.nursery_min_size),
+                      self.nursery_max_size) & ~(WORD-1)
+        self.nursery_adapt_count = 0
+        self.nursery_adapt_used = 0
+        self.nursery_adapt_surviving = 0
+        self.nursery_adapt_max_duration = 0.0
+        #
+        # We can only move the end of the nursery if it is empty, i.e. if
+        # no object was left pinned in it; otherwise retry next time.
+        if newsize == self.nursery_size or self.pinned_objects_in_nursery > 0:
+            return
+        debug_start("gc-adapt-nursery")
+        debug_print("survival rate:", survival)
+        debug_print("nursery size:", self.nursery_size, "=>", newsize)
+        debug_stop("gc-adapt-nursery")
+        assert newsize > 0
+        self.nursery_size = newsize
+        ll_assert(self.nursery_free == self.nursery,
+                  "adapt_nursery_size: nursery not empty")
+        ll_assert(not self.nursery_barriers.non_empty(),
+                  "adapt_nursery_size: unexpected nursery barriers")
+        self.nursery_top = self.nursery + newsize
 
     def _reset_flag_old_objects_pointing_to_pinned(self, obj, ignore):
         ll_assert(self.header(obj).tid & GCFLAG_PINNED_OBJECT_PARENT_KNOWN != 0,
@@ -2437,7 +2752,7 @@ class IncrementalMiniMarkGC(MovingGCBase):
                 if self.old_objects_with_destructors.non_empty():
                     self.deal_with_old_objects_with_destructors()
                 # objects_to_trace processed fully, can move on to sweeping
-                self.ac.mass_free_prepare()
+                self.ac.mass_free_prepare(self._free_if_unvisited)
                 self.start_free_rawmalloc_objects()
                 #
                 # get rid of objects pointing to pinned objects that were not
@@ -2516,6 +2831,10 @@ class IncrementalMiniMarkGC(MovingGCBase):
                 debug_print("next major collection threshold: ",
                             self.next_major_collection_threshold)
                 debug_stop("gc-collect-done")
+                #
+                if self.trim_threshold > 0:
+                    self.trim_if_above_threshold()
+                #
                 self.hooks.fire_gc_collect(
                     num_major_collects=self.num_major_collects,
                     arenas_count_before=self.stat_ac_arenas_count,
@@ -2690,6 +3009,8 @@ class IncrementalMiniMarkGC(MovingGCBase):
     TEST_VISIT_SINGLE_STEP = False    # for tests
 
     def visit_all_objects_step(self, size_to_track):
+        if self.mark_prefetch_distance > 0:
+            return self.visit_all_objects_step_prefetch(size_to_track)
         # Objects can be added to pending by visit
         pending = self.objects_to_trace
         while pending.non_empty():
@@ -2699,6 +3020,40 @@ class IncrementalMiniMarkGC(MovingGCBase):
                 return 0
         return size_to_track
 
+    def visit_all_objects_step_prefetch(self, size_to_track):
+        # Same as visit_all_objects_step(), but the objects popped from
+        # 'objects_to_trace' first wait in a small FIFO of
+        # 'mark_prefetch_distance' entries, giving the prefetch of their
+        # header the time to complete before visit() reads it.
+        pending = self.objects_to_trace
+        fifo = self.mark_prefetch_fifo
+        in_fifo = 0
+        size_gc_header = self.gcheaderbuilder.size_gc_header
+        exhausted = False
+        while True:
+            while in_fifo < self.mark_prefetch_distance and pending.non_empty():
+                obj = pending.pop()
+                gc_prefetch(obj - size_gc_header)
+                fifo.append(obj)
+                in_fifo += 1
+            if in_fifo == 0:
+                break
+            obj = fifo.popleft()
+            in_fifo -= 1
+            size_to_track -= self.visit(obj)
+            if size_to_track < 0 or self.TEST_VISIT_SINGLE_STEP:
+                exhausted = True
+                break
+        #
+        # Put the objects still in the FIFO back into 'objects_to_trace',
+        # which is the only place where the rest of the GC looks for them.
+        # The order in which they are marked doesn't matter.
+        while fifo.non_empty():
+            pending.append(fifo.popleft())
+        if exhausted:
+            return 0
+        return size_to_track
+
     def visit(self, obj):
         #
         # 'obj' is a live object.  Check GCFLAG_VISITED to know if we
@@ -3071,6 +3426,13 @@ class IncrementalMiniMarkGC(MovingGCBase):
             return intmask(self.nursery_size)
         elif stats_no == rgc.TOTAL_GC_TIME:
             return int(self.total_gc_time * 1000)
+        elif stats_no == rgc.RELEASED_MEMORY:
+            return intmask(self.ac.released_memory)
+        elif stats_no == rgc.HUGEPAGE_MEMORY:
+            result = self.ac.hugepage_memory
+            if self.nursery_hugepages:
+                result += r_uint(self._nursery_memory_size())
+            return intmask(result)
         return 0
 
 
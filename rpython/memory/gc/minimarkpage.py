@@ -15,6 +15,17 @@ assert 1 << WORD_POWER_2 == WORD
 # The actual allocation occurs in whole arenas, which are then subdivided
 # into pages.  For each arena we allocate one of the following structures:
 
+# For the pages whose memory was given back to the OS, the link to the next
+# free page is not stored in the page itself (writing it would make the OS
+# give the memory back), but in an array next to the arena, indexed by the
+# number of the page in the arena.
+RELEASED_PAGE = lltype.Struct('ReleasedPage',
+    ('nextpage', llmemory.Address),
+    ('released', lltype.Bool),
+    )
+RELEASED_PAGES = lltype.Array(RELEASED_PAGE, hints={'nolength': True})
+RELEASED_PAGES_NULL = lltype.nullptr(RELEASED_PAGES)
+
 ARENA_PTR = lltype.Ptr(lltype.ForwardReference())
 ARENA = lltype.Struct('ArenaReference',
     # -- The address of the arena, as returned by malloc()
@@ -24,6 +35,15 @@ ARENA = lltype.Struct('ArenaReference',
     ('totalpages', lltype.Signed),
     # -- A chained list of free pages in the arena.  Ends with NULL.
     ('freepages', llmemory.Address),
+    # -- The number of pages at the end of 'freepages' whose memory was
+    #    given back to the OS by release_free_pages(), the array of their
+    #    links (or NULL if there never was any), and the number of bytes
+    #    that the OS really took back: only whole OS pages count.
+    ('nreleasedpages', lltype.Signed),
+    ('releasedpages', lltype.Ptr(RELEASED_PAGES)),
+    ('releasedbytes', lltype.Signed),
+    # -- True if the arena was allocated with arena_malloc_hugepage().
+    ('hugepage', lltype.Bool),
     # -- A linked list of arenas.  See below.
     ('nextarena', ARENA_PTR),
     )
@@ -84,6 +104,11 @@ PAGE_NULL = lltype.nullptr(PAGE_HEADER)
 # ----------
 
 
+# The maximum number of old pages that malloc() sweeps by itself before
+# giving up and taking a fresh page (see sweep_page_for_size()).
+LAZY_SWEEP_MAX_PAGES = 4
+
+
 class ArenaCollection(object):
     _alloc_flavor_ = "raw"
 
@@ -143,6 +168,46 @@ class ArenaCollection(object):
         self.peak_memory_used = r_uint(0)
         self.total_memory_alloced = r_uint(0)
         self.peak_memory_alloced = r_uint(0)
+        #
+        # the total number of bytes of the free pages that were given back
+        # to the OS, see release_free_pages().
+        self.released_memory = 0
+        #
+        # the size of the OS pages, read at runtime when first needed
+        self.os_page_size = 0
+        #
+        # if use_hugepages() was called, we first try to allocate arenas
+        # backed by huge pages; 'hugepage_memory' is how much we got.
+        self.hugepages = False
+        self.hugepage_memory = r_uint(0)
+        #
+        # between mass_free_prepare() and the end of mass_free_incremental(),
+        # the size classes <= 'size_class_with_old_pages' may still have
+        # pages in the 'old_xxx' lists that were not swept yet.
+        self.size_class_with_old_pages = -1
+
+
+    def use_hugepages(self):
+        """Ask for arenas backed by huge pages.  The arena size is rounded
+        up to a multiple of the huge page size.  Returns False if it is too
+        late, i.e. if some arenas were already allocated."""
+        if self.arenas_count > 0:
+            return False
+        hugepage_size = llarena.HUGEPAGE_SIZE
+        self.arena_size = ((self.arena_size + (hugepage_size - 1)) &
+                           ~(hugepage_size - 1))
+        self.max_pages_per_arena = self.arena_size // self.page_size
+        self.arenas_lists = lltype.malloc(rffi.CArray(ARENA_PTR),
+                                          self.max_pages_per_arena,
+                                          flavor='raw', zero=True,
+                                          immortal=True)
+        self.old_arenas_lists = lltype.malloc(rffi.CArray(ARENA_PTR),
+                                              self.max_pages_per_arena,
+                                              flavor='raw', zero=True,
+                                              immortal=True)
+        self.min_empty_nfreepages = self.max_pages_per_arena
+        self.hugepages = True
+        return True
 
 
     def _new_page_ptr_list(self, length):
@@ -163,7 +228,10 @@ class ArenaCollection(object):
         size_class = nsize >> WORD_POWER_2
         page = self.page_for_size[size_class]
         if page == PAGE_NULL:
-            page = self.allocate_new_page(size_class)
+            if size_class <= self.size_class_with_old_pages:
+                page = self.sweep_page_for_size(size_class)
+            if page == PAGE_NULL:
+                page = self.allocate_new_page(size_class)
         #
         # The result is simply 'page.freeblock'
         result = page.freeblock
@@ -208,7 +276,13 @@ class ArenaCollection(object):
             #
             # The 'result' was part of the chained list; read the next.
             arena.nfreepages -= 1
-            freepages = result.address[0]
+            if arena.nreleasedpages > arena.nfreepages:
+                # all the remaining free pages were released, including
+                # 'result': the OS gives it back to us on the first write
+                arena.nreleasedpages = arena.nfreepages
+                freepages = self._reuse_released_page(arena, result)
+            else:
+                freepages = result.address[0]
             llarena.arena_reset(result,
                                 llmemory.sizeof(llmemory.Address),
                                 0)
@@ -295,7 +369,15 @@ class ArenaCollection(object):
         #
         # 'arena_base' points to the start of malloced memory; it might not
         # be a page-aligned address
-        arena_base = llarena.arena_malloc(self.arena_size, False)
+        hugepage = False
+        arena_base = llmemory.NULL
+        if self.hugepages:
+            arena_base = llarena.arena_malloc_hugepage(self.arena_size)
+            if arena_base:
+                hugepage = True
+                self.hugepage_memory += self.arena_size
+        if not arena_base:
+            arena_base = llarena.arena_malloc(self.arena_size, False)
         self.total_memory_alloced += self.arena_size
         self.peak_memory_alloced = max(self.total_memory_alloced,
                                        self.peak_memory_alloced)
@@ -314,6 +396,10 @@ class ArenaCollection(object):
         arena = lltype.malloc(ARENA, flavor='raw', track_allocation=False)
         arena.base = arena_base
         arena.nfreepages = 0        # they are all uninitialized pages
+        arena.nreleasedpages = 0
+        arena.releasedpages = RELEASED_PAGES_NULL
+        arena.releasedbytes = 0
+        arena.hugepage = hugepage
         arena.totalpages = npages
         arena.freepages = firstpage
         self.num_uninitialized_pages = npages
@@ -323,10 +409,13 @@ class ArenaCollection(object):
     allocate_new_arena._dont_inline_ = True
 
 
-    def mass_free_prepare(self):
+    def mass_free_prepare(self, ok_to_free_func):
         """Prepare calls to mass_free_incremental(): moves the chained lists
-        into 'self.old_xxx'.
+        into 'self.old_xxx'.  Until sweeping is complete, malloc() may call
+        'ok_to_free_func' itself to sweep the old pages of the size class
+        it needs, instead of taking a fresh page (see sweep_page_for_size()).
         """
+        self.lazy_sweep_func = ok_to_free_func
         self.peak_memory_used = max(self.peak_memory_used,
                                     self.total_memory_used)
         self.total_memory_used = r_uint(0)
@@ -378,7 +467,7 @@ class ArenaCollection(object):
         """For each object, if ok_to_free_func(obj) returns True, then free
         the object.
         """
-        self.mass_free_prepare()
+        self.mass_free_prepare(ok_to_free_func)
         #
         res = self.mass_free_incremental(ok_to_free_func, sys.maxint)
         ll_assert(res, "non-incremental mass_free_in_pages() returned False")
@@ -405,9 +494,15 @@ class ArenaCollection(object):
                 if arena.nfreepages == arena.totalpages:
                     #
                     # The whole arena is empty.  Free it.
+                    self.released_memory -= arena.releasedbytes
+                    if arena.releasedpages:
+                        lltype.free(arena.releasedpages, flavor='raw',
+                                    track_allocation=False)
                     llarena.arena_reset(arena.base, self.arena_size, 4)
                     llarena.arena_free(arena.base)
                     self.total_memory_alloced -= self.arena_size
+                    if arena.hugepage:
+                        self.hugepage_memory -= self.arena_size
                     lltype.free(arena, flavor='raw', track_allocation=False)
                     self.arenas_count -= 1
                     #
@@ -488,6 +583,152 @@ class ArenaCollection(object):
         return max_pages
 
 
+    def sweep_page_for_size(self, size_class):
+        """Called by malloc() when there is no page with free blocks for
+        'size_class' but there are still old pages of that size class
+        waiting to be swept.  Sweep a few of them now, with the function
+        given to mass_free_prepare().  The swept pages are re-chained into
+        'page_for_size[]' or 'full_page_for_size[]' exactly like
+        mass_free_in_pages() would do, so that the following incremental
+        steps have less work to do.  Returns the first page with free
+        blocks found, or PAGE_NULL if we gave up after sweeping
+        LAZY_SWEEP_MAX_PAGES pages.
+        """
+        nblocks = self.nblocks_for_size[size_class]
+        block_size = size_class * WORD
+        count = 0
+        while count < LAZY_SWEEP_MAX_PAGES:
+            #
+            # Prefer the old pages that were not full: they are more likely
+            # to contain free blocks after sweeping.
+            page = self.old_page_for_size[size_class]
+            if page != PAGE_NULL:
+                self.old_page_for_size[size_class] = page.nextpage
+                was_full = False
+            else:
+                page = self.old_full_page_for_size[size_class]
+                if page == PAGE_NULL:
+                    break
+                self.old_full_page_for_size[size_class] = page.nextpage
+                was_full = True
+            #
+            surviving = self.walk_page(page, block_size, self.lazy_sweep_func)
+            if surviving == nblocks:
+                ll_assert(was_full, "A non-full page became full while freeing")
+                page.nextpage = self.full_page_for_size[size_class]
+                self.full_page_for_size[size_class] = page
+            elif surviving > 0:
+                ll_assert(self.page_for_size[size_class] == PAGE_NULL,
+                          "sweep_page_for_size() but a page is waiting")
+                page.nextpage = PAGE_NULL
+                self.page_for_size[size_class] = page
+                return page
+            else:
+                self.free_page(page)
+            count += 1
+        return PAGE_NULL
+    sweep_page_for_size._dont_inline_ = True
+
+
+    def release_free_pages(self):
+        """Give the memory of the free pages back to the OS with madvise(),
+        without unmapping it: the pages stay in the 'freepages' lists and
+        are reused as usual.  Only the pages freed since the previous call
+        are visited.  Returns the number of bytes released.
+        """
+        released = 0
+        i = 0
+        while i < self.max_pages_per_arena:
+            arena = self.arenas_lists[i]
+            while arena != ARENA_NULL:
+                released += self._release_free_pages_in_arena(arena)
+                arena = arena.nextarena
+            i += 1
+        if self.current_arena != ARENA_NULL:
+            released += self._release_free_pages_in_arena(self.current_arena)
+        return released
+
+    def _release_free_pages_in_arena(self, arena):
+        # free_page() inserts at the head of 'freepages' and
+        # allocate_new_page() takes from the head, so the released pages
+        # are always the last 'nreleasedpages' ones of the list.  Their
+        # links are moved to 'arena.releasedpages', then the runs of
+        # adjacent released pages are given back to the OS: that way, the
+        # OS pages that are larger than our pages can be released too.
+        count = arena.nfreepages - arena.nreleasedpages
+        if count == 0:
+            return 0
+        pages = arena.releasedpages
+        if not pages:
+            pages = lltype.malloc(RELEASED_PAGES, arena.totalpages,
+                                  flavor='raw', zero=True,
+                                  track_allocation=False)
+            arena.releasedpages = pages
+        firstpage = self._first_page(arena)
+        pageaddr = arena.freepages
+        i = 0
+        while i < count:
+            index = (pageaddr - firstpage) // self.page_size
+            pages[index].nextpage = pageaddr.address[0]
+            pages[index].released = True
+            pageaddr = pageaddr.address[0]
+            i += 1
+        arena.nreleasedpages = arena.nfreepages
+        return self._count_released_bytes(arena, True)
+
+    def _reuse_released_page(self, arena, pageaddr):
+        """'pageaddr' is a released page that is going to be used again.
+        Returns the next free page after it."""
+        pages = arena.releasedpages
+        index = (pageaddr - self._first_page(arena)) // self.page_size
+        pages[index].released = False
+        self._count_released_bytes(arena, False)
+        return pages[index].nextpage
+
+    def _count_released_bytes(self, arena, madvise):
+        """Update 'releasedbytes' of the arena and 'self.released_memory'
+        from the runs of released pages, which are first given back to the
+        OS if 'madvise' is True.  Returns the number of bytes added."""
+        pages = arena.releasedpages
+        firstpage = self._first_page(arena)
+        releasedbytes = 0
+        i = 0
+        while i < arena.totalpages:
+            if not pages[i].released:
+                i += 1
+                continue
+            start = i
+            while i < arena.totalpages and pages[i].released:
+                i += 1
+            startaddr = firstpage + start * self.page_size
+            size = (i - start) * self.page_size
+            if madvise:
+                llarena.arena_reset(startaddr, size, 4)
+            releasedbytes += self._whole_os_pages(firstpage, startaddr, size)
+        added = releasedbytes - arena.releasedbytes
+        arena.releasedbytes = releasedbytes
+        self.released_memory += added
+        return added
+
+    def _first_page(self, arena):
+        return start_of_page(arena.base + self.page_size - 1, self.page_size)
+
+    def _whole_os_pages(self, firstpage, startaddr, size):
+        """The number of bytes in the whole OS pages between 'startaddr' and
+        'startaddr + size', which is what madvise() gives back."""
+        if self.os_page_size == 0:
+            self.os_page_size = llarena.posixpagesize.get()
+        os_page_size = self.os_page_size
+        if we_are_translated():
+            start = llmemory.cast_adr_to_int(startaddr)
+        else:
+            # for testing, we assume that 'firstpage' starts an OS page
+            start = startaddr - firstpage
+        stop = (start + size) // os_page_size
+        start = (start + os_page_size - 1) // os_page_size
+        return max(stop - start, 0) * os_page_size
+
+
     def free_page(self, page):
         """Free a whole page."""
         #
@@ -21,6 +21,11 @@ class SimpleArenaCollection(object):
         self.all_objects = []
         self.total_memory_used = 0
         self.arenas_count = 0
+        self.released_memory = 0
+        self.hugepage_memory = 0
+
+    def use_hugepages(self):
+        return False
 
     def malloc(self, size):
         nsize = raw_malloc_usage(size)
@@ -34,7 +39,7 @@ class SimpleArenaCollection(object):
         self.total_memory_used += nsize
         return result
 
-    def mass_free_prepare(self):
+    def mass_free_prepare(self, ok_to_free_func):
         self.old_all_objects = self.all_objects
         self.all_objects = []
         self.total_memory_used = 0
@@ -54,6 +59,9 @@ class SimpleArenaCollection(object):
         return True
 
     def mass_free(self, ok_to_free_func):
-        self.mass_free_prepare()
+        self.mass_free_prepare(ok_to_free_func)
         res = self.mass_free_incremental(ok_to_free_func, sys.maxint)
         assert res
+
+    def release_free_pages(self):
+        return 0
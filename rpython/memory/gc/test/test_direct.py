@@ -844,3 +844,108 @@ class TestIncrementalMiniMarkGCFull(DirectGCTest):
             (incminimark.STATE_SWEEPING, incminimark.STATE_FINALIZING),
             (incminimark.STATE_FINALIZING, incminimark.STATE_SCANNING)
             ]
+
+    def _make_free_arena_pages(self):
+        # make 120 old objects, then keep only one out of 12: most pages
+        # become free, but the arenas themselves are not entirely free.
+        # Pretend that the OS pages are as small as ours.
+        self.gc.ac.os_page_size = self.gc.ac.page_size
+        for i in range(120):
+            self.stackroots.append(self.malloc(S))
+        self.gc.collect()
+        keep = self.stackroots[::12]
+        del self.stackroots[:]
+        self.stackroots.extend(keep)
+        self.gc.collect()
+
+    def test_trim_memory(self, debuglog):
+        from rpython.rlib import rgc
+        self._make_free_arena_pages()
+        assert self.gc.get_stats(rgc.RELEASED_MEMORY) == 0
+        #
+        debuglog.reset()
+        released = self.gc.trim_memory()
+        assert sorted(debuglog.summary()) == ['gc-minor', 'gc-trim']
+        assert released > self.gc.nursery_size
+        assert self.gc.get_stats(rgc.RELEASED_MEMORY) == (
+            released - self.gc.nursery_size)
+        #
+        # the pages released already are not counted a second time
+        assert self.gc.trim_memory() == self.gc.nursery_size
+        for obj in self.stackroots:
+            assert not obj.next
+
+    def test_trim_threshold(self):
+        from rpython.rlib import rgc
+        self.gc.trim_threshold = 1
+        self._make_free_arena_pages()
+        assert self.gc.get_stats(rgc.RELEASED_MEMORY) > 0
+
+    def test_hugepages(self):
+        from rpython.rlib import rgc
+        from rpython.rtyper.lltypesystem import llarena
+        assert self.gc.ac.arena_size == llarena.HUGEPAGE_SIZE
+        assert self.gc.nursery_hugepages
+        nursery_memory = self.gc._nursery_memory_size()
+        assert self.gc.get_stats(rgc.HUGEPAGE_MEMORY) == nursery_memory
+        self.stackroots.append(self.malloc(S))
+        self.gc.collect()
+        assert self.gc.ac.arenas_count == 1
+        assert self.gc.get_stats(rgc.HUGEPAGE_MEMORY) == (
+            nursery_memory + llarena.HUGEPAGE_SIZE)
+        assert not self.gc.ac.use_hugepages()    # too late now
+    test_hugepages.GC_PARAMS = {'hugepages': True}
+
+    def test_adaptive_nursery_grows(self):
+        # all objects survive: the nursery grows up to its maximum size
+        # (the minor collections are slow when not translated, so don't
+        # let their duration shrink the nursery)
+        self.gc.NURSERY_MAX_PAUSE = 1000.0
+        assert self.gc.adaptive_nursery
+        assert self.gc.nursery_size == 32*WORD
+        for i in range(400):
+            self.stackroots.append(self.malloc(S))
+        assert self.gc.nursery_size == 128*WORD
+        assert self.gc.nursery_top == self.gc.nursery + 128*WORD
+        for obj in self.stackroots:
+            assert not obj.next
+    test_adaptive_nursery_grows.GC_PARAMS = {'nursery_size': 32*WORD,
+                                             'nursery_min_size': 16*WORD,
+                                             'nursery_max_size': 128*WORD}
+
+    def test_adaptive_nursery_shrinks(self):
+        # minor collections are "too slow": the nursery shrinks
+        self.gc.NURSERY_MAX_PAUSE = -1.0
+        for i in range(400):
+            self.stackroots.append(self.malloc(S))
+            if len(self.stackroots) > 10:
+                del self.stackroots[0]
+        assert self.gc.nursery_size == 16*WORD
+        assert self.gc.nursery_top == self.gc.nursery + 16*WORD
+    test_adaptive_nursery_shrinks.GC_PARAMS = {'nursery_size': 64*WORD,
+                                               'nursery_min_size': 16*WORD,
+                                               'nursery_max_size': 128*WORD}
+
+
+class TestIncrementalMiniMarkGCMarkPrefetch(TestIncrementalMiniMarkGCSimple):
+    GC_PARAMS = {'ArenaCollectionClass':
+                     TestIncrementalMiniMarkGCSimple.SimpleArenaCollection,
+                 'mark_prefetch_distance': 3}
+
+    def test_prefetch_fifo_reused_and_empty_between_steps(self):
+        for i in range(20):
+            curobj = self.malloc(S)
+            curobj.x = i
+            if self.stackroots:
+                curobj.next = self.stackroots[-1]
+            self.stackroots.append(curobj)
+        fifo = self.gc.mark_prefetch_fifo
+        self.gc.debug_gc_step_until(incminimark.STATE_MARKING)
+        self.gc._minor_collection()
+        while self.gc.objects_to_trace.non_empty():
+            self.gc.visit_all_objects_step(1)
+            assert self.gc.mark_prefetch_fifo is fifo
+            assert not fifo.non_empty()
+        self.gc.debug_gc_step_until(incminimark.STATE_SCANNING)
+        for i in range(20):
+            assert self.stackroots[i].x == i
@@ -10,6 +10,7 @@ class MyGcHooks(GcHooks):
         self._gc_minor_enabled = False
         self._gc_collect_step_enabled = False
         self._gc_collect_enabled = False
+        self._alloc_sample_interval = 0
         self.reset()
 
     def is_gc_minor_enabled(self):
@@ -21,17 +22,24 @@ class MyGcHooks(GcHooks):
     def is_gc_collect_enabled(self):
         return self._gc_collect_enabled
 
+    def get_alloc_sample_interval(self):
+        return self._alloc_sample_interval
+
     def reset(self):
         self.minors = []
         self.steps = []
         self.collects = []
         self.durations = []
+        self.alloc_samples = []
 
-    def on_gc_minor(self, duration, total_memory_used, pinned_objects):
+    def on_gc_minor(self, duration, total_memory_used, pinned_objects,
+                    nursery_size, surviving_size):
         self.durations.append(duration)
         self.minors.append({
             'total_memory_used': total_memory_used,
-            'pinned_objects': pinned_objects})
+            'pinned_objects': pinned_objects,
+            'nursery_size': nursery_size,
+            'surviving_size': surviving_size})
 
     def on_gc_collect_step(self, duration, oldstate, newstate):
         self.durations.append(duration)
@@ -51,6 +59,9 @@ class MyGcHooks(GcHooks):
             'rawmalloc_bytes_before': rawmalloc_bytes_before,
             'rawmalloc_bytes_after': rawmalloc_bytes_after})
 
+    def on_gc_alloc_sample(self, size):
+        self.alloc_samples.append(size)
+
 
 class TestIncMiniMarkHooks(BaseDirectGCTest):
     from rpython.memory.gc.incminimark import IncrementalMiniMarkGC as GCClass
@@ -68,7 +79,8 @@ class TestIncMiniMarkHooks(BaseDirectGCTest):
         self.malloc(S)
         self.gc._minor_collection()
         assert self.gc.hooks.minors == [
-            {'total_memory_used': 0, 'pinned_objects': 0}
+            {'total_memory_used': 0, 'pinned_objects': 0,
+             'nursery_size': self.gc.nursery_size, 'surviving_size': 0}
             ]
         assert self.gc.hooks.durations[0] > 0.
         self.gc.hooks.reset()
@@ -78,7 +90,9 @@ class TestIncMiniMarkHooks(BaseDirectGCTest):
         self.stackroots.append(self.malloc(S))
         self.gc._minor_collection()
         assert self.gc.hooks.minors == [
-            {'total_memory_used': self.size_of_S*2, 'pinned_objects': 0}
+            {'total_memory_used': self.size_of_S*2, 'pinned_objects': 0,
+             'nursery_size': self.gc.nursery_size,
+             'surviving_size': self.size_of_S*2}
             ]
 
     def test_on_gc_collect(self):
@@ -123,3 +137,26 @@ class TestIncMiniMarkHooks(BaseDirectGCTest):
         assert self.gc.hooks.minors == []
         assert self.gc.hooks.steps == []
         assert self.gc.hooks.collects == []
+
+    def test_on_gc_alloc_sample(self):
+        interval = 3 * self.size_of_S
+        self.gc.hooks._alloc_sample_interval = interval
+        self.gc.collect(0)     # takes the new interval into account
+        # the 4th, 7th, ... 28th allocations cross a multiple of 'interval'
+        for i in range(30):
+            self.malloc(S)
+        assert self.gc.hooks.alloc_samples == [interval] * 9
+        #
+        # the count is not reset by minor collections: the next samples
+        # are on the 31st, 34th, 37th and 40th allocations
+        self.gc._minor_collection()
+        for i in range(10):
+            self.malloc(S)
+        assert len(self.gc.hooks.alloc_samples) == 13
+        #
+        self.gc.hooks._alloc_sample_interval = 0
+        self.gc.collect(0)
+        for i in range(30):
+            self.malloc(S)
+        assert len(self.gc.hooks.alloc_samples) == 13
+        assert not self.gc.alloc_sample_top
@@ -1,4 +1,5 @@
 import py
+import sys
 from rpython.memory.gc.minimarkpage import ArenaCollection
 from rpython.memory.gc.minimarkpage import PAGE_HEADER, PAGE_PTR
 from rpython.memory.gc.minimarkpage import PAGE_NULL, WORD
@@ -400,6 +401,83 @@ def test_mass_free_half_page_becomes_more_free():
     assert freepages(ac) == NULL
     assert ac.full_page_for_size[2] == PAGE_NULL
 
+def test_malloc_sweeps_old_page():
+    pagesize = hdrsize + 9*WORD
+    ac = arena_collection_for_test(pagesize, "#", fill_with_objects=2)
+    ok_to_free = OkToFree(ac, 0.5)
+    ac.mass_free_prepare(ok_to_free)
+    assert ac.page_for_size[2] == PAGE_NULL
+    #
+    # no free page is left: malloc() must sweep the old page to find room
+    obj = ac.malloc(2*WORD)
+    assert ok_to_free.seen == {hdrsize + 0*WORD: False,
+                               hdrsize + 2*WORD: True,
+                               hdrsize + 4*WORD: False,
+                               hdrsize + 6*WORD: True}
+    page = getpage(ac, 0)
+    pageaddr = pagenum(ac, 0)
+    assert obj == pageaddr + hdrsize + 2*WORD
+    assert page == ac.page_for_size[2]
+    assert page.nfree == 1
+    assert page.freeblock == pageaddr + hdrsize + 6*WORD
+    assert ac.old_full_page_for_size[2] == PAGE_NULL
+    #
+    # the incremental sweep must not visit the page a second time
+    res = ac.mass_free_incremental(ok_to_free, sys.maxint)
+    assert res
+    assert len(ok_to_free.seen) == 4
+    assert ac.page_for_size[2] == page
+    assert ac.total_memory_used == 3 * 2*WORD
+
+def test_release_free_pages():
+    pagesize = hdrsize + 16
+    ac = arena_collection_for_test(pagesize, "#.#.")
+    ac.os_page_size = pagesize
+    assert ac.current_arena.nfreepages == 2
+    assert ac.release_free_pages() == 2 * pagesize
+    assert ac.current_arena.nreleasedpages == 2
+    assert ac.released_memory == 2 * pagesize
+    assert ac.release_free_pages() == 0
+    #
+    # reusing a released page
+    page = ac.allocate_new_page(5)
+    checkpage(ac, page, 1)
+    assert ac.current_arena.nreleasedpages == 1
+    assert ac.released_memory == pagesize
+    #
+    # a page freed afterwards is released by the next call only
+    ac.free_page(page)
+    assert ac.current_arena.nreleasedpages == 1
+    assert ac.release_free_pages() == pagesize
+    assert ac.released_memory == 2 * pagesize
+    #
+    # the links between the released pages are still there
+    assert ac.allocate_new_page(6) == getpage(ac, 1)
+    assert ac.allocate_new_page(7) == getpage(ac, 3)
+    assert ac.released_memory == 0
+
+def test_release_free_pages_large_os_pages():
+    # an OS page holds two of our pages: only the OS pages that are
+    # entirely made of free pages can be released
+    pagesize = hdrsize + 16
+    ac = arena_collection_for_test(pagesize, "#..#...")
+    ac.os_page_size = 2 * pagesize
+    assert ac.release_free_pages() == 2 * pagesize    # pages 4 and 5
+    assert ac.released_memory == 2 * pagesize
+    assert ac.current_arena.releasedbytes == 2 * pagesize
+    #
+    # pages 1 and 2 don't change anything, but page 4 does
+    assert ac.allocate_new_page(1) == getpage(ac, 1)
+    assert ac.allocate_new_page(2) == getpage(ac, 2)
+    assert ac.released_memory == 2 * pagesize
+    page = ac.allocate_new_page(3)
+    assert page == getpage(ac, 4)
+    assert ac.released_memory == 0
+    #
+    ac.free_page(page)
+    assert ac.release_free_pages() == 2 * pagesize
+    assert ac.released_memory == 2 * pagesize
+
 # ____________________________________________________________
 
 def test_random(incremental=False):
@@ -451,13 +529,12 @@ def test_random(incremental=False):
             if not incremental:
                 ac.mass_free(ok_to_free)
             else:
-                ac.mass_free_prepare()
+                ac.mass_free_prepare(ok_to_free)
                 while not ac.mass_free_incremental(ok_to_free,
                                                    random.randrange(1, 3)):
                     print '[]'
-                    prev = ac.total_memory_used
                     allocate_object(live_objects_extra)
-                    fresh_extra += ac.total_memory_used - prev
+                fresh_extra = sum(live_objects_extra.values())
             #
             # Check that we have seen all objects
             assert sorted(ok_to_free.seen) == sorted(live_objects)
@@ -135,6 +135,9 @@ class GCManagedHeap(object):
     def collect(self, *gen):
         self.gc.collect(*gen)
 
+    def trim_memory(self):
+        return self.gc.trim_memory()
+
     def can_move(self, addr):
         return self.gc.can_move(addr)
 
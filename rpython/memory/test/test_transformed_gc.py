@@ -1396,6 +1396,8 @@ class GcHooksStats(object):
     minors = 0
     steps = 0
     collects = 0
+    alloc_sample_interval = 0
+    alloc_samples = 0
 
     def reset(self):
         # the NonConstant are needed so that the annotator annotates the
@@ -1405,6 +1407,8 @@ class GcHooksStats(object):
         self.minors = NonConstant(0)
         self.steps = NonConstant(0)
         self.collects = NonConstant(0)
+        self.alloc_sample_interval = NonConstant(0)
+        self.alloc_samples = NonConstant(0)
 
 
 class MyGcHooks(GcHooks):
@@ -1421,7 +1425,11 @@ class MyGcHooks(GcHooks):
     def is_gc_collect_enabled(self):
         return True
 
-    def on_gc_minor(self, duration, total_memory_used, pinned_objects):
+    def get_alloc_sample_interval(self):
+        return self.stats.alloc_sample_interval
+
+    def on_gc_minor(self, duration, total_memory_used, pinned_objects,
+                    nursery_size, surviving_size):
         self.stats.minors += 1
 
     def on_gc_collect_step(self, duration, oldstate, newstate):
@@ -1433,6 +1441,9 @@ class MyGcHooks(GcHooks):
                       rawmalloc_bytes_after):
         self.stats.collects += 1
 
+    def on_gc_alloc_sample(self, size):
+        self.stats.alloc_samples += 1
+
 
 class TestIncrementalMiniMarkGC(TestMiniMarkGC):
     gcname = "incminimark"
@@ -1514,6 +1525,24 @@ class TestIncrementalMiniMarkGC(TestMiniMarkGC):
         assert steps == 4 * collects   # 4 steps for each major collection
         assert minors == steps         # one minor collection for each step
 
+    def define_gc_alloc_sample_hook(cls):
+        stats = cls.gchooks.stats
+        S = lltype.GcStruct('S', ('x', lltype.Signed))
+        def f():
+            stats.reset()
+            stats.alloc_sample_interval = 10 * WORD
+            llop.gc__collect(lltype.Void, 0)    # starts the sampling
+            for i in range(1000):
+                lltype.malloc(S)
+            stats.alloc_sample_interval = 0
+            return stats.alloc_samples
+        return f
+
+    def test_gc_alloc_sample_hook(self):
+        run = self.runner("gc_alloc_sample_hook")
+        # each S takes 2 words with its header: one sample every 5 mallocs
+        assert run([]) == 200
+
 # ________________________________________________________________
 # tagged pointers
 
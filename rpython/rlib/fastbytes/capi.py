@@ -0,0 +1,65 @@
+"""
+Vectorized operations on byte strings, implemented in C in the 'src'
+directory: counting a character, finding a line break, changing the
+case, translating with a table, and checking that all the bytes are
+digits, letters, whitespace or ASCII.  There are SSE2 and AVX2 versions;
+the one to use is picked at runtime according to the CPU.  Only
+available on x86 with gcc or clang: check SUPPORTED first.  rbytes.py
+uses these functions automatically.
+"""
+
+import py
+import sys
+from rpython.rtyper.lltypesystem import lltype, rffi
+from rpython.translator.tool.cbuild import ExternalCompilationInfo
+from rpython.translator import cdir
+from rpython.jit.backend import detect_cpu
+
+SRC = py.path.local(__file__).dirpath().join('src')
+
+SUPPORTED = False
+if sys.platform != 'win32':
+    try:
+        SUPPORTED = detect_cpu.autodetect().startswith('x86')
+    except detect_cpu.ProcessorAutodetectError:
+        pass
+
+eci = ExternalCompilationInfo(
+    include_dirs = [SRC, cdir],
+    includes = ['fastbytes.h'],
+    # fastbytes.c includes fastbytes-vec.h
+    separate_module_files = [SRC.join('fastbytes.c')])
+
+def llexternal(name, args, result):
+    return rffi.llexternal(name, args, result, compilation_info=eci,
+                           _nowrapper=True, sandboxsafe=True)
+
+# the values of the 'cls' argument of all_in_class()
+DIGIT = 0
+ALPHA = 1
+ALNUM = 2
+SPACE = 3
+
+count_char = llexternal("fb_count_char",
+                        [rffi.CCHARP, rffi.SIZE_T, rffi.CHAR], rffi.SSIZE_T)
+
+# Returns the index of the first '\n' or '\r', or -1.
+find_linebreak = llexternal("fb_find_linebreak",
+                            [rffi.CCHARP, rffi.SIZE_T], rffi.SSIZE_T)
+
+lower = llexternal("fb_lower",
+                   [rffi.CCHARP, rffi.CCHARP, rffi.SIZE_T], lltype.Void)
+upper = llexternal("fb_upper",
+                   [rffi.CCHARP, rffi.CCHARP, rffi.SIZE_T], lltype.Void)
+swapcase = llexternal("fb_swapcase",
+                      [rffi.CCHARP, rffi.CCHARP, rffi.SIZE_T], lltype.Void)
+
+# The last argument is the table of 256 characters.
+translate = llexternal("fb_translate",
+                       [rffi.CCHARP, rffi.CCHARP, rffi.SIZE_T, rffi.CCHARP],
+                       lltype.Void)
+
+all_in_class = llexternal("fb_all_in_class",
+                          [rffi.CCHARP, rffi.SIZE_T, rffi.INT], rffi.INT)
+
+is_ascii = llexternal("fb_is_ascii", [rffi.CCHARP, rffi.SIZE_T], rffi.INT)
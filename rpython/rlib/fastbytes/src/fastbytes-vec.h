@@ -0,0 +1,148 @@
+/* The vectorized functions, written with the vector extension of gcc
+ * and clang.  This file is included once per instruction set by
+ * fastbytes.c, which defines:
+ *
+ *   FB_VSIZE       the size of the vectors in bytes
+ *   FB_NAME(x)     the name of 'x' for this instruction set
+ *   FB_ISA         the function attribute that enables the instructions
+ *
+ * The functions process FB_VSIZE bytes at a time, and leave the
+ * remaining 'len % FB_VSIZE' bytes to the caller.
+ */
+
+typedef unsigned char FB_NAME(vec) __attribute__((vector_size(FB_VSIZE)));
+typedef uint64_t FB_NAME(vec64) __attribute__((vector_size(FB_VSIZE)));
+
+#define VEC FB_NAME(vec)
+#define VEC64 FB_NAME(vec64)
+#define SPLAT(x) ((VEC){0} + (unsigned char)(x))
+
+FB_ISA static inline VEC FB_NAME(load)(const char *p)
+{
+    VEC v;
+    memcpy(&v, p, sizeof(VEC));
+    return v;
+}
+
+FB_ISA static inline void FB_NAME(store)(char *p, VEC v)
+{
+    memcpy(p, &v, sizeof(VEC));
+}
+
+/* true if any byte of the mask 'm' is set */
+FB_ISA static inline int FB_NAME(any)(VEC m)
+{
+    VEC64 m64 = (VEC64)m;
+    uint64_t r = 0;
+    for (size_t i = 0; i < sizeof(VEC) / 8; i++)
+        r |= m64[i];
+    return r != 0;
+}
+
+/* the comparisons give 0xff for true and 0 for false */
+#define IN_RANGE(v, lo, n)   ((VEC)((VEC)((v) - SPLAT(lo)) < SPLAT(n)))
+
+FB_ISA static inline VEC FB_NAME(class_mask)(VEC v, int cls)
+{
+    VEC digit, alpha;
+    switch (cls) {
+    case FB_DIGIT:
+        return IN_RANGE(v, '0', 10);
+    case FB_ALPHA:
+        return IN_RANGE(v | SPLAT(0x20), 'a', 26);
+    case FB_ALNUM:
+        digit = IN_RANGE(v, '0', 10);
+        alpha = IN_RANGE(v | SPLAT(0x20), 'a', 26);
+        return digit | alpha;
+    default:    /* FB_SPACE: ' ', '\t', '\n', '\v', '\f', '\r' */
+        return (VEC)(v == SPLAT(' ')) | IN_RANGE(v, '\t', 5);
+    }
+}
+
+FB_ISA static size_t FB_NAME(count_char)(const char *s, size_t len, char c,
+                                         ssize_t *count)
+{
+    size_t i = 0;
+    ssize_t total = 0;
+    VEC target = SPLAT(c);
+    while (i + sizeof(VEC) <= len) {
+        /* count in 8-bit lanes for at most 255 vectors, then add up */
+        VEC acc = SPLAT(0);
+        size_t stop = len - (len - i) % sizeof(VEC);
+        if (stop - i > 255 * sizeof(VEC))
+            stop = i + 255 * sizeof(VEC);
+        for (; i < stop; i += sizeof(VEC)) {
+            VEC v = FB_NAME(load)(s + i);
+            acc -= (VEC)(v == target);      /* adds 1 where equal */
+        }
+        for (size_t j = 0; j < sizeof(VEC); j++)
+            total += acc[j];
+    }
+    *count = total;
+    return i;
+}
+
+FB_ISA static size_t FB_NAME(find_linebreak)(const char *s, size_t len)
+{
+    size_t i = 0;
+    for (; i + sizeof(VEC) <= len; i += sizeof(VEC)) {
+        VEC v = FB_NAME(load)(s + i);
+        VEC m = (VEC)(v == SPLAT('\n')) | (VEC)(v == SPLAT('\r'));
+        if (FB_NAME(any)(m))
+            break;
+    }
+    return i;
+}
+
+/* 'kind' is 0 for lower(), 1 for upper() and 2 for swapcase() */
+FB_ISA static size_t FB_NAME(change_case)(const char *s, char *dst,
+                                          size_t len, int kind)
+{
+    size_t i = 0;
+    for (; i + sizeof(VEC) <= len; i += sizeof(VEC)) {
+        VEC v = FB_NAME(load)(s + i);
+        VEC m;
+        if (kind == 0)
+            m = IN_RANGE(v, 'A', 26);
+        else if (kind == 1)
+            m = IN_RANGE(v, 'a', 26);
+        else
+            m = IN_RANGE(v | SPLAT(0x20), 'a', 26);
+        FB_NAME(store)(dst + i, v ^ (m & SPLAT(0x20)));
+    }
+    return i;
+}
+
+FB_ISA static size_t FB_NAME(all_in_class)(const char *s, size_t len,
+                                           int cls, int *result)
+{
+    size_t i = 0;
+    for (; i + sizeof(VEC) <= len; i += sizeof(VEC)) {
+        VEC v = FB_NAME(load)(s + i);
+        if (FB_NAME(any)(~FB_NAME(class_mask)(v, cls))) {
+            *result = 0;
+            return i;
+        }
+    }
+    *result = 1;
+    return i;
+}
+
+FB_ISA static size_t FB_NAME(is_ascii)(const char *s, size_t len,
+                                       int *result)
+{
+    size_t i = 0;
+    VEC acc = SPLAT(0);
+    for (; i + sizeof(VEC) <= len; i += sizeof(VEC)) {
+        acc |= FB_NAME(load)(s + i);
+        if ((i & 1023) == 0 && FB_NAME(any)(acc & SPLAT(0x80)))
+            break;
+    }
+    *result = !FB_NAME(any)(acc & SPLAT(0x80));
+    return i;
+}
+
+#undef VEC
+#undef VEC64
+#undef SPLAT
+#undef IN_RANGE
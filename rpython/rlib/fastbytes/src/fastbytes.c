@@ -0,0 +1,203 @@
+#include "fastbytes.h"
+
+#include <string.h>
+
+#define FB_VSIZE 16
+#define FB_NAME(x) fb_sse2_##x
+#define FB_ISA FB_TARGET("sse2")
+#include "fastbytes-vec.h"
+#undef FB_VSIZE
+#undef FB_NAME
+#undef FB_ISA
+
+#define FB_VSIZE 32
+#define FB_NAME(x) fb_avx2_##x
+#define FB_ISA FB_TARGET("avx2")
+#include "fastbytes-vec.h"
+#undef FB_VSIZE
+#undef FB_NAME
+#undef FB_ISA
+
+
+static int fb_instruction_set = -1;
+#define ISET_SSE2 0x1
+#define ISET_AVX2 0x2
+
+static int fb_detect_instructionset(void)
+{
+    int iset = 0;
+    __builtin_cpu_init();
+    if (__builtin_cpu_supports("sse2")) {
+        iset |= ISET_SSE2;
+    }
+    if (__builtin_cpu_supports("avx2")) {
+        iset |= ISET_AVX2;
+    }
+    fb_instruction_set = iset;
+    return iset;
+}
+
+static inline int fb_iset(void)
+{
+    int iset = fb_instruction_set;
+    if (iset == -1) {
+        iset = fb_detect_instructionset();
+    }
+    return iset;
+}
+
+/* In all the functions below, the vectorized part handles the first 'i'
+   bytes and the loop at the end the rest. */
+
+ssize_t fb_count_char(const char *s, size_t len, char c)
+{
+    ssize_t count = 0;
+    size_t i = 0;
+    int iset = fb_iset();
+    if (iset & ISET_AVX2) {
+        i = fb_avx2_count_char(s, len, c, &count);
+    }
+    else if (iset & ISET_SSE2) {
+        i = fb_sse2_count_char(s, len, c, &count);
+    }
+    for (; i < len; i++) {
+        count += (s[i] == c);
+    }
+    return count;
+}
+
+ssize_t fb_find_linebreak(const char *s, size_t len)
+{
+    size_t i = 0;
+    int iset = fb_iset();
+    if (iset & ISET_AVX2) {
+        i = fb_avx2_find_linebreak(s, len);
+    }
+    else if (iset & ISET_SSE2) {
+        i = fb_sse2_find_linebreak(s, len);
+    }
+    for (; i < len; i++) {
+        if (s[i] == '\n' || s[i] == '\r') {
+            return i;
+        }
+    }
+    return -1;
+}
+
+static void fb_change_case(const char *s, char *dst, size_t len, int kind)
+{
+    size_t i = 0;
+    int iset = fb_iset();
+    if (iset & ISET_AVX2) {
+        i = fb_avx2_change_case(s, dst, len, kind);
+    }
+    else if (iset & ISET_SSE2) {
+        i = fb_sse2_change_case(s, dst, len, kind);
+    }
+    for (; i < len; i++) {
+        unsigned char c = s[i];
+        int is_upper = (unsigned char)(c - 'A') < 26;
+        int is_lower = (unsigned char)(c - 'a') < 26;
+        if ((kind == 0 && is_upper) || (kind == 1 && is_lower) ||
+                (kind == 2 && (is_upper || is_lower))) {
+            c ^= 0x20;
+        }
+        dst[i] = c;
+    }
+}
+
+void fb_lower(const char *s, char *dst, size_t len)
+{
+    fb_change_case(s, dst, len, 0);
+}
+
+void fb_upper(const char *s, char *dst, size_t len)
+{
+    fb_change_case(s, dst, len, 1);
+}
+
+void fb_swapcase(const char *s, char *dst, size_t len)
+{
+    fb_change_case(s, dst, len, 2);
+}
+
+void fb_translate(const char *s, char *dst, size_t len, const char *table)
+{
+    /* there is no useful vector instruction for a 256-bytes table, but
+       unrolling already helps the cpu much more than the RPython loop */
+    const unsigned char *src = (const unsigned char *)s;
+    size_t i = 0;
+    for (; i + 8 <= len; i += 8) {
+        dst[i + 0] = table[src[i + 0]];
+        dst[i + 1] = table[src[i + 1]];
+        dst[i + 2] = table[src[i + 2]];
+        dst[i + 3] = table[src[i + 3]];
+        dst[i + 4] = table[src[i + 4]];
+        dst[i + 5] = table[src[i + 5]];
+        dst[i + 6] = table[src[i + 6]];
+        dst[i + 7] = table[src[i + 7]];
+    }
+    for (; i < len; i++) {
+        dst[i] = table[src[i]];
+    }
+}
+
+static int fb_in_class(unsigned char c, int cls)
+{
+    int digit = (unsigned char)(c - '0') < 10;
+    int alpha = (unsigned char)((c | 0x20) - 'a') < 26;
+    switch (cls) {
+    case FB_DIGIT:
+        return digit;
+    case FB_ALPHA:
+        return alpha;
+    case FB_ALNUM:
+        return digit || alpha;
+    default:
+        return c == ' ' || (unsigned char)(c - '\t') < 5;
+    }
+}
+
+int fb_all_in_class(const char *s, size_t len, int cls)
+{
+    int result = 1;
+    size_t i = 0;
+    int iset = fb_iset();
+    if (iset & ISET_AVX2) {
+        i = fb_avx2_all_in_class(s, len, cls, &result);
+    }
+    else if (iset & ISET_SSE2) {
+        i = fb_sse2_all_in_class(s, len, cls, &result);
+    }
+    if (!result) {
+        return 0;
+    }
+    for (; i < len; i++) {
+        if (!fb_in_class(s[i], cls)) {
+            return 0;
+        }
+    }
+    return 1;
+}
+
+int fb_is_ascii(const char *s, size_t len)
+{
+    int result = 1;
+    size_t i = 0;
+    int iset = fb_iset();
+    if (iset & ISET_AVX2) {
+        i = fb_avx2_is_ascii(s, len, &result);
+    }
+    else if (iset & ISET_SSE2) {
+        i = fb_sse2_is_ascii(s, len, &result);
+    }
+    if (!result) {
+        return 0;
+    }
+    for (; i < len; i++) {
+        if ((unsigned char)s[i] >= 0x80) {
+            return 0;
+        }
+    }
+    return 1;
+}
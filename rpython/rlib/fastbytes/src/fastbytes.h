@@ -0,0 +1,58 @@
+#pragma once
+
+#include <unistd.h>
+#include <stdint.h>
+#include <stddef.h>
+
+#ifdef RPYTHON_LL2CTYPES
+   /* only for testing: ll2ctypes sets RPY_EXTERN from the command-line */
+#ifndef RPY_EXTERN
+#  define RPY_EXTERN RPY_EXPORTED
+#endif
+
+#ifdef _WIN32
+#  define RPY_EXPORTED __declspec(dllexport)
+#else
+#  define RPY_EXPORTED  extern __attribute__((visibility("default")))
+#endif
+
+#else
+#  include "src/precommondefs.h"
+#endif
+
+#if defined(__GNUC__) && (defined(__x86_64__) || defined(__i386__))
+#  define FB_TARGET(isa) __attribute__((target(isa)))
+#else
+#  define FB_TARGET(isa)
+#endif
+
+/* Operations on the 'len' bytes at 's'.  Each function picks an SSE2 or
+ * AVX2 version at runtime according to the CPU, or uses a plain loop.
+ * Only the ASCII letters, digits and whitespace are considered, like
+ * the RPython methods of 'str'.
+ */
+
+/* Returns the number of bytes equal to 'c'. */
+RPY_EXTERN ssize_t fb_count_char(const char *s, size_t len, char c);
+
+/* Returns the index of the first '\n' or '\r', or -1. */
+RPY_EXTERN ssize_t fb_find_linebreak(const char *s, size_t len);
+
+/* Write to 'dst' the 'len' bytes of 's' with the case changed. */
+RPY_EXTERN void fb_lower(const char *s, char *dst, size_t len);
+RPY_EXTERN void fb_upper(const char *s, char *dst, size_t len);
+RPY_EXTERN void fb_swapcase(const char *s, char *dst, size_t len);
+
+/* Write to 'dst' the bytes table[s[i]].  'table' has 256 bytes. */
+RPY_EXTERN void fb_translate(const char *s, char *dst, size_t len,
+                             const char *table);
+
+/* Returns 1 if all the bytes are in the given class, else 0. */
+#define FB_DIGIT 0
+#define FB_ALPHA 1
+#define FB_ALNUM 2
+#define FB_SPACE 3
+RPY_EXTERN int fb_all_in_class(const char *s, size_t len, int cls);
+
+/* Returns 1 if all the bytes are < 0x80, else 0. */
+RPY_EXTERN int fb_is_ascii(const char *s, size_t len);
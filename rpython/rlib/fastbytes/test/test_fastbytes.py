@@ -0,0 +1,86 @@
+import py
+import random
+
+from rpython.rlib.fastbytes import capi
+from rpython.rtyper.lltypesystem import lltype, rffi
+
+if not capi.SUPPORTED:
+    py.test.skip("fastbytes is not supported on this platform")
+
+
+def _size(s):
+    return rffi.cast(rffi.SIZE_T, len(s))
+
+def _call(func, s, *args):
+    with rffi.scoped_str2charp(s) as p:
+        res = func(p, _size(s), *args)
+    return rffi.cast(lltype.Signed, res)
+
+def _call_dst(func, s, *args):
+    with rffi.scoped_str2charp(s) as p:
+        with rffi.scoped_alloc_buffer(len(s)) as buf:
+            func(p, buf.raw, _size(s), *args)
+            return buf.str(len(s))
+
+# the vectorized versions work on 16 or 32 bytes at a time: use lengths
+# around these sizes, and the characters that are at the limits of the
+# ranges that are checked
+CHARS = 'aAzZ@[`{09/:\t\n\r\x0b\x0c\x08\x0e\x1f \x7f\x80\xc1\xe1\xff'
+
+def _random_strings(seed, chars=CHARS):
+    r = random.Random(seed)
+    for i in range(300):
+        yield ''.join([r.choice(chars) for j in range(r.randrange(150))])
+
+def test_count_char():
+    for s in _random_strings(42):
+        for c in 'a\x80\n':
+            assert _call(capi.count_char, s, c) == s.count(c)
+
+def test_count_char_long():
+    # more than 255 vectors: the counters of the vector version overflow
+    s = 'ab' * 20000 + 'a'
+    assert _call(capi.count_char, s, 'a') == 20001
+    assert _call(capi.count_char, s, 'b') == 20000
+
+def test_find_linebreak():
+    for s in _random_strings(43, 'abc\n\r'):
+        n = _call(capi.find_linebreak, s)
+        expected = [i for i in range(len(s)) if s[i] in '\r\n']
+        assert n == (expected[0] if expected else -1)
+
+def test_change_case():
+    for s in _random_strings(44):
+        assert _call_dst(capi.lower, s) == s.lower()
+        assert _call_dst(capi.upper, s) == s.upper()
+        assert _call_dst(capi.swapcase, s) == s.swapcase()
+
+def test_translate():
+    r = random.Random(45)
+    table = ''.join([chr(r.randrange(256)) for i in range(256)])
+    with rffi.scoped_str2charp(table) as t:
+        for s in _random_strings(46):
+            assert _call_dst(capi.translate, s, t) == s.translate(table)
+
+def test_all_in_class():
+    checks = [(capi.DIGIT, str.isdigit), (capi.ALPHA, str.isalpha),
+              (capi.ALNUM, str.isalnum), (capi.SPACE, str.isspace)]
+    for chars in [CHARS, '0123456789x', 'abcXYZ0', ' \t\n\r\x0b\x0cA']:
+        for s in _random_strings(47, chars):
+            # mostly strings where the answer is True, with one change
+            for cls, method in checks:
+                good = ''.join([c for c in s if method(c)])
+                n = _call(capi.all_in_class, good, rffi.cast(rffi.INT, cls))
+                assert n == 1
+                n = _call(capi.all_in_class, s, rffi.cast(rffi.INT, cls))
+                assert n == (not s or method(s))
+
+def test_is_ascii():
+    r = random.Random(48)
+    for s in _random_strings(49, 'abc\x00\x7f'):
+        assert _call(capi.is_ascii, s) == 1
+        if s:
+            index = r.randrange(len(s))
+            s = s[:index] + chr(r.randrange(128, 256)) + s[index + 1:]
+            assert _call(capi.is_ascii, s) == 0
+    assert _call(capi.is_ascii, 'a' * 5000 + '\x80') == 0
@@ -1,66 +1,44 @@
+"""
+Vectorized utf-8 validation and code point counting, implemented in C
+in the 'src' directory.  There are SSE4.1 and AVX2 versions of the
+validating function; the one to use is picked at runtime according to
+the CPU.  Only available on x86 with gcc or clang: check SUPPORTED first.
+rutf8.py uses these functions automatically.
+"""
+
 import py
 import sys
-from rpython.tool.version import rpythonroot
-from rpython.rtyper.lltypesystem import lltype, rffi
+from rpython.rtyper.lltypesystem import rffi
 from rpython.translator.tool.cbuild import ExternalCompilationInfo
-from rpython.rtyper.tool import rffi_platform as platform
-from rpython.translator.platform import platform as trans_plaform
-
-ROOT = py.path.local(rpythonroot).join('rpython', 'rlib', 'rutf8')
-SRC = ROOT.join('src')
-
-if sys.platform.startswith('linux'):
-    _libs = ['dl']
-else:
-    _libs = []
-
-
-IDXTAB = lltype.ForwardReference()
-IDXTAB.become(rffi.CStruct("fu8_idxtab",
-                           ('character_step', rffi.INT),
-                           ('byte_positions', rffi.SIZE_TP),
-                           ('bytepos_table_length', rffi.SIZE_T)))
-IDXTABP = lltype.Ptr(IDXTAB)
-
-def setup():
-    compile_extra = ['-DRPYTHON_LL2CTYPES', '-DALLOW_SURROGATES=0', '-fPIC']
-    eci_kwds = dict(
-        include_dirs = [SRC],
-        includes = ['utf8.h'],
-        libraries = _libs,
-        compile_extra = compile_extra)
-    # compile the SSE4.1 and AVX version
-    compile_extra.append('-msse4.1')
-    ofile_eci = ExternalCompilationInfo(**eci_kwds)
-    sse4_o, = trans_plaform._compile_o_files([SRC.join('utf8-sse4.c')], ofile_eci)
-    compile_extra.pop()
-    compile_extra.append('-mavx2')
-    ofile_eci = ExternalCompilationInfo(**eci_kwds)
-    avx_o, = trans_plaform._compile_o_files([SRC.join('utf8-avx.c')], ofile_eci)
-    del ofile_eci
-
-    eci_kwds['separate_module_files'] = [SRC.join('utf8.c')]
-    eci_kwds['link_files'] = [sse4_o.strpath, avx_o.strpath]
-    eci = ExternalCompilationInfo(**eci_kwds)
-    platform.verify_eci(eci)
-    count_utf8_codepoints = rffi.llexternal("fu8_count_utf8_codepoints",
-                                  [rffi.CCHARP, rffi.SSIZE_T],
-                                  rffi.SSIZE_T, compilation_info=eci,
-                                  _nowrapper=True)
-    index2byteposition = rffi.llexternal("fu8_idx2bytepos",
-                                  [rffi.SIZE_T, rffi.CCHARP, rffi.SIZE_T, IDXTABP],
-                                  rffi.SSIZE_T, compilation_info=eci,
-                                  _nowrapper=True)
-
-    return CInterface(locals())
-
-
-class CInterface(object):
-    def __init__(self, namespace):
-        for k, v in namespace.iteritems():
-            setattr(self, k, v)
-
-    def _freeze_(self):
-        return True
-
-
+from rpython.translator import cdir
+from rpython.jit.backend import detect_cpu
+
+SRC = py.path.local(__file__).dirpath().join('src')
+
+SUPPORTED = False
+if sys.platform != 'win32':
+    try:
+        SUPPORTED = detect_cpu.autodetect().startswith('x86')
+    except detect_cpu.ProcessorAutodetectError:
+        pass
+
+eci = ExternalCompilationInfo(
+    include_dirs = [SRC, cdir],
+    includes = ['utf8.h'],
+    # utf8.c includes utf8-scalar.c
+    separate_module_files = [SRC.join('utf8.c'),
+                             SRC.join('utf8-sse4.c'),
+                             SRC.join('utf8-avx.c')])
+
+# Returns the number of code points, or -1 if the string is not valid
+# utf-8 or contains surrogates.
+count_utf8_codepoints = rffi.llexternal("fu8_count_utf8_codepoints",
+                                        [rffi.CCHARP, rffi.SIZE_T],
+                                        rffi.SSIZE_T, compilation_info=eci,
+                                        _nowrapper=True, sandboxsafe=True)
+
+# Returns the number of code points, assuming that the string is valid.
+count_codepoints = rffi.llexternal("fu8_count_codepoints",
+                                   [rffi.CCHARP, rffi.SIZE_T],
+                                   rffi.SSIZE_T, compilation_info=eci,
+                                   _nowrapper=True, sandboxsafe=True)
@@ -7,60 +7,13 @@
 
 #define BIT(B,P) ((B >> (P-1)) & 0x1)
 
-void _print_mmy(const char * msg, __m256i chunk)
-{
-    printf("%s:", msg);
-    // unpack the first 8 bytes, padding with zeros
-    uint64_t a = _mm256_extract_epi64(chunk, 0);
-    uint64_t b = _mm256_extract_epi64(chunk, 1);
-    uint64_t c = _mm256_extract_epi64(chunk, 2);
-    uint64_t d = _mm256_extract_epi64(chunk, 3);
-    printf("%.2x%.2x%.2x%.2x %.2x%.2x%.2x%.2x  %.2x%.2x%.2x%.2x %.2x%.2x%.2x%.2x    "
-           "%.2x%.2x%.2x%.2x %.2x%.2x%.2x%.2x  %.2x%.2x%.2x%.2x %.2x%.2x%.2x%.2x",
-            (unsigned char)((a >> 0) & 0xff),
-            (unsigned char)((a >> 8) & 0xff),
-            (unsigned char)((a >> 16) & 0xff),
-            (unsigned char)((a >> 24) & 0xff),
-
-            (unsigned char)((a >> 32) & 0xff),
-            (unsigned char)((a >> 40) & 0xff),
-            (unsigned char)((a >> 48) & 0xff),
-            (unsigned char)((a >> 56) & 0xff),
-
-            (unsigned char)((b >> 0) & 0xff),
-            (unsigned char)((b >> 8) & 0xff),
-            (unsigned char)((b >> 16) & 0xff),
-            (unsigned char)((b >> 24) & 0xff),
-
-            (unsigned char)((b >> 32) & 0xff),
-            (unsigned char)((b >> 40) & 0xff),
-            (unsigned char)((b >> 48) & 0xff),
-            (unsigned char)((b >> 56) & 0xff),
-
-            (unsigned char)((c >> 0) & 0xff),
-            (unsigned char)((c >> 8) & 0xff),
-            (unsigned char)((c >> 16) & 0xff),
-            (unsigned char)((c >> 24) & 0xff),
-
-            (unsigned char)((c >> 32) & 0xff),
-            (unsigned char)((c >> 40) & 0xff),
-            (unsigned char)((c >> 48) & 0xff),
-            (unsigned char)((c >> 56) & 0xff),
-
-            (unsigned char)((d >> 0) & 0xff),
-            (unsigned char)((d >> 8) & 0xff),
-            (unsigned char)((d >> 16) & 0xff),
-            (unsigned char)((d >> 24) & 0xff),
-
-            (unsigned char)((d >> 32) & 0xff),
-            (unsigned char)((d >> 40) & 0xff),
-            (unsigned char)((d >> 48) & 0xff),
-            (unsigned char)((d >> 56) & 0xff)
-     );
-
-    printf("\n");
-}
+// shift left by N bytes over the whole 256 bits; _mm256_slli_si256() only
+// shifts within each 128-bit lane, so that a sequence crossing the middle
+// of a chunk was not checked at all
+#define SHIFT_LEFT_BYTES(A, N) \
+    _mm256_alignr_epi8((A), _mm256_permute2x128_si256((A), (A), 0x08), 16 - (N))
 
+FU8_TARGET("avx2")
 ssize_t fu8_count_utf8_codepoints_avx(const char * utf8, size_t len)
 {
     const uint8_t * encoded = (const uint8_t*)utf8;
@@ -110,13 +63,13 @@ ssize_t fu8_count_utf8_codepoints_avx(const char * utf8, size_t len)
         }
 
         __m256i state2 = _mm256_andnot_si256(threebytemarker, twobytemarker);
-        __m256i contbytes = _mm256_slli_si256(_mm256_blendv_epi8(state2, _mm256_set1_epi8(0x1), twobytemarker), 1);
+        __m256i contbytes = SHIFT_LEFT_BYTES(_mm256_blendv_epi8(state2, _mm256_set1_epi8(0x1), twobytemarker), 1);
 
         if (_mm256_movemask_epi8(threebytemarker) != 0) {
             // contains at least one 3 byte marker
             __m256i istate3 = _mm256_andnot_si256(fourbytemarker, threebytemarker);
-            __m256i state3 = _mm256_slli_si256(_mm256_blendv_epi8(zero, _mm256_set1_epi8(0x3), istate3), 1);
-            state3 = _mm256_or_si256(state3, _mm256_slli_si256(state3, 1));
+            __m256i state3 = SHIFT_LEFT_BYTES(_mm256_blendv_epi8(zero, _mm256_set1_epi8(0x3), istate3), 1);
+            state3 = _mm256_or_si256(state3, SHIFT_LEFT_BYTES(state3, 1));
 
             contbytes = _mm256_or_si256(contbytes, state3);
 
@@ -124,7 +77,7 @@ ssize_t fu8_count_utf8_codepoints_avx(const char * utf8, size_t len)
             __m256i equal_e0 = _mm256_cmpeq_epi8(_mm256_blendv_epi8(zero, chunk_signed, istate3),
                                               _mm256_set1_epi8(0xe0-0x80));
             if (_mm256_movemask_epi8(equal_e0) != 0) {
-                __m256i mask = _mm256_blendv_epi8(_mm256_set1_epi8(0x7f), chunk_signed, _mm256_slli_si256(equal_e0, 1));
+                __m256i mask = _mm256_blendv_epi8(_mm256_set1_epi8(0x7f), chunk_signed, SHIFT_LEFT_BYTES(equal_e0, 1));
                 __m256i check_surrogate = _mm256_cmpgt_epi8(_mm256_set1_epi8(0xa0-0x80), mask); // lt
                 if (_mm256_movemask_epi8(check_surrogate) != 0) {
                     // invalid surrograte character!!!
@@ -137,7 +90,7 @@ ssize_t fu8_count_utf8_codepoints_avx(const char * utf8, size_t len)
                 __m256i equal_ed = _mm256_cmpeq_epi8(_mm256_blendv_epi8(zero, chunk_signed, istate3),
                                                   _mm256_set1_epi8(0xed-0x80));
                 if (_mm256_movemask_epi8(equal_ed) != 0) {
-                    __m256i mask = _mm256_blendv_epi8(_mm256_set1_epi8(0x80), chunk_signed, _mm256_slli_si256(equal_ed, 1));
+                    __m256i mask = _mm256_blendv_epi8(_mm256_set1_epi8(0x80), chunk_signed, SHIFT_LEFT_BYTES(equal_ed, 1));
                     __m256i check_surrogate = _mm256_cmpgt_epi8(mask, _mm256_set1_epi8(0xa0-1-0x80));
                     if (_mm256_movemask_epi8(check_surrogate) != 0) {
                         // invalid surrograte character!!!
@@ -149,9 +102,9 @@ ssize_t fu8_count_utf8_codepoints_avx(const char * utf8, size_t len)
 
         if (_mm256_movemask_epi8(fourbytemarker) != 0) {
             // contain a 4 byte marker
-            __m256i istate4 = _mm256_slli_si256(_mm256_blendv_epi8(zero, _mm256_set1_epi8(0x7), fourbytemarker), 1);
-            __m256i state4 =_mm256_or_si256(istate4, _mm256_slli_si256(istate4, 1));
-            state4 =_mm256_or_si256(state4, _mm256_slli_si256(istate4, 2));
+            __m256i istate4 = SHIFT_LEFT_BYTES(_mm256_blendv_epi8(zero, _mm256_set1_epi8(0x7), fourbytemarker), 1);
+            __m256i state4 =_mm256_or_si256(istate4, SHIFT_LEFT_BYTES(istate4, 1));
+            state4 =_mm256_or_si256(state4, SHIFT_LEFT_BYTES(istate4, 2));
 
             contbytes = _mm256_or_si256(contbytes, state4);
 
@@ -159,7 +112,7 @@ ssize_t fu8_count_utf8_codepoints_avx(const char * utf8, size_t len)
             __m256i equal_f0 = _mm256_cmpeq_epi8(_mm256_blendv_epi8(zero, chunk_signed, fourbytemarker),
                                               _mm256_set1_epi8(0xf0-0x80));
             if (_mm256_movemask_epi8(equal_f0) != 0) {
-                __m256i mask = _mm256_blendv_epi8(_mm256_set1_epi8(0x7f), chunk_signed, _mm256_slli_si256(equal_f0, 1));
+                __m256i mask = _mm256_blendv_epi8(_mm256_set1_epi8(0x7f), chunk_signed, SHIFT_LEFT_BYTES(equal_f0, 1));
                 __m256i check_surrogate = _mm256_cmpgt_epi8(_mm256_set1_epi8(0x90-0x80), mask);
                 if (_mm256_movemask_epi8(check_surrogate) != 0) {
                     return -1;
@@ -169,7 +122,7 @@ ssize_t fu8_count_utf8_codepoints_avx(const char * utf8, size_t len)
             __m256i equal_f4 = _mm256_cmpeq_epi8(_mm256_blendv_epi8(zero, chunk_signed, fourbytemarker),
                                               _mm256_set1_epi8(0xf4-0x80));
             if (_mm256_movemask_epi8(equal_f4) != 0) {
-                __m256i mask = _mm256_blendv_epi8(_mm256_set1_epi8(0x80), chunk_signed, _mm256_slli_si256(equal_f4, 1));
+                __m256i mask = _mm256_blendv_epi8(_mm256_set1_epi8(0x80), chunk_signed, SHIFT_LEFT_BYTES(equal_f4, 1));
                 __m256i check_surrogate = _mm256_cmpgt_epi8(mask, _mm256_set1_epi8(0x90-1-0x80));
                 if (_mm256_movemask_epi8(check_surrogate) != 0) {
                     return -1;
@@ -245,7 +198,7 @@ ssize_t fu8_count_utf8_codepoints_avx(const char * utf8, size_t len)
         return num_codepoints;
     }
 
-    ssize_t result = fu8_count_utf8_codepoints_seq(encoded, len);
+    ssize_t result = fu8_count_utf8_codepoints_seq((const char *)encoded, len);
     if (result == -1) {
         return -1;
     }
@@ -253,3 +206,35 @@ ssize_t fu8_count_utf8_codepoints_avx(const char * utf8, size_t len)
     return num_codepoints + result;
     return -1;
 }
+
+FU8_TARGET("avx2")
+ssize_t fu8_count_codepoints_avx(const char * utf8, size_t len)
+{
+    // count the bytes that are not continuation bytes, i.e. the bytes
+    // that are >= -0x40 as signed chars
+    const __m256i limit = _mm256_set1_epi8(-0x41);
+    const __m256i zero = _mm256_setzero_si256();
+    __m256i total = zero;
+    size_t i = 0;
+    while (i + 32 <= len) {
+        // every byte of 'counts' can count up to 255 only
+        size_t stop = i + 32 * 255;
+        if (stop > len) {
+            stop = len;
+        }
+        __m256i counts = zero;
+        for (; i + 32 <= stop; i += 32) {
+            __m256i chunk = _mm256_loadu_si256((const __m256i *)(utf8 + i));
+            // the comparison gives -1 for every byte to count
+            counts = _mm256_sub_epi8(counts, _mm256_cmpgt_epi8(chunk, limit));
+        }
+        total = _mm256_add_epi64(total, _mm256_sad_epu8(counts, zero));
+    }
+    uint64_t parts[4];
+    _mm256_storeu_si256((__m256i *)parts, total);
+    ssize_t num_codepoints = parts[0] + parts[1] + parts[2] + parts[3];
+    for (; i < len; i++) {
+        num_codepoints += ((signed char)utf8[i] >= -0x40);
+    }
+    return num_codepoints;
+}
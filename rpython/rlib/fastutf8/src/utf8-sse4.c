@@ -8,38 +8,7 @@
 
 #define BIT(B,P) ((B >> (P-1)) & 0x1)
 
-void _print_mmx(const char * msg, __m128i chunk)
-{
-    printf("%s:", msg);
-    // unpack the first 8 bytes, padding with zeros
-    uint64_t a = _mm_extract_epi64(chunk, 0);
-    uint64_t b = _mm_extract_epi64(chunk, 1);
-    printf("%.2x%.2x%.2x%.2x %.2x%.2x%.2x%.2x  %.2x%.2x%.2x%.2x %.2x%.2x%.2x%.2x",
-            (unsigned char)((a >> 0) & 0xff),
-            (unsigned char)((a >> 8) & 0xff),
-            (unsigned char)((a >> 16) & 0xff),
-            (unsigned char)((a >> 24) & 0xff),
-
-            (unsigned char)((a >> 32) & 0xff),
-            (unsigned char)((a >> 40) & 0xff),
-            (unsigned char)((a >> 48) & 0xff),
-            (unsigned char)((a >> 56) & 0xff),
-
-            (unsigned char)((b >> 0) & 0xff),
-            (unsigned char)((b >> 8) & 0xff),
-            (unsigned char)((b >> 16) & 0xff),
-            (unsigned char)((b >> 24) & 0xff),
-
-            (unsigned char)((b >> 32) & 0xff),
-            (unsigned char)((b >> 40) & 0xff),
-            (unsigned char)((b >> 48) & 0xff),
-            (unsigned char)((b >> 56) & 0xff)
-     );
-
-    printf("\n");
-}
-
-
+FU8_TARGET("sse4.1")
 ssize_t fu8_count_utf8_codepoints_sse4(const char * utf8, size_t len)
 {
     const uint8_t * encoded = (const uint8_t*)utf8;
@@ -223,7 +192,7 @@ ssize_t fu8_count_utf8_codepoints_sse4(const char * utf8, size_t len)
         return num_codepoints;
     }
 
-    ssize_t result = fu8_count_utf8_codepoints_seq(encoded, len);
+    ssize_t result = fu8_count_utf8_codepoints_seq((const char *)encoded, len);
     if (result == -1) {
         return -1;
     }
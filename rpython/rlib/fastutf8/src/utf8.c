@@ -6,48 +6,37 @@
 #include "utf8-scalar.c" // copy code for scalar operations
 
 
-int instruction_set = -1;
+static int fu8_instruction_set = -1;
 #define ISET_SSE4 0x1
 #define ISET_AVX 0x2
 #define ISET_AVX2 0x4
 
-void detect_instructionset(void)
+static void fu8_detect_instructionset(void)
 {
-    long eax;
-    long ebx;
-    long ecx;
-    long edx;
-    long op = 1;
-    asm ("cpuid"
-            : "=a" (eax),
-              "=b" (ebx),
-              "=c" (ecx),
-              "=d" (edx)
-            : "a" (op));
-
-    instruction_set = 0;
-    if (ecx & (1<<19)) { // sse4.1
-        instruction_set |= ISET_SSE4;
+    fu8_instruction_set = 0;
+    __builtin_cpu_init();
+    if(__builtin_cpu_supports("sse4.1")) {
+        fu8_instruction_set |= ISET_SSE4;
     }
     if(__builtin_cpu_supports("avx")) {
-        instruction_set |= ISET_AVX;
+        fu8_instruction_set |= ISET_AVX;
     }
     if(__builtin_cpu_supports("avx2")) {
-        instruction_set |= ISET_AVX2;
+        fu8_instruction_set |= ISET_AVX2;
     }
 }
 
 ssize_t fu8_count_utf8_codepoints(const char * utf8, size_t len)
 {
-    if (instruction_set == -1) {
-        detect_instructionset();
+    if (fu8_instruction_set == -1) {
+        fu8_detect_instructionset();
     }
 
-    if (len >= 32 && (instruction_set & ISET_AVX2) != 0) {
+    if (len >= 32 && (fu8_instruction_set & ISET_AVX2) != 0) {
         // to the MOON!
         return fu8_count_utf8_codepoints_avx(utf8, len);
     }
-    if (len >= 16 && (instruction_set == ISET_SSE4) != 0) {
+    if (len >= 16 && (fu8_instruction_set & ISET_SSE4) != 0) {
         // speed!!
         return fu8_count_utf8_codepoints_sse4(utf8, len);
     }
@@ -56,6 +45,24 @@ ssize_t fu8_count_utf8_codepoints(const char * utf8, size_t len)
     return fu8_count_utf8_codepoints_seq(utf8, len);
 }
 
+ssize_t fu8_count_codepoints(const char * utf8, size_t len)
+{
+    if (fu8_instruction_set == -1) {
+        fu8_detect_instructionset();
+    }
+
+    if (len >= 32 && (fu8_instruction_set & ISET_AVX2) != 0) {
+        return fu8_count_codepoints_avx(utf8, len);
+    }
+
+    // count the bytes that are not continuation bytes (10xxxxxx)
+    ssize_t num_codepoints = 0;
+    for (size_t i = 0; i < len; i++) {
+        num_codepoints += ((signed char)utf8[i] >= -0x40);
+    }
+    return num_codepoints;
+}
+
 typedef struct fu8_idxtab {
     int character_step;
     size_t * byte_positions;
@@ -159,7 +166,7 @@ ssize_t _fu8_idx2bytepos(size_t index,
 
     assert(index != 0 && "index must not be 0");
     // note that itab STILL can be NULL
-
+    return -1;
 }
 
 size_t _fu8_idxtab_lookup_bytepos_i(struct fu8_idxtab * tab, size_t cpidx)
@@ -16,6 +16,20 @@
 #  define RPY_EXPORTED  extern __attribute__((visibility("default")))
 #endif
 
+#else
+#  include "src/precommondefs.h"
+#endif
+
+#ifndef ALLOW_SURROGATES
+   /* surrogates are rejected by the validating functions below; the
+      caller can always check again more slowly if it accepts them */
+#  define ALLOW_SURROGATES 0
+#endif
+
+#if defined(__GNUC__) && (defined(__x86_64__) || defined(__i386__))
+#  define FU8_TARGET(isa) __attribute__((target(isa)))
+#else
+#  define FU8_TARGET(isa)
 #endif
 
 /**
@@ -35,6 +49,13 @@ RPY_EXTERN ssize_t fu8_count_utf8_codepoints_seq(const char * utf8, size_t len);
 RPY_EXTERN ssize_t fu8_count_utf8_codepoints_sse4(const char * utf8, size_t len);
 RPY_EXTERN ssize_t fu8_count_utf8_codepoints_avx(const char * utf8, size_t len);
 
+/**
+ * Returns the amount of code points in the given string, which must be
+ * valid utf8 already.  Does not check anything.
+ */
+RPY_EXTERN ssize_t fu8_count_codepoints(const char * utf8, size_t len);
+RPY_EXTERN ssize_t fu8_count_codepoints_avx(const char * utf8, size_t len);
+
 
 struct fu8_idxtab;
 
@@ -0,0 +1,89 @@
+import py
+import random
+
+from rpython.rlib import rutf8
+from rpython.rlib.fastutf8 import capi
+from rpython.rtyper.lltypesystem import lltype, rffi
+
+if not capi.SUPPORTED:
+    py.test.skip("fastutf8 is not supported on this platform")
+
+
+def _call(func, s):
+    with rffi.scoped_str2charp(s) as p:
+        res = func(p, rffi.cast(rffi.SIZE_T, len(s)))
+    return rffi.cast(lltype.Signed, res)
+
+def _check(s):
+    expected = rutf8._check_utf8(s, False, 0, len(s))
+    if expected < 0:
+        expected = -1
+    assert _call(capi.count_utf8_codepoints, s) == expected
+    if expected >= 0:
+        assert _call(capi.count_codepoints, s) == expected
+
+# the vectorized versions work on 16 or 32 bytes at a time: make sure
+# that the multibyte sequences also cross these boundaries
+PIECES = [u'a', u'\x7f', u'\x80', u'\xe9', u'\u07ff', u'\u0800', u'\u65e5',
+          u'\ud7ff', u'\ue000', u'\uffff', u'\U00010000', u'\U0001f600',
+          u'\U0010ffff']
+
+def _random_utf8(r):
+    pieces = [r.choice(PIECES) for i in range(r.randrange(100))]
+    return u''.join(pieces).encode('utf-8')
+
+def test_valid():
+    r = random.Random(42)
+    for i in range(200):
+        _check(_random_utf8(r))
+
+def test_invalid_byte():
+    r = random.Random(43)
+    for i in range(500):
+        s = _random_utf8(r)
+        if s:
+            index = r.randrange(len(s))
+            s = s[:index] + chr(r.randrange(256)) + s[index + 1:]
+        _check(s)
+
+def test_truncated():
+    r = random.Random(44)
+    for i in range(500):
+        s = _random_utf8(r)
+        _check(s[:len(s) - r.randrange(1, 4)])
+
+def test_random_bytes():
+    r = random.Random(45)
+    for i in range(500):
+        _check(''.join([chr(r.randrange(256))
+                        for j in range(r.randrange(100))]))
+
+def test_boundaries():
+    for n in range(12, 36):
+        for c in [u'\xe9', u'\u65e5', u'\U0001f600']:
+            s = ('a' * n) + c.encode('utf-8') + ('b' * 40)
+            _check(s)
+            for cut in range(1, len(c.encode('utf-8'))):
+                _check(s[:n + cut] + 'b' * 40)
+
+def test_surrogates_rejected():
+    s = 'x' * 40 + '\xed\xa0\x80' + 'x' * 40
+    assert _call(capi.count_utf8_codepoints, s) == -1
+    assert rutf8.check_utf8(s, True) == 81
+
+def test_rutf8_compiled():
+    from rpython.translator.c.test.test_genc import compile
+
+    def f(s, allow_surrogates):
+        try:
+            length = rutf8.check_utf8(s, allow_surrogates)
+        except rutf8.CheckError as e:
+            length = ~e.pos
+        return length * 10000 + rutf8.codepoints_in_utf8(s, min(3, len(s)))
+
+    fn = compile(f, [str, bool])
+    for s in ['', 'abc', 'a' * 100, u'\u65e5'.encode('utf-8') * 30,
+              'x' * 40 + '\xed\xa0\x80' + 'x' * 40,
+              'x' * 40 + '\xc3' + 'x' * 40]:
+        for allow_surrogates in [False, True]:
+            assert fn(s, allow_surrogates) == f(s, allow_surrogates)
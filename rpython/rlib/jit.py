@@ -577,6 +577,8 @@ PARAMETER_DOCS = {
     'vec_cost': 'threshold for which traces to bail. Unpacking increases the counter,'\
                 ' vector operation decrease the cost',
     'vec_all': 'try to vectorize trace loops that occur outside of the numpypy library',
+    'regalloc_linear_scan': 'plan the register spilling of the backend with a '
+                            'linear scan over the whole trace (1/0), x86 only',
 }
 
 PARAMETERS = {'threshold': 1039, # just above 1024, prime
@@ -595,6 +597,7 @@ PARAMETERS = {'threshold': 1039, # just above 1024, prime
               'vec': 0,
               'vec_all': 0,
               'vec_cost': 0,
+              'regalloc_linear_scan': 0,
               }
 unroll_parameters = unrolling_iterable(PARAMETERS.items())
 
@@ -1423,6 +1426,9 @@ class Counters(object):
     NVIRTUALS
     NVHOLES
     NVREUSED
+    GUARD_FAILURES
+    BLACKHOLE
+    RESUMED_FRAMES
     TOTAL_COMPILED_LOOPS
     TOTAL_COMPILED_BRIDGES
     TOTAL_FREED_LOOPS
@@ -120,6 +120,31 @@ LOOP_RUN_CONTAINER = lltype.GcArray(lltype.Struct('elem',
 def stats_get_loop_run_times(warmrunnerdesc):
     return warmrunnerdesc.metainterp_sd.cpu.get_all_loop_runs()
 
+GUARD_FAILURES_CONTAINER = lltype.GcArray(lltype.Struct('elem',
+                                                  ('number', lltype.Signed),
+                                                  ('counter', lltype.Signed)))
+
+@register_helper(annmodel.s_None)
+def stats_set_guard_failures(warmrunnerdesc, flag):
+    if warmrunnerdesc is None:
+        return # called directly, without the JIT
+    warmrunnerdesc.metainterp_sd.guard_failures.set_enabled(flag)
+
+@register_helper(lltype.Ptr(GUARD_FAILURES_CONTAINER))
+def stats_get_guard_failures(warmrunnerdesc, reset):
+    if warmrunnerdesc is None:
+        return lltype.nullptr(GUARD_FAILURES_CONTAINER)
+    counts = warmrunnerdesc.metainterp_sd.guard_failures.counts
+    result = lltype.malloc(GUARD_FAILURES_CONTAINER, len(counts))
+    i = 0
+    for number, counter in counts.items():
+        result[i].number = number
+        result[i].counter = counter
+        i += 1
+    if reset:
+        counts.clear()
+    return result
+
 @register_helper(annmodel.SomeInteger(unsigned=True))
 def stats_asmmemmgr_allocated(warmrunnerdesc):
     return warmrunnerdesc.metainterp_sd.cpu.asmmemmgr.get_stats()[0]
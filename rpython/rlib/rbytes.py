@@ -0,0 +1,292 @@
+"""
+Bulk operations on strings of bytes: counting a character, finding a
+line break, changing the case, translating with a table, and checking
+the class of all the characters.  The argument can be a 'str' or a
+list of chars made by rgc.resizable_list_supporting_raw_ptr().
+
+When translated, long enough strings are given to the vectorized C
+functions of rlib/fastbytes if the CPU supports them; otherwise, and
+always when running untranslated, plain loops are used.  Only the ASCII
+letters, digits and whitespace are considered, like in the RPython
+methods of 'str'.
+"""
+
+from rpython.rlib import jit, rgc
+from rpython.rlib.objectmodel import specialize, we_are_translated
+from rpython.rlib.objectmodel import keepalive_until_here
+from rpython.rlib.rstring import StringBuilder
+from rpython.rlib.fastbytes import capi as fastbytes
+from rpython.rtyper.annlowlevel import llstr, hlstr
+from rpython.rtyper.lltypesystem import lltype, rffi, rstr
+from rpython.rtyper.lltypesystem.rstr import STR, mallocstr
+
+# Strings at least this long are given to the C functions.
+FASTBYTES_MIN_LENGTH = 16
+
+def _use_fastbytes(length):
+    return (fastbytes.SUPPORTED and we_are_translated() and
+            not rgc.must_split_gc_address_space() and
+            length >= FASTBYTES_MIN_LENGTH)
+
+@specialize.argtype(0)
+def _get_raw(value, start):
+    # no GC operation may occur between here and the end of the call
+    # that uses the result, which must be followed by
+    # keepalive_until_here(value)
+    if isinstance(value, str):
+        addr = rstr._get_raw_buf_string(STR, llstr(value), start)
+        return rffi.cast(rffi.CCHARP, addr)
+    else:
+        p = rgc.nonmoving_raw_ptr_for_resizable_list(value)
+        return rffi.ptradd(p, start)
+
+def _size(length):
+    return rffi.cast(rffi.SIZE_T, length)
+
+@specialize.argtype(0)
+def _clip(value, start, end):
+    if end > len(value):
+        end = len(value)
+    if start > end:
+        start = end
+    return start, end
+
+# ____________________________________________________________
+
+@specialize.argtype(0)
+@jit.dont_look_inside
+def count_char(value, c, start, end):
+    """Count the characters 'c' in value[start:end].  Both 'start' and
+    'end' must be >= 0."""
+    assert start >= 0
+    start, end = _clip(value, start, end)
+    if _use_fastbytes(end - start):
+        p = _get_raw(value, start)
+        res = fastbytes.count_char(p, _size(end - start), c)
+        keepalive_until_here(value)
+        return rffi.cast(lltype.Signed, res)
+    return _count_char_loop(value, c, start, end)
+
+@specialize.argtype(0)
+def _count_char_loop(value, c, start, end):
+    count = 0
+    for i in range(start, end):
+        if value[i] == c:
+            count += 1
+    return count
+
+@specialize.argtype(0)
+@jit.dont_look_inside
+def find_linebreak(value, start, end):
+    """Return the index of the first '\\n' or '\\r' in value[start:end],
+    or -1.  Both 'start' and 'end' must be >= 0."""
+    assert start >= 0
+    start, end = _clip(value, start, end)
+    if _use_fastbytes(end - start):
+        p = _get_raw(value, start)
+        res = fastbytes.find_linebreak(p, _size(end - start))
+        keepalive_until_here(value)
+        res = rffi.cast(lltype.Signed, res)
+        if res < 0:
+            return -1
+        return start + res
+    return _find_linebreak_loop(value, start, end)
+
+@specialize.argtype(0)
+def _find_linebreak_loop(value, start, end):
+    for i in range(start, end):
+        c = value[i]
+        if c == '\n' or c == '\r':
+            return i
+    return -1
+
+# ____________________________________________________________
+
+LOWER = 0
+UPPER = 1
+SWAPCASE = 2
+
+def _get_raw_result(ll_result):
+    # the C functions write directly into the new string, allocated with
+    # mallocstr().  Like _get_raw(), no GC operation may occur until the
+    # end of the call.  Call this after _get_raw(), which may do one
+    addr = rstr._get_raw_buf_string(STR, ll_result, 0)
+    return rffi.cast(rffi.CCHARP, addr)
+
+def _hlstr_result(ll_result):
+    result = hlstr(ll_result)
+    assert result is not None
+    return result
+
+@specialize.argtype(0)
+def _change_case(value, kind):
+    length = len(value)
+    ll_result = mallocstr(length)
+    p = _get_raw(value, 0)
+    dst = _get_raw_result(ll_result)
+    if kind == LOWER:
+        fastbytes.lower(p, dst, _size(length))
+    elif kind == UPPER:
+        fastbytes.upper(p, dst, _size(length))
+    else:
+        fastbytes.swapcase(p, dst, _size(length))
+    keepalive_until_here(value)
+    keepalive_until_here(ll_result)
+    return _hlstr_result(ll_result)
+
+@specialize.argtype(0)
+@jit.dont_look_inside
+def lower(value):
+    if isinstance(value, str):
+        # the C compiler already vectorizes the loop of str.lower()
+        return value.lower()
+    if _use_fastbytes(len(value)):
+        return _change_case(value, LOWER)
+    return _lower_loop(value)
+
+@specialize.argtype(0)
+def _lower_loop(value):
+    builder = StringBuilder(len(value))
+    for c in value:
+        if c.isupper():
+            c = chr(ord(c) + 32)
+        builder.append(c)
+    return builder.build()
+
+@specialize.argtype(0)
+@jit.dont_look_inside
+def upper(value):
+    if isinstance(value, str):
+        return value.upper()
+    if _use_fastbytes(len(value)):
+        return _change_case(value, UPPER)
+    return _upper_loop(value)
+
+@specialize.argtype(0)
+def _upper_loop(value):
+    builder = StringBuilder(len(value))
+    for c in value:
+        if c.islower():
+            c = chr(ord(c) - 32)
+        builder.append(c)
+    return builder.build()
+
+@specialize.argtype(0)
+@jit.dont_look_inside
+def swapcase(value):
+    if _use_fastbytes(len(value)):
+        return _change_case(value, SWAPCASE)
+    return _swapcase_loop(value)
+
+@specialize.argtype(0)
+def _swapcase_loop(value):
+    builder = StringBuilder(len(value))
+    for c in value:
+        if c.isupper():
+            c = chr(ord(c) + 32)
+        elif c.islower():
+            c = chr(ord(c) - 32)
+        builder.append(c)
+    return builder.build()
+
+@specialize.argtype(0)
+@jit.dont_look_inside
+def translate(value, table):
+    """Return the string of the characters table[ord(c)].  'table' is
+    a string of 256 characters."""
+    assert len(table) == 256
+    length = len(value)
+    if _use_fastbytes(length):
+        ll_result = mallocstr(length)
+        p = _get_raw(value, 0)
+        dst = _get_raw_result(ll_result)
+        t = _get_raw(table, 0)
+        fastbytes.translate(p, dst, _size(length), t)
+        keepalive_until_here(value)
+        keepalive_until_here(table)
+        keepalive_until_here(ll_result)
+        return _hlstr_result(ll_result)
+    return _translate_loop(value, table)
+
+@specialize.argtype(0)
+def _translate_loop(value, table):
+    builder = StringBuilder(len(value))
+    for c in value:
+        builder.append(table[ord(c)])
+    return builder.build()
+
+# ____________________________________________________________
+
+@specialize.argtype(0)
+def _all_in_class(value, cls):
+    length = len(value)
+    if _use_fastbytes(length):
+        p = _get_raw(value, 0)
+        res = fastbytes.all_in_class(p, _size(length),
+                                     rffi.cast(rffi.INT, cls))
+        keepalive_until_here(value)
+        return rffi.cast(lltype.Signed, res) != 0
+    return _all_in_class_loop(value, cls)
+
+@specialize.argtype(0)
+def _all_in_class_loop(value, cls):
+    if len(value) == 0:
+        return False
+    if cls == fastbytes.DIGIT:
+        for c in value:
+            if not c.isdigit():
+                return False
+    elif cls == fastbytes.ALPHA:
+        for c in value:
+            if not c.isalpha():
+                return False
+    elif cls == fastbytes.ALNUM:
+        for c in value:
+            if not c.isalnum():
+                return False
+    else:
+        for c in value:
+            if not c.isspace():
+                return False
+    return True
+
+# like the methods of 'str': False for the empty string
+
+@specialize.argtype(0)
+@jit.dont_look_inside
+def isdigit(value):
+    return _all_in_class(value, fastbytes.DIGIT)
+
+@specialize.argtype(0)
+@jit.dont_look_inside
+def isalpha(value):
+    return _all_in_class(value, fastbytes.ALPHA)
+
+@specialize.argtype(0)
+@jit.dont_look_inside
+def isalnum(value):
+    return _all_in_class(value, fastbytes.ALNUM)
+
+@specialize.argtype(0)
+@jit.dont_look_inside
+def isspace(value):
+    return _all_in_class(value, fastbytes.SPACE)
+
+@specialize.argtype(0)
+@jit.dont_look_inside
+def is_ascii(value):
+    """True if all the characters are < 0x80, including for ''."""
+    length = len(value)
+    if _use_fastbytes(length):
+        p = _get_raw(value, 0)
+        res = fastbytes.is_ascii(p, _size(length))
+        keepalive_until_here(value)
+        return rffi.cast(lltype.Signed, res) != 0
+    return _is_ascii_loop(value)
+
+@specialize.argtype(0)
+def _is_ascii_loop(value):
+    for c in value:
+        if ord(c) >= 0x80:
+            return False
+    return True
@@ -58,6 +58,14 @@ def is_done__states(oldstate, newstate):
     # just write it in plain RPython.
     return oldstate != 0 and newstate == 0
 
+def trim_memory():
+    """Give back to the OS the memory that the GC holds but does not
+    currently use: the free pages in the arenas, the nursery, and the free
+    memory of the raw malloc() heap.  Return the number of bytes of GC
+    memory released.  Does nothing if the GC doesn't support it.
+    """
+    return 0
+
 def set_max_heap_size(nbytes):
     """Limit the heap size to n bytes.
     """
@@ -213,6 +221,18 @@ class CollectStepEntry(ExtRegistryEntry):
         return hop.genop('gc__collect_step', hop.args_v, resulttype=hop.r_result)
 
 
+class TrimMemoryEntry(ExtRegistryEntry):
+    _about_ = trim_memory
+
+    def compute_result_annotation(self):
+        from rpython.annotator import model as annmodel
+        return annmodel.SomeInteger()
+
+    def specialize_call(self, hop):
+        hop.exception_cannot_occur()
+        return hop.genop('gc__trim_memory', hop.args_v, resulttype=hop.r_result)
+
+
 class SetMaxHeapSizeEntry(ExtRegistryEntry):
     _about_ = set_max_heap_size
 
@@ -845,7 +865,7 @@ def cast_gcref_to_int(gcref):
 (TOTAL_MEMORY, TOTAL_ALLOCATED_MEMORY, TOTAL_MEMORY_PRESSURE,
  PEAK_MEMORY, PEAK_ALLOCATED_MEMORY, TOTAL_ARENA_MEMORY,
  TOTAL_RAWMALLOCED_MEMORY, PEAK_ARENA_MEMORY, PEAK_RAWMALLOCED_MEMORY,
- NURSERY_SIZE, TOTAL_GC_TIME) = range(11)
+ NURSERY_SIZE, TOTAL_GC_TIME, RELEASED_MEMORY, HUGEPAGE_MEMORY) = range(13)
 
 @not_rpython
 def get_stats(stat_no):
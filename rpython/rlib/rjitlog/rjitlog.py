@@ -41,6 +41,8 @@ eci = ExternalCompilationInfo(**eci_kwds)
 # jit log functions
 jitlog_init = rffi.llexternal("jitlog_init", [rffi.INT],
                               rffi.CCHARP, compilation_info=eci)
+jitlog_init_socket = rffi.llexternal("jitlog_init_socket", [rffi.CCHARP],
+                              rffi.CCHARP, compilation_info=eci)
 jitlog_try_init_using_env = rffi.llexternal("jitlog_try_init_using_env",
                               [], lltype.Void, compilation_info=eci)
 jitlog_write_marked = rffi.llexternal("jitlog_write_marked",
@@ -63,7 +65,9 @@ class JitlogError(Exception):
 def stats_flush_trace_counts(warmrunnerdesc):
     if not we_are_translated():
         return # first param is None untranslated
-    warmrunnerdesc.metainterp_sd.cpu.assembler.flush_trace_counters()
+    metainterp_sd = warmrunnerdesc.metainterp_sd
+    metainterp_sd.cpu.assembler.flush_trace_counters()
+    metainterp_sd.jitlog.flush_guard_failures()
 
 @jit.dont_look_inside
 def enable_jitlog(fileno):
@@ -71,9 +75,30 @@ def enable_jitlog(fileno):
     p_error = jitlog_init(fileno)
     if p_error:
         raise JitlogError(rffi.charp2str(p_error))
+    _write_header()
+
+@jit.dont_look_inside
+def enable_jitlog_socket(path):
+    """ Stream the jitlog to the Unix-domain socket 'path'.  The
+        records are the same as the ones written to a file.
+    """
+    with rffi.scoped_str2charp(path) as ll_path:
+        p_error = jitlog_init_socket(ll_path)
+        if p_error:
+            raise JitlogError(rffi.charp2str(p_error))
+    _write_header()
+
+def _write_header():
     blob = assemble_header()
     jitlog_write_marked(MARK_JITLOG_HEADER + blob, len(blob) + 1)
 
+def flush_counters():
+    """ Write the execution counters of the loops and bridges, and the
+        guard failure counts, collected since the last flush.  Called
+        periodically when streaming the jitlog.
+    """
+    stats_flush_trace_counts(None)
+
 def disable_jitlog():
     stats_flush_trace_counts(None)
     jitlog_teardown()
@@ -305,13 +330,17 @@ def assemble_header():
     return ''.join(content)
 
 def _log_jit_counter(struct):
+    _log_counter(struct.number, struct.type, struct.i)
+
+def _log_counter(number, type, count):
     if not jitlog_enabled():
         return
     # addr is either a number (trace_id), or the address
     # of the descriptor. for entries it is a the trace_id,
-    # for any label/bridge entry the addr is the address
-    list = [MARK_JITLOG_COUNTER, encode_le_addr(struct.number),
-            struct.type, encode_le_64bit(struct.i)]
+    # for any label/bridge entry and for guard failures ('g')
+    # the addr is the address
+    list = [MARK_JITLOG_COUNTER, encode_le_addr(number),
+            type, encode_le_64bit(count)]
     content = ''.join(list)
     jitlog_write_marked(content, len(content))
 
@@ -338,6 +367,9 @@ class JitLogger(object):
         self.memo = {}
         self.trace_id = 0
         self.metainterp_sd = None
+        # unique id of a fail descr -> number of failures since the
+        # last flush_guard_failures()
+        self.guard_failures = {}
         # legacy
         self.logger_ops = None
         self.logger_noopt = None
@@ -358,6 +390,17 @@ class JitLogger(object):
         self.trace_id += 1
         return self.trace_id
 
+    def guard_failed(self, faildescr):
+        if not jitlog_enabled():
+            return
+        number = compute_unique_id(faildescr)
+        self.guard_failures[number] = self.guard_failures.get(number, 0) + 1
+
+    def flush_guard_failures(self):
+        for number, count in self.guard_failures.items():
+            _log_counter(number, 'g', count)
+        self.guard_failures.clear()
+
     def start_new_trace(self, metainterp_sd, faildescr=None, entry_bridge=False, jd_name=""):
         # even if the logger is not enabled, increment the trace id
         self.trace_id += 1
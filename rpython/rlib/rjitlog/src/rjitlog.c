@@ -25,6 +25,8 @@
 #include <fcntl.h>
 #ifndef _WIN32
 #include <unistd.h>
+#include <sys/socket.h>
+#include <sys/un.h>
 #endif
 #include <errno.h>
 
@@ -84,6 +86,33 @@ char *jitlog_init(int fd)
     return NULL;
 }
 
+RPY_EXTERN
+char *jitlog_init_socket(char *path)
+{
+#ifdef _WIN32
+    return "streaming the jitlog to a socket is not supported on Windows";
+#else
+    struct sockaddr_un addr;
+    int fd;
+
+    if (strlen(path) >= sizeof(addr.sun_path))
+        return "socket path too long";
+    memset(&addr, 0, sizeof(addr));
+    addr.sun_family = AF_UNIX;
+    strcpy(addr.sun_path, path);
+
+    fd = socket(AF_UNIX, SOCK_STREAM, 0);
+    if (fd == -1)
+        return strerror(errno);
+    if (connect(fd, (struct sockaddr *)&addr, sizeof(addr)) == -1) {
+        int saved_errno = errno;
+        close(fd);
+        return strerror(saved_errno);
+    }
+    return jitlog_init(fd);
+#endif
+}
+
 RPY_EXTERN
 void jitlog_teardown()
 {
@@ -101,5 +130,18 @@ void jitlog_write_marked(char * text, int length)
 {
     if (!jitlog_ready) { return; }
 
-    write(jitlog_fd, text, length);
+    while (length > 0) {
+        int count = write(jitlog_fd, text, length);
+        if (count < 0) {
+            if (errno == EINTR)
+                continue;
+            /* the reader went away (e.g. the other end of the socket
+               was closed): stop logging instead of failing again and
+               again */
+            jitlog_ready = 0;
+            return;
+        }
+        text += count;
+        length -= count;
+    }
 }
@@ -151,3 +151,82 @@ class TestLogger(object):
               jl.encode_le_addr(new_id_looptoken) + \
               jl.encode_le_addr(newlooptoken._ll_function_addr)
         assert binary.endswith(end)
+
+    def test_guard_failures(self, tmpdir):
+        descr1 = FakeCallAssemblerLoopToken(0x0)
+        descr2 = FakeCallAssemblerLoopToken(0x0)
+        logger = jl.JitLogger()
+        file = tmpdir.join('binary_file')
+        file.ensure()
+        rfile = create_file(str(file), 'wb')
+        with SuppressIPH():
+            jl.jitlog_init(rfile.fileno())
+            logger.guard_failed(descr1)
+            logger.guard_failed(descr2)
+            logger.guard_failed(descr1)
+            logger.flush_guard_failures()
+            # the counts start again from zero after a flush
+            logger.guard_failed(descr1)
+            logger.flush_guard_failures()
+            rfile.close()
+        binary = file.read()
+        def counter(descr, count):
+            return (jl.MARK_JITLOG_COUNTER +
+                    jl.encode_le_addr(compute_unique_id(descr)) + 'g' +
+                    jl.encode_le_64bit(count))
+        assert len(binary) == 3 * len(counter(descr1, 0))
+        assert counter(descr1, 2) in binary
+        assert counter(descr2, 1) in binary
+        assert binary.endswith(counter(descr1, 1))
+
+    @pytest.mark.skipif("sys.platform == 'win32'")
+    def test_enable_jitlog_socket(self):
+        import socket, tempfile, shutil, os
+        tmpdir = tempfile.mkdtemp()
+        path = os.path.join(tmpdir, 'jitlog.sock')
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            server.bind(path)
+            server.listen(1)
+            jl.enable_jitlog_socket(path)
+            conn, _ = server.accept()
+            jl._log_counter(42, 'e', 1000)
+            jl.jitlog_teardown()
+            data = ''
+            while True:
+                chunk = conn.recv(4096)
+                if not chunk:
+                    break
+                data += chunk
+            conn.close()
+        finally:
+            server.close()
+            shutil.rmtree(tmpdir)
+        blob = jl.assemble_header()
+        assert data == (jl.MARK_JITLOG_HEADER + blob +
+                        jl.MARK_JITLOG_COUNTER + jl.encode_le_addr(42) +
+                        'e' + jl.encode_le_64bit(1000))
+
+    def test_enable_jitlog_socket_error(self, tmpdir):
+        with pytest.raises(jl.JitlogError):
+            jl.enable_jitlog_socket(str(tmpdir.join('nosuchsocket')))
+
+    def test_flush_trace_counters_keeps_totals(self, monkeypatch):
+        from rpython.jit.backend.llsupport.assembler import BaseAssembler
+        logged = []
+        monkeypatch.setattr(jl, '_log_counter',
+                            lambda number, type, count:
+                                logged.append((number, type, count)))
+        class FakeAssembler(BaseAssembler):
+            def __init__(self):
+                self.loop_run_counters = []
+        asm = FakeAssembler()
+        struct = asm._register_counter('e', 42, None)
+        struct.i = 3
+        asm.flush_trace_counters()
+        assert logged == [(42, 'e', 3)]
+        struct.i += 2
+        asm.flush_trace_counters()
+        asm.flush_trace_counters()
+        assert logged == [(42, 'e', 3), (42, 'e', 2)]
+        assert struct.i == 5
@@ -881,6 +881,19 @@ if _POSIX:
         def madvise_free(addr, map_size):
             "No madvise() on this platform"
 
+    if has_madvise and MADV_HUGEPAGE is not None:
+        def madvise_hugepage(addr, map_size):
+            # Ask for transparent huge pages.  Returns False if the kernel
+            # doesn't support them.
+            res = c_madvise_safe(rffi.cast(PTR, addr),
+                                 rffi.cast(size_t, map_size),
+                                 rffi.cast(rffi.INT, MADV_HUGEPAGE))
+            return rffi.cast(lltype.Signed, res) == 0
+    else:
+        def madvise_hugepage(addr, map_size):
+            "No transparent huge pages on this platform"
+            return False
+
 elif _MS_WINDOWS:
     def mmap(fileno, length, tagname="", access=_ACCESS_DEFAULT, offset=0):
         # XXX flags is or-ed into access by now.
@@ -1041,3 +1054,7 @@ elif _MS_WINDOWS:
             rffi.cast(DWORD, PAGE_READWRITE))
         #from rpython.rlib import debug
         #debug.debug_print("madvise_free:", r)
+
+    def madvise_hugepage(addr, map_size):
+        "Large pages need a special privilege on Windows, not supported"
+        return False
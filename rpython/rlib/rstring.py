@@ -470,6 +470,17 @@ SEARCH_COUNT = 0
 SEARCH_FIND = 1
 SEARCH_RFIND = 2
 
+# For needles at least that long, _search_normal() switches to the
+# two-way algorithm if the simple search starts to take more than linear
+# time.  Shorter needles cannot make it much slower than linear anyway.
+TWOWAY_MIN_LENGTH = 6
+
+# For needles shorter than that, searching a str looks for the first char
+# of the needle with memchr() or memrchr() instead, when translated.
+# Longer needles let _search_normal() skip more chars at once.
+MEMCHR_MAX_LENGTH = 32
+HAVE_MEMRCHR = sys.platform.startswith('linux')
+
 @specialize.ll()
 def bloom_add(mask, c):
     return mask | (1 << (ord(c) & (BLOOM_WIDTH - 1)))
@@ -487,6 +498,10 @@ def _search(value, other, start, end, mode):
 @specialize.argtype(0, 1)
 @jit.elidable
 def _search_elidable(value, other, start, end, mode):
+    from rpython.rtyper.lltypesystem.rstr import use_memchr
+    if (0 < len(other) < MEMCHR_MAX_LENGTH and use_memchr() and
+            (mode != SEARCH_RFIND or HAVE_MEMRCHR)):
+        return _search_memchr(value, other, start, end, mode)
     return _search_normal(value, other, start, end, mode)
 
 @specialize.argtype(0, 1)
@@ -527,6 +542,9 @@ def _search_normal(value, other, start, end, mode):
     mlast = m - 1
     skip = mlast
     mask = 0
+    # number of chars compared so far, to detect inputs that would make
+    # this algorithm quadratic, like 'aa...aabaa...aa' in 'aaaa...'
+    work = 0
 
     if mode != SEARCH_RFIND:
         for i in range(mlast):
@@ -549,6 +567,11 @@ def _search_normal(value, other, start, end, mode):
                     i += mlast
                     continue
 
+                if m >= TWOWAY_MIN_LENGTH:
+                    work += j + 1
+                    if work > n:
+                        return _search_two_way(value, other, i, end, mode,
+                                               count)
                 if i + m < len(value):
                     c = value[i + m]
                 else:
@@ -580,6 +603,11 @@ def _search_normal(value, other, start, end, mode):
                         break
                 else:
                     return i
+                if m >= TWOWAY_MIN_LENGTH:
+                    work += m - j
+                    if work > n:
+                        return _search_two_way(value, other, start, i + m,
+                                               mode, 0)
                 if i - 1 >= 0 and not bloom(mask, value[i - 1]):
                     i -= m
                 else:
@@ -592,6 +620,155 @@ def _search_normal(value, other, start, end, mode):
         return -1
     return count
 
+@specialize.argtype(1)
+def _search_memchr(value, other, start, end, mode):
+    # For short needles: memchr() or memrchr() find the next position of
+    # the first char of the needle much faster than _search_normal() can
+    # skip, unless that char is very common in 'value'.
+    from rpython.rtyper.annlowlevel import llstr
+    from rpython.rtyper.lltypesystem.rstr import ll_memchr
+    if start < 0:
+        start = 0
+    if end > len(value):
+        end = len(value)
+    m = len(other)
+    first = other[0]
+    reverse = mode == SEARCH_RFIND
+    # the positions still to check are lo to hi included
+    lo = start
+    hi = end - m
+    count = 0
+    misses = 0
+    ll_value = llstr(value)
+    while lo <= hi:
+        i = ll_memchr(ll_value, first, lo, hi + 1, reverse)
+        if i < 0:
+            break
+        j = 1
+        while j < m and value[i + j] == other[j]:
+            j += 1
+        if j == m:
+            if mode != SEARCH_COUNT:
+                return i
+            count += 1
+            lo = i + m
+            continue
+        if reverse:
+            hi = i - 1
+        else:
+            lo = i + 1
+        misses += 1
+        if misses > 16 and misses * 8 > (lo - start) + (end - m - hi):
+            # too many false candidates, _search_normal() is faster
+            res = _search_normal(value, other, lo, hi + m, mode)
+            if mode == SEARCH_COUNT:
+                res += count
+            return res
+    if mode != SEARCH_COUNT:
+        return -1
+    return count
+
+@specialize.argtype(0)
+def _char_at(s, start, end, index, reverse):
+    # the index-th char of s[start:end], or of the reversed s[start:end]
+    if reverse:
+        return s[end - 1 - index]
+    return s[start + index]
+
+@specialize.argtype(0)
+def _maximal_suffix(other, reverse, inverse_order):
+    # Returns the start of the maximal suffix of 'other' minus one, for
+    # the order of chars given by 'inverse_order', and its period.
+    m = len(other)
+    maxsuffix = -1
+    j = 0
+    k = period = 1
+    while j + k < m:
+        a = ord(_char_at(other, 0, m, j + k, reverse))
+        b = ord(_char_at(other, 0, m, maxsuffix + k, reverse))
+        if inverse_order:
+            a, b = b, a
+        if a < b:
+            j += k
+            k = 1
+            period = j - maxsuffix
+        elif a == b:
+            if k != period:
+                k += 1
+            else:
+                j += period
+                k = 1
+        else:
+            maxsuffix = j
+            j += 1
+            k = period = 1
+    return maxsuffix, period
+
+@specialize.argtype(0, 1)
+def _search_two_way(value, other, start, end, mode, count):
+    """The two-way algorithm of Crochemore and Perrin: linear time in the
+    worst case, and constant space.  SEARCH_RFIND runs the same algorithm
+    on the reversed strings.  'count' is the number of matches found
+    so far, for SEARCH_COUNT.
+    """
+    reverse = mode == SEARCH_RFIND
+    n = end - start
+    m = len(other)
+    #
+    # critical factorization of the needle: other[:suffix] + other[suffix:]
+    maxsuffix1, period1 = _maximal_suffix(other, reverse, False)
+    maxsuffix2, period2 = _maximal_suffix(other, reverse, True)
+    if maxsuffix1 > maxsuffix2:
+        suffix = maxsuffix1 + 1
+        period = period1
+    else:
+        suffix = maxsuffix2 + 1
+        period = period2
+    #
+    # is 'period' the period of the whole needle?
+    periodic = suffix + period <= m
+    if periodic:
+        for i in range(suffix):
+            if (_char_at(other, 0, m, i, reverse) !=
+                    _char_at(other, 0, m, i + period, reverse)):
+                periodic = False
+                break
+    if not periodic:
+        period = max(suffix, m - suffix) + 1
+    #
+    # 'memory' is the length of the needle's prefix that is known to
+    # match already, in the periodic case
+    memory = 0
+    j = 0
+    while j <= n - m:
+        i = max(suffix, memory)
+        while (i < m and _char_at(other, 0, m, i, reverse) ==
+                         _char_at(value, start, end, i + j, reverse)):
+            i += 1
+        if i < m:
+            j += i - suffix + 1
+            memory = 0
+            continue
+        i = suffix - 1
+        while (i >= memory and _char_at(other, 0, m, i, reverse) ==
+                               _char_at(value, start, end, i + j, reverse)):
+            i -= 1
+        if i < memory:
+            if mode == SEARCH_COUNT:
+                count += 1
+                j += m
+                memory = 0
+                continue
+            if reverse:
+                return end - j - m
+            return start + j
+        j += period
+        if periodic:
+            memory = m - period
+    if mode != SEARCH_COUNT:
+        return -1
+    return count
+
 # -------------- numeric parsing support --------------------
 
 def strip_spaces(s):
@@ -81,6 +81,23 @@ class FormatIterator(object):
                 self.operate(fmtdesc, repetitions)
         self.finished()
 
+    @jit.look_inside_iff(lambda self, compiled: jit.isconstant(compiled))
+    def interpret_compiled(self, compiled):
+        # same as interpret(), for a format that was already parsed by
+        # compile_format(); only for subclasses with a specialized operate()
+        table = unroll_native_fmtdescs
+        if not compiled.native:
+            table = unroll_standard_fmtdescs
+        self.bigendian = compiled.bigendian
+        for op in compiled.ops:
+            for fmtdesc in table:
+                if op.fmtchar == fmtdesc.fmtchar:
+                    if fmtdesc.alignment > 1:
+                        self.align(fmtdesc.mask)
+                    self.operate(fmtdesc, op.repetitions)
+                    break
+        self.finished()
+
     def finished(self):
         pass
 
@@ -103,6 +120,58 @@ class CalcSizeFormatIterator(FormatIterator):
             raise StructError("total struct size too long")
 
 
+class FormatOp(object):
+    _immutable_ = True
+
+    def __init__(self, fmtchar, repetitions):
+        self.fmtchar = fmtchar
+        self.repetitions = repetitions
+
+
+class CompiledFormat(object):
+    """
+    A format string parsed once and for all: the list of FormatOps to
+    give to operate(), and the total size.  See compile_format().
+    """
+    _immutable_ = True
+    _immutable_fields_ = ['ops[*]']
+
+    def __init__(self, native, bigendian, ops, size):
+        self.native = native
+        self.bigendian = bigendian
+        self.ops = ops
+        self.size = size
+
+
+class CompileFormatIterator(CalcSizeFormatIterator):
+    def __init__(self):
+        self.ops = []
+
+    def operate(self, fmtdesc, repetitions):
+        CalcSizeFormatIterator.operate(self, fmtdesc, repetitions)
+        if (not fmtdesc.needcount and self.ops and
+                self.ops[-1].fmtchar == fmtdesc.fmtchar):
+            # "iii" is the same as "3i"
+            prev = self.ops.pop()
+            try:
+                repetitions = ovfcheck(prev.repetitions + repetitions)
+            except OverflowError:
+                raise StructError("overflow in item count")
+        self.ops.append(FormatOp(fmtdesc.fmtchar, repetitions))
+
+
+def compile_format(fmt):
+    """Parse the format string 'fmt' and return a CompiledFormat, which
+    FormatIterator.interpret_compiled() can then run any number of times
+    without looking at the format string again.  Raises StructError if
+    the format is invalid."""
+    fmtiter = CompileFormatIterator()
+    fmtiter.interpret(fmt)
+    native = not (len(fmt) > 0 and fmt[0] in '=<>!')
+    return CompiledFormat(native, fmtiter.bigendian, fmtiter.ops[:],
+                          fmtiter.totalsize)
+
+
 class FmtDesc(object):
     def __init__(self, fmtchar, attrs):
         self.fmtchar = fmtchar
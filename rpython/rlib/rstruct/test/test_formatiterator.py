@@ -0,0 +1,32 @@
+import pytest
+from rpython.rlib.rstruct.error import StructError
+from rpython.rlib.rstruct.formatiterator import compile_format
+from rpython.rlib.rstruct.nativefmttable import native_is_bigendian
+import struct
+
+
+def ops(compiled):
+    return [(op.fmtchar, op.repetitions) for op in compiled.ops]
+
+def test_compile_format():
+    c = compile_format('<hhxi 3s2s')
+    assert not c.native
+    assert not c.bigendian
+    assert c.size == struct.calcsize('<hhxi 3s2s')
+    assert ops(c) == [('h', 2), ('x', 1), ('i', 1), ('s', 3), ('s', 2)]
+    #
+    c = compile_format('bi3ic')
+    assert c.native
+    assert c.bigendian == native_is_bigendian
+    assert c.size == struct.calcsize('bi3ic')
+    assert ops(c) == [('b', 1), ('i', 4), ('c', 1)]
+    #
+    c = compile_format('!q')
+    assert not c.native
+    assert c.bigendian
+    assert compile_format('').ops == []
+
+def test_compile_format_errors():
+    pytest.raises(StructError, compile_format, 'iz')
+    pytest.raises(StructError, compile_format, '12')
+    pytest.raises(StructError, compile_format, 'i\x00')
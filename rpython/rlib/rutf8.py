@@ -18,12 +18,14 @@ extra code in the middle for error handlers and so on.
 import sys
 from rpython.rlib.objectmodel import enforceargs, we_are_translated, specialize
 from rpython.rlib.objectmodel import always_inline, dont_inline, try_inline
+from rpython.rlib.objectmodel import keepalive_until_here
 from rpython.rlib.rstring import StringBuilder
 from rpython.rlib import jit, types, rarithmetic
 from rpython.rlib.signature import signature, finishsigs
 from rpython.rlib.types import char, none
 from rpython.rlib.rarithmetic import r_uint
 from rpython.rlib.unicodedata import unicodedb
+from rpython.rlib.fastutf8 import capi as fastutf8
 from rpython.rtyper.lltypesystem import lltype, rffi
 
 # We always use MAXUNICODE = 0x10ffff when unicode objects use utf8
@@ -369,14 +371,49 @@ def get_utf8_length(s, start=0, end=-1):
         end = len(s)
     return codepoints_in_utf8(s, start, end)
 
+# Strings at least this long are given to the vectorized C functions of
+# rlib/fastutf8, if the CPU supports them.  Not when running untranslated.
+FASTUTF8_MIN_LENGTH = 16
+
+@specialize.arg(0)
+def _call_fastutf8(validate, s, start, end):
+    from rpython.rtyper.annlowlevel import llstr
+    from rpython.rtyper.lltypesystem import rstr
+    # no GC operation may occur between here and the end of the call
+    ll_s = llstr(s)
+    addr = rstr._get_raw_buf_string(rstr.STR, ll_s, start)
+    if validate:
+        func = fastutf8.count_utf8_codepoints
+    else:
+        func = fastutf8.count_codepoints
+    res = func(rffi.cast(rffi.CCHARP, addr),
+               rffi.cast(rffi.SIZE_T, end - start))
+    keepalive_until_here(ll_s)
+    return rffi.cast(lltype.Signed, res)
+
+def _use_fastutf8(start, end):
+    from rpython.rlib import rgc
+    return (fastutf8.SUPPORTED and we_are_translated() and
+            not rgc.must_split_gc_address_space() and
+            end - start >= FASTUTF8_MIN_LENGTH)
+
 @jit.elidable
 def _check_utf8(s, allow_surrogates, start, stop):
-    pos = start
-    continuation_bytes = 0
     if stop < 0:
         end = len(s)
     else:
         end = stop
+    if _use_fastutf8(start, end):
+        res = _call_fastutf8(True, s, start, end)
+        if res >= 0:
+            return res
+        # not valid utf-8, or contains surrogates: the loop finds out
+        # which, and where
+    return _check_utf8_loop(s, allow_surrogates, start, end)
+
+def _check_utf8_loop(s, allow_surrogates, start, end):
+    pos = start
+    continuation_bytes = 0
     while pos < end:
         ordch1 = ord(s[pos])
         pos += 1
@@ -475,6 +512,11 @@ def codepoints_in_utf8(value, start=0, end=sys.maxint):
     if end > len(value):
         end = len(value)
     assert 0 <= start <= end
+    if _use_fastutf8(start, end):
+        return _call_fastutf8(False, value, start, end)
+    return _codepoints_in_utf8_loop(value, start, end)
+
+def _codepoints_in_utf8_loop(value, start, end):
     length = 0
     for i in range(start, end):
         # we want to count the number of chars not between 0x80 and 0xBF;
@@ -32,8 +32,10 @@ def get_unique_id(code):
         return code._vmprof_unique_id
     return 0
 
-def enable(fileno, interval, memory=0, native=0, real_time=0):
-    _get_vmprof().enable(fileno, interval, memory, native, real_time)
+def enable(fileno, interval, memory=0, native=0, real_time=0,
+           alloc_sample=0):
+    _get_vmprof().enable(fileno, interval, memory, native, real_time,
+                         alloc_sample)
 
 def disable():
     _get_vmprof().disable()
@@ -42,6 +44,22 @@ def is_enabled():
     vmp = _get_vmprof()
     return vmp.is_enabled
 
+def get_alloc_sample_interval():
+    return _get_vmprof().alloc_sample_interval
+
+def sample_allocation(size):
+    """Record the current stack as standing for 'size' bytes of
+    allocations.  Meant to be called from the GC hooks, so it must
+    not allocate anything.  Does nothing if vmprof is not enabled or
+    if sampling is stopped.
+    """
+    # the GC hooks are only annotated when the GC is transformed, which
+    # is too late to add a method to the VMProf classes: call the C
+    # function directly
+    vmp = _get_vmprof()
+    if vmp.is_enabled:
+        vmp.cintf.vmprof_sample_allocation(size)
+
 def get_profile_path(space):
     vmp = _get_vmprof()
     if not vmp.is_enabled:
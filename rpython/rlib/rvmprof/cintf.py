@@ -148,6 +148,13 @@ def setup():
     vmprof_start_sampling = rffi.llexternal("vmprof_start_sampling", [],
                                             lltype.Void, compilation_info=eci,
                                             _nowrapper=True)
+    vmprof_sample_allocation = rffi.llexternal("vmprof_sample_allocation",
+                                               [lltype.Signed], rffi.INT,
+                                               compilation_info=eci,
+                                               _nowrapper=True)
+    vmprof_set_alloc_sampling = rffi.llexternal("vmprof_set_alloc_sampling",
+                                                [rffi.INT], lltype.Void,
+                                                compilation_info=eci)
 
     return CInterface(locals())
 
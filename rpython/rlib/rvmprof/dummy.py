@@ -2,6 +2,7 @@ from rpython.rlib.objectmodel import specialize
 
 class DummyVMProf(object):
     is_enabled = False
+    alloc_sample_interval = 0
 
     def __init__(self):
         self._unique_id = 0
@@ -14,7 +15,8 @@ class DummyVMProf(object):
     def register_code(self, code, full_name_func):
         pass
 
-    def enable(self, fileno, interval, memory=0, native=0, real_time=0):
+    def enable(self, fileno, interval, memory=0, native=0, real_time=0,
+               alloc_sample=0):
         pass
 
     def disable(self):
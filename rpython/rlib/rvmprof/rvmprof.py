@@ -55,6 +55,7 @@ class VMProf(object):
 
     def _cleanup_(self):
         self.is_enabled = False
+        self.alloc_sample_interval = 0
 
     @jit.dont_look_inside
     @specialize.argtype(1)
@@ -129,20 +130,32 @@ class VMProf(object):
         self._gather_all_code_objs = gather_all_code_objs
 
     @jit.dont_look_inside
-    def enable(self, fileno, interval, memory=0, native=0, real_time=0):
+    def enable(self, fileno, interval, memory=0, native=0, real_time=0,
+               alloc_sample=0):
         """Enable vmprof.  Writes go to the given 'fileno'.
         The sampling interval is given by 'interval' as a number of
         seconds, as a float which must be smaller than 1.0.
+        If 'alloc_sample' is not zero, the stack is also recorded about
+        every 'alloc_sample' bytes of allocations (see
+        rvmprof.sample_allocation()).  This is only supported on Unix,
+        and the profile then has the version VERSION_ALLOC_SAMPLE.
         Raises VMProfError if something goes wrong.
         """
         assert fileno >= 0
         if self.is_enabled:
             raise VMProfError("vmprof is already enabled")
+        if alloc_sample < 0:
+            raise VMProfError("alloc_sample must be positive or zero")
 
         if PLAT_WINDOWS:
             native = 0 # force disabled on Windows
+            if alloc_sample:
+                raise VMProfError(
+                    "allocation sampling only supported on unix")
         lines = 0 # not supported on PyPy currently
 
+        self.cintf.vmprof_set_alloc_sampling(int(alloc_sample != 0))
+
         p_error = self.cintf.vmprof_init(fileno, interval, memory, lines, "pypy", native, real_time)
         if p_error:
             raise VMProfError(rffi.charp2str(p_error))
@@ -152,6 +165,7 @@ class VMProf(object):
         if res < 0:
             raise VMProfError(os.strerror(rposix.get_saved_errno()))
         self.is_enabled = True
+        self.alloc_sample_interval = alloc_sample
 
     @jit.dont_look_inside
     def disable(self):
@@ -161,6 +175,7 @@ class VMProf(object):
         if not self.is_enabled:
             raise VMProfError("vmprof is not enabled")
         self.is_enabled = False
+        self.alloc_sample_interval = 0
         res = self.cintf.vmprof_disable()
         if res < 0:
             raise VMProfError(os.strerror(rposix.get_saved_errno()))
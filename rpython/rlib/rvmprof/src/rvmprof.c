@@ -46,3 +46,45 @@ void vmprof_start_sampling(void)
 {
     vmprof_ignore_signals(0);
 }
+
+#ifdef VMPROF_UNIX
+int vmprof_sample_allocation(long size)
+{
+    /* Called by the GC every 'size' bytes allocated in the nursery.
+       Writes the current stack in the format of the SIGPROF samples,
+       but with MARKER_ALLOCATION and 'size' in place of the count.
+       Returns 1 if a sample was written. */
+    int commit = 0;
+    if (vmprof_enter_signal() == 0) {
+        int fd = vmp_profile_fileno();
+        struct profbuf_s *p = reserve_buffer(fd);
+        if (p != NULL) {
+            struct prof_stacktrace_s *st = (struct prof_stacktrace_s *)p->data;
+            int depth = get_stack_trace(get_vmprof_stack(), st->stack,
+                                        MAX_STACK_DEPTH-1, (intptr_t)NULL);
+            if (depth > 0) {
+                st->marker = MARKER_ALLOCATION;
+                st->count = size;
+                st->depth = depth;
+                st->stack[depth++] = NULL;    /* no thread state */
+                p->data_offset = offsetof(struct prof_stacktrace_s, marker);
+                p->data_size = (depth * sizeof(void *) +
+                                sizeof(struct prof_stacktrace_s) -
+                                offsetof(struct prof_stacktrace_s, marker));
+                commit_buffer(fd, p);
+                commit = 1;
+            }
+            else {
+                cancel_buffer(p);
+            }
+        }
+    }
+    vmprof_exit_signal();
+    return commit;
+}
+#else
+int vmprof_sample_allocation(long size)
+{
+    return 0;    /* not supported: enable() refuses 'alloc_sample' */
+}
+#endif
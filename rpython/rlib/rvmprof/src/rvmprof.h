@@ -5,6 +5,11 @@
 
 #define SINGLE_BUF_SIZE (8192 - 2 * sizeof(unsigned int))
 
+/* a stack trace written by vmprof_sample_allocation(): same format as
+   MARKER_STACKTRACE, but with a number of bytes instead of the count.
+   Only in the profiles with the version VERSION_ALLOC_SAMPLE. */
+#define MARKER_ALLOCATION '\x09'
+
 #ifdef VMPROF_WINDOWS
 #include <crtdefs.h>
 typedef __int64 int64_t;
@@ -40,6 +45,8 @@ RPY_EXTERN intptr_t vmprof_get_traceback(void *, void *, void**, intptr_t);
 RPY_EXTERN long vmprof_get_profile_path(char *, long);
 RPY_EXTERN int vmprof_stop_sampling(void);
 RPY_EXTERN void vmprof_start_sampling(void);
+RPY_EXTERN int vmprof_sample_allocation(long);
+RPY_EXTERN void vmprof_set_alloc_sampling(int);
 
 long vmprof_write_header_for_jit_addr(intptr_t *result, long n,
                                       intptr_t addr, int max_depth);
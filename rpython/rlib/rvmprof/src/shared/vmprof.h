@@ -27,6 +27,9 @@
 #define VERSION_MODE_AWARE '\x04'
 #define VERSION_DURATION '\x05'
 #define VERSION_TIMESTAMP '\x06'
+/* like VERSION_TIMESTAMP, but the profile also contains MARKER_ALLOCATION
+   records: readers that don't know them must not accept the file */
+#define VERSION_ALLOC_SAMPLE '\x07'
 
 #define PROFILE_MEMORY '\x01'
 #define PROFILE_LINES  '\x02'
@@ -0,0 +1,125 @@
+import py
+import random
+
+from rpython.rlib import rbytes
+from rpython.rlib.objectmodel import specialize
+from rpython.rlib.rgc import resizable_list_supporting_raw_ptr
+from rpython.rlib.fastbytes import capi
+
+
+CHARS = 'aAzZ@[`{09/:\t\n\r\x0b\x0c\x1c \x7f\x80\xc1\xff'
+
+def _random_strings(seed, chars=CHARS):
+    r = random.Random(seed)
+    for i in range(100):
+        yield ''.join([r.choice(chars) for j in range(r.randrange(60))])
+
+def _values(s):
+    # the functions accept a str or a list of chars
+    return [s, resizable_list_supporting_raw_ptr(list(s))]
+
+TABLE = ''.join([chr((i * 7 + 3) & 0xff) for i in range(256)])
+
+OPERATIONS = [
+    ('lower', rbytes.lower, str.lower),
+    ('upper', rbytes.upper, str.upper),
+    ('swapcase', rbytes.swapcase, str.swapcase),
+    ('translate', lambda v: rbytes.translate(v, TABLE),
+                  lambda s: s.translate(TABLE)),
+    ('isdigit', rbytes.isdigit, str.isdigit),
+    ('isalpha', rbytes.isalpha, str.isalpha),
+    ('isalnum', rbytes.isalnum, str.isalnum),
+    ('isspace', rbytes.isspace, str.isspace),
+    ('is_ascii', rbytes.is_ascii, lambda s: all([ord(c) < 0x80 for c in s])),
+]
+
+def _find_linebreak(s, start, end):
+    for i in range(start, min(end, len(s))):
+        if s[i] in '\r\n':
+            return i
+    return -1
+
+def test_count_char():
+    for s in _random_strings(42):
+        for value in _values(s):
+            for start, end in [(0, len(s)), (3, 20), (10, 5), (2, 1000)]:
+                assert (rbytes.count_char(value, 'a', start, end) ==
+                        s.count('a', start, end))
+
+def test_find_linebreak():
+    for s in _random_strings(43, 'abc\n\r'):
+        for value in _values(s):
+            for start, end in [(0, len(s)), (3, 20), (10, 5), (2, 1000)]:
+                assert (rbytes.find_linebreak(value, start, end) ==
+                        _find_linebreak(s, start, end))
+
+def test_operations():
+    for s in _random_strings(44):
+        for value in _values(s):
+            for name, func, expected in OPERATIONS:
+                assert func(value) == expected(s), name
+
+def test_classes():
+    for chars in ['0123456789', 'abcXYZ', 'abc09', ' \t\n\r\x0b\x0c']:
+        for s in _random_strings(45, chars):
+            for value in _values(s):
+                for name, func, expected in OPERATIONS:
+                    assert func(value) == expected(s), name
+
+
+class TestTranslated:
+    # when translated, strings of 16 bytes or more use the C functions
+
+    def setup_class(cls):
+        if not capi.SUPPORTED:
+            py.test.skip("fastbytes is not supported on this platform")
+        from rpython.translator.c.test.test_genc import compile
+
+        @specialize.argtype(0)
+        def run(value, index):
+            if index == 0:
+                return str(rbytes.count_char(value, 'a', 1, len(value)))
+            elif index == 1:
+                return str(rbytes.find_linebreak(value, 2, len(value)))
+            elif index == 2:
+                return rbytes.lower(value)
+            elif index == 3:
+                return rbytes.upper(value)
+            elif index == 4:
+                return rbytes.swapcase(value)
+            elif index == 5:
+                return rbytes.translate(value, TABLE)
+            else:
+                return '%d%d%d%d%d' % (rbytes.isdigit(value),
+                                       rbytes.isalpha(value),
+                                       rbytes.isalnum(value),
+                                       rbytes.isspace(value),
+                                       rbytes.is_ascii(value))
+
+        def f(s, index):
+            if index >= 100:
+                lst = resizable_list_supporting_raw_ptr([c for c in s])
+                return run(lst, index - 100)
+            return run(s, index)
+        cls.fn = staticmethod(compile(f, [str, int], gcpolicy='incminimark'))
+
+    def check(self, s):
+        results = [str(s.count('a', 1)),
+                   str(_find_linebreak(s, 2, len(s))),
+                   s.lower(), s.upper(), s.swapcase(), s.translate(TABLE),
+                   '%d%d%d%d%d' % (s.isdigit(), s.isalpha(), s.isalnum(),
+                                   s.isspace(), max(s or '\0') < '\x80')]
+        for index, expected in enumerate(results):
+            assert self.fn(s, index) == expected
+            assert self.fn(s, 100 + index) == expected
+
+    def test_mixed(self):
+        r = random.Random(46)
+        self.check(''.join([r.choice(CHARS) for i in range(100)]))
+
+    def test_classes(self):
+        self.check('0123456789' * 5)
+        self.check('abcdefXYZ' * 5)
+        self.check('abc09' * 10)
+        self.check(' \t\n\r\x0b\x0c' * 10)
+        self.check('abc' * 20 + '\x80')
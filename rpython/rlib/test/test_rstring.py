@@ -267,6 +267,105 @@ def test_search():
     check_search(count, 'a', 'ab', 0, 1, res=0)
     check_search(count, 'ac', 'ab', 0, 2, res=0)
 
+def test_search_two_way():
+    import random
+    from rpython.rlib.rstring import _search_two_way, SEARCH_RFIND
+    r = random.Random(42)
+    for i in range(3000):
+        alphabet = 'abc'[:r.randrange(1, 4)]
+        value = ''.join([r.choice(alphabet) for i in range(r.randrange(30))])
+        sub = ''.join([r.choice(alphabet) for i in range(r.randrange(1, 8))])
+        start = r.randrange(len(value) + 1)
+        end = r.randrange(start, len(value) + 1)
+        for v in [value, list(value)]:
+            assert (_search_two_way(v, sub, start, end, SEARCH_FIND, 0) ==
+                    value.find(sub, start, end))
+            assert (_search_two_way(v, sub, start, end, SEARCH_RFIND, 0) ==
+                    value.rfind(sub, start, end))
+            assert (_search_two_way(v, sub, start, end, SEARCH_COUNT, 0) ==
+                    value.count(sub, start, end))
+
+def test_search_pathological():
+    # these inputs make the simple algorithm switch to the two-way one
+    n = 5000
+    for value, sub in [('a' * n, 'a' * 10 + 'b'),
+                       ('a' * n + 'b', 'a' * 10 + 'b'),
+                       ('b' + 'a' * n, 'b' + 'a' * 10),
+                       ('ab' * n, 'ab' * 10 + 'b'),
+                       ('ab' * n + 'b', 'ab' * 10 + 'b'),
+                       ('a' * n, 'a' * 10),
+                       ('aab' * n, 'aab' * 5 + 'aa'),
+                       ('xyz' + 'a' * n + 'xyz', 'a' * 99 + 'x')]:
+        for start, end in [(0, len(value)), (7, len(value) - 3), (3, 50)]:
+            for v in [value, list(value)]:
+                assert find(v, sub, start, end) == value.find(sub, start, end)
+                assert (rfind(v, sub, start, end) ==
+                        value.rfind(sub, start, end))
+                assert (count(v, sub, start, end) ==
+                        value.count(sub, start, end))
+
+def test_search_compiled():
+    # the memchr() paths are only used when translated
+    from rpython.translator.c.test.test_genc import compile
+    from rpython.rlib.rstring import SEARCH_RFIND
+    cases = [('one two three ' * 20, 'thr'),
+             ('one two three ' * 20, 'e t'),
+             ('one two three ' * 20, 'o'),
+             ('ab' * 100, 'abc'),
+             ('ab' * 100 + 'c', 'abc'),
+             ('a' * 200 + 'b', 'a' * 7 + 'b'),
+             ('b' + 'a' * 200, 'b' + 'a' * 20),
+             ('aab' * 100, 'aab' * 5 + 'a'),
+             ('x' * 100 + 'hello' * 10 + 'x' * 100, 'hello' * 7)]
+
+    def match(value, sub, i):
+        for j in range(len(sub)):
+            if value[i + j] != sub[j]:
+                return False
+        return True
+
+    def naive(value, sub, start, end, mode):
+        res = 0
+        i = start
+        while i + len(sub) <= end:
+            if match(value, sub, i):
+                if mode == SEARCH_FIND:
+                    return i
+                res += 1
+                i += len(sub)
+            else:
+                i += 1
+        if mode == SEARCH_RFIND:
+            i = end - len(sub)
+            while i >= start:
+                if match(value, sub, i):
+                    return i
+                i -= 1
+        if mode != SEARCH_COUNT:
+            return -1
+        return res
+
+    def fn(n):
+        errors = 0
+        for value, sub in cases:
+            for start in range(0, len(value), 7):
+                for end in range(start, len(value) + 1, 7):
+                    for mode in [SEARCH_COUNT, SEARCH_FIND, SEARCH_RFIND]:
+                        if (_search(value, sub, start, end, mode) !=
+                                naive(value, sub, start, end, mode)):
+                            errors += 1
+                    c = sub[0]
+                    if value.find(c, start, end) != naive(value, c, start,
+                                                          end, SEARCH_FIND):
+                        errors += 1
+                    if value.rfind(c, start, end) != naive(value, c, start,
+                                                           end, SEARCH_RFIND):
+                        errors += 1
+        return errors + n
+
+    f = compile(fn, [int])
+    assert f(0) == 0
+
 
 class TestTranslates(BaseRtypingTest):
     def test_split_rsplit(self):
@@ -298,6 +397,16 @@ class TestTranslates(BaseRtypingTest):
         assert res
 
 
+    def test_search_pathological(self):
+        def fn(n):
+            value = 'a' * n + 'b'
+            sub = 'a' * 10 + 'b'
+            return (find(value, sub, 0, len(value)) * 1000000 +
+                    rfind(value, sub, 0, len(value)) * 1000 +
+                    count(value, 'a' * 10, 0, len(value)))
+        res = self.interpret(fn, [100])
+        assert res == 90 * 1000000 + 90 * 1000 + 10
+
     def test_replace(self):
         def fn():
             res = True
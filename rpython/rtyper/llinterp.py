@@ -837,6 +837,9 @@ class LLFrame(object):
     def op_gc__collect_step(self):
         return self.heap.collect_step()
 
+    def op_gc__trim_memory(self):
+        return self.heap.trim_memory()
+
     def op_gc__enable(self):
         self.heap.enable()
 
@@ -319,6 +319,15 @@ def arena_malloc(nbytes, zero):
     """Allocate and return a new arena, optionally zero-initialized."""
     return Arena(nbytes, zero).getaddr(0)
 
+HUGEPAGE_SIZE = 2 * 1024 * 1024
+
+def arena_malloc_hugepage(nbytes):
+    """Allocate and return a new arena, not zero-initialized, aligned to
+    HUGEPAGE_SIZE and that the OS is asked to back with (transparent) huge
+    pages.  The arena is released with arena_free() as usual.  Returns NULL
+    if huge pages are not supported; use arena_malloc() instead then."""
+    return arena_malloc(nbytes, False)
+
 def arena_free(arena_addr):
     """Release an arena."""
     assert isinstance(arena_addr, fakearenaaddress)
@@ -524,6 +533,37 @@ register_external(arena_malloc, [int, int], llmemory.Address,
                   llfakeimpl=arena_malloc,
                   sandboxsafe=True)
 
+if os.name == 'posix':
+    llimpl_posix_memalign = rffi.llexternal('posix_memalign',
+                                [rffi.VOIDPP, rffi.SIZE_T, rffi.SIZE_T],
+                                rffi.INT, sandboxsafe=True, _nowrapper=True)
+
+    def llimpl_arena_malloc_hugepage(nbytes):
+        from rpython.rlib import rmmap
+        # round up the size: a huge page is only used if the whole
+        # aligned 2MB range is part of the arena
+        size = (nbytes + HUGEPAGE_SIZE - 1) & ~(HUGEPAGE_SIZE - 1)
+        p = lltype.malloc(rffi.VOIDPP.TO, 1, flavor='raw',
+                          track_allocation=False)
+        res = llimpl_posix_memalign(p, rffi.cast(rffi.SIZE_T, HUGEPAGE_SIZE),
+                                    rffi.cast(rffi.SIZE_T, size))
+        addr = rffi.cast(llmemory.Address, p[0])
+        lltype.free(p, flavor='raw', track_allocation=False)
+        if rffi.cast(lltype.Signed, res) != 0:
+            return llmemory.NULL
+        if not rmmap.madvise_hugepage(addr, size):
+            llimpl_free(addr)
+            return llmemory.NULL
+        return addr
+else:
+    def llimpl_arena_malloc_hugepage(nbytes):
+        return llmemory.NULL
+register_external(arena_malloc_hugepage, [int], llmemory.Address,
+                  'll_arena.arena_malloc_hugepage',
+                  llimpl=llimpl_arena_malloc_hugepage,
+                  llfakeimpl=arena_malloc_hugepage,
+                  sandboxsafe=True)
+
 register_external(arena_free, [llmemory.Address], None, 'll_arena.arena_free',
                   llimpl=llimpl_free,
                   llfakeimpl=arena_free,
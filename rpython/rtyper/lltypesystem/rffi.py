@@ -1460,6 +1460,23 @@ c_memset = llexternal("memset",
             releasegil=False,
             calling_conv='c',
         )
+c_memchr = llexternal("memchr",
+            [CCHARP, lltype.Signed, SIZE_T],
+            CCHARP,
+            releasegil=False,
+            calling_conv='c',
+            _nowrapper=True,
+            sandboxsafe=True,
+        )
+# GNU extension, only on Linux
+c_memrchr = llexternal("memrchr",
+            [CCHARP, lltype.Signed, SIZE_T],
+            CCHARP,
+            releasegil=False,
+            calling_conv='c',
+            _nowrapper=True,
+            sandboxsafe=True,
+        )
 
 
 # NOTE: This is not a weak key dictionary, thus keeping a lot of stuff alive.
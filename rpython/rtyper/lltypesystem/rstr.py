@@ -184,6 +184,33 @@ def _new_copy_contents_fun(SRC_TP, DST_TP, CHAR_TP, name):
  _get_raw_buf_unicode) = _new_copy_contents_fun(UNICODE, UNICODE, UniChar,
                                                 'unicode')
 
+def use_memchr():
+    return we_are_translated() and not rgc.must_split_gc_address_space()
+
+@signature(types.any(), types.any(), types.int(), types.int(), types.bool(),
+           returns=types.int())
+def ll_memchr(s, ch, start, end, reverse):
+    """Returns the index of the first 'ch' in s.chars[start:end], or of
+    the last one if 'reverse', or -1.  Uses the C library's memchr() or
+    memrchr(): check use_memchr() first, and HAVE_MEMRCHR from rlib.rstring
+    for 'reverse'.
+    """
+    from rpython.rtyper.lltypesystem import rffi
+    # from here, no GC operations can happen
+    addr = rffi.cast(rffi.CCHARP, _get_raw_buf_string(STR, s, start))
+    length = rffi.cast(rffi.SIZE_T, end - start)
+    if reverse:
+        res = rffi.c_memrchr(addr, ord(ch), length)
+    else:
+        res = rffi.c_memchr(addr, ord(ch), length)
+    if res:
+        index = start + (rffi.cast(Signed, res) - rffi.cast(Signed, addr))
+    else:
+        index = -1
+    # end of "no GC" section
+    keepalive_until_here(s)
+    return index
+
 CONST_STR_CACHE = WeakValueDictionary()
 CONST_UNICODE_CACHE = WeakValueDictionary()
 
@@ -670,6 +697,8 @@ class LLHelpers(AbstractLLHelpers):
         i = start
         if end > len(s.chars):
             end = len(s.chars)
+        if typeOf(s) == Ptr(STR) and use_memchr() and i < end:
+            return ll_memchr(s, ch, i, end, False)
         while i < end:
             if s.chars[i] == ch:
                 return i
@@ -682,6 +711,10 @@ class LLHelpers(AbstractLLHelpers):
     def ll_rfind_char(s, ch, start, end):
         if end > len(s.chars):
             end = len(s.chars)
+        from rpython.rlib.rstring import HAVE_MEMRCHR
+        if (HAVE_MEMRCHR and typeOf(s) == Ptr(STR) and use_memchr() and
+                start < end):
+            return ll_memchr(s, ch, start, end, True)
         i = end
         while i > start:
             i -= 1
@@ -772,10 +805,18 @@ class LLHelpers(AbstractLLHelpers):
         from rpython.rtyper.annlowlevel import hlstr, hlunicode
         from rpython.rlib import rstring
         tp = typeOf(s1)
+        # the strings are never None here: say so, to get the same
+        # annotations as the calls to rstring._search() from RPython code
         if tp == string_repr.lowleveltype or tp == Char:
-            return rstring._search(hlstr(s1), hlstr(s2), start, end, mode)
+            value = hlstr(s1)
+            other = hlstr(s2)
+            assert value is not None and other is not None
+            return rstring._search(value, other, start, end, mode)
         else:
-            return rstring._search(hlunicode(s1), hlunicode(s2), start, end, mode)
+            value = hlunicode(s1)
+            other = hlunicode(s2)
+            assert value is not None and other is not None
+            return rstring._search(value, other, start, end, mode)
 
     @staticmethod
     @signature(types.int(), types.any(), returns=types.any())
@@ -322,6 +322,19 @@ def test_madvise_arena_free():
     assert rffi.cast(lltype.Signed, addr) == 124 * pagesize
     assert size == pagesize * 5
 
+def test_arena_malloc_hugepage():
+    if os.name != 'posix':
+        py.test.skip("posix only")
+    size = llarena.HUGEPAGE_SIZE + 100
+    a = llarena.llimpl_arena_malloc_hugepage(size)
+    if not a:
+        py.test.skip("no transparent huge pages here")
+    try:
+        addr = rffi.cast(lltype.Signed, a)
+        assert addr % llarena.HUGEPAGE_SIZE == 0
+    finally:
+        llarena.llimpl_free(a)
+
 
 class TestStandalone(test_standalone.StandaloneTests):
     def test_compiled_arena_protect(self):
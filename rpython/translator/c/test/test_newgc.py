@@ -1913,6 +1913,39 @@ class TestIncrementalMiniMarkGC(TestMiniMarkGC):
         res = self.run("total_gc_time")
         assert res > 0 # should take a few microseconds
 
+    def define_trim_memory(cls):
+        class A:
+            pass
+        def f():
+            # make many old objects, then keep only runs of them: the pages
+            # between the runs become free, but not whole arenas
+            lst = []
+            for i in range(100000):
+                a = A()
+                a.i = i
+                lst.append(a)
+            rgc.collect()
+            keep = [a for a in lst if (a.i // 2000) % 4 == 0]
+            lst = None
+            rgc.collect()
+            released = rgc.trim_memory()
+            if rgc.get_stats(rgc.RELEASED_MEMORY) <= 0:
+                return -1
+            if rgc.trim_memory() >= released:
+                return -2
+            # only whole OS pages are counted
+            if rgc.get_stats(rgc.RELEASED_MEMORY) % 4096 != 0:
+                return -4
+            for a in keep:
+                if (a.i // 2000) % 4 != 0:
+                    return -3
+            return released
+        return f
+
+    def test_trim_memory(self):
+        res = self.run("trim_memory")
+        assert res > 0
+
     def define_increase_root_stack_depth(cls):
         class X:
             pass
@@ -0,0 +1,110 @@
+""" Benchmark of the bulk operations of rbytes on log-like text:
+
+    ./targetbytes-bench-c size count [loop]
+
+With 'loop', the plain RPython loops are used instead of the vectorized
+C functions of rlib/fastbytes.  'lower' is done on a list of chars, like
+bytearray.lower(): on a str, rbytes.lower() is just str.lower().
+"""
+
+import time
+from rpython.rlib import rbytes
+from rpython.rlib.rgc import resizable_list_supporting_raw_ptr
+
+LOG_PIECE = ("2024-05-17 12:34:56,789 INFO [worker-3] GET /api/v1/items"
+             "?id=42 200 OK 0.0123s\n")
+TABLE = ''.join([chr(i) for i in range(256)]).replace('/', '_')
+
+def make_input(piece, size):
+    assert size >= 0
+    s = piece * (size // len(piece) + 1)
+    return s[:size]
+
+def report(what, size, count, t):
+    if t > 0.0:
+        mb_per_sec = size * count / t / (1024.0 * 1024.0)
+    else:
+        mb_per_sec = 0.0
+    print what, t, 'seconds', mb_per_sec, 'MB/s'
+
+def count_lines(s, use_loop):
+    # like str.splitlines(), without building the list
+    n = 0
+    pos = 0
+    end = len(s)
+    while pos < end:
+        if use_loop:
+            pos = rbytes._find_linebreak_loop(s, pos, end)
+        else:
+            pos = rbytes.find_linebreak(s, pos, end)
+        if pos < 0:
+            pos = end
+        pos += 1
+        n += 1
+    return n
+
+def run(op, s, lst, use_loop):
+    size = len(s)
+    if op == 'count_char':
+        if use_loop:
+            return rbytes._count_char_loop(s, ' ', 0, size)
+        return rbytes.count_char(s, ' ', 0, size)
+    elif op == 'splitlines':
+        return count_lines(s, use_loop)
+    elif op == 'lower':
+        if use_loop:
+            return len(rbytes._lower_loop(lst))
+        return len(rbytes.lower(lst))
+    elif op == 'swapcase':
+        if use_loop:
+            return len(rbytes._swapcase_loop(s))
+        return len(rbytes.swapcase(s))
+    elif op == 'translate':
+        if use_loop:
+            return len(rbytes._translate_loop(s, TABLE))
+        return len(rbytes.translate(s, TABLE))
+    elif op == 'isdigit':
+        if use_loop:
+            return rbytes._all_in_class_loop(s, rbytes.fastbytes.DIGIT)
+        return rbytes.isdigit(s)
+    elif op == 'isspace':
+        if use_loop:
+            return rbytes._all_in_class_loop(s, rbytes.fastbytes.SPACE)
+        return rbytes.isspace(s)
+    else:
+        if use_loop:
+            return rbytes._is_ascii_loop(s)
+        return rbytes.is_ascii(s)
+
+OPERATIONS = ['count_char', 'splitlines', 'lower', 'swapcase', 'translate',
+              'isdigit', 'isspace', 'is_ascii']
+
+def main(argv):
+    if len(argv) < 3:
+        print __doc__
+        return 1
+    size = int(argv[1])
+    count = int(argv[2])
+    use_loop = len(argv) > 3 and argv[3] == 'loop'
+    log = make_input(LOG_PIECE, size)
+    digits = make_input("0123456789", size)
+    spaces = make_input(" \t\n", size)
+    lst = resizable_list_supporting_raw_ptr([c for c in log])
+    # the first round only warms up the GC
+    for round in range(2):
+        for op in OPERATIONS:
+            if op == 'isdigit':
+                s = digits
+            elif op == 'isspace':
+                s = spaces
+            else:
+                s = log
+            t0 = time.time()
+            for i in range(count):
+                run(op, s, lst, use_loop)
+            if round == 1:
+                report(op + ':', size, count, time.time() - t0)
+    return 0
+
+def target(*args):
+    return main, None
@@ -0,0 +1,59 @@
+""" Benchmark of the major collections of incminimark on a heap much
+larger than the cache:
+
+    ./targetgcmark-bench-c nodes count
+
+Builds 'nodes' small objects that point to each other in a random order,
+then times 'count' full collections.  The marking dominates: there is
+almost no garbage to sweep.  Run it with and without
+PYPY_GC_MARK_PREFETCH=8 in the environment to compare.
+"""
+
+import time
+from rpython.rlib import rgc
+from rpython.rlib.rrandom import Random
+
+
+class Node(object):
+    def __init__(self, value):
+        self.value = value
+        self.left = None
+        self.right = None
+
+def build_heap(nodes):
+    # every node is reachable from nodes[0], but following the pointers
+    # jumps around the heap instead of walking it in allocation order
+    lst = [Node(i) for i in range(nodes)]
+    order = range(1, nodes)
+    rnd = Random(42)
+    for i in range(len(order) - 1, 0, -1):
+        j = int(rnd.random() * (i + 1))
+        order[i], order[j] = order[j], order[i]
+    prev = [lst[0]]
+    for k in range(len(order)):
+        parent = prev[k // 2]
+        node = lst[order[k]]
+        if k & 1:
+            parent.right = node
+        else:
+            parent.left = node
+        prev.append(node)
+    return lst[0]
+
+def main(argv):
+    if len(argv) < 3:
+        print __doc__
+        return 1
+    nodes = int(argv[1])
+    count = int(argv[2])
+    root = build_heap(nodes)
+    rgc.collect()    # warm-up, and the nodes are old afterwards
+    t0 = time.time()
+    for i in range(count):
+        rgc.collect()
+    t = time.time() - t0
+    print 'major collection:', t / count * 1000.0, 'ms', root.value
+    return 0
+
+def target(*args):
+    return main, None
@@ -0,0 +1,66 @@
+""" Benchmark of str.find(), str.rfind() and str.count() on text where
+the needle is not found, and on pathological inputs that make a simple
+search algorithm quadratic:
+
+    ./targetsearch-bench-c text|worst size needlelength count
+
+'text' searches a needle made of words in a piece of English text.
+'worst' searches 'a' * k + 'b' + 'a' * k in 'a' * size.
+"""
+
+import time
+
+TEXT_PIECE = ("The quick brown fox jumps over the lazy dog, and then "
+              "it runs away into the forest.\n")
+
+def make_input(kind, size, needlelength):
+    if kind == 'worst':
+        s = 'a' * size
+        half = 'a' * (needlelength // 2)
+        needle = half + 'b' + half
+    else:
+        s = TEXT_PIECE * (size // len(TEXT_PIECE) + 1)
+        needle = ('zebras jump quickly ' * needlelength)[:needlelength]
+    return s, needle
+
+def report(what, size, count, t):
+    if t > 0.0:
+        mb_per_sec = size * count / t / (1024.0 * 1024.0)
+    else:
+        mb_per_sec = 0.0
+    print what, t, 'seconds', mb_per_sec, 'MB/s'
+
+def main(argv):
+    if len(argv) < 5:
+        print __doc__
+        return 1
+    size = int(argv[2])
+    needlelength = int(argv[3])
+    assert size >= 0 and needlelength > 0
+    s, needle = make_input(argv[1], size, needlelength)
+    size = len(s)
+    count = int(argv[4])
+    res = 0
+    #
+    t0 = time.time()
+    for i in range(count):
+        res += s.find(needle)
+    t1 = time.time()
+    report('find:', size, count, t1 - t0)
+    #
+    t0 = time.time()
+    for i in range(count):
+        res += s.rfind(needle)
+    t1 = time.time()
+    report('rfind:', size, count, t1 - t0)
+    #
+    t0 = time.time()
+    for i in range(count):
+        res += s.count(needle)
+    t1 = time.time()
+    report('count:', size, count, t1 - t0)
+    print res
+    return 0
+
+def target(*args):
+    return main, None
@@ -0,0 +1,62 @@
+""" Benchmark of the utf-8 validation and length computation of rutf8,
+on mostly-ascii or mostly-CJK strings:
+
+    ./targetutf8-bench-c ascii|cjk size count [loop]
+
+With 'loop', the plain RPython loops are used instead of the vectorized
+C functions of rlib/fastutf8.
+"""
+
+import time
+from rpython.rlib import rutf8
+
+ASCII_PIECE = "Some text, with an accent here and there: \xc3\xa9t\xc3\xa9.\n"
+CJK_PIECE = (u"\u65e5\u672c\u8a9e\u306e\u30c6\u30ad\u30b9\u30c8\u3001"
+             u"\u4e2d\u6587 (utf-8)\u3002\n").encode('utf-8')
+
+def make_input(kind, size):
+    if kind == 'cjk':
+        piece = CJK_PIECE
+    else:
+        piece = ASCII_PIECE
+    return piece * (size // len(piece) + 1)
+
+def report(what, size, count, t):
+    if t > 0.0:
+        mb_per_sec = size * count / t / (1024.0 * 1024.0)
+    else:
+        mb_per_sec = 0.0
+    print what, t, 'seconds', mb_per_sec, 'MB/s'
+
+def main(argv):
+    if len(argv) < 4:
+        print __doc__
+        return 1
+    s = make_input(argv[1], int(argv[2]))
+    count = int(argv[3])
+    use_loop = len(argv) > 4 and argv[4] == 'loop'
+    end = len(s)
+    length = 0
+    #
+    t0 = time.time()
+    for i in range(count):
+        if use_loop:
+            length = rutf8._check_utf8_loop(s, False, 0, end)
+        else:
+            length = rutf8.check_utf8(s, False)
+    t1 = time.time()
+    report('check_utf8:', end, count, t1 - t0)
+    #
+    t0 = time.time()
+    for i in range(count):
+        if use_loop:
+            length = rutf8._codepoints_in_utf8_loop(s, 0, end)
+        else:
+            length = rutf8.codepoints_in_utf8(s)
+    t1 = time.time()
+    report('codepoints_in_utf8:', end, count, t1 - t0)
+    print end, 'bytes,', length, 'code points'
+    return 0
+
+def target(*args):
+    return main, None